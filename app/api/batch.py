@@ -0,0 +1,170 @@
+import asyncio
+import inspect
+import os
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ValidationError
+
+from app.api import charts, correlation, descriptive, distribution, inferential, regression
+from app.api.fast_json import FastJSONResponse, jsonable
+from app.models.array_types import KIND_GROUPS, array_field_kinds
+from app.models.request_models import BatchJob, BatchRequest
+from app.models.response_models import BatchJobResult, BatchResponse
+from app.services.compute_pool import compute_pool, ComputeQueueFullError
+
+router = APIRouter()
+
+# 可在批次中使用的路由群組 (與 main.py 的前綴相同)
+_JOB_ROUTERS = {
+    "descriptive": descriptive.router,
+    "inferential": inferential.router,
+    "regression": regression.router,
+    "correlation": correlation.router,
+    "distribution": distribution.router,
+    "charts": charts.router,
+}
+
+
+def _single_model_endpoint(route: APIRoute) -> bool:
+    """只接受單一請求模型參數的端點才能作為批次工作 (串流端點除外)"""
+    parameters = list(inspect.signature(route.endpoint).parameters.values())
+    return (
+        len(parameters) == 1
+        and inspect.isclass(parameters[0].annotation)
+        and issubclass(parameters[0].annotation, BaseModel)
+    )
+
+
+def _build_job_registry() -> Dict[str, Tuple[Type[BaseModel], Callable[..., Any]]]:
+    """
+    由各路由建立工作類型對照表
+
+    工作類型為「群組.路徑」(如 inferential.ttest)，路徑名稱不重複時也可直接使用
+    (如 ttest)。批次工作直接呼叫原本的端點函式，驗證、計算與錯誤處理都與單一請求相同。
+    """
+    registry: Dict[str, Tuple[Type[BaseModel], Callable[..., Any]]] = {}
+    short_names: Dict[str, List[str]] = {}
+    for group, group_router in _JOB_ROUTERS.items():
+        for route in group_router.routes:
+            if not isinstance(route, APIRoute) or not _single_model_endpoint(route):
+                continue
+            name = route.path.strip("/")
+            job_type = f"{group}.{name}"
+            registry[job_type] = (route.body_field.type_, route.endpoint)
+            short_names.setdefault(name, []).append(job_type)
+
+    for name, job_types in short_names.items():
+        if len(job_types) == 1 and name not in registry:
+            registry[name] = registry[job_types[0]]
+    return registry
+
+
+JOB_REGISTRY = _build_job_registry()
+
+# 同時執行的工作數量上限
+_MAX_CONCURRENT_JOBS = int(os.environ.get("SFDA_BATCH_CONCURRENCY", compute_pool.thread_workers))
+
+
+def _decode_shared_array(name: str, value: Any):
+    """共用陣列只轉換一次：一維/二維陣列轉為 NumPy 陣列，長度不一的多組資料轉為陣列列表"""
+    try:
+        array = np.asarray(value, dtype=float)
+    except (ValueError, TypeError):
+        if not isinstance(value, list):
+            raise ValueError(f"共用陣列 {name} 必須為數值陣列")
+        try:
+            return [np.asarray(group, dtype=float) for group in value]
+        except (ValueError, TypeError):
+            raise ValueError(f"共用陣列 {name} 必須為數值陣列")
+    if array.ndim not in (1, 2) or array.size == 0:
+        raise ValueError(f"共用陣列 {name} 必須為非空的一維或二維數值陣列")
+    return array
+
+
+def _resolve_params(model: Type[BaseModel], params: Dict[str, Any], arrays: Dict[str, Any]) -> Dict[str, Any]:
+    """將陣列欄位中的共用陣列名稱替換為已解碼的陣列"""
+    resolved = dict(params)
+
+    def lookup(name: str):
+        if name not in arrays:
+            raise ValueError(f"找不到共用陣列: {name}")
+        return arrays[name]
+
+    for field, kind in array_field_kinds(model).items():
+        value = resolved.get(field)
+        if isinstance(value, str):
+            resolved[field] = lookup(value)
+        elif kind == KIND_GROUPS and isinstance(value, list) and value and all(isinstance(v, str) for v in value):
+            resolved[field] = [lookup(name) for name in value]
+    return resolved
+
+
+def _validation_errors(error: ValidationError) -> List[Dict[str, Any]]:
+    return [
+        {"loc": list(item["loc"]), "msg": item["msg"], "type": item["type"]}
+        for item in error.errors(include_url=False)
+    ]
+
+
+async def _run_job(job: BatchJob, arrays: Dict[str, Any], semaphore: asyncio.Semaphore) -> BatchJobResult:
+    """執行單一工作，錯誤只影響該工作"""
+    if job.type not in JOB_REGISTRY:
+        return BatchJobResult(
+            id=job.id, type=job.type, success=False, status_code=400, error=f"不支援的工作類型: {job.type}"
+        )
+
+    model, endpoint = JOB_REGISTRY[job.type]
+    try:
+        request = model.model_validate(_resolve_params(model, job.params, arrays))
+        async with semaphore:
+            result = await endpoint(request)
+    except ValidationError as e:
+        return BatchJobResult(id=job.id, type=job.type, success=False, status_code=422, error=_validation_errors(e))
+    except ComputeQueueFullError as e:
+        return BatchJobResult(id=job.id, type=job.type, success=False, status_code=503, error=str(e))
+    except HTTPException as e:
+        return BatchJobResult(id=job.id, type=job.type, success=False, status_code=e.status_code, error=e.detail)
+    except Exception as e:
+        return BatchJobResult(id=job.id, type=job.type, success=False, status_code=400, error=str(e))
+
+    if isinstance(result, FastJSONResponse):
+        # 略過 response_model 的端點：取回原始結果 (可能含 NumPy 陣列)
+        result = jsonable(result.payload)
+    if isinstance(result, Response):
+        return BatchJobResult(
+            id=job.id, type=job.type, success=False, status_code=400,
+            error="批次工作只能回傳 JSON，圖片請使用 image_delivery=base64 或 url",
+        )
+    if isinstance(result, BaseModel):
+        result = result.model_dump()
+    return BatchJobResult(id=job.id, type=job.type, success=True, status_code=200, result=result)
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(request: BatchRequest):
+    """
+    批次執行多個統計分析工作
+
+    共用陣列 (arrays) 只解碼一次，各工作以名稱引用；工作在計算執行器上並行執行，
+    結果依工作順序回傳，單一工作失敗不影響其他工作
+    """
+    try:
+        arrays = {name: _decode_shared_array(name, value) for name, value in request.arrays.items()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    semaphore = asyncio.Semaphore(max(1, _MAX_CONCURRENT_JOBS))
+    results = await asyncio.gather(*(_run_job(job, arrays, semaphore) for job in request.jobs))
+    succeeded = sum(1 for result in results if result.success)
+    return BatchResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+
+@router.get("/jobs")
+async def list_job_types():
+    """
+    列出可在批次中使用的工作類型
+    """
+    return {"job_types": sorted(JOB_REGISTRY)}
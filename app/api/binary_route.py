@@ -0,0 +1,122 @@
+from typing import Any, Callable, Dict, List, Optional, Type, get_args, get_origin
+
+import numpy as np
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.datastructures import Headers
+
+from app.models.array_types import array_field_kinds
+from app.services.array_codec import (
+    ARROW_STREAM_CONTENT_TYPE,
+    BINARY_CONTENT_TYPES,
+    ArrayDecodeError,
+    assign_raw_arrays,
+    decode_arrow_stream,
+    decode_raw_float64,
+)
+
+
+def _is_list_annotation(annotation) -> bool:
+    """判斷欄位型別是否為 List/Tuple (含 Optional 包裝)"""
+    if get_origin(annotation) in (list, tuple):
+        return True
+    return any(_is_list_annotation(arg) for arg in get_args(annotation))
+
+
+def _describe_array_inputs(errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """驗證錯誤的 input 為 NumPy 陣列時改為形狀描述 (陣列無法也不需要序列化回傳)"""
+    return [
+        {**error, "input": f"array{error['input'].shape}"} if isinstance(error.get("input"), np.ndarray) else error
+        for error in errors
+    ]
+
+
+class BinaryArrayRequest(Request):
+    """
+    二進位陣列請求
+
+    將 Arrow IPC 串流或原始 float64 內容解碼為 NumPy 陣列，與查詢參數中的
+    純量參數合併後，以 JSON 請求的形式交給 FastAPI 驗證，陣列欄位不會逐元素轉換。
+    """
+
+    def __init__(self, scope, receive, model: Type[BaseModel], content_type: str):
+        super().__init__(scope, receive)
+        self._model = model
+        self._binary_content_type = content_type
+        # FastAPI 只對 JSON 內容呼叫 json()，因此改寫內容類型
+        headers = self.headers.mutablecopy()
+        headers["content-type"] = "application/json"
+        self._headers = Headers(raw=headers.raw)
+
+    def _query_payload(self) -> Dict[str, Any]:
+        """從查詢參數取得純量與列表參數 (列表可重複參數或以逗號分隔)"""
+        payload: Dict[str, Any] = {}
+        for name, field in self._model.model_fields.items():
+            values = self.query_params.getlist(name)
+            if not values:
+                continue
+            if _is_list_annotation(field.annotation):
+                if len(values) == 1 and "," in values[0]:
+                    values = values[0].split(",")
+                payload[name] = values
+            else:
+                payload[name] = values[-1]
+        return payload
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            kinds = array_field_kinds(self._model)
+            try:
+                if self._binary_content_type == ARROW_STREAM_CONTENT_TYPE:
+                    arrays = decode_arrow_stream(body, kinds)
+                else:
+                    names_header = self.headers.get("x-array-names")
+                    names: Optional[List[str]] = (
+                        [name.strip() for name in names_header.split(",")] if names_header else None
+                    )
+                    arrays = assign_raw_arrays(decode_raw_float64(body), kinds, names)
+            except ArrayDecodeError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            payload = self._query_payload()
+            payload.update(arrays)
+            self._json = payload
+        return self._json
+
+
+class BinaryArrayRoute(APIRoute):
+    """
+    支援二進位陣列請求的路由
+
+    除了 JSON 之外，請求模型中的數值陣列欄位 (FloatArray 等) 也可透過
+    `application/vnd.apache.arrow.stream` 或 `application/octet-stream` 傳送，
+    其餘參數則以查詢參數傳入。
+    """
+
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+        model = self.body_field.type_ if self.body_field is not None else None
+        if not (isinstance(model, type) and issubclass(model, BaseModel) and array_field_kinds(model)):
+            return original_route_handler
+
+        # 在 OpenAPI 文件中列出二進位請求格式
+        binary_schema = {"schema": {"type": "string", "format": "binary"}}
+        self.openapi_extra = self.openapi_extra or {}
+        content = self.openapi_extra.setdefault("requestBody", {}).setdefault("content", {})
+        for binary_content_type in BINARY_CONTENT_TYPES:
+            content.setdefault(binary_content_type, binary_schema)
+
+        async def binary_route_handler(request: Request) -> Response:
+            content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type in BINARY_CONTENT_TYPES:
+                request = BinaryArrayRequest(request.scope, request.receive, model, content_type)
+                try:
+                    return await original_route_handler(request)
+                except RequestValidationError as e:
+                    raise RequestValidationError(_describe_array_inputs(e.errors()))
+            return await original_route_handler(request)
+
+        return binary_route_handler
@@ -1,4 +1,7 @@
-from fastapi import APIRouter, HTTPException
+import uuid
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Response
 from app.models.chart_models import (
     CreatePieChartRequest,
     CreateBarChartRequest,
@@ -10,12 +13,103 @@ from app.models.chart_models import (
     ChartResponse,
 )
 from app.services.chart_service import ChartService
+from app.services.compute_pool import compute_pool, ComputeQueueFullError
+from app.services.field_selection import wants_field
+from app.services.image_store import image_store, image_media_type, ImageNotFoundError
+from app.api.binary_route import BinaryArrayRoute
 
-router = APIRouter()
+router = APIRouter(route_class=BinaryArrayRoute)
 chart_service = ChartService()
 
+IMAGE_DELIVERY_BASE64 = "base64"
+IMAGE_DELIVERY_BINARY = "binary"
+IMAGE_DELIVERY_MULTIPART = "multipart"
+IMAGE_DELIVERY_URL = "url"
+
+# 暫存圖片的下載路徑 (與 main.py 註冊的前綴一致)
+IMAGE_URL_PREFIX = "/api/v1/charts/images"
+
+# 圖表端點除 JSON 外可能的回應內容類型
+CHART_RESPONSES = {
+    200: {
+        "content": {
+            "image/png": {"schema": {"type": "string", "format": "binary"}},
+            "image/svg+xml": {"schema": {"type": "string"}},
+            "multipart/mixed": {"schema": {"type": "string", "format": "binary"}},
+        },
+        "description": "依 image_delivery 回傳 JSON、圖片本身或 multipart/mixed (JSON 中繼資料 + 圖片)",
+    }
+}
+
+
+def _wants_raw_image(request) -> bool:
+    """是否以 base64 以外的方式回傳圖片"""
+    return request.generate_image and request.image_delivery != IMAGE_DELIVERY_BASE64
+
+
+def _service_include(request) -> Optional[List[str]]:
+    """傳給服務的 include；另行繪製圖片時仍需完整數據，待繪製後才移除"""
+    return None if _wants_raw_image(request) else request.include
+
+
+def _multipart_mixed(response: ChartResponse, image: bytes, media_type: str, image_format: str) -> Response:
+    """組成 multipart/mixed 回應：第一部分為 JSON 中繼資料，第二部分為圖片位元組"""
+    boundary = uuid.uuid4().hex
+    body = b"".join([
+        f"--{boundary}\r\nContent-Type: application/json\r\n\r\n".encode(),
+        response.model_dump_json().encode(),
+        f"\r\n--{boundary}\r\nContent-Type: {media_type}\r\n"
+        f"Content-Disposition: attachment; filename=\"chart.{image_format}\"\r\n\r\n".encode(),
+        image,
+        f"\r\n--{boundary}--\r\n".encode(),
+    ])
+    return Response(content=body, media_type=f"multipart/mixed; boundary={boundary}")
+
+
+async def _deliver_image(response: ChartResponse, request):
+    """
+    繪製圖表圖片並依 image_delivery 回傳
+
+    - binary: 直接回傳圖片位元組 (image/png、image/svg+xml 等)
+    - multipart: multipart/mixed，JSON 中繼資料 + 圖片位元組
+    - url: 圖片存入暫存區，JSON 回應只帶 image_id 與 image_url
+    """
+    if not response.success:
+        return response
+    response = response.model_copy()
+    image = await compute_pool.run(
+        "charts.render",
+        chart_service.render_image,
+        response.chart_type,
+        response.data,
+        response.title or "圖表",
+        response.metadata,
+        request.figsize,
+        request.dpi,
+        request.image_format,
+    )
+    if not wants_field(getattr(request, "include", None), "data"):
+        response.data = []
+    if image is None:
+        response.reasoning += "，但圖片生成失敗"
+        return response
+
+    media_type = image_media_type(request.image_format)
+    if request.image_delivery == IMAGE_DELIVERY_BINARY:
+        return Response(content=image, media_type=media_type)
+
+    response.image_format = request.image_format
+    response.has_image = True
+    response.reasoning += f"，並成功生成 {request.image_format.upper()} 圖片"
+    if request.image_delivery == IMAGE_DELIVERY_MULTIPART:
+        return _multipart_mixed(response, image, media_type, request.image_format)
+
+    response.image_id = image_store.put(image, media_type)
+    response.image_url = f"{IMAGE_URL_PREFIX}/{response.image_id}"
+    return response
 
-@router.post("/pie", response_model=ChartResponse)
+
+@router.post("/pie", response_model=ChartResponse, responses=CHART_RESPONSES)
 async def create_pie_chart(request: CreatePieChartRequest):
     """
     創建圓餅圖
@@ -23,12 +117,19 @@ async def create_pie_chart(request: CreatePieChartRequest):
     用於顯示各部分占整體的比例關係
     """
     try:
-        return chart_service.create_pie_chart(request.data, request.title)
+        response = await compute_pool.run(
+            "charts.pie", chart_service.create_pie_chart, request.data, request.title
+        )
+        if _wants_raw_image(request):
+            return await _deliver_image(response, request)
+        return response
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/bar", response_model=ChartResponse)
+@router.post("/bar", response_model=ChartResponse, responses=CHART_RESPONSES)
 async def create_bar_chart(request: CreateBarChartRequest):
     """
     創建長條圖
@@ -36,17 +137,24 @@ async def create_bar_chart(request: CreateBarChartRequest):
     用於比較不同類別的數值大小
     """
     try:
-        return chart_service.create_bar_chart(
+        response = await compute_pool.run(
+            "charts.bar",
+            chart_service.create_bar_chart,
             request.data, 
             request.title, 
             request.x_axis_label, 
             request.y_axis_label
         )
+        if _wants_raw_image(request):
+            return await _deliver_image(response, request)
+        return response
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/line", response_model=ChartResponse)
+@router.post("/line", response_model=ChartResponse, responses=CHART_RESPONSES)
 async def create_line_chart(request: CreateLineChartRequest):
     """
     創建折線圖
@@ -54,17 +162,28 @@ async def create_line_chart(request: CreateLineChartRequest):
     用於顯示數據隨時間或其他連續變量的變化趨勢
     """
     try:
-        return chart_service.create_line_chart(
+        response = await compute_pool.run(
+            "charts.line",
+            chart_service.create_line_chart,
             request.data, 
             request.title, 
             request.x_axis_label, 
-            request.y_axis_label
+            request.y_axis_label,
+            decimation=request.decimation,
+            max_points=request.max_points,
+            data_format=request.data_format,
+            include=_service_include(request)
         )
+        if _wants_raw_image(request):
+            return await _deliver_image(response, request)
+        return response
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/simple", response_model=ChartResponse)
+@router.post("/simple", response_model=ChartResponse, responses=CHART_RESPONSES)
 async def create_simple_chart(request: SimpleChartRequest):
     """
     創建簡單圖表
@@ -74,8 +193,20 @@ async def create_simple_chart(request: SimpleChartRequest):
     支援圖片生成功能 (設定 generate_image=true)
     """
     try:
-        if request.generate_image:
-            return chart_service.create_chart_from_simple_data_with_image(
+        if _wants_raw_image(request):
+            response = await compute_pool.run(
+                "charts.simple",
+                chart_service.create_chart_from_simple_data,
+                request.labels,
+                request.values,
+                request.chart_type,
+                request.title
+            )
+            return await _deliver_image(response, request)
+        elif request.generate_image:
+            return await compute_pool.run(
+                "charts.simple",
+                chart_service.create_chart_from_simple_data_with_image,
                 labels=request.labels,
                 values=request.values,
                 chart_type=request.chart_type,
@@ -86,17 +217,21 @@ async def create_simple_chart(request: SimpleChartRequest):
                 dpi=request.dpi
             )
         else:
-            return chart_service.create_chart_from_simple_data(
+            return await compute_pool.run(
+                "charts.simple",
+                chart_service.create_chart_from_simple_data,
                 request.labels,
                 request.values,
                 request.chart_type,
                 request.title
             )
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/histogram", response_model=ChartResponse)
+@router.post("/histogram", response_model=ChartResponse, responses=CHART_RESPONSES)
 async def create_histogram(request: HistogramRequest):
     """
     創建直方圖
@@ -108,22 +243,31 @@ async def create_histogram(request: HistogramRequest):
     - 異常值識別
     """
     try:
-        return chart_service.create_histogram(
+        response = await compute_pool.run(
+            "charts.histogram",
+            chart_service.create_histogram,
             values=request.values,
             bins=request.bins,
             title=request.title,
             x_axis_label=request.x_axis_label,
             y_axis_label=request.y_axis_label,
-            generate_image=request.generate_image,
+            generate_image=request.generate_image and not _wants_raw_image(request),
             image_format=request.image_format,
             figsize=request.figsize,
-            dpi=request.dpi
+            dpi=request.dpi,
+            data_format=request.data_format,
+            include=_service_include(request)
         )
+        if _wants_raw_image(request):
+            return await _deliver_image(response, request)
+        return response
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/boxplot", response_model=ChartResponse)
+@router.post("/boxplot", response_model=ChartResponse, responses=CHART_RESPONSES)
 async def create_boxplot(request: BoxplotRequest):
     """
     創建盒鬚圖
@@ -135,17 +279,26 @@ async def create_boxplot(request: BoxplotRequest):
     - 分佈形狀比較
     """
     try:
-        return chart_service.create_boxplot(
+        response = await compute_pool.run(
+            "charts.boxplot",
+            chart_service.create_boxplot,
             groups=request.groups,
             group_labels=request.group_labels,
             title=request.title,
-            y_axis_label=request.y_axis_label
+            y_axis_label=request.y_axis_label,
+            data_format=request.data_format,
+            include=_service_include(request)
         )
+        if _wants_raw_image(request):
+            return await _deliver_image(response, request)
+        return response
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/scatter", response_model=ChartResponse)
+@router.post("/scatter", response_model=ChartResponse, responses=CHART_RESPONSES)
 async def create_scatter(request: ScatterRequest):
     """
     創建散點圖
@@ -158,22 +311,54 @@ async def create_scatter(request: ScatterRequest):
     支援圖片生成功能 (設定 generate_image=true)
     """
     try:
-        return chart_service.create_scatter(
+        response = await compute_pool.run(
+            "charts.scatter",
+            chart_service.create_scatter,
             x=request.x,
             y=request.y,
             title=request.title,
             x_axis_label=request.x_axis_label,
             y_axis_label=request.y_axis_label,
             show_regression_line=request.show_regression_line,
-            generate_image=request.generate_image,
+            generate_image=request.generate_image and not _wants_raw_image(request),
             image_format=request.image_format,
             figsize=request.figsize,
-            dpi=request.dpi
+            dpi=request.dpi,
+            decimation=request.decimation,
+            max_points=request.max_points,
+            data_format=request.data_format,
+            include=_service_include(request)
         )
+        if _wants_raw_image(request):
+            return await _deliver_image(response, request)
+        return response
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get(
+    "/images/{image_id}",
+    responses={200: {"content": {"image/png": {}, "image/svg+xml": {}}, "description": "圖片位元組"}},
+)
+async def get_chart_image(image_id: str):
+    """
+    取得暫存的圖表圖片 (image_delivery=url 時回傳的 image_url)
+
+    圖片只保存一段時間，過期或不存在時回傳 404
+    """
+    try:
+        content, media_type = image_store.get(image_id)
+    except ImageNotFoundError:
+        raise HTTPException(status_code=404, detail=f"找不到圖片: {image_id}")
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Cache-Control": f"private, max-age={int(image_store.ttl)}"},
+    )
+
+
 @router.get("/health")
 async def chart_health_check():
     """
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
 from app.models.request_models import CorrelationRequest, CorrelationMatrixRequest
 from app.models.response_models import CorrelationResponse, CorrelationMatrixResponse
 from app.services.correlation_analysis import CorrelationAnalysisService
+from app.services.compute_pool import compute_pool, ComputeQueueFullError
+from app.services.streaming_stats import covariance_from_block
+from app.api.binary_route import BinaryArrayRoute
+from app.api.fast_json import FastJSONResponse
+from app.api.streaming import STREAM_OPENAPI, accumulate_stream, parse_columns
 
-router = APIRouter()
+router = APIRouter(route_class=BinaryArrayRoute)
 correlation_service = CorrelationAnalysisService()
 
 
@@ -15,7 +21,14 @@ async def pearson_correlation(request: CorrelationRequest):
     適用於連續變數的線性相關分析
     """
     try:
-        return correlation_service.pearson_correlation(request.x, request.y)
+        return await compute_pool.run(
+            "correlation.pearson",
+            correlation_service.pearson_correlation,
+            request.x,
+            request.y,
+        )
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -28,7 +41,14 @@ async def spearman_correlation(request: CorrelationRequest):
     適用於順序變數或非線性關係
     """
     try:
-        return correlation_service.spearman_correlation(request.x, request.y)
+        return await compute_pool.run(
+            "correlation.spearman",
+            correlation_service.spearman_correlation,
+            request.x,
+            request.y,
+        )
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -41,7 +61,14 @@ async def kendall_correlation(request: CorrelationRequest):
     適用於小樣本或有序變數
     """
     try:
-        return correlation_service.kendall_correlation(request.x, request.y)
+        return await compute_pool.run(
+            "correlation.kendall",
+            correlation_service.kendall_correlation,
+            request.x,
+            request.y,
+        )
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -51,9 +78,46 @@ async def correlation_matrix(request: CorrelationMatrixRequest):
     """
     計算相關矩陣
 
-    同時計算多個變數間的相關係數
+    同時計算多個變數間的相關係數，支援 pearson、spearman 與 kendall 方法
     """
     try:
-        return correlation_service.correlation_matrix(request.data, request.columns)
+        result = await compute_pool.run(
+            "correlation.matrix",
+            correlation_service.correlation_matrix,
+            request.data,
+            request.columns,
+            request.method,
+        )
+        return FastJSONResponse(result)
+    except ComputeQueueFullError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/matrix/stream", response_model=CorrelationMatrixResponse, openapi_extra=STREAM_OPENAPI
+)
+async def correlation_matrix_stream(
+    request: Request,
+    columns: Optional[str] = Query(None, description="以逗號分隔的欄位名稱"),
+):
+    """
+    以串流方式計算 Pearson 相關矩陣
+
+    適用於資料列數很多、無法一次載入記憶體的資料。請求本體可為：
+    - text/csv: 第一列為欄位名稱，columns 未指定時使用所有欄位
+    - application/octet-stream: 依列排列的 little-endian float64，columns 指定各欄名稱
+    - multipart/form-data: 以 file 欄位上傳上述格式的檔案
+
+    資料以區塊累加平均數與交叉乘積矩陣，記憶體與變數數的平方成正比，與資料列數無關
+    """
+    try:
+        accumulator, names = await accumulate_stream(
+            request, "correlation.matrix_stream", covariance_from_block, parse_columns(columns)
+        )
+        return FastJSONResponse(correlation_service.correlation_matrix_from_accumulator(accumulator, names))
+    except (ComputeQueueFullError, HTTPException):
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
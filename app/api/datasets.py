@@ -0,0 +1,67 @@
+from typing import Optional
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from app.models.response_models import DatasetInfo, DatasetListResponse
+from app.services.dataset_store import dataset_store, detect_format, DatasetNotFoundError
+from app.services.compute_pool import compute_pool, ComputeQueueFullError
+
+router = APIRouter()
+
+
+@router.post("", response_model=DatasetInfo)
+async def upload_dataset(
+    file: UploadFile = File(..., description="資料檔案 (CSV、Arrow IPC 或 Parquet)"),
+    name: Optional[str] = Form(None, description="資料集名稱"),
+    format: Optional[str] = Form(None, description="資料格式，未指定時依副檔名判斷"),
+):
+    """
+    上傳資料集
+
+    上傳後回傳資料集 id，之後的分析請求可用 `{"dataset": id, "column": "欄位"}`
+    引用欄位，不必重複傳送整個陣列
+    """
+    try:
+        fmt = format or detect_format(file.filename, file.content_type)
+        content = await file.read()
+        return await compute_pool.run(
+            "datasets.upload", dataset_store.ingest, content, fmt, name or file.filename
+        )
+    except ComputeQueueFullError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("", response_model=DatasetListResponse)
+async def list_datasets():
+    """
+    列出已上傳的資料集
+    """
+    return DatasetListResponse(
+        datasets=dataset_store.list(),
+        total_bytes=dataset_store.total_bytes,
+        max_bytes=dataset_store.max_bytes,
+        evictions=dataset_store.evictions,
+    )
+
+
+@router.get("/{dataset_id}", response_model=DatasetInfo)
+async def get_dataset(dataset_id: str):
+    """
+    取得資料集資訊
+    """
+    try:
+        return dataset_store.get(dataset_id).info()
+    except DatasetNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.delete("/{dataset_id}")
+async def delete_dataset(dataset_id: str):
+    """
+    刪除資料集
+    """
+    try:
+        dataset_store.delete(dataset_id)
+    except DatasetNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"deleted": dataset_id}
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException
+import functools
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
 from app.models.request_models import (
     BasicStatsRequest,
     DistributionStatsRequest,
@@ -8,10 +10,16 @@ from app.models.response_models import (
     BasicStatsResponse,
     DistributionStatsResponse,
     PercentilesResponse,
+    StreamingStatsResponse,
 )
 from app.services.descriptive_stats import DescriptiveStatsService
+from app.services.compute_pool import compute_pool, ComputeQueueFullError
+from app.services.quantiles import DEFAULT_SKETCH_K
+from app.services.streaming_stats import moments_from_block, summary_from_block
+from app.api.binary_route import BinaryArrayRoute
+from app.api.streaming import STREAM_OPENAPI, accumulate_stream
 
-router = APIRouter()
+router = APIRouter(route_class=BinaryArrayRoute)
 stats_service = DescriptiveStatsService()
 
 
@@ -23,7 +31,11 @@ async def calculate_basic_stats(request: BasicStatsRequest):
     包括：平均數、中位數、眾數、標準差、變異數、最小值、最大值、全距等
     """
     try:
-        return stats_service.calculate_basic_stats(request.values)
+        return await compute_pool.run(
+            "descriptive.basic", stats_service.calculate_basic_stats, request.values
+        )
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -36,7 +48,13 @@ async def calculate_distribution_stats(request: DistributionStatsRequest):
     包括：偏度、峰度、常態性檢定等
     """
     try:
-        return stats_service.calculate_distribution_stats(request.values)
+        return await compute_pool.run(
+            "descriptive.distribution",
+            stats_service.calculate_distribution_stats,
+            request.values,
+        )
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -47,8 +65,92 @@ async def calculate_percentiles(request: PercentilesRequest):
     計算百分位數
 
     包括：指定百分位數、四分位數等
+    method=sketch 時以 KLL 分位數草圖估計，適用於極大量資料
     """
     try:
-        return stats_service.calculate_percentiles(request.values, request.percentiles)
+        return await compute_pool.run(
+            "descriptive.percentiles",
+            stats_service.calculate_percentiles,
+            request.values,
+            request.percentiles,
+            request.method,
+            request.sketch_k,
+        )
+    except ComputeQueueFullError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/basic/stream", response_model=StreamingStatsResponse, openapi_extra=STREAM_OPENAPI)
+async def calculate_basic_stats_stream(
+    request: Request,
+    column: Optional[str] = Query(None, description="CSV 欄位名稱，未指定時使用第一欄"),
+):
+    """
+    以串流方式計算基本統計量
+
+    請求本體可為 CSV (text/csv)、little-endian float64 (application/octet-stream)
+    或 multipart 上傳檔案；單次走訪並以固定記憶體累加平均數、變異數、最小/最大值、偏度與峰度，
+    中位數由分位數草圖估計
+    """
+    try:
+        summary, _ = await accumulate_stream(
+            request, "descriptive.basic_stream", summary_from_block,
+            [column] if column else None, single_column=True,
+        )
+        return stats_service.basic_stats_from_accumulator(summary.moments, summary.sketch)
+    except (ComputeQueueFullError, HTTPException):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/distribution/stream", response_model=DistributionStatsResponse, openapi_extra=STREAM_OPENAPI
+)
+async def calculate_distribution_stats_stream(
+    request: Request,
+    column: Optional[str] = Query(None, description="CSV 欄位名稱，未指定時使用第一欄"),
+):
+    """
+    以串流方式計算分佈統計量
+
+    偏度與峰度由串流動差計算，常態性檢定使用 D'Agostino-Pearson K² 檢定
+    """
+    try:
+        moments, _ = await accumulate_stream(
+            request, "descriptive.distribution_stream", moments_from_block,
+            [column] if column else None, single_column=True,
+        )
+        return stats_service.distribution_stats_from_accumulator(moments)
+    except (ComputeQueueFullError, HTTPException):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/percentiles/stream", response_model=PercentilesResponse, openapi_extra=STREAM_OPENAPI)
+async def calculate_percentiles_stream(
+    request: Request,
+    column: Optional[str] = Query(None, description="CSV 欄位名稱，未指定時使用第一欄"),
+    percentiles: List[float] = Query([25, 50, 75], description="百分位數列表"),
+    sketch_k: int = Query(DEFAULT_SKETCH_K, ge=8, le=65536, description="分位數草圖大小"),
+):
+    """
+    以串流方式估計百分位數
+
+    各區塊建立 KLL 分位數草圖後合併，記憶體只與 sketch_k 有關；
+    回應中的 rank_error 為估計的等級誤差比例
+    """
+    try:
+        summary, _ = await accumulate_stream(
+            request, "descriptive.percentiles_stream",
+            functools.partial(summary_from_block, sketch_k=sketch_k),
+            [column] if column else None, single_column=True,
+        )
+        return stats_service.percentiles_from_sketch(summary.sketch, percentiles)
+    except (ComputeQueueFullError, HTTPException):
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
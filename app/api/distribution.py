@@ -2,8 +2,10 @@ from fastapi import APIRouter, HTTPException
 from app.models.request_models import NormalDistributionRequest, DistributionTestRequest
 from app.models.response_models import DistributionAnalysisResponse
 from app.services.distribution_analysis import DistributionAnalysisService
+from app.services.compute_pool import compute_pool, ComputeQueueFullError
+from app.api.binary_route import BinaryArrayRoute
 
-router = APIRouter()
+router = APIRouter(route_class=BinaryArrayRoute)
 distribution_service = DistributionAnalysisService()
 
 
@@ -15,7 +17,13 @@ async def normal_distribution_analysis(request: NormalDistributionRequest):
     估計參數並檢定是否符合常態分佈
     """
     try:
-        return distribution_service.normal_distribution_analysis(request.values)
+        return await compute_pool.run(
+            "distribution.normal",
+            distribution_service.normal_distribution_analysis,
+            request.values,
+        )
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -28,8 +36,13 @@ async def distribution_goodness_of_fit(request: DistributionTestRequest):
     檢定數據是否符合指定的機率分佈
     """
     try:
-        return distribution_service.distribution_test(
-            request.values, request.distribution
+        return await compute_pool.run(
+            "distribution.test",
+            distribution_service.distribution_test,
+            request.values,
+            request.distribution,
         )
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
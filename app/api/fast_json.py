@@ -0,0 +1,76 @@
+import json
+from typing import Any
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# NumPy 陣列以 C 迴圈直接寫出，不必先轉為 Python float 列表
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def jsonable(value: Any) -> Any:
+    """
+    轉為 JSON 可序列化的 Python 物件
+
+    Pydantic 模型取欄位值 (不重新驗證)，NumPy 陣列與純量轉為 Python 列表與數值，
+    NaN 與無限大轉為 None (與 orjson 輸出的 null 一致)；
+    用於沒有 orjson 的環境，以及需要 Python 物件的呼叫端 (如批次分析結果)。
+    """
+    if isinstance(value, BaseModel):
+        return {name: jsonable(item) for name, item in value}
+    if isinstance(value, dict):
+        return {key: jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(item) for item in value]
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "f":
+            finite = np.isfinite(value)
+            if not finite.all():
+                items = value.astype(object)
+                items[~finite] = None
+                return items.tolist()
+        return value.tolist()
+    if isinstance(value, (float, np.floating)):
+        return float(value) if np.isfinite(value) else None
+    if isinstance(value, np.generic):
+        return value.tolist()
+    return value
+
+
+def _default(value: Any) -> Any:
+    """orjson 無法直接序列化的物件"""
+    if isinstance(value, BaseModel):
+        # 只取第一層欄位，巢狀模型與陣列再交給 orjson 處理
+        return dict(value)
+    if isinstance(value, (np.ndarray, np.generic)):
+        # 非連續或 orjson 不支援型別的陣列
+        return value.tolist()
+    raise TypeError(f"無法序列化 {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    以 orjson 序列化的 JSON 回應
+
+    可直接接收 Pydantic 模型 (欄位可為 NumPy 陣列)，端點回傳此回應時 FastAPI 不再以
+    response_model 驗證並以 jsonable_encoder 逐元素轉換，適用於殘差、相關矩陣等大型數值結果。
+    NaN 與無限大輸出為 null (標準 JSON 不支援)。未安裝 orjson 時退回標準函式庫。
+    """
+
+    def __init__(self, content: Any, status_code: int = 200, **kwargs):
+        # 保留原始內容，供批次分析等內部呼叫端直接取用
+        self.payload = content
+        super().__init__(content, status_code=status_code, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+        return json.dumps(
+            jsonable(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
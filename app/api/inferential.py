@@ -1,18 +1,62 @@
+import numpy as np
 from fastapi import APIRouter, HTTPException
 from app.models.request_models import (
     TTestRequest, ChiSquareRequest, ANOVARequest,
-    MannWhitneyRequest, WilcoxonRequest, KruskalWallisRequest
+    MannWhitneyRequest, WilcoxonRequest, KruskalWallisRequest,
+    MassTestRequest, MultipleComparisonRequest
 )
 from app.models.response_models import (
     TTestResponse, ChiSquareResponse, ANOVAResponse,
-    MannWhitneyResponse, WilcoxonResponse, KruskalWallisResponse
+    MannWhitneyResponse, WilcoxonResponse, KruskalWallisResponse,
+    MassTestResponse, MultipleComparisonResponse
 )
+from app.models.response_models import BootstrapInterval
+from app.services import bootstrap
+from app.services.group_stats import split_groups
 from app.services.inferential_stats import InferentialStatsService
+from app.services.compute_pool import compute_pool, ComputeQueueFullError
+from app.api.binary_route import BinaryArrayRoute
+from app.api.resampling import effect_size_interval
+from app.api.fast_json import FastJSONResponse
 
-router = APIRouter()
+router = APIRouter(route_class=BinaryArrayRoute)
 stats_service = InferentialStatsService()
 
 
+async def _with_effect_size_ci(response, request, name: str, samples):
+    """請求指定 effect_size_ci 時，以 bootstrap 計算效果量的信賴區間並加入回應"""
+    if request.effect_size_ci is None:
+        return response
+    interval = await effect_size_interval(
+        "inferential.bootstrap",
+        name,
+        samples,
+        n_resamples=request.bootstrap_resamples,
+        confidence_level=request.confidence_level,
+        method=request.effect_size_ci,
+        seed=request.random_seed,
+    )
+    return response.model_copy(update={"effect_size_ci": BootstrapInterval(**interval)})
+
+
+def _request_groups(request):
+    """各組數據；長格式請求依標籤切分 (bootstrap 需要各組的原始數據)"""
+    if request.groups is not None:
+        return request.groups
+    return split_groups(request.values, request.labels)[1]
+
+
+def _ttest_effect_size(request: TTestRequest):
+    """t 檢定的效果量：單樣本與配對為差值的 Cohen's d，獨立樣本為合併標準差的 Cohen's d"""
+    if request.sample2 is None:
+        return bootstrap.COHENS_D_ONE_SAMPLE, [request.sample1]
+    if request.paired:
+        if len(request.sample1) != len(request.sample2):
+            raise ValueError("配對樣本的數量必須相同")
+        return bootstrap.COHENS_D_ONE_SAMPLE, [np.subtract(request.sample1, request.sample2)]
+    return bootstrap.COHENS_D, [request.sample1, request.sample2]
+
+
 @router.post("/ttest", response_model=TTestResponse)
 async def perform_ttest(request: TTestRequest):
     """
@@ -21,13 +65,22 @@ async def perform_ttest(request: TTestRequest):
     支援單樣本、雙樣本獨立、配對 t 檢定
     """
     try:
-        return stats_service.ttest(
+        response = await compute_pool.run(
+            "inferential.ttest",
+            stats_service.ttest,
             sample1=request.sample1,
             sample2=request.sample2,
             paired=request.paired,
             alpha=request.alpha,
             alternative=request.alternative,
+            method=request.method,
+            n_resamples=request.n_resamples,
+            p_value_precision=request.p_value_precision,
+            random_seed=request.random_seed,
         )
+        return await _with_effect_size_ci(response, request, *_ttest_effect_size(request))
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -40,9 +93,17 @@ async def perform_chisquare_test(request: ChiSquareRequest):
     適用於獨立性檢定和適合度檢定
     """
     try:
-        return stats_service.chi_square_test(
-            observed=request.observed, expected=request.expected
+        if request.effect_size_ci is not None and request.expected is not None:
+            raise ValueError("適合度檢定沒有 Cramér's V 效果量，effect_size_ci 僅適用於獨立性檢定")
+        response = await compute_pool.run(
+            "inferential.chisquare",
+            stats_service.chi_square_test,
+            observed=request.observed,
+            expected=request.expected,
         )
+        return await _with_effect_size_ci(response, request, bootstrap.CRAMERS_V, [request.observed])
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -52,10 +113,25 @@ async def perform_anova(request: ANOVARequest):
     """
     執行單因子變異數分析 (One-way ANOVA)
 
-    檢定多個組別間是否有顯著差異
+    檢定多個組別間是否有顯著差異；輸入可為各組數據 (groups) 或長格式數據 (values + labels)
     """
     try:
-        return stats_service.anova(request.groups)
+        response = await compute_pool.run(
+            "inferential.anova",
+            stats_service.anova,
+            request.groups,
+            method=request.method,
+            n_resamples=request.n_resamples,
+            p_value_precision=request.p_value_precision,
+            random_seed=request.random_seed,
+            posthoc=request.posthoc,
+            values=request.values,
+            labels=request.labels,
+        )
+        samples = _request_groups(request) if request.effect_size_ci else None
+        return await _with_effect_size_ci(response, request, bootstrap.ETA_SQUARED, samples)
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -71,12 +147,23 @@ async def perform_mann_whitney_test(request: MannWhitneyRequest):
     - 順序資料或連續資料
     """
     try:
-        return stats_service.mann_whitney_test(
+        response = await compute_pool.run(
+            "inferential.mann_whitney",
+            stats_service.mann_whitney_test,
             sample1=request.sample1,
             sample2=request.sample2,
             alpha=request.alpha,
             alternative=request.alternative,
+            method=request.method,
+            n_resamples=request.n_resamples,
+            p_value_precision=request.p_value_precision,
+            random_seed=request.random_seed,
+        )
+        return await _with_effect_size_ci(
+            response, request, bootstrap.RANK_BISERIAL, [request.sample1, request.sample2]
         )
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -92,12 +179,19 @@ async def perform_wilcoxon_test(request: WilcoxonRequest):
     - 樣本數較小時的替代方案
     """
     try:
-        return stats_service.wilcoxon_test(
+        response = await compute_pool.run(
+            "inferential.wilcoxon",
+            stats_service.wilcoxon_test,
             sample1=request.sample1,
             sample2=request.sample2,
             alpha=request.alpha,
             alternative=request.alternative,
         )
+        return await _with_effect_size_ci(
+            response, request, bootstrap.MATCHED_RANK_BISERIAL, [np.subtract(request.sample1, request.sample2)]
+        )
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -111,10 +205,73 @@ async def perform_kruskal_wallis_test(request: KruskalWallisRequest):
     - 三個或以上獨立組別的比較
     - 資料不符合常態分佈假設
     - ANOVA 的非參數替代方案
+
+    輸入可為各組數據 (groups) 或長格式數據 (values + labels)
+    """
+    try:
+        response = await compute_pool.run(
+            "inferential.kruskal_wallis",
+            stats_service.kruskal_wallis_test,
+            groups=request.groups,
+            alpha=request.alpha,
+            posthoc=request.posthoc,
+            posthoc_correction=request.posthoc_correction,
+            values=request.values,
+            labels=request.labels,
+        )
+        samples = _request_groups(request) if request.effect_size_ci else None
+        return await _with_effect_size_ci(response, request, bootstrap.KRUSKAL_ETA_SQUARED, samples)
+    except ComputeQueueFullError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/mass_test", response_model=MassTestResponse)
+async def perform_mass_test(request: MassTestRequest):
+    """
+    逐欄大量檢定 (數千個特徵的組間比較)
+
+    對數據矩陣的每一欄執行 Welch/Student t、Mann-Whitney U 或 Kruskal-Wallis 檢定，
+    所有欄位以向量化方式一次計算，再做 Bonferroni、Holm 或 Benjamini-Hochberg 校正。
+    結果以各特徵對應的精簡陣列回傳。
+    """
+    try:
+        result = await compute_pool.run(
+            "inferential.mass_test",
+            stats_service.mass_test,
+            data=request.data,
+            labels=request.labels,
+            features=request.features,
+            test=request.test,
+            correction=request.correction,
+            alpha=request.alpha,
+            alternative=request.alternative,
+        )
+        return FastJSONResponse(result)
+    except ComputeQueueFullError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/multiple_comparison", response_model=MultipleComparisonResponse)
+async def perform_multiple_comparison(request: MultipleComparisonRequest):
+    """
+    多重比較校正
+
+    以 Bonferroni、Holm 或 Benjamini-Hochberg (FDR) 方法校正一組 p 值
     """
     try:
-        return stats_service.kruskal_wallis_test(
-            groups=request.groups, alpha=request.alpha
+        result = await compute_pool.run(
+            "inferential.multiple_comparison",
+            stats_service.multiple_comparison,
+            p_values=request.p_values,
+            method=request.method,
+            alpha=request.alpha,
         )
+        return FastJSONResponse(result)
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
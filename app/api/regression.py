@@ -3,11 +3,23 @@ from app.models.request_models import (
     LinearRegressionRequest,
     MultipleRegressionRequest,
     PolynomialRegressionRequest,
+    RegressionSessionRequest,
+    RegressionRowsRequest,
+    RegressionSolveRequest,
 )
-from app.models.response_models import RegressionResponse
+from app.models.response_models import RegressionResponse, RegressionSessionInfo, RegressionSessionState
 from app.services.regression_analysis import RegressionAnalysisService
+from app.services.regression_sessions import (
+    regression_sessions,
+    rows_moments,
+    moments_from_state,
+    RegressionSessionNotFoundError,
+)
+from app.services.compute_pool import compute_pool, ComputeQueueFullError
+from app.api.binary_route import BinaryArrayRoute
+from app.api.fast_json import FastJSONResponse
 
-router = APIRouter()
+router = APIRouter(route_class=BinaryArrayRoute)
 regression_service = RegressionAnalysisService()
 
 
@@ -19,7 +31,17 @@ async def linear_regression(request: LinearRegressionRequest):
     分析兩個變數間的線性關係
     """
     try:
-        return regression_service.linear_regression(request.x, request.y)
+        result = await compute_pool.run(
+            "regression.linear",
+            regression_service.linear_regression,
+            request.x,
+            request.y,
+            include=request.include,
+            confidence_level=request.confidence_level,
+        )
+        return FastJSONResponse(result)
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -32,7 +54,17 @@ async def multiple_regression(request: MultipleRegressionRequest):
     分析多個自變數與因變數的關係
     """
     try:
-        return regression_service.multiple_regression(request.x, request.y)
+        result = await compute_pool.run(
+            "regression.multiple",
+            regression_service.multiple_regression,
+            request.x,
+            request.y,
+            include=request.include,
+            confidence_level=request.confidence_level,
+        )
+        return FastJSONResponse(result)
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -45,8 +77,131 @@ async def polynomial_regression(request: PolynomialRegressionRequest):
     分析非線性關係
     """
     try:
-        return regression_service.polynomial_regression(
-            request.x, request.y, request.degree
+        result = await compute_pool.run(
+            "regression.polynomial",
+            regression_service.polynomial_regression,
+            request.x,
+            request.y,
+            request.degree,
+            include=request.include,
+            confidence_level=request.confidence_level,
+        )
+        return FastJSONResponse(result)
+    except ComputeQueueFullError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/sessions", response_model=RegressionSessionInfo)
+async def create_regression_session(request: RegressionSessionRequest):
+    """
+    建立增量迴歸工作階段
+
+    資料列過多、無法在單一請求送出時，先建立工作階段，再分批以
+    `POST /sessions/{id}/rows` 加入資料列，最後以 `POST /sessions/{id}/solve` 求解。
+    工作階段只保存充分統計量，記憶體與資料列數無關。
+    """
+    try:
+        return regression_sessions.create(request.n_features, request.terms).info()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/sessions/{session_id}", response_model=RegressionSessionInfo)
+async def get_regression_session(session_id: str):
+    """
+    取得增量迴歸工作階段資訊
+    """
+    try:
+        return regression_sessions.get(session_id).info()
+    except RegressionSessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/sessions/{session_id}/rows", response_model=RegressionSessionInfo)
+async def add_regression_rows(session_id: str, request: RegressionRowsRequest):
+    """
+    加入一批資料列
+
+    區塊的充分統計量交給計算執行器計算後併入工作階段，同一工作階段可同時加入多批資料列
+    """
+    try:
+        session = regression_sessions.get(session_id)
+        moments = await compute_pool.run("regression.session_rows", rows_moments, request.x, request.y)
+        session.merge(moments)
+        return session.info()
+    except RegressionSessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeQueueFullError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/sessions/{session_id}/state", response_model=RegressionSessionState)
+async def get_regression_session_state(session_id: str):
+    """
+    匯出工作階段的充分統計量
+
+    可交給其他 worker 的工作階段以 `POST /sessions/{id}/merge` 合併
+    """
+    try:
+        return regression_sessions.get(session_id).state()
+    except RegressionSessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/sessions/{session_id}/merge", response_model=RegressionSessionInfo)
+async def merge_regression_session(session_id: str, request: RegressionSessionState):
+    """
+    併入其他工作階段匯出的充分統計量
+
+    結果與所有資料列都加入同一工作階段相同
+    """
+    try:
+        session = regression_sessions.get(session_id)
+        session.merge(moments_from_state(request))
+        return session.info()
+    except RegressionSessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/sessions/{session_id}/solve", response_model=RegressionResponse)
+async def solve_regression_session(session_id: str, request: RegressionSolveRequest):
+    """
+    以目前累加的資料列求解多元線性迴歸
+
+    回應與 `/multiple` 相同，但不含殘差、配適值與 Durbin-Watson (工作階段不保留個別資料列)；
+    求解後仍可繼續加入資料列
+    """
+    try:
+        session = regression_sessions.get(session_id)
+        result = await compute_pool.run(
+            "regression.session_solve",
+            regression_service.session_regression,
+            session.snapshot(),
+            session.terms,
+            confidence_level=request.confidence_level,
         )
+        return FastJSONResponse(result)
+    except RegressionSessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/sessions/{session_id}")
+async def delete_regression_session(session_id: str):
+    """
+    刪除增量迴歸工作階段
+    """
+    try:
+        regression_sessions.delete(session_id)
+    except RegressionSessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"deleted": session_id}
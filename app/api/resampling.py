@@ -0,0 +1,61 @@
+import asyncio
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.services.bootstrap import bootstrap_distribution, confidence_interval
+from app.services.compute_pool import compute_pool
+
+# 重抽次數達到此值時拆成多段，交給計算執行器平行計算
+FANOUT_MIN_RESAMPLES = 100_000
+# 每段至少的重抽次數與最多的段數
+_FANOUT_CHUNK = 50_000
+_FANOUT_MAX_PARTS = 8
+
+
+def _chunk_sizes(n_resamples: int) -> Sequence[int]:
+    if n_resamples < FANOUT_MIN_RESAMPLES:
+        return [n_resamples]
+    parts = min(_FANOUT_MAX_PARTS, math.ceil(n_resamples / _FANOUT_CHUNK))
+    size = math.ceil(n_resamples / parts)
+    return [min(size, n_resamples - start) for start in range(0, n_resamples, size)]
+
+
+async def effect_size_interval(
+    endpoint: str,
+    name: str,
+    samples: Sequence,
+    n_resamples: int,
+    confidence_level: float,
+    method: str,
+    seed: Optional[int] = None,
+) -> dict:
+    """
+    以 bootstrap 計算效果量的信賴區間
+
+    重抽次數達 FANOUT_MIN_RESAMPLES 時拆成多段，各段以 SeedSequence.spawn 的子種子
+    在計算執行器中平行重抽 (可用 SFDA_COMPUTE_POLICY 將 endpoint 指定到行程池)，
+    合併分佈後再計算信賴區間；相同的種子與重抽次數得到相同的結果。
+
+    Args:
+        endpoint: 計算執行器的端點名稱
+        name: 效果量 (app/services/bootstrap.py)
+        samples: 各組資料 (Cramér's V 為列聯表)
+        n_resamples: 重抽次數
+        confidence_level: 信心水準
+        method: 信賴區間方法 (percentile 或 bca)
+        seed: 亂數種子
+
+    Returns:
+        效果量名稱、估計值、信賴區間與 bootstrap 標準誤
+    """
+    sizes = _chunk_sizes(n_resamples)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    parts = await asyncio.gather(*(
+        compute_pool.run(endpoint, bootstrap_distribution, name, samples, size, child)
+        for size, child in zip(sizes, seeds)
+    ))
+    return await compute_pool.run(
+        endpoint, confidence_interval, name, samples, np.concatenate(parts), confidence_level, method
+    )
@@ -0,0 +1,140 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from app.services.compute_pool import compute_pool
+from app.services.streaming_stats import STREAM_CSV, STREAM_FLOAT64, RowBlockReader
+
+# 串流請求的內容類型
+STREAM_CONTENT_TYPES = {
+    "text/csv": STREAM_CSV,
+    "application/octet-stream": STREAM_FLOAT64,
+}
+
+# 上傳檔案每次讀取的位元組數
+_UPLOAD_READ_BYTES = 1 << 20
+# 同時交給計算執行器的區塊數量上限
+_MAX_INFLIGHT_BLOCKS = 2
+
+STREAM_OPENAPI = {
+    "requestBody": {
+        "content": {
+            "text/csv": {"schema": {"type": "string"}},
+            "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            },
+        }
+    }
+}
+
+
+def parse_columns(columns: Optional[str]) -> Optional[List[str]]:
+    """解析以逗號分隔的欄位名稱查詢參數"""
+    if not columns:
+        return None
+    return [name.strip() for name in columns.split(",") if name.strip()]
+
+
+async def _iter_upload(upload) -> AsyncIterator[bytes]:
+    while True:
+        data = await upload.read(_UPLOAD_READ_BYTES)
+        if not data:
+            break
+        yield data
+
+
+async def _open_stream(request: Request) -> Tuple[str, AsyncIterator[bytes]]:
+    """依內容類型取得串流格式與位元組串流 (請求本體或 multipart 上傳檔案)"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="multipart 請求必須包含 file 欄位")
+        filename = (upload.filename or "").lower()
+        upload_type = (upload.content_type or "").split(";")[0].strip().lower()
+        fmt = STREAM_CSV if filename.endswith((".csv", ".txt")) or upload_type == "text/csv" else STREAM_FLOAT64
+        return fmt, _iter_upload(upload)
+
+    if content_type not in STREAM_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail="串流端點僅接受 text/csv、application/octet-stream 或 multipart/form-data",
+        )
+    return STREAM_CONTENT_TYPES[content_type], request.stream()
+
+
+async def accumulate_stream(
+    request: Request,
+    endpoint: str,
+    block_func: Callable[..., Any],
+    columns: Optional[List[str]],
+    single_column: bool = False,
+) -> Tuple[Any, List[str]]:
+    """
+    以區塊方式讀取請求本體並累加統計量
+
+    每個完整資料列區塊交給計算執行器以 block_func(block, fmt, names, usecols) 計算部分統計量，
+    再以 merge 合併，記憶體只與區塊大小及統計量大小有關。
+
+    Args:
+        request: 請求
+        endpoint: 計算執行器的端點名稱
+        block_func: 區塊統計量函式 (回傳具有 merge 方法的累加器)
+        columns: 要使用的欄位；CSV 未指定時使用所有欄位，float64 串流則必須指定
+        single_column: 僅使用單一欄位；未指定 columns 時 CSV 取第一欄，float64 串流視為單欄
+
+    Returns:
+        (合併後的累加器, 使用的欄位名稱)
+    """
+    fmt, chunks = await _open_stream(request)
+    if single_column and columns and len(columns) > 1:
+        raise HTTPException(status_code=400, detail="此端點只接受單一欄位")
+    if single_column and not columns and fmt == STREAM_FLOAT64:
+        columns = ["values"]
+    if fmt == STREAM_FLOAT64 and not columns:
+        raise HTTPException(status_code=400, detail="float64 串流必須以 columns 查詢參數指定欄位名稱")
+    reader = RowBlockReader(fmt, len(columns) if fmt == STREAM_FLOAT64 else None)
+
+    accumulator = None
+    pending: List[asyncio.Future] = []
+
+    async def merge_oldest():
+        nonlocal accumulator
+        partial = await pending.pop(0)
+        accumulator = partial if accumulator is None else accumulator.merge(partial)
+
+    def submit(block: bytes):
+        names = columns if fmt == STREAM_FLOAT64 else reader.header
+        usecols = columns or (reader.header[:1] if single_column else reader.header)
+        missing = [name for name in usecols if name not in names]
+        if missing:
+            raise ValueError(f"找不到欄位: {', '.join(missing)}")
+        pending.append(asyncio.ensure_future(
+            compute_pool.run(endpoint, block_func, block, fmt, names, usecols)
+        ))
+
+    try:
+        async for data in chunks:
+            for block in reader.feed(data):
+                submit(block)
+                if len(pending) >= _MAX_INFLIGHT_BLOCKS:
+                    await merge_oldest()
+        tail = reader.finish()
+        if tail:
+            submit(tail)
+        while pending:
+            await merge_oldest()
+    finally:
+        for future in pending:
+            future.cancel()
+
+    if accumulator is None:
+        raise ValueError("串流中沒有資料列")
+    return accumulator, list(columns or (reader.header[:1] if single_column else reader.header))
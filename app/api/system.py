@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Query
+from app.services.compute_pool import compute_pool
+from app.services.lazy_imports import import_report
+from app.services.result_cache import result_cache
+
+router = APIRouter()
+
+
+@router.get("/cache")
+async def cache_stats():
+    """
+    取得結果快取的命中率與使用量
+    """
+    return result_cache.stats()
+
+
+@router.delete("/cache")
+async def clear_cache():
+    """
+    清除結果快取
+    """
+    result_cache.clear()
+    return result_cache.stats()
+
+
+@router.get("/compute")
+async def compute_stats():
+    """
+    取得計算執行器的佇列狀態
+    """
+    return compute_pool.stats()
+
+
+@router.get("/imports")
+async def import_stats(limit: int = Query(30, ge=1, le=1000, description="列出的啟動模組數量")):
+    """
+    取得匯入成本報告 (啟動時各模組的匯入時間、延遲載入套件與背景暖機狀態)
+    """
+    return import_report(limit)
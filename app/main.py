@@ -1,6 +1,17 @@
-from fastapi import FastAPI
+import os
+import threading
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import descriptive, inferential, regression, correlation, distribution, charts
+from fastapi.responses import JSONResponse
+from app.services.lazy_imports import record_imports, warm_up, warmup_enabled
+
+# 記錄各模組的匯入時間 (GET /api/v1/system/imports)；SciPy、pandas、scikit-learn、
+# matplotlib 與 seaborn 等重量級套件改為第一次使用或背景暖機時才載入
+with record_imports():
+    from app.api import descriptive, inferential, regression, correlation, distribution, charts, datasets, system, batch
+    from app.services.compute_pool import compute_pool, ComputeQueueFullError
+    from app.services.render_farm import render_farm
+    from app.api.fast_json import FastJSONResponse
 
 app = FastAPI(
     title="SFDA 統計學分析 API",
@@ -8,6 +19,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
 )
 
 # CORS 設定
@@ -19,6 +31,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(ComputeQueueFullError)
+async def compute_queue_full_handler(request: Request, exc: ComputeQueueFullError):
+    """
+    計算佇列已滿時回傳 503，提示呼叫端稍後重試
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.on_event("startup")
+def prewarm_render_farm():
+    """
+    於背景啟動並預熱繪圖行程池 (可用 SFDA_RENDER_PREWARM=0 關閉)
+    """
+    if render_farm.enabled and os.environ.get("SFDA_RENDER_PREWARM", "1") != "0":
+        threading.Thread(target=render_farm.start, name="sfda-render-prewarm", daemon=True).start()
+
+
+@app.on_event("startup")
+def warm_up_lazy_imports():
+    """
+    於背景載入延遲匯入的套件並設定圖表字體 (可用 SFDA_LAZY_WARMUP=0 關閉)
+    """
+    if warmup_enabled():
+        threading.Thread(target=warm_up, name="sfda-lazy-warmup", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def shutdown_compute_pool():
+    """
+    關閉計算執行器與繪圖行程池
+    """
+    compute_pool.shutdown(wait=False)
+    render_farm.shutdown(wait=False)
+
+
 # 註冊路由
 app.include_router(
     descriptive.router, prefix="/api/v1/descriptive", tags=["描述性統計"]
@@ -34,6 +86,11 @@ app.include_router(
 app.include_router(
     charts.router, prefix="/api/v1/charts", tags=["圖表創建"]
 )
+app.include_router(
+    datasets.router, prefix="/api/v1/datasets", tags=["資料集"]
+)
+app.include_router(batch.router, prefix="/api/v1/batch", tags=["批次分析"])
+app.include_router(system.router, prefix="/api/v1/system", tags=["系統"])
 
 
 @app.get("/")
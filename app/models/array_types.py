@@ -0,0 +1,251 @@
+import functools
+from typing import Annotated, Any, Dict, List, Optional, Type, Union, get_args, get_origin
+
+import numpy as np
+from pydantic import BaseModel, WrapValidator
+from pydantic_core import PydanticKnownError
+
+
+# 陣列欄位種類
+KIND_VECTOR = "vector"  # 一維數值陣列
+KIND_MATRIX = "matrix"  # 二維數值矩陣
+KIND_GROUPS = "groups"  # 長度不一的多組一維數值陣列
+KIND_LABELS = "labels"  # 每個觀測值的分組標籤 (字串或數值)
+
+
+def _as_float_array(value: Any, ndim: int, allow_missing: bool = False) -> np.ndarray:
+    """
+    將 NumPy 陣列轉為 float64 (已是 float64 時不複製) 並檢查維度
+
+    allow_missing 為 False 時不接受 NaN 與無限大 (與 JSON 請求的 float 驗證相同)
+    """
+    array = np.asarray(value, dtype=np.float64)
+    if array.ndim != ndim:
+        raise ValueError(f"陣列維度必須為 {ndim}，實際為 {array.ndim}")
+    if array.size == 0:
+        raise ValueError("數值陣列不能為空")
+    if not allow_missing and not np.isfinite(array).all():
+        raise ValueError("數值陣列不能包含 NaN 或無限大")
+    return array
+
+
+def _check_length(value: Any, min_length: Optional[int], max_length: Optional[int]) -> None:
+    """套用欄位的 min_items/max_items 限制 (NumPy 陣列不經過 List 驗證，需另外檢查)"""
+    length = len(value)
+    if min_length is not None and length < min_length:
+        raise PydanticKnownError(
+            "too_short", {"field_type": "List", "min_length": min_length, "actual_length": length}
+        )
+    if max_length is not None and length > max_length:
+        raise PydanticKnownError(
+            "too_long", {"field_type": "List", "max_length": max_length, "actual_length": length}
+        )
+
+
+def _reject_non_finite(schema: Dict[str, Any]) -> None:
+    """JSON 請求的 float 項目不接受 NaN 與無限大"""
+    if schema.get("type") == "float":
+        schema["allow_inf_nan"] = False
+    elif schema.get("type") == "list":
+        _reject_non_finite(schema["items_schema"])
+
+
+# 資料集欄位引用的 JSON Schema
+_DATASET_REF_SCHEMAS = {
+    KIND_VECTOR: {
+        "type": "object",
+        "title": "DatasetColumnRef",
+        "properties": {"dataset": {"type": "string"}, "column": {"type": "string"}},
+        "required": ["dataset", "column"],
+    },
+    KIND_MATRIX: {
+        "type": "object",
+        "title": "DatasetColumnsRef",
+        "properties": {
+            "dataset": {"type": "string"},
+            "columns": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["dataset", "columns"],
+    },
+    KIND_GROUPS: {
+        "type": "object",
+        "title": "DatasetGroupedColumnRef",
+        "properties": {
+            "dataset": {"type": "string"},
+            "column": {"type": "string"},
+            "group_by": {"type": "string"},
+        },
+        "required": ["dataset", "column", "group_by"],
+    },
+    KIND_LABELS: {
+        "type": "object",
+        "title": "DatasetLabelColumnRef",
+        "properties": {"dataset": {"type": "string"}, "column": {"type": "string"}},
+        "required": ["dataset", "column"],
+    },
+}
+
+
+def _check_complete(dataset_id: str, columns: List[str], array: np.ndarray) -> np.ndarray:
+    """數值欄位含缺失值時指出欄位名稱 (逐列配對的欄位不能各自排除缺失值)"""
+    finite = np.isfinite(array)
+    if not finite.all():
+        incomplete = [name for name, ok in zip(columns, finite.reshape(len(array), -1).all(axis=0)) if not ok]
+        raise ValueError(f"資料集 {dataset_id} 的欄位 {', '.join(incomplete)} 含有缺失值")
+    return array
+
+
+def _resolve_dataset_ref(
+    kind: str, ref: Dict[str, Any], variables_as_rows: bool = False, allow_missing: bool = False
+):
+    """
+    將資料集欄位引用解析為 NumPy 陣列 (唯讀)
+
+    數值欄位含缺失值時，除了 allow_missing 的欄位之外都不接受；
+    分組引用 (group_by) 則排除數值或標籤缺失的列
+    """
+    from app.services.dataset_store import DatasetNotFoundError, dataset_store
+
+    dataset_id = ref.get("dataset")
+    if not isinstance(dataset_id, str):
+        raise ValueError("資料集引用必須包含 dataset")
+    try:
+        if kind == KIND_VECTOR:
+            column = dataset_store.column(dataset_id, ref["column"])
+            return column if allow_missing else _check_complete(dataset_id, [ref["column"]], column)
+        if kind == KIND_LABELS:
+            return dataset_store.labels(dataset_id, ref["column"])
+        if kind == KIND_MATRIX:
+            columns = list(ref["columns"])
+            matrix = dataset_store.matrix(dataset_id, columns)
+            if not allow_missing:
+                _check_complete(dataset_id, columns, matrix)
+            return matrix.T if variables_as_rows else matrix
+        return dataset_store.grouped(dataset_id, ref["column"], ref["group_by"])
+    except DatasetNotFoundError as e:
+        raise ValueError(str(e))
+    except KeyError as e:
+        raise ValueError(f"資料集引用缺少 {e.args[0]}")
+
+
+class _ArrayValidator(WrapValidator):
+    """
+    接受 NumPy 陣列與資料集引用的驗證器
+
+    JSON 請求仍逐一驗證 List[float]；二進位請求解碼後的 NumPy 陣列則不逐元素建立
+    Python float 物件，改以向量運算套用相同的限制 (欄位的 min_items/max_items、
+    不接受 NaN 與無限大)，驗證失敗時兩者都回傳 422。欄位值也可以是已上傳資料集的
+    欄位引用 (如 `{"dataset": id, "column": "exam_score"}`)，驗證時直接取得登錄表中的陣列。
+    allow_missing 為 True 的欄位以 NaN 表示缺失值，不檢查是否為有限值。
+    """
+
+    def __init__(self, kind: str, variables_as_rows: bool = False, allow_missing: bool = False):
+        super().__init__(func=self._validate)
+        object.__setattr__(self, "kind", kind)
+        object.__setattr__(self, "variables_as_rows", variables_as_rows)
+        object.__setattr__(self, "allow_missing", allow_missing)
+
+    def __get_pydantic_core_schema__(self, source_type: Any, handler):
+        schema = super().__get_pydantic_core_schema__(source_type, handler)
+        # 同一個驗證器由多個欄位共用，欄位的長度限制綁定在各自的驗證函式上
+        inner = schema.get("schema", {})
+        schema["function"]["function"] = functools.partial(
+            self._validate_field, min_length=inner.get("min_length"), max_length=inner.get("max_length")
+        )
+        if not self.allow_missing:
+            _reject_non_finite(inner)
+        ref_schema = _DATASET_REF_SCHEMAS[self.kind]
+
+        def add_dataset_ref(core_schema, json_handler):
+            return {"anyOf": [json_handler(core_schema), ref_schema]}
+
+        schema.setdefault("metadata", {}).setdefault("pydantic_js_functions", []).append(add_dataset_ref)
+        return schema
+
+    def _validate(self, value: Any, handler):
+        return self._validate_field(value, handler)
+
+    def _validate_field(
+        self, value: Any, handler, min_length: Optional[int] = None, max_length: Optional[int] = None
+    ):
+        if isinstance(value, dict) and "dataset" in value:
+            value = _resolve_dataset_ref(self.kind, value, self.variables_as_rows, self.allow_missing)
+
+        array = self._validate_array(value)
+        if array is None:
+            return handler(value)
+        _check_length(array, min_length, max_length)
+        return array
+
+    def _validate_array(self, value: Any):
+        """驗證 NumPy 陣列 (或含 NumPy 陣列的多組數據)；其他輸入回傳 None 交給 List 驗證"""
+        if self.kind == KIND_LABELS:
+            if isinstance(value, np.ndarray):
+                if value.ndim != 1:
+                    raise ValueError(f"分組標籤必須為一維陣列，實際為 {value.ndim} 維")
+                return value
+            return None
+
+        if self.kind == KIND_GROUPS:
+            if isinstance(value, (list, tuple)) and any(isinstance(group, np.ndarray) for group in value):
+                return [_as_float_array(group, 1, self.allow_missing) for group in value]
+            if isinstance(value, np.ndarray):
+                matrix = _as_float_array(value, 2, self.allow_missing)
+                return [_as_float_array(row, 1, self.allow_missing) for row in matrix]
+            return None
+
+        if isinstance(value, np.ndarray):
+            return _as_float_array(value, 1 if self.kind == KIND_VECTOR else 2, self.allow_missing)
+        return None
+
+
+# 可接受 NumPy 陣列與資料集引用的數值欄位型別
+FloatArray = Annotated[List[float], _ArrayValidator(KIND_VECTOR)]
+FloatMatrix = Annotated[List[List[float]], _ArrayValidator(KIND_MATRIX)]
+# 以 NaN 表示缺失值的數值陣列與矩陣 (服務端自行排除缺失值)
+FloatArrayWithMissing = Annotated[List[float], _ArrayValidator(KIND_VECTOR, allow_missing=True)]
+FloatMatrixWithMissing = Annotated[List[List[float]], _ArrayValidator(KIND_MATRIX, allow_missing=True)]
+FloatArrayList = Annotated[List[List[float]], _ArrayValidator(KIND_GROUPS)]
+# 每列為一個變數的矩陣 (如相關矩陣)，資料集引用會轉置為 變數 × 觀測值
+VariablesMatrix = Annotated[List[List[float]], _ArrayValidator(KIND_MATRIX, variables_as_rows=True)]
+# 分組標籤，資料集引用 (`{"dataset": id, "column": "group"}`) 保留欄位原本的型別
+GroupLabels = Annotated[List[Union[str, float]], _ArrayValidator(KIND_LABELS)]
+
+
+def _find_kind(metadata) -> Optional[str]:
+    for item in metadata:
+        if isinstance(item, _ArrayValidator):
+            return item.kind
+    return None
+
+
+def _find_kind_in_annotation(annotation) -> Optional[str]:
+    for arg in get_args(annotation):
+        if get_origin(arg) is Annotated:
+            kind = _find_kind(arg.__metadata__)
+            if kind:
+                return kind
+        kind = _find_kind_in_annotation(arg)
+        if kind:
+            return kind
+    return None
+
+
+def array_field_kinds(model: Type[BaseModel]) -> Dict[str, str]:
+    """
+    取得模型中可接受 NumPy 陣列的欄位及其種類 (依宣告順序)
+
+    分組標籤不是數值陣列，不列入 (二進位請求中以查詢參數或資料集引用傳送)
+
+    Args:
+        model: 請求模型類別
+
+    Returns:
+        欄位名稱對應陣列種類的字典
+    """
+    kinds = {}
+    for name, field in model.model_fields.items():
+        kind = _find_kind(field.metadata) or _find_kind_in_annotation(field.annotation)
+        if kind and kind != KIND_LABELS:
+            kinds[name] = kind
+    return kinds
@@ -1,5 +1,36 @@
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Literal, Optional, Dict, Any, Tuple, Union
 from pydantic import BaseModel, Field
+from app.models.array_types import FloatArray, FloatArrayList
+
+
+# 可選擇回傳的大型欄位
+ChartField = Literal["data"]
+
+
+# 圖表數據格式 (請求與回應的 data_format 共用)
+DATA_FORMAT_DESCRIPTION = "圖表數據格式 (records: 每個數據點一個物件, columns: 每個欄位一個陣列，大量數據點時較小且較快)"
+
+
+class ChartImageOptions(BaseModel):
+    """圖表請求共用的圖片選項"""
+    generate_image: bool = Field(False, description="是否生成圖片")
+    image_format: str = Field("png", description="圖片格式 (png, jpg, svg)")
+    image_delivery: str = Field(
+        "base64",
+        description="圖片回傳方式 (base64: 內嵌於 JSON, binary: 直接回傳圖片, multipart: multipart/mixed, url: 暫存後回傳下載網址)",
+        pattern="^(base64|binary|multipart|url)$",
+    )
+    figsize: Optional[Tuple[int, int]] = Field((10, 6), description="圖片大小 (寬, 高)")
+    dpi: int = Field(100, description="圖片解析度")
+
+
+class ChartDataOptions(BaseModel):
+    """回傳圖表數據的請求共用的數據選項"""
+    data_format: str = Field("records", description=DATA_FORMAT_DESCRIPTION, pattern="^(records|columns)$")
+    include: Optional[List[ChartField]] = Field(
+        None,
+        description="要回傳的大型欄位，未指定時全部回傳；傳入 [] 時不回傳 data (只回傳統計量與圖片)",
+    )
 
 
 class ChartDataPoint(BaseModel):
@@ -8,45 +39,43 @@ class ChartDataPoint(BaseModel):
     value: float = Field(..., description="數值")
 
 
-class CreatePieChartRequest(BaseModel):
+class CreatePieChartRequest(ChartImageOptions):
     """創建圓餅圖請求模型"""
     data: List[ChartDataPoint] = Field(..., description="圖表數據", min_items=1)
     title: Optional[str] = Field(None, description="圖表標題")
-    generate_image: bool = Field(False, description="是否生成圖片")
-    image_format: str = Field("png", description="圖片格式 (png, jpg, svg)")
     figsize: Optional[Tuple[int, int]] = Field((10, 8), description="圖片大小 (寬, 高)")
-    dpi: int = Field(100, description="圖片解析度")
 
 
-class CreateBarChartRequest(BaseModel):
+class CreateBarChartRequest(ChartImageOptions):
     """創建長條圖請求模型"""
     data: List[ChartDataPoint] = Field(..., description="圖表數據", min_items=1)
     title: Optional[str] = Field(None, description="圖表標題")
     x_axis_label: Optional[str] = Field(None, description="X軸標籤")
     y_axis_label: Optional[str] = Field(None, description="Y軸標籤")
-    generate_image: bool = Field(False, description="是否生成圖片")
-    image_format: str = Field("png", description="圖片格式 (png, jpg, svg)")
-    figsize: Optional[Tuple[int, int]] = Field((10, 6), description="圖片大小 (寬, 高)")
-    dpi: int = Field(100, description="圖片解析度")
 
 
-class CreateLineChartRequest(BaseModel):
+class CreateLineChartRequest(ChartDataOptions, ChartImageOptions):
     """創建折線圖請求模型"""
     data: List[ChartDataPoint] = Field(..., description="圖表數據", min_items=2)
     title: Optional[str] = Field(None, description="圖表標題")
     x_axis_label: Optional[str] = Field(None, description="X軸標籤")
     y_axis_label: Optional[str] = Field(None, description="Y軸標籤")
-    generate_image: bool = Field(False, description="是否生成圖片")
-    image_format: str = Field("png", description="圖片格式 (png, jpg, svg)")
-    figsize: Optional[Tuple[int, int]] = Field((10, 6), description="圖片大小 (寬, 高)")
-    dpi: int = Field(100, description="圖片解析度")
+    decimation: str = Field(
+        "auto",
+        description="數據點超過 max_points 時的降採樣方法 (auto/lttb: 保留折線形狀, minmax: 保留每段最小與最大值, none: 不降採樣)",
+        pattern="^(auto|lttb|minmax|none)$",
+    )
+    max_points: Optional[int] = Field(None, description="降採樣門檻與輸出點數上限 (預設 SFDA_DECIMATE_THRESHOLD)", ge=10)
 
 
 class ChartResponse(BaseModel):
     """圖表響應模型"""
     success: bool = Field(..., description="是否成功")
     chart_type: str = Field(..., description="圖表類型")
-    data: List[Dict[str, Any]] = Field(..., description="圖表數據")
+    data: Union[List[Dict[str, Any]], Dict[str, List[Any]]] = Field(
+        ..., description="圖表數據 (records: 每個數據點一個物件, columns: 每個欄位一個陣列)"
+    )
+    data_format: str = Field("records", description=DATA_FORMAT_DESCRIPTION)
     title: Optional[str] = Field(None, description="圖表標題")
     confidence: float = Field(1.0, description="信心度")
     reasoning: str = Field(..., description="創建原因")
@@ -55,54 +84,46 @@ class ChartResponse(BaseModel):
     image_base64: Optional[str] = Field(None, description="Base64 編碼的圖片資料")
     image_format: Optional[str] = Field("png", description="圖片格式 (png, jpg, svg)")
     has_image: bool = Field(False, description="是否包含圖片")
+    image_id: Optional[str] = Field(None, description="暫存圖片 id (image_delivery=url)")
+    image_url: Optional[str] = Field(None, description="暫存圖片下載網址 (image_delivery=url)")
 
 
-class SimpleChartRequest(BaseModel):
+class SimpleChartRequest(ChartImageOptions):
     """簡化圖表請求模型 - 支援直接傳入標籤和數值"""
     labels: List[str] = Field(..., description="標籤陣列", min_items=1)
     values: List[float] = Field(..., description="數值陣列", min_items=1)
     title: Optional[str] = Field(None, description="圖表標題")
     chart_type: str = Field(..., description="圖表類型", pattern="^(pie|bar|line)$")
-    generate_image: bool = Field(False, description="是否生成圖片")
-    image_format: str = Field("png", description="圖片格式 (png, jpg, svg)")
-    figsize: Optional[Tuple[int, int]] = Field((10, 6), description="圖片大小 (寬, 高)")
-    dpi: int = Field(100, description="圖片解析度")
 
 
-class HistogramRequest(BaseModel):
+class HistogramRequest(ChartDataOptions, ChartImageOptions):
     """直方圖請求模型"""
-    values: List[float] = Field(..., description="數值陣列", min_items=5)
+    values: FloatArray = Field(..., description="數值陣列", min_items=5)
     bins: Optional[int] = Field(10, description="直方圖區間數", ge=5, le=50)
     title: Optional[str] = Field(None, description="圖表標題")
     x_axis_label: Optional[str] = Field("數值", description="X軸標籤")
     y_axis_label: Optional[str] = Field("頻率", description="Y軸標籤")
-    generate_image: bool = Field(False, description="是否生成圖片")
-    image_format: str = Field("png", description="圖片格式 (png, jpg, svg)")
-    figsize: Optional[Tuple[int, int]] = Field((10, 6), description="圖片大小 (寬, 高)")
-    dpi: int = Field(100, description="圖片解析度")
 
 
-class BoxplotRequest(BaseModel):
+class BoxplotRequest(ChartDataOptions, ChartImageOptions):
     """盒鬚圖請求模型"""
-    groups: List[List[float]] = Field(..., description="各組數據", min_items=1)
+    groups: FloatArrayList = Field(..., description="各組數據", min_items=1)
     group_labels: Optional[List[str]] = Field(None, description="組別標籤")
     title: Optional[str] = Field(None, description="圖表標題")
     y_axis_label: Optional[str] = Field("數值", description="Y軸標籤")
-    generate_image: bool = Field(False, description="是否生成圖片")
-    image_format: str = Field("png", description="圖片格式 (png, jpg, svg)")
-    figsize: Optional[Tuple[int, int]] = Field((10, 6), description="圖片大小 (寬, 高)")
-    dpi: int = Field(100, description="圖片解析度")
 
 
-class ScatterRequest(BaseModel):
+class ScatterRequest(ChartDataOptions, ChartImageOptions):
     """散點圖請求模型"""
-    x: List[float] = Field(..., description="X軸數據", min_items=3)
-    y: List[float] = Field(..., description="Y軸數據", min_items=3)
+    x: FloatArray = Field(..., description="X軸數據", min_items=3)
+    y: FloatArray = Field(..., description="Y軸數據", min_items=3)
     title: Optional[str] = Field(None, description="圖表標題")
     x_axis_label: Optional[str] = Field("X", description="X軸標籤")
     y_axis_label: Optional[str] = Field("Y", description="Y軸標籤")
     show_regression_line: bool = Field(False, description="是否顯示迴歸線")
-    generate_image: bool = Field(False, description="是否生成圖片")
-    image_format: str = Field("png", description="圖片格式 (png, jpg, svg)")
-    figsize: Optional[Tuple[int, int]] = Field((10, 6), description="圖片大小 (寬, 高)")
-    dpi: int = Field(100, description="圖片解析度") 
\ No newline at end of file
+    decimation: str = Field(
+        "auto",
+        description="數據點超過 max_points 時的降採樣方法 (auto/density: 二維網格計數, none: 不降採樣)",
+        pattern="^(auto|density|none)$",
+    )
+    max_points: Optional[int] = Field(None, description="降採樣門檻與輸出格子數上限 (預設 SFDA_DECIMATE_THRESHOLD)", ge=10)
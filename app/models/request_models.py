@@ -1,126 +1,316 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+from app.models.array_types import (
+    FloatArray, FloatArrayWithMissing, FloatMatrix, FloatMatrixWithMissing, FloatArrayList, GroupLabels, VariablesMatrix
+)
+
+# 迴歸分析可選擇是否回傳的大型欄位
+RegressionField = Literal["residuals", "fitted_values"]
+
+
+def _require_groups_or_long_format(request):
+    """多組比較的輸入為各組數據 (groups) 或長格式數據 (values + labels)，兩者擇一"""
+    long_format = request.values is not None or request.labels is not None
+    if request.groups is None and not long_format:
+        raise ValueError("必須提供 groups，或同時提供 values 與 labels")
+    if request.groups is not None and long_format:
+        raise ValueError("groups 與 values/labels 只能擇一提供")
+    if request.groups is None and (request.values is None or request.labels is None):
+        raise ValueError("長格式數據必須同時提供 values 與 labels")
+    if request.groups is None and len(request.values) != len(request.labels):
+        raise ValueError(f"分組標籤有 {len(request.labels)} 個，數值有 {len(request.values)} 個")
+    return request
+
+
+class EffectSizeCIOptions(BaseModel):
+    """效果量 bootstrap 信賴區間的共用選項，由回傳效果量的檢定請求模型繼承"""
+
+    effect_size_ci: Optional[str] = Field(
+        None, description="以 bootstrap 計算效果量信賴區間的方法 (percentile, bca)，未指定時不計算", pattern="^(percentile|bca)$"
+    )
+    bootstrap_resamples: int = Field(10000, description="bootstrap 重抽次數 (100000 次以上拆段平行計算)", ge=100, le=10000000)
+    confidence_level: float = Field(0.95, description="效果量信賴區間的信心水準", gt=0, lt=1)
+    random_seed: Optional[int] = Field(None, description="bootstrap 與置換檢定的亂數種子 (可重現結果)")
 
 
 class BasicStatsRequest(BaseModel):
     """基本統計量請求模型"""
 
-    values: List[float] = Field(..., description="數值陣列", min_items=1)
+    values: FloatArray = Field(..., description="數值陣列", min_items=1)
 
 
 class DistributionStatsRequest(BaseModel):
     """分佈統計量請求模型"""
 
-    values: List[float] = Field(..., description="數值陣列", min_items=3)
+    values: FloatArray = Field(..., description="數值陣列", min_items=3)
 
 
 class PercentilesRequest(BaseModel):
     """百分位數請求模型"""
 
-    values: List[float] = Field(..., description="數值陣列", min_items=1)
+    values: FloatArray = Field(..., description="數值陣列", min_items=1)
     percentiles: List[float] = Field(default=[25, 50, 75], description="百分位數列表")
+    method: str = Field(
+        "exact", description="計算方法 (exact 精確值, sketch 分位數草圖估計)", pattern="^(exact|sketch)$"
+    )
+    sketch_k: int = Field(200, description="分位數草圖大小，越大越精確", ge=8, le=65536)
 
 
-class TTestRequest(BaseModel):
+class TTestRequest(EffectSizeCIOptions):
     """t檢定請求模型"""
 
-    sample1: List[float] = Field(..., description="樣本1數據", min_items=2)
-    sample2: Optional[List[float]] = Field(None, description="樣本2數據(雙樣本檢定用)")
+    sample1: FloatArray = Field(..., description="樣本1數據", min_items=2)
+    sample2: Optional[FloatArray] = Field(None, description="樣本2數據(雙樣本檢定用)")
     paired: bool = Field(False, description="是否為配對檢定")
     alpha: float = Field(0.05, description="顯著水準", gt=0, lt=1)
     alternative: str = Field(
         "two-sided", description="對立假設", pattern="^(two-sided|less|greater)$"
     )
+    method: str = Field(
+        "parametric",
+        description="p 值計算方法 (parametric: 理論分佈, permutation: 置換檢定，適合小樣本)",
+        pattern="^(parametric|permutation)$",
+    )
+    n_resamples: int = Field(10000, description="置換檢定的隨機置換數；所有置換數不超過此值時改為精確檢定", ge=100, le=1000000)
+    p_value_precision: Optional[float] = Field(
+        None, description="置換檢定 p 值的目標精度 (99% 信賴區間半寬)，達到即提前停止", gt=0, lt=0.5
+    )
 
 
-class ChiSquareRequest(BaseModel):
-    """卡方檢定請求模型"""
+class ChiSquareRequest(EffectSizeCIOptions):
+    """卡方檢定請求模型 (效果量 Cramér's V 的信賴區間僅適用於獨立性檢定)"""
 
     observed: List[List[int]] = Field(..., description="觀察值矩陣")
     expected: Optional[List[List[float]]] = Field(None, description="期望值矩陣(可選)")
 
 
-class ANOVARequest(BaseModel):
+class ANOVARequest(EffectSizeCIOptions):
     """ANOVA請求模型"""
 
-    groups: List[List[float]] = Field(..., description="各組數據", min_items=2)
+    groups: Optional[FloatArrayList] = Field(None, description="各組數據", min_items=2)
+    values: Optional[FloatArrayWithMissing] = Field(
+        None, description="長格式數據的數值陣列 (與 labels 一起取代 groups)；也可用 {\"dataset\": id, \"column\": \"value\"} 引用資料集欄位"
+    )
+    labels: Optional[GroupLabels] = Field(
+        None, description="長格式數據中每個數值的分組標籤，組別依標籤排序；也可用 {\"dataset\": id, \"column\": \"group\"} 引用資料集欄位"
+    )
+    posthoc: Optional[str] = Field(
+        None, description="事後兩兩比較 (tukey: Tukey HSD, games_howell: 不假設變異數相等)", pattern="^(tukey|games_howell)$"
+    )
+    method: str = Field(
+        "parametric",
+        description="p 值計算方法 (parametric: 理論分佈, permutation: 置換檢定，適合小樣本)",
+        pattern="^(parametric|permutation)$",
+    )
+    n_resamples: int = Field(10000, description="置換檢定的隨機置換數；所有置換數不超過此值時改為精確檢定", ge=100, le=1000000)
+    p_value_precision: Optional[float] = Field(
+        None, description="置換檢定 p 值的目標精度 (99% 信賴區間半寬)，達到即提前停止", gt=0, lt=0.5
+    )
+
+    @model_validator(mode="after")
+    def _check_input(self):
+        return _require_groups_or_long_format(self)
 
 
 class LinearRegressionRequest(BaseModel):
     """線性迴歸請求模型"""
 
-    x: List[float] = Field(..., description="自變數", min_items=2)
-    y: List[float] = Field(..., description="依變數", min_items=2)
+    x: FloatArray = Field(..., description="自變數", min_items=2)
+    y: FloatArray = Field(..., description="依變數", min_items=2)
+    include: Optional[List[RegressionField]] = Field(
+        None, description="要回傳的大型欄位 (residuals, fitted_values)，未指定時全部回傳，空列表只回傳係數與配適度"
+    )
+    confidence_level: float = Field(0.95, description="係數信賴區間的信心水準", gt=0, lt=1)
 
 
 class MultipleRegressionRequest(BaseModel):
     """多元迴歸請求模型"""
 
-    x: List[List[float]] = Field(..., description="自變數矩陣", min_items=1)
-    y: List[float] = Field(..., description="依變數", min_items=2)
+    x: FloatMatrix = Field(..., description="自變數矩陣", min_items=1)
+    y: FloatArray = Field(..., description="依變數", min_items=2)
+    include: Optional[List[RegressionField]] = Field(
+        None, description="要回傳的大型欄位 (residuals, fitted_values)，未指定時全部回傳，空列表只回傳係數與配適度"
+    )
+    confidence_level: float = Field(0.95, description="係數信賴區間的信心水準", gt=0, lt=1)
 
 
 class PolynomialRegressionRequest(BaseModel):
     """多項式迴歸請求模型"""
 
-    x: List[float] = Field(..., description="自變數", min_items=3)
-    y: List[float] = Field(..., description="依變數", min_items=3)
+    x: FloatArray = Field(..., description="自變數", min_items=3)
+    y: FloatArray = Field(..., description="依變數", min_items=3)
     degree: int = Field(2, description="多項式次數", ge=1, le=10)
+    include: Optional[List[RegressionField]] = Field(
+        None, description="要回傳的大型欄位 (residuals, fitted_values)，未指定時全部回傳，空列表只回傳係數與配適度"
+    )
+    confidence_level: float = Field(0.95, description="係數信賴區間的信心水準", gt=0, lt=1)
+
+
+class RegressionSessionRequest(BaseModel):
+    """建立增量迴歸工作階段請求模型"""
+
+    n_features: int = Field(..., description="自變數數量", ge=1)
+    terms: Optional[List[str]] = Field(None, description="各自變數的名稱，預設為 x1, x2, ...")
+
+
+class RegressionRowsRequest(BaseModel):
+    """加入迴歸資料列請求模型"""
+
+    x: FloatMatrix = Field(..., description="自變數矩陣 (觀測值 × 自變數)", min_items=1)
+    y: FloatArray = Field(..., description="依變數", min_items=1)
+
+
+class RegressionSolveRequest(BaseModel):
+    """求解增量迴歸請求模型"""
+
+    confidence_level: float = Field(0.95, description="係數信賴區間的信心水準", gt=0, lt=1)
 
 
 class CorrelationRequest(BaseModel):
     """相關性請求模型"""
 
-    x: List[float] = Field(..., description="變數X", min_items=3)
-    y: List[float] = Field(..., description="變數Y", min_items=3)
+    x: FloatArray = Field(..., description="變數X", min_items=3)
+    y: FloatArray = Field(..., description="變數Y", min_items=3)
 
 
 class CorrelationMatrixRequest(BaseModel):
     """相關矩陣請求模型"""
 
-    data: List[List[float]] = Field(..., description="數據矩陣", min_items=2)
+    data: VariablesMatrix = Field(..., description="數據矩陣", min_items=2)
     columns: List[str] = Field(..., description="變數名稱列表")
+    method: str = Field(
+        "pearson", description="相關方法", pattern="^(pearson|spearman|kendall)$"
+    )
 
 
 class NormalDistributionRequest(BaseModel):
     """常態分佈請求模型"""
 
-    values: List[float] = Field(..., description="數值陣列", min_items=8)
+    values: FloatArray = Field(..., description="數值陣列", min_items=8)
 
 
 class DistributionTestRequest(BaseModel):
     """分佈檢定請求模型"""
 
-    values: List[float] = Field(..., description="數值陣列", min_items=8)
+    values: FloatArray = Field(..., description="數值陣列", min_items=8)
     distribution: str = Field(
         "normal", description="檢定的分佈類型", pattern="^(normal|exponential|uniform)$"
     )
 
 
-class MannWhitneyRequest(BaseModel):
+class MannWhitneyRequest(EffectSizeCIOptions):
     """Mann-Whitney U 檢定請求模型"""
 
-    sample1: List[float] = Field(..., description="樣本1數據", min_items=3)
-    sample2: List[float] = Field(..., description="樣本2數據", min_items=3)
+    sample1: FloatArray = Field(..., description="樣本1數據", min_items=3)
+    sample2: FloatArray = Field(..., description="樣本2數據", min_items=3)
     alpha: float = Field(0.05, description="顯著水準", gt=0, lt=1)
     alternative: str = Field(
         "two-sided", description="對立假設", pattern="^(two-sided|less|greater)$"
     )
+    method: str = Field(
+        "parametric",
+        description="p 值計算方法 (parametric: 理論分佈, permutation: 置換檢定，適合小樣本)",
+        pattern="^(parametric|permutation)$",
+    )
+    n_resamples: int = Field(10000, description="置換檢定的隨機置換數；所有置換數不超過此值時改為精確檢定", ge=100, le=1000000)
+    p_value_precision: Optional[float] = Field(
+        None, description="置換檢定 p 值的目標精度 (99% 信賴區間半寬)，達到即提前停止", gt=0, lt=0.5
+    )
 
 
-class WilcoxonRequest(BaseModel):
+class WilcoxonRequest(EffectSizeCIOptions):
     """Wilcoxon 符號等級檢定請求模型"""
 
-    sample1: List[float] = Field(..., description="第一次測量數據", min_items=3)
-    sample2: List[float] = Field(..., description="第二次測量數據", min_items=3)
+    sample1: FloatArray = Field(..., description="第一次測量數據", min_items=3)
+    sample2: FloatArray = Field(..., description="第二次測量數據", min_items=3)
     alpha: float = Field(0.05, description="顯著水準", gt=0, lt=1)
     alternative: str = Field(
         "two-sided", description="對立假設", pattern="^(two-sided|less|greater)$"
     )
 
 
-class KruskalWallisRequest(BaseModel):
+class KruskalWallisRequest(EffectSizeCIOptions):
     """Kruskal-Wallis 檢定請求模型"""
 
-    groups: List[List[float]] = Field(..., description="各組數據", min_items=3)
+    groups: Optional[FloatArrayList] = Field(None, description="各組數據", min_items=3)
+    values: Optional[FloatArrayWithMissing] = Field(
+        None, description="長格式數據的數值陣列 (與 labels 一起取代 groups)；也可用 {\"dataset\": id, \"column\": \"value\"} 引用資料集欄位"
+    )
+    labels: Optional[GroupLabels] = Field(
+        None, description="長格式數據中每個數值的分組標籤，組別依標籤排序；也可用 {\"dataset\": id, \"column\": \"group\"} 引用資料集欄位"
+    )
+    alpha: float = Field(0.05, description="顯著水準", gt=0, lt=1)
+    posthoc: Optional[str] = Field(None, description="事後兩兩比較 (dunn: Dunn 檢定)", pattern="^dunn$")
+    posthoc_correction: str = Field(
+        "bonferroni", description="Dunn 檢定的多重比較校正 (none, bonferroni, holm, fdr_bh)",
+        pattern="^(none|bonferroni|holm|fdr_bh)$",
+    )
+
+    @model_validator(mode="after")
+    def _check_input(self):
+        return _require_groups_or_long_format(self)
+
+
+class MassTestRequest(BaseModel):
+    """逐欄大量檢定請求模型"""
+
+    data: FloatMatrixWithMissing = Field(
+        ..., description="數據矩陣 (觀測值 × 特徵)；也可用 {\"dataset\": id, \"columns\": [...]} 引用資料集"
+    )
+    labels: GroupLabels = Field(
+        ..., description="每個觀測值的分組標籤；也可用 {\"dataset\": id, \"column\": \"group\"} 引用資料集欄位"
+    )
+    features: Optional[List[str]] = Field(None, description="特徵名稱 (引用資料集時預設為欄位名稱)")
+    test: str = Field(
+        "welch",
+        description="檢定方法 (welch, student, mann_whitney: 兩組; kruskal: 兩組以上)",
+        pattern="^(welch|student|mann_whitney|kruskal)$",
+    )
+    correction: str = Field(
+        "fdr_bh", description="多重比較校正 (none, bonferroni, holm, fdr_bh)", pattern="^(none|bonferroni|holm|fdr_bh)$"
+    )
+    alpha: float = Field(0.05, description="顯著水準 (比較校正後的 p 值)", gt=0, lt=1)
+    alternative: str = Field(
+        "two-sided", description="兩組檢定的對立假設 (第一組相對第二組，組別依標籤排序)",
+        pattern="^(two-sided|less|greater)$",
+    )
+
+    @model_validator(mode="before")
+    @classmethod
+    def _features_from_dataset(cls, values: Any) -> Any:
+        """引用資料集時以欄位名稱作為特徵名稱"""
+        if isinstance(values, dict) and values.get("features") is None:
+            data = values.get("data")
+            if isinstance(data, dict) and isinstance(data.get("columns"), list):
+                values = {**values, "features": data["columns"]}
+        return values
+
+
+class MultipleComparisonRequest(BaseModel):
+    """多重比較校正請求模型"""
+
+    p_values: FloatArray = Field(..., description="原始 p 值", min_items=1)
+    method: str = Field(
+        "holm", description="校正方法 (bonferroni, holm, fdr_bh)", pattern="^(bonferroni|holm|fdr_bh)$"
+    )
     alpha: float = Field(0.05, description="顯著水準", gt=0, lt=1)
+
+
+class BatchJob(BaseModel):
+    """批次分析中的單一工作"""
+
+    type: str = Field(..., description="工作類型，例如 ttest、anova、inferential.mann_whitney、histogram")
+    params: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="與對應端點相同的請求參數；數值陣列欄位可填入共用陣列名稱 (多組資料可填名稱列表)",
+    )
+    id: Optional[str] = Field(None, description="工作識別碼，原樣回傳")
+
+
+class BatchRequest(BaseModel):
+    """批次分析請求模型"""
+
+    arrays: Dict[str, Any] = Field(
+        default_factory=dict, description="共用的具名數值陣列 (一維陣列或多組陣列)，每個陣列只解碼一次"
+    )
+    jobs: List[BatchJob] = Field(..., description="工作列表", min_items=1, max_items=256)
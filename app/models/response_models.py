@@ -1,5 +1,16 @@
-from typing import List, Dict, Optional, Any
-from pydantic import BaseModel
+from typing import Annotated, List, Dict, Optional, Any
+
+import numpy as np
+from pydantic import BaseModel, Field, PlainSerializer
+
+
+def _float_list(values: Any) -> List[float]:
+    return np.asarray(values, dtype=float).tolist()
+
+
+# 可保存 NumPy 陣列的數值列表欄位：服務以 model_construct 直接放入陣列 (由 FastJSONResponse 序列化)，
+# model_dump / model_dump_json 時轉為 Python 列表
+FloatList = Annotated[List[float], PlainSerializer(_float_list, return_type=List[float])]
 
 
 class BasicStatsResponse(BaseModel):
@@ -16,6 +27,21 @@ class BasicStatsResponse(BaseModel):
     count: int
 
 
+class StreamingStatsResponse(BaseModel):
+    """串流基本統計量回應模型 (單次走訪，中位數於串流模式下不一定提供)"""
+
+    mean: float
+    median: Optional[float] = None
+    std: float
+    variance: float
+    min: float
+    max: float
+    range: float
+    count: int
+    skewness: Optional[float] = None
+    kurtosis: Optional[float] = None
+
+
 class DistributionStatsResponse(BaseModel):
     """分佈統計回應模型"""
 
@@ -23,6 +49,7 @@ class DistributionStatsResponse(BaseModel):
     kurtosis: float
     is_normal: bool
     normality_p_value: float
+    normality_test: str = "shapiro"
 
 
 class PercentilesResponse(BaseModel):
@@ -30,6 +57,29 @@ class PercentilesResponse(BaseModel):
 
     percentiles: Dict[str, float]
     quartiles: Dict[str, float]
+    method: str = "exact"
+    rank_error: Optional[float] = None
+
+
+class PermutationInfo(BaseModel):
+    """置換檢定的執行資訊"""
+
+    n_resamples: int
+    exact: bool
+    early_stopped: bool
+    standard_error: float
+
+
+class BootstrapInterval(BaseModel):
+    """以 bootstrap 計算的效果量信賴區間"""
+
+    effect_size: str
+    estimate: float
+    confidence_interval: List[float]
+    confidence_level: float
+    method: str
+    n_resamples: int
+    standard_error: float
 
 
 class TTestResponse(BaseModel):
@@ -43,6 +93,9 @@ class TTestResponse(BaseModel):
     confidence_interval: Optional[List[float]]
     effect_size: Optional[float] = None
     effect_size_interpretation: Optional[str] = None
+    effect_size_ci: Optional[BootstrapInterval] = None
+    method: str = "parametric"
+    permutation: Optional[PermutationInfo] = None
 
 
 class ChiSquareResponse(BaseModel):
@@ -55,6 +108,26 @@ class ChiSquareResponse(BaseModel):
     reject_null: bool
     effect_size: Optional[float] = None
     effect_size_interpretation: Optional[str] = None
+    effect_size_ci: Optional[BootstrapInterval] = None
+
+
+class PostHocResponse(BaseModel):
+    """事後兩兩比較結果 (各陣列依配對 (0, 1), (0, 2), ..., (k-2, k-1) 排列)"""
+
+    method: str
+    correction: Optional[str] = None
+    alpha: float
+    groups: List[str]
+    group1: List[int]
+    group2: List[int]
+    difference: List[float]
+    standard_error: List[float]
+    statistic: List[float]
+    degrees_of_freedom: Optional[List[float]] = None
+    p_value: List[float]
+    confidence_lower: Optional[List[float]] = None
+    confidence_upper: Optional[List[float]] = None
+    reject_null: List[bool]
 
 
 class ANOVAResponse(BaseModel):
@@ -71,6 +144,21 @@ class ANOVAResponse(BaseModel):
     reject_null: bool
     effect_size: Optional[float] = None
     effect_size_interpretation: Optional[str] = None
+    effect_size_ci: Optional[BootstrapInterval] = None
+    method: str = "parametric"
+    permutation: Optional[PermutationInfo] = None
+    posthoc: Optional[PostHocResponse] = None
+
+
+class CoefficientStatistics(BaseModel):
+    """迴歸係數的推論統計"""
+
+    term: str
+    estimate: float
+    standard_error: float
+    t_value: float
+    p_value: float
+    confidence_interval: List[float]
 
 
 class RegressionResponse(BaseModel):
@@ -82,8 +170,35 @@ class RegressionResponse(BaseModel):
     adjusted_r_squared: float
     f_statistic: float
     p_value: float
-    residuals: List[float]
-    fitted_values: List[float]
+    residuals: Optional[FloatList] = None
+    fitted_values: Optional[FloatList] = None
+    coefficient_table: Optional[List[CoefficientStatistics]] = None
+    confidence_level: Optional[float] = None
+    degrees_of_freedom: Optional[int] = None
+    residual_standard_error: Optional[float] = None
+    durbin_watson: Optional[float] = None
+    condition_number: Optional[float] = None
+    warnings: List[str] = []
+
+
+class RegressionSessionInfo(BaseModel):
+    """增量迴歸工作階段資訊"""
+
+    id: str
+    terms: List[str]
+    n_features: int
+    n: int
+    created_at: float
+    updated_at: float
+
+
+class RegressionSessionState(BaseModel):
+    """增量迴歸的充分統計量 (資料列 [x1, ..., xp, y] 的觀測數、平均數與離均差交叉乘積)"""
+
+    n_features: int
+    n: int = Field(..., ge=0)
+    mean: List[float]
+    comoment: List[List[float]]
 
 
 class CorrelationResponse(BaseModel):
@@ -103,6 +218,8 @@ class CorrelationMatrixResponse(BaseModel):
     correlation_matrix: List[List[float]]
     p_values_matrix: List[List[float]]
     columns: List[str]
+    method: str = "pearson"
+    n_observations: Optional[int] = None
 
 
 class DistributionAnalysisResponse(BaseModel):
@@ -122,6 +239,7 @@ class NonparametricTestResponse(BaseModel):
     reject_null: bool
     alpha: float
     effect_size: Optional[float] = None
+    effect_size_ci: Optional[BootstrapInterval] = None
     interpretation: str
 
 
@@ -132,6 +250,8 @@ class MannWhitneyResponse(NonparametricTestResponse):
     z_score: Optional[float] = None
     rank_sum1: float
     rank_sum2: float
+    method: str = "parametric"
+    permutation: Optional[PermutationInfo] = None
 
 
 class WilcoxonResponse(NonparametricTestResponse):
@@ -148,6 +268,85 @@ class KruskalWallisResponse(NonparametricTestResponse):
     h_statistic: float
     degrees_of_freedom: int
     n_groups: int
+    posthoc: Optional[PostHocResponse] = None
+
+
+class DatasetColumnInfo(BaseModel):
+    """資料集欄位資訊"""
+
+    name: str
+    dtype: str
+    numeric: bool
+
+
+class DatasetInfo(BaseModel):
+    """資料集資訊回應模型"""
+
+    id: str
+    name: str
+    format: str
+    n_rows: int
+    columns: List[DatasetColumnInfo]
+    nbytes: int
+    created_at: float
+
+
+class DatasetListResponse(BaseModel):
+    """資料集列表回應模型"""
+
+    datasets: List[DatasetInfo]
+    total_bytes: int
+    max_bytes: int
+    evictions: int
+
+
+class MassTestResponse(BaseModel):
+    """逐欄大量檢定回應模型 (各陣列依特徵順序排列，無法檢定的特徵為 null)"""
+
+    test: str
+    correction: str
+    alternative: str
+    alpha: float
+    groups: List[str]
+    group_sizes: List[int]
+    n_tests: int
+    n_significant: int
+    features: Optional[List[str]] = None
+    statistic: List[Optional[float]]
+    degrees_of_freedom: Optional[List[Optional[float]]] = None
+    p_value: List[Optional[float]]
+    adjusted_p_value: List[Optional[float]]
+    reject_null: List[bool]
+
+
+class MultipleComparisonResponse(BaseModel):
+    """多重比較校正回應模型"""
+
+    method: str
+    alpha: float
+    n_tests: int
+    n_significant: int
+    adjusted_p_value: List[Optional[float]]
+    reject_null: List[bool]
+
+
+class BatchJobResult(BaseModel):
+    """批次分析中單一工作的結果"""
+
+    id: Optional[str] = None
+    type: str
+    success: bool
+    status_code: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """批次分析回應模型 (結果順序與工作順序相同)"""
+
+    results: List[BatchJobResult]
+    succeeded: int
+    failed: int
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,199 @@
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.models.array_types import KIND_GROUPS, KIND_MATRIX, KIND_VECTOR
+
+
+ARROW_STREAM_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+RAW_FLOAT64_CONTENT_TYPE = "application/octet-stream"
+
+BINARY_CONTENT_TYPES = (ARROW_STREAM_CONTENT_TYPE, RAW_FLOAT64_CONTENT_TYPE)
+
+_HEADER_DTYPE = np.dtype("<u8")
+_VALUE_DTYPE = np.dtype("<f8")
+
+
+class ArrayDecodeError(ValueError):
+    """二進位陣列解碼失敗"""
+
+
+def decode_raw_float64(body: bytes) -> List[np.ndarray]:
+    """
+    解碼原始 float64 陣列串流
+
+    格式為一個或多個陣列依序串接，每個陣列包含：
+    - 標頭: little-endian uint64 維度數 ndim，接著 ndim 個 uint64 維度大小
+    - 資料: 依 C 順序排列的 little-endian float64 數值
+
+    所有欄位皆為 8 位元組，資料區段因此維持對齊，可直接以 np.frombuffer 零複製讀取。
+
+    Args:
+        body: 請求內容
+
+    Returns:
+        唯讀的 NumPy 陣列列表 (與 body 共用記憶體)
+    """
+    arrays = []
+    offset = 0
+    size = len(body)
+    while offset < size:
+        if size - offset < _HEADER_DTYPE.itemsize:
+            raise ArrayDecodeError("二進位陣列標頭不完整")
+        ndim = int(np.frombuffer(body, dtype=_HEADER_DTYPE, count=1, offset=offset)[0])
+        offset += _HEADER_DTYPE.itemsize
+        if ndim not in (1, 2) or size - offset < ndim * _HEADER_DTYPE.itemsize:
+            raise ArrayDecodeError(f"不支援的陣列維度: {ndim}")
+
+        shape = tuple(int(dim) for dim in np.frombuffer(body, dtype=_HEADER_DTYPE, count=ndim, offset=offset))
+        offset += ndim * _HEADER_DTYPE.itemsize
+
+        # 以 Python 整數計算元素數 (np.prod 會在 int64 溢位)，並與剩餘資料長度比對
+        count = math.prod(shape)
+        if count > (size - offset) // _VALUE_DTYPE.itemsize:
+            raise ArrayDecodeError("二進位陣列資料長度與標頭不符")
+        arrays.append(np.frombuffer(body, dtype=_VALUE_DTYPE, count=count, offset=offset).reshape(shape))
+        offset += count * _VALUE_DTYPE.itemsize
+
+    return arrays
+
+
+def encode_raw_float64(*arrays) -> bytes:
+    """將陣列編碼為 decode_raw_float64 可解讀的格式 (供客戶端與測試使用)"""
+    parts = []
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype=_VALUE_DTYPE)
+        parts.append(np.array([array.ndim, *array.shape], dtype=_HEADER_DTYPE).tobytes())
+        parts.append(array.tobytes())
+    return b"".join(parts)
+
+
+def assign_raw_arrays(
+    arrays: List[np.ndarray], kinds: Dict[str, str], names: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    將依序解碼的陣列指派給請求欄位
+
+    Args:
+        arrays: decode_raw_float64 的結果
+        kinds: 欄位名稱對應陣列種類 (見 array_field_kinds)
+        names: 各陣列對應的欄位名稱；未指定時依欄位宣告順序指派，
+               最後一個多組欄位 (groups) 會接收剩餘的所有陣列 (其後的欄位須以名稱指定)
+
+    Returns:
+        欄位名稱對應陣列的字典
+    """
+    if names is None:
+        field_names = list(kinds)
+        group_fields = [i for i, name in enumerate(field_names) if kinds[name] == KIND_GROUPS]
+        if group_fields and len(arrays) > group_fields[-1]:
+            last = group_fields[-1]
+            names = field_names[:last] + [field_names[last]] * (len(arrays) - last)
+        else:
+            names = field_names[:len(arrays)]
+
+    if len(names) != len(arrays):
+        raise ArrayDecodeError(f"陣列數量 ({len(arrays)}) 與欄位名稱數量 ({len(names)}) 不符")
+
+    payload: Dict[str, Any] = {}
+    for name, array in zip(names, arrays):
+        kind = kinds.get(name)
+        if kind is None:
+            raise ArrayDecodeError(f"欄位 {name} 不接受數值陣列")
+        if kind == KIND_GROUPS:
+            groups = payload.setdefault(name, [])
+            groups.extend(array if array.ndim == 2 else [array])
+        else:
+            _check_ndim(name, array, 1 if kind == KIND_VECTOR else 2)
+            payload[name] = array
+    return payload
+
+
+def decode_arrow_stream(body: bytes, kinds: Dict[str, str]) -> Dict[str, Any]:
+    """
+    解碼 Arrow IPC 串流
+
+    每個欄位 (column) 對應一個請求欄位：
+    - float64 欄位: 一維陣列 (整欄)
+    - list<float64> 欄位且僅一列: 一維陣列 (可用於長度不同的 sample1/sample2)
+    - fixed_size_list<float64> / list<float64> 欄位: 二維矩陣或多組陣列 (每列一組)
+
+    單一區塊且無缺值的欄位以零複製方式轉為 NumPy 陣列。
+
+    Args:
+        body: 請求內容
+        kinds: 欄位名稱對應陣列種類 (見 array_field_kinds)
+
+    Returns:
+        欄位名稱對應陣列的字典
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ArrayDecodeError("伺服器未安裝 pyarrow，無法解碼 Arrow 串流")
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise ArrayDecodeError(f"Arrow 串流格式錯誤: {str(e)}")
+
+    payload: Dict[str, Any] = {}
+    for name in table.column_names:
+        kind = kinds.get(name)
+        if kind is None:
+            raise ArrayDecodeError(f"欄位 {name} 不接受數值陣列")
+        chunked = table.column(name)
+        column = chunked.chunk(0) if chunked.num_chunks == 1 else chunked.combine_chunks()
+
+        if pa.types.is_floating(column.type) or pa.types.is_integer(column.type):
+            if kind != KIND_VECTOR:
+                raise ArrayDecodeError(f"欄位 {name} 必須使用 list<float64> 或 fixed_size_list<float64> 型別")
+            payload[name] = _arrow_values(column)
+            continue
+
+        if not (pa.types.is_list(column.type) or pa.types.is_large_list(column.type)
+                or pa.types.is_fixed_size_list(column.type)):
+            raise ArrayDecodeError(f"欄位 {name} 的 Arrow 型別不支援: {column.type}")
+
+        values = _arrow_values(column.flatten())
+        if pa.types.is_fixed_size_list(column.type):
+            rows = values.reshape(len(column), column.type.list_size)
+            offsets = None
+        else:
+            rows = None
+            offsets = column.offsets.to_numpy()
+
+        if kind == KIND_VECTOR:
+            if len(column) != 1:
+                raise ArrayDecodeError(f"欄位 {name} 為一維陣列，list 欄位必須僅有一列")
+            payload[name] = values
+        elif kind == KIND_MATRIX:
+            if rows is None:
+                lengths = np.diff(offsets)
+                if len(lengths) and np.any(lengths != lengths[0]):
+                    raise ArrayDecodeError(f"欄位 {name} 各列長度必須相同")
+                rows = values.reshape(len(column), int(lengths[0]) if len(lengths) else 0)
+            payload[name] = rows
+        else:
+            if rows is not None:
+                payload[name] = list(rows)
+            else:
+                start = int(offsets[0])
+                payload[name] = [
+                    values[int(lo) - start:int(hi) - start] for lo, hi in zip(offsets[:-1], offsets[1:])
+                ]
+    return payload
+
+
+def _arrow_values(array) -> np.ndarray:
+    """將 Arrow 數值陣列轉為 float64 NumPy 陣列，可行時不複製"""
+    if array.null_count:
+        raise ArrayDecodeError("Arrow 陣列不得包含缺值")
+    values = array.to_numpy(zero_copy_only=False)
+    return values if values.dtype == np.float64 else values.astype(np.float64)
+
+
+def _check_ndim(name: str, array: np.ndarray, ndim: int) -> None:
+    if array.ndim != ndim:
+        raise ArrayDecodeError(f"欄位 {name} 必須為 {ndim} 維陣列，實際為 {array.ndim} 維")
@@ -0,0 +1,264 @@
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.services.lazy_imports import lazy_module
+
+stats = lazy_module("scipy.stats")
+
+# 每個區塊的元素上限 (重抽次數 × 觀測值數，約 32 MB 的 float64)
+_BLOCK_ELEMENTS = 4_000_000
+
+# 信賴區間方法
+CI_PERCENTILE = "percentile"
+CI_BCA = "bca"  # 偏誤校正與加速 (bias-corrected and accelerated)
+
+# 效果量
+COHENS_D = "cohens_d"  # 獨立樣本 Cohen's d
+COHENS_D_ONE_SAMPLE = "cohens_d_one_sample"  # 單樣本 (或配對差值) Cohen's d
+ETA_SQUARED = "eta_squared"  # ANOVA η²
+CRAMERS_V = "cramers_v"  # 列聯表 Cramér's V
+RANK_BISERIAL = "rank_biserial"  # Mann-Whitney 等級雙列相關
+MATCHED_RANK_BISERIAL = "matched_rank_biserial"  # Wilcoxon 配對等級雙列相關
+KRUSKAL_ETA_SQUARED = "kruskal_eta_squared"  # Kruskal-Wallis η²_H
+
+SeedLike = Union[None, int, np.random.SeedSequence]
+
+
+# ---- 向量化效果量：每個樣本為 (重抽次數 × 觀測值) 矩陣，回傳每列的效果量 ----
+
+def _sum_of_squares(samples: np.ndarray, mean: np.ndarray) -> np.ndarray:
+    """每列的離均差平方和 (先減去平均數再平方，避免 Σx² - n·x̄² 在數值偏移大時的相消誤差)"""
+    deviations = samples - mean[:, None]
+    return np.einsum("ij,ij->i", deviations, deviations)
+
+
+def cohens_d_one_sample(x: np.ndarray) -> np.ndarray:
+    mean = x.mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return mean / np.sqrt(_sum_of_squares(x, mean) / (x.shape[1] - 1))
+
+
+def cohens_d(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    n1, n2 = x.shape[1], y.shape[1]
+    mean1, mean2 = x.mean(axis=1), y.mean(axis=1)
+    pooled = (_sum_of_squares(x, mean1) + _sum_of_squares(y, mean2)) / (n1 + n2 - 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (mean1 - mean2) / np.sqrt(pooled)
+
+
+def _between_over_total(groups: Sequence[np.ndarray]) -> np.ndarray:
+    """組間平方和 / 總平方和 (每列)"""
+    sizes = np.array([group.shape[1] for group in groups])
+    means = np.column_stack([group.mean(axis=1) for group in groups])
+    grand_mean = means @ sizes / sizes.sum()
+    ss_between = ((means - grand_mean[:, None]) ** 2 * sizes).sum(axis=1)
+    ss_within = sum(_sum_of_squares(group, means[:, i]) for i, group in enumerate(groups))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return ss_between / (ss_between + ss_within)
+
+
+def eta_squared(*groups: np.ndarray) -> np.ndarray:
+    return _between_over_total(groups)
+
+
+def kruskal_eta_squared(*groups: np.ndarray) -> np.ndarray:
+    """
+    η²_H = (H - k + 1) / (n - k)
+
+    含同值校正的 H 等於等級的 (n - 1) × 組間平方和 / 總平方和，因此整批只需一次逐列排等級
+    """
+    sizes = [group.shape[1] for group in groups]
+    n, k = sum(sizes), len(sizes)
+    ranks = stats.rankdata(np.hstack(groups), axis=1)
+    h = (n - 1) * _between_over_total(np.split(ranks, np.cumsum(sizes)[:-1], axis=1))
+    return (h - k + 1) / (n - k)
+
+
+def rank_biserial(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """r = 2 U₁ / (n₁ n₂) - 1 (正值表示第一組傾向較大)"""
+    n1, n2 = x.shape[1], y.shape[1]
+    ranks = stats.rankdata(np.hstack([x, y]), axis=1)
+    u1 = ranks[:, :n1].sum(axis=1) - n1 * (n1 + 1) / 2.0
+    return 2.0 * u1 / (n1 * n2) - 1.0
+
+
+def matched_rank_biserial(d: np.ndarray) -> np.ndarray:
+    """
+    r = (T₊ - T₋) / (T₊ + T₋)，差值為 0 者不計 (與 Wilcoxon 檢定相同)
+
+    |d| 的等級中 0 一定排在最前面，扣除 0 的個數即為非零差值之間的等級
+    """
+    zeros = np.count_nonzero(d == 0, axis=1)[:, None]
+    ranks = np.where(d == 0, 0.0, stats.rankdata(np.abs(d), axis=1) - zeros)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (np.sign(d) * ranks).sum(axis=1) / ranks.sum(axis=1)
+
+
+def cramers_v(tables: np.ndarray) -> np.ndarray:
+    """(重抽次數 × 列 × 欄) 列聯表的 Cramér's V (未做連續性校正)"""
+    total = tables.sum(axis=(1, 2))
+    expected = tables.sum(axis=2)[:, :, None] * tables.sum(axis=1)[:, None, :] / total[:, None, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        chi2 = np.nansum((tables - expected) ** 2 / expected, axis=(1, 2))
+        return np.sqrt(chi2 / (total * (min(tables.shape[1:]) - 1)))
+
+
+EFFECT_SIZES = {
+    COHENS_D: cohens_d,
+    COHENS_D_ONE_SAMPLE: cohens_d_one_sample,
+    ETA_SQUARED: eta_squared,
+    RANK_BISERIAL: rank_biserial,
+    MATCHED_RANK_BISERIAL: matched_rank_biserial,
+    KRUSKAL_ETA_SQUARED: kruskal_eta_squared,
+}
+
+
+def _effect_size(name: str) -> Callable[..., np.ndarray]:
+    if name != CRAMERS_V and name not in EFFECT_SIZES:
+        raise ValueError(f"不支援的效果量: {name}")
+    return EFFECT_SIZES.get(name)
+
+
+def _as_samples(name: str, samples: Sequence) -> List[np.ndarray]:
+    if name == CRAMERS_V:
+        table = np.asarray(samples[0], dtype=float)
+        if table.ndim != 2 or min(table.shape) < 2:
+            raise ValueError("Cramér's V 需要至少 2 × 2 的列聯表")
+        return [table]
+    return [np.asarray(sample, dtype=float).ravel() for sample in samples]
+
+
+def estimate(name: str, samples: Sequence) -> float:
+    """原始資料的效果量"""
+    samples = _as_samples(name, samples)
+    if name == CRAMERS_V:
+        return float(cramers_v(samples[0][None])[0])
+    return float(_effect_size(name)(*(sample[None, :] for sample in samples))[0])
+
+
+def bootstrap_distribution(name: str, samples: Sequence, n_resamples: int, seed: SeedLike = None) -> np.ndarray:
+    """
+    效果量的 bootstrap 分佈
+
+    重抽索引以 (重抽次數 × n) 的區塊一次產生，效果量對整個區塊以單一向量運算計算；
+    區塊大小依 _BLOCK_ELEMENTS 限制記憶體。多組資料各自重抽 (分層)，列聯表以多項分佈重抽各格次數。
+    模組層級函式，可將大量重抽拆成多段交給計算執行器平行計算 (各段使用 SeedSequence.spawn 的子種子)。
+
+    Returns:
+        長度 n_resamples 的效果量陣列 (可能含 NaN，例如重抽後變異數為 0)
+    """
+    statistic = _effect_size(name)
+    samples = _as_samples(name, samples)
+    rng = np.random.default_rng(seed)
+    width = sum(sample.size for sample in samples)
+    rows = max(1, _BLOCK_ELEMENTS // width)
+    values = np.empty(n_resamples)
+    for start in range(0, n_resamples, rows):
+        size = min(rows, n_resamples - start)
+        if name == CRAMERS_V:
+            table = samples[0]
+            total = int(table.sum())
+            counts = rng.multinomial(total, table.ravel() / total, size=size)
+            values[start:start + size] = cramers_v(counts.reshape(size, *table.shape).astype(float))
+        else:
+            resampled = [sample[rng.integers(0, sample.size, (size, sample.size))] for sample in samples]
+            values[start:start + size] = statistic(*resampled)
+    return values
+
+
+def _jackknife(name: str, samples: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    逐一刪除每個觀測值後的效果量與權重 (BCa 的加速常數用)
+
+    每個樣本的刪一矩陣 (n × (n - 1)) 依 _BLOCK_ELEMENTS 分區塊計算，其餘樣本維持原樣；
+    列聯表則對每個非空格子減 1，以格子次數為權重。
+    """
+    if name == CRAMERS_V:
+        table = samples[0]
+        cells = np.flatnonzero(table.ravel() > 0)
+        tables = np.repeat(table[None], cells.size, axis=0)
+        tables.reshape(cells.size, -1)[np.arange(cells.size), cells] -= 1
+        return cramers_v(tables), table.ravel()[cells]
+
+    statistic = _effect_size(name)
+    values = []
+    for index, sample in enumerate(samples):
+        n = sample.size
+        rows = max(1, _BLOCK_ELEMENTS // max(n * len(samples), 1))
+        for start in range(0, n, rows):
+            stop = min(n, start + rows)
+            leave_out = np.arange(start, stop)
+            keep = np.arange(n)[None, :] != leave_out[:, None]
+            reduced = np.broadcast_to(sample, (stop - start, n))[keep].reshape(stop - start, n - 1)
+            others = [np.broadcast_to(other, (stop - start, other.size)) for other in samples]
+            others[index] = reduced
+            values.append(statistic(*others))
+    values = np.concatenate(values)
+    return values, np.ones_like(values)
+
+
+def confidence_interval(
+    name: str,
+    samples: Sequence,
+    distribution: np.ndarray,
+    confidence_level: float = 0.95,
+    method: str = CI_PERCENTILE,
+) -> dict:
+    """
+    由 bootstrap 分佈計算信賴區間
+
+    - percentile: 分佈的 α/2 與 1 - α/2 分位數
+    - bca: 以 bootstrap 分佈低於估計值的比例校正偏誤 (z₀)，以刀切法 (jackknife) 估計加速常數 (a)，
+      調整取用的分位數 (Efron, 1987)
+
+    Returns:
+        效果量名稱、估計值、信賴區間與 bootstrap 標準誤
+    """
+    if method not in (CI_PERCENTILE, CI_BCA):
+        raise ValueError(f"不支援的信賴區間方法: {method}")
+    samples = _as_samples(name, samples)
+    observed = estimate(name, samples)
+    finite = distribution[np.isfinite(distribution)]
+    if finite.size < 2 or not np.isfinite(observed):
+        raise ValueError("效果量無法計算 (例如變異數為 0)，無法建立 bootstrap 信賴區間")
+
+    alpha = 1.0 - confidence_level
+    levels = np.array([alpha / 2.0, 1.0 - alpha / 2.0])
+    if method == CI_BCA:
+        below = (np.count_nonzero(finite < observed) + 0.5 * np.count_nonzero(finite == observed)) / finite.size
+        z0 = stats.norm.ppf(below)
+        jackknife, weights = _jackknife(name, samples)
+        mask = np.isfinite(jackknife)
+        jackknife, weights = jackknife[mask], weights[mask]
+        deviation = np.average(jackknife, weights=weights) - jackknife
+        denominator = 6.0 * np.sum(weights * deviation ** 2) ** 1.5
+        acceleration = np.sum(weights * deviation ** 3) / denominator if denominator > 0 else 0.0
+        z = z0 + stats.norm.ppf(levels)
+        levels = stats.norm.cdf(z0 + z / (1.0 - acceleration * z))
+        if not np.isfinite(levels).all():
+            raise ValueError("BCa 校正失敗 (bootstrap 分佈全部位於估計值同一側)，請改用 percentile")
+
+    lower, upper = np.quantile(finite, levels)
+    return {
+        "effect_size": name,
+        "estimate": observed,
+        "confidence_interval": [float(lower), float(upper)],
+        "confidence_level": confidence_level,
+        "method": method,
+        "n_resamples": int(finite.size),
+        "standard_error": float(np.std(finite, ddof=1)),
+    }
+
+
+def bootstrap_ci(
+    name: str,
+    samples: Sequence,
+    n_resamples: int = 10000,
+    confidence_level: float = 0.95,
+    method: str = CI_PERCENTILE,
+    seed: Optional[int] = None,
+) -> dict:
+    """在同一執行緒中重抽並計算信賴區間 (不拆段)"""
+    distribution = bootstrap_distribution(name, samples, n_resamples, np.random.SeedSequence(seed))
+    return confidence_interval(name, samples, distribution, confidence_level, method)
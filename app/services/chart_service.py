@@ -1,70 +1,174 @@
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 import numpy as np
-from scipy import stats
-import matplotlib
-matplotlib.use('Agg')  # 使用非互動式後端
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import seaborn as sns
 import base64
 import io
+import os
+import threading
 from app.models.chart_models import ChartDataPoint, ChartResponse
+from app.services.decimation import (
+    DECIMATION_AUTO,
+    DECIMATION_DENSITY,
+    DECIMATION_LTTB,
+    DECIMATION_MINMAX,
+    DECIMATION_NONE,
+    decimation_threshold,
+    density_grid,
+    lttb_indices,
+    minmax_indices,
+)
+from app.services.field_selection import wants_field
+from app.services.font_cache import CHINESE_FONTS, ChartFonts, chart_fonts
+from app.services.lazy_imports import add_warmup_task, lazy_module
+from app.services.quantiles import exact_percentiles
+from app.services.render_farm import render_farm
+from app.services.result_cache import cached
 
 
-class ChartService:
-    """圖表服務類"""
-    
-    def __init__(self):
-        """初始化圖表服務，設定中文字體"""
-        # 設定 matplotlib 支援中文
-        # 嘗試多種中文字體，從最常見的開始
-        chinese_fonts = [
-            'PingFang HK',           # macOS 繁體中文字體
-            'PingFang SC',           # macOS 簡體中文字體  
-            'PingFang TC',           # macOS 繁體中文字體
-            'Hiragino Sans GB',      # macOS 簡體中文
-            'Hiragino Sans TC',      # macOS 繁體中文
-            'Hiragino Sans CNS',     # macOS 中文字體
-            'Hiragino Sans',         # macOS 通用
-            'Arial Unicode MS',      # macOS 通用字體
-            'Microsoft YaHei',       # Windows 雅黑
-            'SimHei',               # Windows 黑體
-            'WenQuanYi Micro Hei',  # Linux 文泉驛
-            'DejaVu Sans'           # 備用
-        ]
-        
-        # 找到可用的中文字體
-        available_fonts = [f.name for f in fm.fontManager.ttflist]
-        selected_font = None
-        
-        for font in chinese_fonts:
-            if font in available_fonts:
-                selected_font = font
-                break
-        
-        if selected_font:
-            # 清除字體緩存並重新設定
-            plt.rcParams['font.sans-serif'] = [selected_font] + chinese_fonts
-            plt.rcParams['font.family'] = ['sans-serif']
-            # 清除 matplotlib 字體緩存
-            try:
-                matplotlib.font_manager.fontManager._findfont_cache.clear()
-            except:
-                pass
-            print(f"使用中文字體: {selected_font}")
+def _use_agg_backend():
+    """匯入 pyplot 前先選定非互動式後端 (seaborn 會匯入 pyplot)"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+stats = lazy_module("scipy.stats")
+mpl = lazy_module("matplotlib")
+mpl_figure = lazy_module("matplotlib.figure")
+backend_agg = lazy_module("matplotlib.backends.backend_agg")
+fm = lazy_module("matplotlib.font_manager")
+sns = lazy_module("seaborn", before=_use_agg_backend)
+
+# 圖片版面
+LAYOUT_TIGHT = "tight"  # tight_layout 並裁切空白 (需繪製兩次)
+LAYOUT_FIXED = "fixed"  # 固定邊界，只繪製一次，圖片大小固定為 figsize × dpi
+
+# 固定版面的邊界 (英吋)，保留標題、軸標籤與旋轉 45 度的刻度標籤的空間
+_FIXED_MARGINS = {"left": 0.9, "right": 0.3, "bottom": 1.1, "top": 0.8}
+
+
+def _cacheable_chart(response: ChartResponse) -> bool:
+    """圖表建立或圖片生成失敗 (可能為逾時等暫時性錯誤) 時不保存結果"""
+    return response.success and "圖片生成失敗" not in response.reasoning
+
+
+def _cacheable_image(image: Optional[bytes]) -> bool:
+    """圖片生成失敗時不保存結果"""
+    return image is not None
+
+
+# 圖表數據格式
+DATA_FORMAT_RECORDS = "records"  # 每個數據點一個物件 [{"x": 1.0, "y": 2.0}, ...]
+DATA_FORMAT_COLUMNS = "columns"  # 每個欄位一個陣列 {"x": [1.0, ...], "y": [2.0, ...]}
+
+
+def chart_columns(data) -> Dict[str, List[Any]]:
+    """把圖表數據轉為欄式，已是欄式時直接回傳"""
+    if isinstance(data, dict):
+        return data
+    if not data:
+        return {}
+    return {key: [item[key] for item in data] for key in data[0]}
+
+
+def chart_records(data) -> List[Dict[str, Any]]:
+    """把圖表數據轉為逐點物件，已是逐點物件時直接回傳"""
+    if isinstance(data, list):
+        return data
+    keys = list(data)
+    if len(keys) == 2:
+        # 最常見的兩欄 (x/y、label/value) 直接以 dict 字面值建立，比 dict(zip()) 快約兩倍
+        first, second = keys
+        return [{first: a, second: b} for a, b in zip(*data.values())]
+    return [dict(zip(keys, row)) for row in zip(*data.values())]
+
+
+def shape_chart_data(columns: Dict[str, List[Any]], data_format: str):
+    """
+    依請求的數據格式輸出圖表數據
+
+    各服務先以 NumPy 向量運算建立欄式數據 (每欄一次 tolist())，
+    只有要求逐點物件時才組成每個數據點的 dict。
+    """
+    if data_format == DATA_FORMAT_COLUMNS:
+        return columns
+    if data_format == DATA_FORMAT_RECORDS:
+        return chart_records(columns)
+    raise ValueError(f"不支援的數據格式: {data_format}")
+
+
+# matplotlib 並非執行緒安全，於本行程內繪圖時一次只繪製一張
+_RENDER_LOCK = threading.Lock()
+
+
+def chart_layout() -> str:
+    """圖片版面，可用 SFDA_CHART_LAYOUT 設定 (tight 或 fixed)"""
+    layout = os.environ.get("SFDA_CHART_LAYOUT", LAYOUT_TIGHT)
+    if layout not in (LAYOUT_TIGHT, LAYOUT_FIXED):
+        raise ValueError(f"不支援的圖片版面: {layout}")
+    return layout
+
+
+def _apply_fixed_layout(fig) -> None:
+    """依圖片大小把固定邊界 (英吋) 換算為 subplot 參數"""
+    width, height = fig.get_size_inches()
+    fig.subplots_adjust(
+        left=min(0.3, _FIXED_MARGINS["left"] / width),
+        right=max(0.7, 1 - _FIXED_MARGINS["right"] / width),
+        bottom=min(0.4, _FIXED_MARGINS["bottom"] / height),
+        top=max(0.6, 1 - _FIXED_MARGINS["top"] / height),
+    )
+
+# 中文字體與 seaborn 樣式在每個行程只設定一次
+_STYLE_LOCK = threading.Lock()
+_style_configured = False
+
+
+def configure_matplotlib() -> ChartFonts:
+    """
+    設定 matplotlib 中文字體與 seaborn 樣式
+
+    字體由預先解析的字體檔 (app/services/font_cache.py) 取得，不必掃描字體清單；
+    匯入 matplotlib/seaborn 的成本仍較高，因此延後到第一次繪圖 (或啟動後的背景暖機) 才執行。
+
+    Returns:
+        繪圖用字體
+    """
+    global _style_configured
+    fonts = chart_fonts()
+    if _style_configured:
+        return fonts
+    with _STYLE_LOCK:
+        if _style_configured:
+            return fonts
+        mpl.rcParams['font.sans-serif'] = [fonts.family] + CHINESE_FONTS
+        mpl.rcParams['font.family'] = ['sans-serif']
+        mpl.rcParams['axes.unicode_minus'] = False
+        if fonts.path:
+            print(f"使用中文字體: {fonts.family}")
         else:
-            # 如果找不到中文字體，嘗試使用系統預設
-            plt.rcParams['font.sans-serif'] = chinese_fonts
             print("警告: 未找到合適的中文字體，可能會有顯示問題")
-        
-        plt.rcParams['axes.unicode_minus'] = False
-        
+
         # 設定 seaborn 樣式
         sns.set_style("whitegrid")
         sns.set_palette("husl")
-        
-        # 儲存選定的字體供後續使用
-        self.chinese_font = selected_font or 'Arial Unicode MS'
+        _style_configured = True
+        return fonts
+
+
+add_warmup_task("chart_fonts", configure_matplotlib)
+
+
+class ChartService:
+    """圖表服務類"""
+
+    @property
+    def fonts(self) -> ChartFonts:
+        """繪圖使用的字體 (第一次使用時才設定字體與樣式)"""
+        return configure_matplotlib()
+
+    @property
+    def chinese_font(self) -> str:
+        """繪圖使用的中文字體名稱"""
+        return self.fonts.family
     
     def list_available_chinese_fonts(self):
         """列出系統中可用的中文字體"""
@@ -78,6 +182,7 @@ class ChartService:
         
         return sorted(list(set(chinese_fonts)))
 
+    @cached(when=_cacheable_chart)
     def create_pie_chart(
         self, 
         data: List[ChartDataPoint], 
@@ -162,6 +267,7 @@ class ChartService:
                 reasoning=f"創建圓餅圖失敗: {str(e)}"
             )
 
+    @cached(when=_cacheable_chart)
     def create_bar_chart(
         self, 
         data: List[ChartDataPoint], 
@@ -255,6 +361,7 @@ class ChartService:
                 reasoning=f"創建長條圖失敗: {str(e)}"
             )
 
+    @cached(when=_cacheable_chart)
     def create_line_chart(
         self, 
         data: List[ChartDataPoint], 
@@ -264,7 +371,11 @@ class ChartService:
         generate_image: bool = False,
         image_format: str = "png",
         figsize: Tuple[int, int] = (10, 6),
-        dpi: int = 100
+        dpi: int = 100,
+        decimation: str = DECIMATION_AUTO,
+        max_points: Optional[int] = None,
+        data_format: str = DATA_FORMAT_RECORDS,
+        include: Optional[List[str]] = None
     ) -> ChartResponse:
         """
         創建折線圖
@@ -274,6 +385,10 @@ class ChartService:
             title: 圖表標題
             x_axis_label: X軸標籤
             y_axis_label: Y軸標籤
+            decimation: 降採樣方法 (auto/lttb, minmax, none)
+            max_points: 降採樣門檻，預設為 SFDA_DECIMATE_THRESHOLD
+            data_format: 數據格式 (records 或 columns)
+            include: 要回傳的大型欄位 (data)，未指定時全部回傳
             
         Returns:
             ChartResponse: 圖表響應
@@ -283,33 +398,53 @@ class ChartService:
             if len(data) < 2:
                 raise ValueError("折線圖至少需要2個數據點")
             
-            # 轉換數據格式
-            chart_data = []
-            for point in data:
-                chart_data.append({
-                    "label": point.label,
-                    "value": point.value
-                })
-            
-            # 計算統計信息
+            # 計算統計信息 (以完整數據計算)
             values = [point.value for point in data]
             max_value = max(values)
             min_value = min(values)
             
+            metadata = {
+                "max_value": max_value,
+                "min_value": min_value,
+                "data_points_count": len(data),
+                "x_axis_label": x_axis_label,
+                "y_axis_label": y_axis_label
+            }
+            reasoning = f"成功創建包含 {len(data)} 個數據點的折線圖，數值範圍 {min_value} - {max_value}"
+            
+            # 數據點過多時降採樣，回傳數據與圖片都只使用選出的點
+            keep_data = wants_field(include, "data")
+            indices = self._decimate_line(values, decimation, decimation_threshold(max_points))
+            if indices is None:
+                # 不回傳數據也不生成圖片時不必建立標籤列表
+                labels = [point.label for point in data] if keep_data or generate_image else []
+                columns = {"label": labels, "value": values}
+            else:
+                method = DECIMATION_LTTB if decimation == DECIMATION_AUTO else decimation
+                kept = indices.tolist()
+                columns = {
+                    "label": [data[i].label for i in kept],
+                    "value": [values[i] for i in kept],
+                    "index": kept
+                }
+                metadata["decimation"] = {
+                    "method": method,
+                    "threshold": decimation_threshold(max_points),
+                    "original_points": len(data),
+                    "returned_points": len(kept)
+                }
+                reasoning += f"，已以 {method} 降採樣為 {len(kept)} 個點"
+            chart_data = shape_chart_data(columns, data_format) if keep_data else []
+            
             response = ChartResponse(
                 success=True,
                 chart_type="line",
                 data=chart_data,
+                data_format=data_format,
                 title=title or "折線圖",
                 confidence=1.0,
-                reasoning=f"成功創建包含 {len(data)} 個數據點的折線圖，數值範圍 {min_value} - {max_value}",
-                metadata={
-                    "max_value": max_value,
-                    "min_value": min_value,
-                    "data_points_count": len(data),
-                    "x_axis_label": x_axis_label,
-                    "y_axis_label": y_axis_label
-                }
+                reasoning=reasoning,
+                metadata=metadata
             )
             
             # 如果需要生成圖片
@@ -317,7 +452,7 @@ class ChartService:
                 try:
                     image_base64 = self._generate_chart_image(
                         chart_type="line",
-                        data=chart_data,
+                        data=columns,
                         title=response.title or "折線圖",
                         metadata=response.metadata,
                         figsize=figsize,
@@ -348,6 +483,7 @@ class ChartService:
                 reasoning=f"創建折線圖失敗: {str(e)}"
             )
 
+    @cached(when=_cacheable_chart)
     def create_chart_from_simple_data(
         self, 
         labels: List[str], 
@@ -401,6 +537,7 @@ class ChartService:
                 reasoning=f"創建圖表失敗: {str(e)}"
             )
 
+    @cached(when=_cacheable_chart)
     def create_chart_from_simple_data_with_image(
         self, 
         labels: List[str], 
@@ -457,6 +594,7 @@ class ChartService:
         
         return response
 
+    @cached(when=_cacheable_chart)
     def create_histogram(
         self,
         values: List[float],
@@ -467,26 +605,26 @@ class ChartService:
         generate_image: bool = False,
         image_format: str = "png",
         figsize: Tuple[int, int] = (10, 6),
-        dpi: int = 100
+        dpi: int = 100,
+        data_format: str = DATA_FORMAT_RECORDS,
+        include: Optional[List[str]] = None
     ) -> ChartResponse:
         """創建直方圖"""
         try:
-            values_array = np.array(values)
+            values_array = np.asarray(values, dtype=float)
             
             # 計算直方圖
             counts, bin_edges = np.histogram(values_array, bins=bins)
             
             # 建立圖表數據
-            chart_data = []
-            for i in range(len(counts)):
-                bin_center = (bin_edges[i] + bin_edges[i + 1]) / 2
-                chart_data.append({
-                    "bin_start": float(bin_edges[i]),
-                    "bin_end": float(bin_edges[i + 1]),
-                    "bin_center": float(bin_center),
-                    "count": int(counts[i]),
-                    "frequency": float(counts[i] / len(values))
-                })
+            columns = {
+                "bin_start": bin_edges[:-1].tolist(),
+                "bin_end": bin_edges[1:].tolist(),
+                "bin_center": ((bin_edges[:-1] + bin_edges[1:]) / 2).tolist(),
+                "count": counts.tolist(),
+                "frequency": (counts / len(values_array)).tolist()
+            }
+            chart_data = shape_chart_data(columns, data_format) if wants_field(include, "data") else []
             
             # 計算統計摘要
             mean_val = float(np.mean(values_array))
@@ -496,6 +634,7 @@ class ChartService:
                 success=True,
                 chart_type="histogram",
                 data=chart_data,
+                data_format=data_format,
                 title=title or "直方圖",
                 confidence=1.0,
                 reasoning=f"成功創建包含 {len(values)} 個數據點的直方圖，分為 {bins} 個區間",
@@ -514,7 +653,7 @@ class ChartService:
                 try:
                     image_base64 = self._generate_chart_image(
                         chart_type="histogram",
-                        data=chart_data,
+                        data=columns,
                         title=response.title or "直方圖",
                         metadata=response.metadata,
                         figsize=figsize,
@@ -545,6 +684,7 @@ class ChartService:
                 reasoning=f"創建直方圖失敗: {str(e)}"
             )
 
+    @cached(when=_cacheable_chart)
     def create_boxplot(
         self,
         groups: List[List[float]],
@@ -554,36 +694,33 @@ class ChartService:
         generate_image: bool = False,
         image_format: str = "png",
         figsize: Tuple[int, int] = (10, 6),
-        dpi: int = 100
+        dpi: int = 100,
+        data_format: str = DATA_FORMAT_RECORDS,
+        include: Optional[List[str]] = None
     ) -> ChartResponse:
         """創建盒鬚圖"""
         try:
             if group_labels and len(group_labels) != len(groups):
                 raise ValueError("組別標籤數量必須與組別數量相同")
             
-            chart_data = []
+            records = []
             for i, group in enumerate(groups):
-                group_array = np.array(group)
+                group_array = np.asarray(group, dtype=float)
                 
-                # 計算五數概括
-                q1 = float(np.percentile(group_array, 25))
-                q2 = float(np.percentile(group_array, 50))  # 中位數
-                q3 = float(np.percentile(group_array, 75))
+                # 計算五數概括 (三個四分位數一次計算)
+                q1, q2, q3 = (float(q) for q in exact_percentiles(group_array, [25, 50, 75]))
                 
                 # 計算四分位距和異常值範圍
                 iqr = q3 - q1
-                lower_whisker = float(np.max([np.min(group_array), q1 - 1.5 * iqr]))
-                upper_whisker = float(np.min([np.max(group_array), q3 + 1.5 * iqr]))
+                lower_whisker = max(float(group_array.min()), q1 - 1.5 * iqr)
+                upper_whisker = min(float(group_array.max()), q3 + 1.5 * iqr)
                 
                 # 找出異常值
-                outliers = []
-                for val in group_array:
-                    if val < lower_whisker or val > upper_whisker:
-                        outliers.append(float(val))
+                outliers = group_array[(group_array < lower_whisker) | (group_array > upper_whisker)].tolist()
                 
                 group_label = group_labels[i] if group_labels else f"組別 {i+1}"
                 
-                chart_data.append({
+                records.append({
                     "group": group_label,
                     "q1": q1,
                     "median": q2,
@@ -595,12 +732,15 @@ class ChartService:
                     "count": len(group)
                 })
             
+            columns = chart_columns(records)
+            chart_data = shape_chart_data(columns, data_format) if wants_field(include, "data") else []
             total_points = sum(len(group) for group in groups)
             
             response = ChartResponse(
                 success=True,
                 chart_type="boxplot",
                 data=chart_data,
+                data_format=data_format,
                 title=title or "盒鬚圖",
                 confidence=1.0,
                 reasoning=f"成功創建包含 {len(groups)} 個組別，總計 {total_points} 個數據點的盒鬚圖",
@@ -616,7 +756,7 @@ class ChartService:
                 try:
                     image_base64 = self._generate_chart_image(
                         chart_type="boxplot",
-                        data=chart_data,
+                        data=columns,
                         title=response.title or "盒鬚圖",
                         metadata=response.metadata,
                         figsize=figsize,
@@ -647,6 +787,7 @@ class ChartService:
                 reasoning=f"創建盒鬚圖失敗: {str(e)}"
             )
 
+    @cached(when=_cacheable_chart)
     def create_scatter(
         self,
         x: List[float],
@@ -658,23 +799,29 @@ class ChartService:
         generate_image: bool = False,
         image_format: str = "png",
         figsize: Tuple[int, int] = (10, 6),
-        dpi: int = 100
+        dpi: int = 100,
+        decimation: str = DECIMATION_AUTO,
+        max_points: Optional[int] = None,
+        data_format: str = DATA_FORMAT_RECORDS,
+        include: Optional[List[str]] = None
     ) -> ChartResponse:
-        """創建散點圖"""
+        """
+        創建散點圖
+
+        數據點超過降採樣門檻時 (decimation 為 auto 或 density)，以二維網格計數取代原始散點：
+        回傳每個非空格子的中心與點數 ({"x", "y", "count"})，圖片依點數著色。
+        迴歸線、範圍等統計量仍以完整數據計算。
+
+        include 未列出 data 時不回傳數據點 (data 為空列表)，只回傳統計量與圖片。
+        """
         try:
             if len(x) != len(y):
                 raise ValueError("X 和 Y 數據的長度必須相同")
+            if decimation not in (DECIMATION_AUTO, DECIMATION_DENSITY, DECIMATION_NONE):
+                raise ValueError(f"散點圖不支援的降採樣方法: {decimation}")
             
-            x_array = np.array(x)
-            y_array = np.array(y)
-            
-            # 建立散點數據
-            chart_data = []
-            for i in range(len(x)):
-                chart_data.append({
-                    "x": float(x[i]),
-                    "y": float(y[i])
-                })
+            x_array = np.asarray(x, dtype=float)
+            y_array = np.asarray(y, dtype=float)
             
             metadata = {
                 "data_points_count": len(x),
@@ -684,6 +831,24 @@ class ChartService:
                 "y_range": [float(np.min(y_array)), float(np.max(y_array))]
             }
             
+            # 建立散點數據
+            keep_data = wants_field(include, "data")
+            threshold = decimation_threshold(max_points)
+            if decimation != DECIMATION_NONE and len(x) > threshold:
+                x_centers, y_centers, counts = density_grid(x_array, y_array, threshold)
+                columns = {"x": x_centers.tolist(), "y": y_centers.tolist(), "count": counts.tolist()}
+                metadata["decimation"] = {
+                    "method": DECIMATION_DENSITY,
+                    "threshold": threshold,
+                    "original_points": len(x),
+                    "returned_points": len(counts)
+                }
+            elif keep_data or generate_image:
+                columns = {"x": x_array.tolist(), "y": y_array.tolist()}
+            else:
+                columns = {}
+            chart_data = shape_chart_data(columns, data_format) if keep_data else []
+            
             # 如果要顯示迴歸線，計算線性迴歸
             if show_regression_line:
                 slope, intercept, r_value, p_value, std_err = stats.linregress(x_array, y_array)
@@ -707,11 +872,14 @@ class ChartService:
             reasoning = f"成功創建包含 {len(x)} 個數據點的散點圖"
             if show_regression_line:
                 reasoning += f"，相關係數 r = {metadata.get('correlation', 0):.3f}"
+            if "decimation" in metadata:
+                reasoning += f"，已依密度分箱為 {metadata['decimation']['returned_points']} 個格子"
             
             response = ChartResponse(
                 success=True,
                 chart_type="scatter",
                 data=chart_data,
+                data_format=data_format,
                 title=title or "散點圖",
                 confidence=1.0,
                 reasoning=reasoning,
@@ -723,7 +891,7 @@ class ChartService:
                 try:
                     image_base64 = self._generate_chart_image(
                         chart_type="scatter",
-                        data=chart_data,
+                        data=columns,
                         title=response.title or "散點圖",
                         metadata=response.metadata,
                         figsize=figsize,
@@ -754,10 +922,26 @@ class ChartService:
                 reasoning=f"創建散點圖失敗: {str(e)}"
             )
 
+    def _decimate_line(self, values: List[float], decimation: str, threshold: int) -> Optional[np.ndarray]:
+        """
+        折線圖降採樣
+
+        Returns:
+            選出的點的索引，數據點未超過門檻或不降採樣時為 None
+        """
+        if decimation not in (DECIMATION_AUTO, DECIMATION_LTTB, DECIMATION_MINMAX, DECIMATION_NONE):
+            raise ValueError(f"折線圖不支援的降採樣方法: {decimation}")
+        if decimation == DECIMATION_NONE or len(values) <= threshold:
+            return None
+        y = np.asarray(values, dtype=float)
+        if decimation == DECIMATION_MINMAX:
+            return minmax_indices(y, threshold)
+        return lttb_indices(np.arange(len(y), dtype=float), y, threshold)
+
     def _generate_chart_image(
         self,
         chart_type: str,
-        data: List[Dict[str, Any]],
+        data: Union[List[Dict[str, Any]], Dict[str, List[Any]]],
         title: str,
         metadata: Optional[Dict[str, Any]] = None,
         figsize: Tuple[int, int] = (10, 6),
@@ -766,7 +950,31 @@ class ChartService:
     ) -> Optional[str]:
         """
         生成圖表圖片並回傳 base64 編碼字串
-        
+
+        Returns:
+            base64 編碼的圖片字串，失敗時回傳 None
+        """
+        image_bytes = self.render_image(chart_type, data, title, metadata, figsize, dpi, image_format)
+        if image_bytes is None:
+            return None
+        return base64.b64encode(image_bytes).decode('utf-8')
+
+    @cached(when=_cacheable_image)
+    def render_image(
+        self,
+        chart_type: str,
+        data: Union[List[Dict[str, Any]], Dict[str, List[Any]]],
+        title: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        figsize: Tuple[int, int] = (10, 6),
+        dpi: int = 100,
+        image_format: str = "png"
+    ) -> Optional[bytes]:
+        """
+        生成圖表圖片並回傳編碼後的位元組
+
+        啟用繪圖行程池時交由繪圖行程繪製，否則在本行程內取得繪圖鎖後繪製
+
         Args:
             chart_type: 圖表類型
             data: 圖表數據
@@ -775,70 +983,110 @@ class ChartService:
             figsize: 圖片大小 (寬, 高)
             dpi: 圖片解析度
             image_format: 圖片格式
-            
+
         Returns:
-            base64 編碼的圖片字串，失敗時回傳 None
+            編碼後的圖片位元組，失敗時回傳 None
         """
+        spec = {
+            "chart_type": chart_type,
+            "data": data,
+            "title": title,
+            "metadata": metadata,
+            "figsize": tuple(figsize),
+            "dpi": dpi,
+            "image_format": image_format,
+            "layout": chart_layout(),
+        }
         try:
-            fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
-            
-            if chart_type == "pie":
-                self._create_pie_chart_image(ax, data, title)
-            elif chart_type == "bar":
-                self._create_bar_chart_image(ax, data, title, metadata)
-            elif chart_type == "line":
-                self._create_line_chart_image(ax, data, title, metadata)
-            elif chart_type == "histogram":
-                self._create_histogram_image(ax, data, title, metadata)
-            elif chart_type == "boxplot":
-                self._create_boxplot_image(ax, data, title, metadata)
-            elif chart_type == "scatter":
-                self._create_scatter_image(ax, data, title, metadata)
-            else:
-                raise ValueError(f"不支援的圖表類型: {chart_type}")
-            
-            # 調整布局
-            plt.tight_layout()
-            
-            # 將圖片轉換為 base64
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format=image_format, bbox_inches='tight', 
-                       facecolor='white', edgecolor='none')
-            buffer.seek(0)
-            
-            # 編碼為 base64
-            image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            
-            # 清理內存
-            plt.close(fig)
-            buffer.close()
-            
-            return image_base64
-            
+            if render_farm.enabled:
+                return render_farm.render(spec)
+            with _RENDER_LOCK:
+                return self.render_chart_bytes(**spec)
         except Exception as e:
             print(f"圖片生成失敗: {str(e)}")
-            if 'fig' in locals():
-                plt.close(fig)
             return None
 
+    def render_chart_bytes(
+        self,
+        chart_type: str,
+        data: Union[List[Dict[str, Any]], Dict[str, List[Any]]],
+        title: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        figsize: Tuple[int, int] = (10, 6),
+        dpi: int = 100,
+        image_format: str = "png",
+        layout: str = LAYOUT_TIGHT
+    ) -> bytes:
+        """
+        繪製圖表並回傳編碼後的圖片位元組
+
+        只使用物件導向 API (Figure + FigureCanvasAgg)，不經過 pyplot 的圖表管理器；
+        matplotlib 並非執行緒安全，呼叫端仍需確保同一行程內不會並行呼叫
+
+        Args:
+            chart_type: 圖表類型
+            data: 圖表數據
+            title: 圖表標題
+            metadata: 附加元數據
+            figsize: 圖片大小 (寬, 高)
+            dpi: 圖片解析度
+            image_format: 圖片格式
+            layout: 圖片版面，tight 會調整版面並裁切空白 (需繪製兩次)，
+                fixed 使用固定邊界且只繪製一次
+
+        Returns:
+            編碼後的圖片位元組
+        """
+        configure_matplotlib()
+        fig = mpl_figure.Figure(figsize=figsize, dpi=dpi)
+        backend_agg.FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        if chart_type == "pie":
+            self._create_pie_chart_image(ax, data, title)
+        elif chart_type == "bar":
+            self._create_bar_chart_image(ax, data, title, metadata)
+        elif chart_type == "line":
+            self._create_line_chart_image(ax, data, title, metadata)
+        elif chart_type == "histogram":
+            self._create_histogram_image(ax, data, title, metadata)
+        elif chart_type == "boxplot":
+            self._create_boxplot_image(ax, data, title, metadata)
+        elif chart_type == "scatter":
+            self._create_scatter_image(ax, data, title, metadata)
+        else:
+            raise ValueError(f"不支援的圖表類型: {chart_type}")
+
+        buffer = io.BytesIO()
+        if layout == LAYOUT_FIXED:
+            _apply_fixed_layout(fig)
+            fig.savefig(buffer, format=image_format, facecolor='white', edgecolor='none')
+        else:
+            # 調整布局並裁切空白
+            fig.tight_layout()
+            fig.savefig(buffer, format=image_format, bbox_inches='tight',
+                        facecolor='white', edgecolor='none')
+        return buffer.getvalue()
+
     def _create_pie_chart_image(self, ax, data: List[Dict[str, Any]], title: str):
         """生成圓餅圖圖片"""
+        fonts = self.fonts
         labels = [item['label'] for item in data]
         values = [item['value'] for item in data]
         
         # 創建圓餅圖，明確指定字體
         wedges, texts, autotexts = ax.pie(values, labels=labels, autopct='%1.1f%%', 
                                          startangle=90, 
-                                         textprops={'fontsize': 10, 'fontfamily': self.chinese_font})
+                                         textprops={'fontproperties': fonts.text})
         
         # 設定標題，明確指定字體
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20, fontfamily=self.chinese_font)
+        ax.set_title(title, pad=20, fontproperties=fonts.title)
         
         # 確保圓餅圖是圓形
         ax.axis('equal')
 
     def _create_bar_chart_image(self, ax, data: List[Dict[str, Any]], title: str, metadata: Optional[Dict]):
         """生成長條圖圖片"""
+        fonts = self.fonts
         labels = [item['label'] for item in data]
         values = [item['value'] for item in data]
         
@@ -852,56 +1100,65 @@ class ChartService:
                    f'{value:.1f}', ha='center', va='bottom', fontsize=9)
         
         # 設定標題和軸標籤，明確指定字體
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20, fontfamily=self.chinese_font)
+        ax.set_title(title, pad=20, fontproperties=fonts.title)
         if metadata:
-            ax.set_xlabel(metadata.get('x_axis_label', '類別'), fontsize=12, fontfamily=self.chinese_font)
-            ax.set_ylabel(metadata.get('y_axis_label', '數值'), fontsize=12, fontfamily=self.chinese_font)
+            ax.set_xlabel(metadata.get('x_axis_label', '類別'), fontproperties=fonts.label)
+            ax.set_ylabel(metadata.get('y_axis_label', '數值'), fontproperties=fonts.label)
         
         # 美化圖表，設定 X 軸標籤字體
         ax.grid(True, alpha=0.3)
-        plt.xticks(rotation=45, ha='right', fontfamily=self.chinese_font)
+        for label in ax.get_xticklabels():
+            label.set(rotation=45, ha='right', fontproperties=fonts.tick)
 
     def _create_line_chart_image(self, ax, data: List[Dict[str, Any]], title: str, metadata: Optional[Dict]):
         """生成折線圖圖片"""
-        labels = [item['label'] for item in data]
-        values = [item['value'] for item in data]
-        
-        # 創建折線圖
-        ax.plot(labels, values, marker='o', linewidth=2, markersize=6)
+        fonts = self.fonts
+        columns = chart_columns(data)
+        labels = columns['label']
+        values = columns['value']
         
-        # 在點上顯示數值
-        for i, value in enumerate(values):
-            ax.text(i, value + max(values)*0.02, f'{value:.1f}', 
-                   ha='center', va='bottom', fontsize=9)
+        if metadata and 'decimation' in metadata:
+            # 降採樣後依原始位置繪製，只標示少數刻度，不逐點顯示數值
+            positions = columns['index']
+            ax.plot(positions, values, linewidth=1)
+            ticks = np.unique(np.linspace(0, len(positions) - 1, 10).astype(int))
+            ax.set_xticks([positions[i] for i in ticks])
+            ax.set_xticklabels([labels[i] for i in ticks])
+        else:
+            # 創建折線圖
+            ax.plot(labels, values, marker='o', linewidth=2, markersize=6)
+            
+            # 在點上顯示數值
+            for i, value in enumerate(values):
+                ax.text(i, value + max(values)*0.02, f'{value:.1f}', 
+                       ha='center', va='bottom', fontsize=9)
         
         # 設定標題和軸標籤，明確指定字體
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20, fontfamily=self.chinese_font)
+        ax.set_title(title, pad=20, fontproperties=fonts.title)
         if metadata:
-            ax.set_xlabel(metadata.get('x_axis_label', '時間'), fontsize=12, fontfamily=self.chinese_font)
-            ax.set_ylabel(metadata.get('y_axis_label', '數值'), fontsize=12, fontfamily=self.chinese_font)
+            ax.set_xlabel(metadata.get('x_axis_label', '時間'), fontproperties=fonts.label)
+            ax.set_ylabel(metadata.get('y_axis_label', '數值'), fontproperties=fonts.label)
         
         # 美化圖表，設定 X 軸標籤字體
         ax.grid(True, alpha=0.3)
-        plt.xticks(rotation=45, ha='right', fontfamily=self.chinese_font)
+        for label in ax.get_xticklabels():
+            label.set(rotation=45, ha='right', fontproperties=fonts.tick)
 
     def _create_histogram_image(self, ax, data: List[Dict[str, Any]], title: str, metadata: Optional[Dict]):
         """生成直方圖圖片"""
-        # 從數據中重建原始值（近似）
-        values = []
-        for item in data:
-            bin_center = item['bin_center']
-            count = item['count']
-            values.extend([bin_center] * count)
+        fonts = self.fonts
+        columns = chart_columns(data)
         
-        # 創建直方圖
-        bins = metadata.get('bins', 10) if metadata else 10
-        ax.hist(values, bins=bins, alpha=0.7, color='skyblue', edgecolor='black')
+        # 以區間中心加權繪製已計算的直方圖，不必重建原始值
+        edges = columns['bin_start'] + columns['bin_end'][-1:]
+        ax.hist(columns['bin_center'], bins=edges, weights=columns['count'],
+                alpha=0.7, color='skyblue', edgecolor='black')
         
         # 設定標題和軸標籤，明確指定字體
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20, fontfamily=self.chinese_font)
+        ax.set_title(title, pad=20, fontproperties=fonts.title)
         if metadata:
-            ax.set_xlabel(metadata.get('x_axis_label', '數值'), fontsize=12, fontfamily=self.chinese_font)
-            ax.set_ylabel(metadata.get('y_axis_label', '頻率'), fontsize=12, fontfamily=self.chinese_font)
+            ax.set_xlabel(metadata.get('x_axis_label', '數值'), fontproperties=fonts.label)
+            ax.set_ylabel(metadata.get('y_axis_label', '頻率'), fontproperties=fonts.label)
             
             # 顯示統計資訊
             mean_val = metadata.get('mean', 0)
@@ -915,11 +1172,12 @@ class ChartService:
 
     def _create_boxplot_image(self, ax, data: List[Dict[str, Any]], title: str, metadata: Optional[Dict]):
         """生成盒鬚圖圖片"""
+        fonts = self.fonts
         # 準備盒鬚圖數據
         box_data = []
         labels = []
         
-        for item in data:
+        for item in chart_records(data):
             # 構建用於 matplotlib 的盒鬚圖數據格式
             box_stats = {
                 'med': item['median'],
@@ -942,21 +1200,29 @@ class ChartService:
             patch.set_alpha(0.7)
         
         # 設定標題和軸標籤，明確指定字體
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20, fontfamily=self.chinese_font)
+        ax.set_title(title, pad=20, fontproperties=fonts.title)
         ax.set_xticklabels(labels)
         if metadata:
-            ax.set_ylabel(metadata.get('y_axis_label', '數值'), fontsize=12, fontfamily=self.chinese_font)
+            ax.set_ylabel(metadata.get('y_axis_label', '數值'), fontproperties=fonts.label)
         
         # 美化圖表
         ax.grid(True, alpha=0.3)
 
     def _create_scatter_image(self, ax, data: List[Dict[str, Any]], title: str, metadata: Optional[Dict]):
         """生成散點圖圖片"""
-        x_values = [item['x'] for item in data]
-        y_values = [item['y'] for item in data]
+        fonts = self.fonts
+        columns = chart_columns(data)
+        x_values = columns['x']
+        y_values = columns['y']
         
-        # 創建散點圖
-        ax.scatter(x_values, y_values, alpha=0.6, s=50)
+        # 創建散點圖，密度分箱後的數據以點數著色
+        if metadata and 'decimation' in metadata:
+            points = ax.scatter(x_values, y_values, c=columns['count'],
+                                cmap='viridis', marker='s', s=12)
+            colorbar = ax.figure.colorbar(points, ax=ax)
+            colorbar.set_label('點數', fontproperties=fonts.label)
+        else:
+            ax.scatter(x_values, y_values, alpha=0.6, s=50)
         
         # 如果有迴歸線數據，繪製迴歸線
         if metadata and 'regression_line' in metadata:
@@ -968,10 +1234,10 @@ class ChartService:
             ax.legend()
         
         # 設定標題和軸標籤，明確指定字體
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20, fontfamily=self.chinese_font)
+        ax.set_title(title, pad=20, fontproperties=fonts.title)
         if metadata:
-            ax.set_xlabel(metadata.get('x_axis_label', 'X'), fontsize=12, fontfamily=self.chinese_font)
-            ax.set_ylabel(metadata.get('y_axis_label', 'Y'), fontsize=12, fontfamily=self.chinese_font)
+            ax.set_xlabel(metadata.get('x_axis_label', 'X'), fontproperties=fonts.label)
+            ax.set_ylabel(metadata.get('y_axis_label', 'Y'), fontproperties=fonts.label)
         
         # 美化圖表
         ax.grid(True, alpha=0.3) 
\ No newline at end of file
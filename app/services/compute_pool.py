@@ -0,0 +1,241 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.services.result_cache import MISS, call_uncached, result_cache
+
+
+# 執行通道
+LANE_INLINE = "inline"  # 直接在事件迴圈中執行，僅適用於極輕量的計算
+LANE_THREAD = "thread"  # 執行緒池，適用於會釋放 GIL 的 NumPy/SciPy 計算
+LANE_PROCESS = "process"  # 行程池，適用於純 Python 迴圈較重的計算
+
+LANES = (LANE_INLINE, LANE_THREAD, LANE_PROCESS)
+
+# 預設的端點路由策略，未列出的端點使用執行緒池。
+# 迴歸改為 QR 分解與動差矩陣後只剩幾次 BLAS 呼叫 (會釋放 GIL)，行程池的 pickle 成本反而較高，
+# 因此目前所有端點都使用執行緒池；純 Python 迴圈較重的端點可用 SFDA_COMPUTE_POLICY 指定行程池
+DEFAULT_POLICY: Dict[str, str] = {}
+
+
+class ComputeQueueFullError(Exception):
+    """計算佇列已滿，呼叫端應稍後重試"""
+
+    def __init__(self, endpoint: str, lane: str, limit: int):
+        self.endpoint = endpoint
+        self.lane = lane
+        self.limit = limit
+        super().__init__(f"計算佇列已滿 ({lane}，上限 {limit})，請稍後再試: {endpoint}")
+
+
+def _parse_policy(spec: str) -> Dict[str, str]:
+    """解析 `endpoint=lane,endpoint=lane` 格式的策略字串"""
+    policy = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        endpoint, _, lane = item.partition("=")
+        lane = lane.strip()
+        if lane not in LANES:
+            raise ValueError(f"不支援的計算通道: {lane}")
+        policy[endpoint.strip()] = lane
+    return policy
+
+
+def _parse_limits(spec: str) -> Dict[str, int]:
+    """解析 `endpoint=上限,endpoint=上限` 格式的佇列上限字串"""
+    limits = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        endpoint, _, limit = item.partition("=")
+        limits[endpoint.strip()] = int(limit)
+    return limits
+
+
+class ComputePool:
+    """
+    計算執行器
+
+    所有路由透過此類別把 CPU 密集的統計計算移出事件迴圈，
+    依端點路由策略分派到執行緒池或行程池，並以佇列深度上限保護服務，
+    讓 /health 等輕量端點在重度計算進行時仍能即時回應。
+    """
+
+    def __init__(
+        self,
+        thread_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        policy: Optional[Dict[str, str]] = None,
+        max_pending: Optional[Dict[str, int]] = None,
+        endpoint_limits: Optional[Dict[str, int]] = None,
+    ):
+        cpu_count = os.cpu_count() or 1
+        self.thread_workers = thread_workers or min(32, cpu_count + 4)
+        self.process_workers = process_workers or cpu_count
+        self.policy = dict(DEFAULT_POLICY)
+        if policy:
+            self.policy.update(policy)
+        self.max_pending = {
+            LANE_INLINE: 0,
+            LANE_THREAD: self.thread_workers * 4,
+            LANE_PROCESS: self.process_workers * 4,
+        }
+        if max_pending:
+            self.max_pending.update(max_pending)
+        self.endpoint_limits = dict(endpoint_limits or {})
+
+        self._lock = threading.Lock()
+        self._pending = {lane: 0 for lane in LANES}
+        self._endpoint_pending: Dict[str, int] = {}
+        self._rejected = {lane: 0 for lane in LANES}
+        self._completed = {lane: 0 for lane in LANES}
+        self._executors: Dict[str, Executor] = {}
+
+    @classmethod
+    def from_env(cls) -> "ComputePool":
+        """
+        從環境變數建立計算執行器
+
+        - SFDA_COMPUTE_THREADS: 執行緒池大小
+        - SFDA_COMPUTE_PROCESSES: 行程池大小
+        - SFDA_COMPUTE_MAX_PENDING_THREAD / SFDA_COMPUTE_MAX_PENDING_PROCESS: 各通道佇列上限
+        - SFDA_COMPUTE_POLICY: 端點路由策略，例如 `correlation.matrix=process,descriptive.basic=inline`
+        - SFDA_COMPUTE_ENDPOINT_LIMITS: 端點佇列上限，例如 `regression.multiple=4`
+        """
+        env = os.environ
+        max_pending = {}
+        for lane in (LANE_THREAD, LANE_PROCESS):
+            value = env.get(f"SFDA_COMPUTE_MAX_PENDING_{lane.upper()}")
+            if value:
+                max_pending[lane] = int(value)
+
+        return cls(
+            thread_workers=int(env["SFDA_COMPUTE_THREADS"]) if env.get("SFDA_COMPUTE_THREADS") else None,
+            process_workers=int(env["SFDA_COMPUTE_PROCESSES"]) if env.get("SFDA_COMPUTE_PROCESSES") else None,
+            policy=_parse_policy(env.get("SFDA_COMPUTE_POLICY", "")),
+            max_pending=max_pending,
+            endpoint_limits=_parse_limits(env.get("SFDA_COMPUTE_ENDPOINT_LIMITS", "")),
+        )
+
+    def lane_for(self, endpoint: str) -> str:
+        """取得端點對應的執行通道"""
+        return self.policy.get(endpoint, LANE_THREAD)
+
+    def _get_executor(self, lane: str) -> Executor:
+        """延遲建立執行器，避免未使用的行程池佔用資源"""
+        with self._lock:
+            executor = self._executors.get(lane)
+            if executor is None:
+                if lane == LANE_THREAD:
+                    executor = ThreadPoolExecutor(
+                        max_workers=self.thread_workers, thread_name_prefix="sfda-compute"
+                    )
+                else:
+                    # 使用 spawn 避免在多執行緒的 uvicorn 行程中 fork
+                    executor = ProcessPoolExecutor(
+                        max_workers=self.process_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                self._executors[lane] = executor
+            return executor
+
+    def _acquire(self, endpoint: str, lane: str) -> None:
+        """佔用佇列名額，超過上限時拋出 ComputeQueueFullError"""
+        with self._lock:
+            lane_limit = self.max_pending.get(lane, 0)
+            if lane_limit and self._pending[lane] >= lane_limit:
+                self._rejected[lane] += 1
+                raise ComputeQueueFullError(endpoint, lane, lane_limit)
+
+            endpoint_limit = self.endpoint_limits.get(endpoint, 0)
+            endpoint_pending = self._endpoint_pending.get(endpoint, 0)
+            if endpoint_limit and endpoint_pending >= endpoint_limit:
+                self._rejected[lane] += 1
+                raise ComputeQueueFullError(endpoint, lane, endpoint_limit)
+
+            self._pending[lane] += 1
+            self._endpoint_pending[endpoint] = endpoint_pending + 1
+
+    def _release(self, endpoint: str, lane: str) -> None:
+        """釋放佇列名額"""
+        with self._lock:
+            self._pending[lane] -= 1
+            self._completed[lane] += 1
+            self._endpoint_pending[endpoint] -= 1
+
+    async def run(self, endpoint: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        依路由策略執行計算
+
+        Args:
+            endpoint: 端點名稱 (例如 "descriptive.basic")，用於查詢路由策略與佇列上限
+            func: 要執行的函式；行程池通道要求函式與參數可被 pickle
+            *args, **kwargs: 傳給函式的參數
+
+        Returns:
+            函式的回傳值
+        """
+        # 以 @cached 標記的服務方法先查詢結果快取，命中時不佔用計算佇列。
+        # 雜湊大型輸入與讀取磁碟層都較耗時，交給預設執行器以免阻塞事件迴圈
+        loop = asyncio.get_running_loop()
+        cache_name = getattr(func, "__cache_name__", None)
+        cache_key = None
+        if cache_name:
+            cache_key, result = await loop.run_in_executor(
+                None, result_cache.lookup, cache_name, args, kwargs
+            )
+            if result is not MISS:
+                return result
+        if cache_key is not None:
+            cache_when = func.__cache_when__
+            func = functools.partial(call_uncached, func.__self__, func.__name__)
+
+        lane = self.lane_for(endpoint)
+        if lane == LANE_INLINE:
+            result = func(*args, **kwargs)
+        else:
+            self._acquire(endpoint, lane)
+            try:
+                result = await loop.run_in_executor(
+                    self._get_executor(lane), functools.partial(func, *args, **kwargs)
+                )
+            finally:
+                self._release(endpoint, lane)
+
+        if cache_key is not None and cache_when(result):
+            await loop.run_in_executor(None, result_cache.put, cache_key, result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """回傳各通道的佇列狀態"""
+        with self._lock:
+            return {
+                "policy": dict(self.policy),
+                "workers": {
+                    LANE_THREAD: self.thread_workers,
+                    LANE_PROCESS: self.process_workers,
+                },
+                "max_pending": dict(self.max_pending),
+                "pending": dict(self._pending),
+                "completed": dict(self._completed),
+                "rejected": dict(self._rejected),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """關閉所有執行器"""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait)
+
+
+# 全域計算執行器，所有路由共用
+compute_pool = ComputePool.from_env()
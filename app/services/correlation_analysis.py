@@ -1,7 +1,12 @@
 from typing import List
 import numpy as np
-from scipy import stats
 from app.models.response_models import CorrelationResponse, CorrelationMatrixResponse
+from app.services.correlation_engine import CORRELATION_METHODS, correlation_p_values
+from app.services.streaming_stats import CovarianceAccumulator
+from app.services.result_cache import cached
+from app.services.lazy_imports import lazy_module
+
+stats = lazy_module("scipy.stats")
 
 
 class CorrelationAnalysisService:
@@ -20,13 +25,14 @@ class CorrelationAnalysisService:
         else:
             return "大"
 
+    @cached
     def pearson_correlation(
         self, x: List[float], y: List[float]
     ) -> CorrelationResponse:
         """計算 Pearson 相關係數"""
         try:
-            x_array = np.array(x)
-            y_array = np.array(y)
+            x_array = np.asarray(x, dtype=float)
+            y_array = np.asarray(y, dtype=float)
 
             # 計算 Pearson 相關係數
             correlation_coefficient, p_value = stats.pearsonr(x_array, y_array)
@@ -79,13 +85,14 @@ class CorrelationAnalysisService:
         except Exception as e:
             raise ValueError(f"Pearson 相關係數計算失敗: {str(e)}")
 
+    @cached
     def spearman_correlation(
         self, x: List[float], y: List[float]
     ) -> CorrelationResponse:
         """計算 Spearman 等級相關係數"""
         try:
-            x_array = np.array(x)
-            y_array = np.array(y)
+            x_array = np.asarray(x, dtype=float)
+            y_array = np.asarray(y, dtype=float)
 
             # 計算 Spearman 相關係數
             correlation_coefficient, p_value = stats.spearmanr(x_array, y_array)
@@ -139,13 +146,14 @@ class CorrelationAnalysisService:
         except Exception as e:
             raise ValueError(f"Spearman 相關係數計算失敗: {str(e)}")
 
+    @cached
     def kendall_correlation(
         self, x: List[float], y: List[float]
     ) -> CorrelationResponse:
         """計算 Kendall τ 相關係數"""
         try:
-            x_array = np.array(x)
-            y_array = np.array(y)
+            x_array = np.asarray(x, dtype=float)
+            y_array = np.asarray(y, dtype=float)
 
             # 計算 Kendall τ 相關係數
             correlation_coefficient, p_value = stats.kendalltau(x_array, y_array)
@@ -199,37 +207,50 @@ class CorrelationAnalysisService:
         except Exception as e:
             raise ValueError(f"Kendall 相關係數計算失敗: {str(e)}")
 
+    @cached
     def correlation_matrix(
-        self, data: List[List[float]], columns: List[str]
+        self, data: List[List[float]], columns: List[str], method: str = "pearson"
     ) -> CorrelationMatrixResponse:
-        """計算相關矩陣"""
+        """
+        計算相關矩陣
+
+        以向量化引擎一次計算所有變數配對 (僅計算上三角後鏡射)，
+        method 可為 pearson、spearman 或 kendall
+        """
         try:
-            data_array = np.array(data).T  # 轉置，使每列為一個變數
-
-            # 計算相關矩陣
-            n_vars = data_array.shape[1]
-            correlation_matrix = []
-            p_values_matrix = []
-
-            for i in range(n_vars):
-                corr_row = []
-                p_row = []
-                for j in range(n_vars):
-                    if i == j:
-                        corr_row.append(1.0)
-                        p_row.append(0.0)
-                    else:
-                        corr, p_val = stats.pearsonr(data_array[:, i], data_array[:, j])
-                        corr_row.append(float(corr))
-                        p_row.append(float(p_val))
-
-                correlation_matrix.append(corr_row)
-                p_values_matrix.append(p_row)
-
-            return CorrelationMatrixResponse(
+            if method not in CORRELATION_METHODS:
+                raise ValueError(f"不支援的相關方法: {method}")
+            data_array = np.asarray(data, dtype=float).T  # 轉置，使每行為一個變數
+
+            correlation_matrix, p_values_matrix = CORRELATION_METHODS[method](data_array)
+
+            # 矩陣保留為 NumPy 陣列，由 FastJSONResponse 直接序列化
+            return CorrelationMatrixResponse.model_construct(
+                correlation_matrix=correlation_matrix,
+                p_values_matrix=p_values_matrix,
+                columns=columns,
+                method=method,
+            )
+
+        except Exception as e:
+            raise ValueError(f"相關矩陣計算失敗: {str(e)}")
+
+    def correlation_matrix_from_accumulator(
+        self, accumulator: CovarianceAccumulator, columns: List[str]
+    ) -> CorrelationMatrixResponse:
+        """由串流累加的交叉乘積統計量計算 Pearson 相關矩陣"""
+        try:
+            correlation_matrix = accumulator.correlation()
+            p_values_matrix = correlation_p_values(correlation_matrix, accumulator.n)
+            np.fill_diagonal(p_values_matrix, 0.0)
+
+            # 矩陣保留為 NumPy 陣列，由 FastJSONResponse 直接序列化
+            return CorrelationMatrixResponse.model_construct(
                 correlation_matrix=correlation_matrix,
                 p_values_matrix=p_values_matrix,
                 columns=columns,
+                method="pearson",
+                n_observations=accumulator.n,
             )
 
         except Exception as e:
@@ -0,0 +1,183 @@
+import math
+from typing import Tuple
+
+import numpy as np
+
+from app.services.lazy_imports import lazy_module
+
+stats = lazy_module("scipy.stats")
+
+# Kendall 符號矩陣每個區塊的元素上限 (約 64 MB 的 float64)
+_KENDALL_BLOCK_ELEMENTS = 8_000_000
+# 觀測值超過此數量時 Kendall 改為逐對以 O(n log n) 計算
+_KENDALL_MATMUL_MAX_N = 2000
+# SciPy 對無同值且 n 不超過此數的資料使用精確 p 值
+_KENDALL_EXACT_MAX_N = 33
+
+
+def _upper_triangle(n_vars: int) -> Tuple[np.ndarray, np.ndarray]:
+    return np.triu_indices(n_vars, k=1)
+
+
+def _symmetric(n_vars: int, rows: np.ndarray, cols: np.ndarray, values: np.ndarray, diagonal: float) -> np.ndarray:
+    """由上三角的值組成對稱矩陣"""
+    matrix = np.empty((n_vars, n_vars))
+    matrix[rows, cols] = values
+    matrix[cols, rows] = values
+    np.fill_diagonal(matrix, diagonal)
+    return matrix
+
+
+def correlation_p_values(r: np.ndarray, n: int) -> np.ndarray:
+    """
+    以 t 分佈計算相關係數的雙尾 p 值 (Pearson 與 Spearman 適用)
+
+    t = r √((n - 2) / (1 - r²))，自由度 n - 2
+    """
+    r = np.asarray(r, dtype=float)
+    if n <= 2:
+        return np.where(np.isnan(r), np.nan, 1.0)
+    df = n - 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.abs(r) * np.sqrt(df / (1.0 - r * r))
+    p_values = 2.0 * stats.t.sf(t, df)
+    return np.where(np.abs(r) >= 1.0, 0.0, p_values)
+
+
+def _pearson_upper(data: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """標準化一次後以單一矩陣乘法計算所有相關係數，回傳上三角索引與係數"""
+    centered = data - data.mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        standardized = centered / np.linalg.norm(centered, axis=0)
+    # Z.T @ Z 由 BLAS 計算 (NumPy 對轉置自乘使用對稱的 syrk)
+    gram = standardized.T @ standardized
+    rows, cols = _upper_triangle(data.shape[1])
+    return rows, cols, np.clip(gram[rows, cols], -1.0, 1.0)
+
+
+def pearson_matrix(data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pearson 相關矩陣
+
+    Args:
+        data: 觀測值 × 變數 的矩陣
+
+    Returns:
+        (相關係數矩陣, p 值矩陣)
+    """
+    n_obs, n_vars = data.shape
+    rows, cols, r = _pearson_upper(data)
+    return (
+        _symmetric(n_vars, rows, cols, r, 1.0),
+        _symmetric(n_vars, rows, cols, correlation_p_values(r, n_obs), 0.0),
+    )
+
+
+def spearman_matrix(data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Spearman 相關矩陣：各欄先轉為等級 (同值取平均等級) 再計算 Pearson 相關"""
+    return pearson_matrix(stats.rankdata(data, axis=0))
+
+
+def _tie_terms(column: np.ndarray) -> Tuple[float, float, float]:
+    """回傳同值對數、以及漸近變異數所需的兩個同值修正項"""
+    _, counts = np.unique(column, return_counts=True)
+    counts = counts[counts > 1].astype(float)
+    pairs = float(np.sum(counts * (counts - 1) / 2))
+    term0 = float(np.sum(counts * (counts - 1) * (counts - 2)))
+    term1 = float(np.sum(counts * (counts - 1) * (2 * counts + 5)))
+    return pairs, term0, term1
+
+
+def _kendall_sign_gram(data: np.ndarray) -> np.ndarray:
+    """
+    計算 Σ sign(x_i - x_j) sign(y_i - y_j) 的矩陣 (i < j)
+
+    對角線為各變數無同值的配對數，非對角線為一致對減不一致對 (C - D)。
+    以區塊方式建立符號差矩陣後做矩陣乘法，避免一次配置 n² × p 的記憶體。
+    """
+    n_obs, n_vars = data.shape
+    block = max(1, _KENDALL_BLOCK_ELEMENTS // max(1, n_obs * n_vars))
+    gram = np.zeros((n_vars, n_vars))
+    for start in range(0, n_obs, block):
+        stop = min(start + block, n_obs)
+        signs = np.sign(data[start:stop, None, :] - data[None, :, :]).reshape(-1, n_vars)
+        gram += signs.T @ signs
+    # 所有有序配對各計算兩次
+    return gram / 2.0
+
+
+def _kendall_exact_p(n: int, c: np.ndarray) -> np.ndarray:
+    """
+    無同值時 Kendall tau 的精確雙尾 p 值
+
+    反序數分佈 (Mahonian numbers) 對同一 n 只計算一次，再以查表取得所有配對的 p 值，
+    與 SciPy 的精確方法相同。
+    """
+    max_inversions = n * (n - 1) // 2
+    counts = np.zeros(max_inversions + 1)
+    counts[0] = 1.0
+    for j in range(2, n + 1):
+        # 加入第 j 個元素可增加 0..j-1 個反序
+        cumulative = np.cumsum(counts)
+        shifted = np.zeros_like(cumulative)
+        shifted[j:] = cumulative[:-j]
+        counts = cumulative - shifted
+    cdf = np.cumsum(counts) / math.factorial(n)
+    return np.clip(2.0 * cdf[c], 0.0, 1.0)
+
+
+def kendall_matrix(data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Kendall tau-b 相關矩陣
+
+    觀測值不多時以符號矩陣乘法一次取得所有配對的 C - D；觀測值較多時改為
+    對上三角逐對呼叫 SciPy 的 O(n log n) 演算法。p 值與 SciPy 的自動方法一致：
+    無同值且 n ≤ 33 時使用精確分佈，其餘使用含同值修正的常態近似。
+    """
+    n_obs, n_vars = data.shape
+    rows, cols = _upper_triangle(n_vars)
+
+    if n_obs > _KENDALL_MATMUL_MAX_N:
+        tau = np.empty(len(rows))
+        p_values = np.empty(len(rows))
+        for k, (i, j) in enumerate(zip(rows, cols)):
+            tau[k], p_values[k] = stats.kendalltau(data[:, i], data[:, j])
+        return _symmetric(n_vars, rows, cols, tau, 1.0), _symmetric(n_vars, rows, cols, p_values, 0.0)
+
+    total_pairs = n_obs * (n_obs - 1) / 2.0
+    ties = np.array([_tie_terms(data[:, k]) for k in range(n_vars)])
+    x_ties, y_ties = ties[rows, 0], ties[cols, 0]
+
+    gram = _kendall_sign_gram(data)
+    con_minus_dis = gram[rows, cols]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tau = np.clip(con_minus_dis / np.sqrt(gram[rows, rows] * gram[cols, cols]), -1.0, 1.0)
+
+        # 含同值修正的漸近變異數
+        m = n_obs * (n_obs - 1.0)
+        variance = (
+            (m * (2 * n_obs + 5) - ties[rows, 2] - ties[cols, 2]) / 18.0
+            + 2.0 * x_ties * y_ties / m
+            + ties[rows, 1] * ties[cols, 1] / (9.0 * m * (n_obs - 2))
+        )
+        p_values = 2.0 * stats.norm.sf(np.abs(con_minus_dis) / np.sqrt(variance))
+
+    no_ties = (x_ties == 0) & (y_ties == 0)
+    if np.any(no_ties):
+        discordant = (total_pairs - con_minus_dis[no_ties]) / 2.0
+        c = np.rint(np.minimum(discordant, total_pairs - discordant)).astype(int)
+        if n_obs <= _KENDALL_EXACT_MAX_N:
+            p_values[no_ties] = _kendall_exact_p(n_obs, c) if n_obs > 2 else 1.0
+        else:
+            # SciPy 在 min(D, 總對數 - D) ≤ 1 時同樣改用精確值
+            exact = np.where(c == 0, 2 / math.factorial(n_obs), 2 / math.factorial(n_obs - 1))
+            p_values[no_ties] = np.where(c <= 1, exact, p_values[no_ties])
+
+    return _symmetric(n_vars, rows, cols, tau, 1.0), _symmetric(n_vars, rows, cols, p_values, 0.0)
+
+
+CORRELATION_METHODS = {
+    "pearson": pearson_matrix,
+    "spearman": spearman_matrix,
+    "kendall": kendall_matrix,
+}
@@ -0,0 +1,261 @@
+import io
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.models.response_models import DatasetColumnInfo, DatasetInfo
+from app.services.group_stats import split_groups
+from app.services.lazy_imports import lazy_module
+
+pd = lazy_module("pandas")
+
+
+SUPPORTED_FORMATS = ("csv", "arrow", "parquet")
+
+_EXTENSION_FORMATS = {
+    ".csv": "csv",
+    ".txt": "csv",
+    ".arrow": "arrow",
+    ".arrows": "arrow",
+    ".ipc": "arrow",
+    ".feather": "arrow",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+}
+
+_CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/vnd.apache.arrow.stream": "arrow",
+    "application/vnd.apache.arrow.file": "arrow",
+    "application/vnd.apache.parquet": "parquet",
+}
+
+
+class DatasetNotFoundError(KeyError):
+    """找不到指定的資料集"""
+
+    def __init__(self, dataset_id: str):
+        self.dataset_id = dataset_id
+        super().__init__(dataset_id)
+
+    def __str__(self) -> str:
+        return f"找不到資料集: {self.dataset_id}"
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """回傳唯讀視圖，避免服務端修改登錄表中的欄位"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def detect_format(filename: Optional[str] = None, content_type: Optional[str] = None) -> str:
+    """依副檔名或內容類型判斷資料集格式"""
+    if filename:
+        extension = os.path.splitext(filename)[1].lower()
+        if extension in _EXTENSION_FORMATS:
+            return _EXTENSION_FORMATS[extension]
+    if content_type:
+        content_type = content_type.split(";")[0].strip().lower()
+        if content_type in _CONTENT_TYPE_FORMATS:
+            return _CONTENT_TYPE_FORMATS[content_type]
+    raise ValueError("無法判斷資料集格式，請指定 format (csv, arrow, parquet)")
+
+
+def _read_table(content: bytes, fmt: str) -> Dict[str, np.ndarray]:
+    """讀取資料集內容並轉為欄位名稱對應 NumPy 陣列的字典"""
+    if fmt == "csv":
+        frame = pd.read_csv(io.BytesIO(content))
+        return {str(name): _column_array(frame[name].to_numpy()) for name in frame.columns}
+
+    import pyarrow as pa
+
+    if fmt == "arrow":
+        buffer = pa.py_buffer(content)
+        try:
+            table = pa.ipc.open_stream(buffer).read_all()
+        except pa.ArrowInvalid:
+            table = pa.ipc.open_file(buffer).read_all()
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(pa.BufferReader(content))
+    else:
+        raise ValueError(f"不支援的資料集格式: {fmt}")
+
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+            # 無缺值的單一區塊數值欄位可零複製轉換
+            values = column.to_numpy()
+        else:
+            values = column.to_pandas().to_numpy()
+        columns[str(name)] = _column_array(values)
+    return columns
+
+
+def _column_array(values: np.ndarray) -> np.ndarray:
+    """數值欄位轉為 float64，其餘欄位轉為字串物件陣列"""
+    if values.dtype.kind in "iufb":
+        return np.ascontiguousarray(values, dtype=np.float64)
+    return np.asarray([None if pd.isna(value) else str(value) for value in values], dtype=object)
+
+
+def _column_nbytes(values: np.ndarray) -> int:
+    if values.dtype == object:
+        return values.nbytes + sum(len(value) for value in values if value is not None)
+    return values.nbytes
+
+
+class StoredDataset:
+    """記憶體中的欄式資料集"""
+
+    def __init__(self, dataset_id: str, name: str, fmt: str, columns: Dict[str, np.ndarray]):
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("資料集各欄位長度必須相同")
+        self.id = dataset_id
+        self.name = name
+        self.format = fmt
+        self.columns = columns
+        self.n_rows = lengths.pop() if lengths else 0
+        self.nbytes = sum(_column_nbytes(values) for values in columns.values())
+        self.created_at = time.time()
+
+    def info(self) -> DatasetInfo:
+        return DatasetInfo(
+            id=self.id,
+            name=self.name,
+            format=self.format,
+            n_rows=self.n_rows,
+            columns=[
+                DatasetColumnInfo(name=name, dtype=str(values.dtype), numeric=values.dtype != object)
+                for name, values in self.columns.items()
+            ],
+            nbytes=self.nbytes,
+            created_at=self.created_at,
+        )
+
+
+class DatasetStore:
+    """
+    資料集登錄表
+
+    上傳一次的資料集以欄式 NumPy 陣列保存在記憶體中，請求模型可用
+    `{"dataset": id, "column": "exam_score"}` 引用欄位，不必重複傳送整個陣列。
+    依最近最少使用 (LRU) 順序淘汰，並限制總位元組數與資料集數量。
+    """
+
+    def __init__(self, max_bytes: int = 1 << 30, max_datasets: int = 64):
+        self.max_bytes = max_bytes
+        self.max_datasets = max_datasets
+        self._lock = threading.Lock()
+        self._datasets: "OrderedDict[str, StoredDataset]" = OrderedDict()
+        self._total_bytes = 0
+        self._evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "DatasetStore":
+        """
+        從環境變數建立資料集登錄表
+
+        - SFDA_DATASET_MAX_BYTES: 所有資料集的位元組上限
+        - SFDA_DATASET_MAX_COUNT: 資料集數量上限
+        """
+        return cls(
+            max_bytes=int(os.environ.get("SFDA_DATASET_MAX_BYTES", 1 << 30)),
+            max_datasets=int(os.environ.get("SFDA_DATASET_MAX_COUNT", 64)),
+        )
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    def ingest(self, content: bytes, fmt: str, name: Optional[str] = None) -> DatasetInfo:
+        """
+        匯入資料集
+
+        Args:
+            content: 檔案內容
+            fmt: 資料格式 (csv, arrow, parquet)
+            name: 資料集名稱
+
+        Returns:
+            DatasetInfo: 資料集資訊 (含資料集 id)
+        """
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"不支援的資料集格式: {fmt}")
+
+        dataset = StoredDataset(uuid.uuid4().hex, name or "dataset", fmt, _read_table(content, fmt))
+        if dataset.nbytes > self.max_bytes:
+            raise ValueError(f"資料集大小 ({dataset.nbytes} bytes) 超過上限 ({self.max_bytes} bytes)")
+
+        with self._lock:
+            self._datasets[dataset.id] = dataset
+            self._total_bytes += dataset.nbytes
+            while self._total_bytes > self.max_bytes or len(self._datasets) > self.max_datasets:
+                _, evicted = self._datasets.popitem(last=False)
+                self._total_bytes -= evicted.nbytes
+                self._evictions += 1
+        return dataset.info()
+
+    def get(self, dataset_id: str) -> StoredDataset:
+        """取得資料集並標記為最近使用"""
+        with self._lock:
+            dataset = self._datasets.get(dataset_id)
+            if dataset is None:
+                raise DatasetNotFoundError(dataset_id)
+            self._datasets.move_to_end(dataset_id)
+            return dataset
+
+    def list(self) -> List[DatasetInfo]:
+        with self._lock:
+            datasets = list(self._datasets.values())
+        return [dataset.info() for dataset in datasets]
+
+    def delete(self, dataset_id: str) -> None:
+        with self._lock:
+            dataset = self._datasets.pop(dataset_id, None)
+            if dataset is None:
+                raise DatasetNotFoundError(dataset_id)
+            self._total_bytes -= dataset.nbytes
+
+    def column(self, dataset_id: str, column: str) -> np.ndarray:
+        """取得單一數值欄位"""
+        dataset = self.get(dataset_id)
+        if column not in dataset.columns:
+            raise ValueError(f"資料集 {dataset_id} 沒有欄位: {column}")
+        values = dataset.columns[column]
+        if values.dtype == object:
+            raise ValueError(f"欄位 {column} 不是數值欄位")
+        return _read_only(values)
+
+    def labels(self, dataset_id: str, column: str) -> np.ndarray:
+        """取得分組用的標籤欄位 (任意型別)"""
+        dataset = self.get(dataset_id)
+        if column not in dataset.columns:
+            raise ValueError(f"資料集 {dataset_id} 沒有欄位: {column}")
+        return _read_only(dataset.columns[column])
+
+    def matrix(self, dataset_id: str, columns: List[str]) -> np.ndarray:
+        """取得多個數值欄位組成的矩陣 (列為觀測值、行為欄位)"""
+        return np.column_stack([self.column(dataset_id, column) for column in columns])
+
+    def grouped(self, dataset_id: str, column: str, group_by: str) -> List[np.ndarray]:
+        """依分組欄位切分數值欄位，組別依標籤排序；數值或標籤缺失的列不納入"""
+        # 與內嵌長格式數據共用同一套分組與缺失值規則
+        return split_groups(self.column(dataset_id, column), self.labels(dataset_id, group_by))[1]
+
+
+# 全域資料集登錄表
+dataset_store = DatasetStore.from_env()
@@ -0,0 +1,124 @@
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+# 降採樣方法
+DECIMATION_AUTO = "auto"        # 依圖表類型選擇 (折線圖 lttb，散點圖 density)
+DECIMATION_NONE = "none"        # 不降採樣
+DECIMATION_LTTB = "lttb"        # Largest-Triangle-Three-Buckets，保留折線的視覺形狀
+DECIMATION_MINMAX = "minmax"    # 每個區段保留最小值與最大值 (包絡線)，不遺漏尖峰
+DECIMATION_DENSITY = "density"  # 二維網格計數，以格點中心與點數取代原始散點
+
+# 預設的降採樣門檻 (資料點數)
+DEFAULT_THRESHOLD = 5000
+
+
+def decimation_threshold(max_points: Optional[int] = None) -> int:
+    """
+    降採樣門檻：資料點數超過此值才降採樣，降採樣後最多回傳此數量的點
+
+    請求可用 max_points 指定，否則使用 SFDA_DECIMATE_THRESHOLD (預設 5000)
+    """
+    if max_points is not None:
+        return max_points
+    return int(os.environ.get("SFDA_DECIMATE_THRESHOLD", DEFAULT_THRESHOLD))
+
+
+def _bucket_edges(n: int, n_buckets: int) -> np.ndarray:
+    """把 1..n-2 (不含首尾點) 均分為 n_buckets 個區段的邊界"""
+    return np.linspace(1, n - 1, n_buckets + 1).astype(np.intp)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 降採樣
+
+    保留首尾點，其餘點均分為 n_out - 2 個區段；每個區段選出與前一個已選點、
+    下一個區段平均點構成最大三角形面積的點。各區段內的面積以向量運算求得。
+
+    Args:
+        x: X 座標 (須遞增)
+        y: Y 座標
+        n_out: 輸出點數 (至少 3)
+
+    Returns:
+        選出的點在原始資料中的索引 (遞增)
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = _bucket_edges(n, n_out - 2)
+    # 每個區段的平均點，最後一個區段之後以末點代替
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        ax, ay = x[previous], y[previous]
+        areas = np.abs(
+            (ax - mean_x[i + 1]) * (y[start:stop] - ay)
+            - (ax - x[start:stop]) * (mean_y[i + 1] - ay)
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    最小-最大包絡線降採樣
+
+    保留首尾點，其餘點均分為 (n_out - 2) / 2 個區段，每個區段保留最小值與最大值的點，
+    因此任何尖峰或谷底都不會被略過。
+
+    Args:
+        y: Y 座標
+        n_out: 輸出點數上限 (至少 4)
+
+    Returns:
+        選出的點在原始資料中的索引 (遞增)
+    """
+    n = len(y)
+    n_buckets = (n_out - 2) // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    edges = _bucket_edges(n, n_buckets)
+    inner = np.arange(1, n - 1)
+    buckets = np.searchsorted(edges, inner, side="right") - 1
+    # 依 (區段, 數值) 排序後，每個區段的第一個與最後一個即為最小值與最大值
+    order = inner[np.lexsort((y[1:-1], buckets))]
+    starts = edges[:-1] - 1
+    stops = edges[1:] - 2
+    picked = np.concatenate(([0], order[starts], order[stops], [n - 1]))
+    return np.unique(picked)
+
+
+def density_grid(x: np.ndarray, y: np.ndarray, max_cells: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    二維網格密度分箱
+
+    以 sqrt(max_cells) × sqrt(max_cells) 的網格計算每格的點數，只回傳有點的格子。
+
+    Args:
+        x: X 座標
+        y: Y 座標
+        max_cells: 回傳格子數上限
+
+    Returns:
+        (格子中心 X, 格子中心 Y, 點數)
+    """
+    bins = max(1, int(np.sqrt(max_cells)))
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    x_index, y_index = np.nonzero(counts)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+    return x_centers[x_index], y_centers[y_index], counts[x_index, y_index].astype(np.int64)
@@ -1,17 +1,29 @@
 import numpy as np
-import pandas as pd
-from scipy import stats
 from typing import List, Dict, Optional
 from app.models.response_models import (
     BasicStatsResponse,
     DistributionStatsResponse,
     PercentilesResponse,
+    StreamingStatsResponse,
 )
+from app.services.result_cache import cached
+from app.services.quantiles import (
+    DEFAULT_SKETCH_K,
+    QUANTILE_EXACT,
+    QUANTILE_SKETCH,
+    KLLSketch,
+    exact_percentiles,
+)
+from app.services.streaming_stats import MomentAccumulator
+from app.services.lazy_imports import lazy_module
+
+stats = lazy_module("scipy.stats")
 
 
 class DescriptiveStatsService:
     """描述性統計服務類別"""
 
+    @cached
     def calculate_basic_stats(self, values: List[float]) -> BasicStatsResponse:
         """
         計算基本統計量
@@ -22,27 +34,39 @@ class DescriptiveStatsService:
         Returns:
             BasicStatsResponse: 基本統計量結果
         """
-        if not values:
+        if len(values) == 0:
             raise ValueError("數值陣列不能為空")
 
-        arr = np.array(values)
+        arr = np.asarray(values, dtype=float)
+
+        # 排序一次即可取得最小值、最大值、中位數與眾數
+        sorted_arr = np.sort(arr)
+        n = len(sorted_arr)
+        middle = n // 2
+        median = sorted_arr[middle] if n % 2 else (sorted_arr[middle - 1] + sorted_arr[middle]) / 2.0
 
-        # 計算眾數
-        mode_result = stats.mode(arr, keepdims=True)
-        mode_values = mode_result.mode.tolist() if len(mode_result.mode) > 0 else None
+        # 眾數：相同數值在排序後相鄰，取次數最多者中最小的值 (與 scipy.stats.mode 相同)
+        run_starts = np.flatnonzero(np.r_[True, sorted_arr[1:] != sorted_arr[:-1]])
+        run_lengths = np.diff(np.r_[run_starts, n])
+        mode_values = [float(sorted_arr[run_starts[np.argmax(run_lengths)]])]
+
+        # 平均數與變異數 (單一動差累加器)
+        moments = MomentAccumulator.from_values(arr)
+        variance = moments.variance(ddof=1)
 
         return BasicStatsResponse(
-            mean=float(np.mean(arr)),
-            median=float(np.median(arr)),
+            mean=moments.mean,
+            median=float(median),
             mode=mode_values,
-            std=float(np.std(arr, ddof=1)) if len(arr) > 1 else 0.0,
-            variance=float(np.var(arr, ddof=1)) if len(arr) > 1 else 0.0,
-            min=float(np.min(arr)),
-            max=float(np.max(arr)),
-            range=float(np.max(arr) - np.min(arr)),
-            count=len(arr),
+            std=float(np.sqrt(variance)),
+            variance=float(variance),
+            min=float(sorted_arr[0]),
+            max=float(sorted_arr[-1]),
+            range=float(sorted_arr[-1] - sorted_arr[0]),
+            count=n,
         )
 
+    @cached
     def calculate_distribution_stats(
         self, values: List[float]
     ) -> DistributionStatsResponse:
@@ -58,7 +82,7 @@ class DescriptiveStatsService:
         if len(values) < 3:
             raise ValueError("計算分佈統計量至少需要3個數值")
 
-        arr = np.array(values)
+        arr = np.asarray(values, dtype=float)
 
         # 計算偏度和峰度
         skewness = float(stats.skew(arr))
@@ -80,8 +104,13 @@ class DescriptiveStatsService:
             normality_p_value=normality_p_value,
         )
 
+    @cached
     def calculate_percentiles(
-        self, values: List[float], percentiles: List[float]
+        self,
+        values: List[float],
+        percentiles: List[float],
+        method: str = QUANTILE_EXACT,
+        sketch_k: int = DEFAULT_SKETCH_K,
     ) -> PercentilesResponse:
         """
         計算百分位數
@@ -89,27 +118,110 @@ class DescriptiveStatsService:
         Args:
             values: 數值陣列
             percentiles: 百分位數列表
+            method: exact 為精確值；sketch 使用 KLL 分位數草圖估計 (誤差可由 sketch_k 控制)
+            sketch_k: 草圖大小，越大越精確
 
         Returns:
             PercentilesResponse: 百分位數結果
         """
-        if not values:
+        if len(values) == 0:
             raise ValueError("數值陣列不能為空")
 
-        arr = np.array(values)
+        arr = np.asarray(values, dtype=float)
 
-        # 計算指定百分位數
-        percentile_results = {}
-        for p in percentiles:
-            if 0 <= p <= 100:
-                percentile_results[f"P{p}"] = float(np.percentile(arr, p))
+        # 所有百分位數與四分位數一次計算
+        requested = [p for p in percentiles if 0 <= p <= 100]
+        positions = requested + [25, 50, 75]
+        if method == QUANTILE_SKETCH:
+            sketch = KLLSketch(sketch_k).update(arr)
+            results = sketch.percentiles(positions)
+            rank_error = sketch.rank_error
+        else:
+            results = exact_percentiles(arr, positions)
+            rank_error = None
 
-        # 計算四分位數
+        return self._percentiles_response(requested, results, method, rank_error)
+
+    @staticmethod
+    def _percentiles_response(
+        requested: List[float], results: np.ndarray, method: str, rank_error: Optional[float]
+    ) -> PercentilesResponse:
+        """依百分位數計算結果建立回應 (最後三個值為 Q1、Q2、Q3)"""
+        percentile_results = {f"P{p:g}": float(value) for p, value in zip(requested, results)}
+        q1, q2, q3 = (float(value) for value in results[-3:])
         quartiles = {
-            "Q1": float(np.percentile(arr, 25)),
-            "Q2": float(np.percentile(arr, 50)),  # 中位數
-            "Q3": float(np.percentile(arr, 75)),
-            "IQR": float(np.percentile(arr, 75) - np.percentile(arr, 25)),
+            "Q1": q1,
+            "Q2": q2,  # 中位數
+            "Q3": q3,
+            "IQR": q3 - q1,
         }
 
-        return PercentilesResponse(percentiles=percentile_results, quartiles=quartiles)
+        return PercentilesResponse(
+            percentiles=percentile_results, quartiles=quartiles, method=method, rank_error=rank_error
+        )
+
+    def basic_stats_from_accumulator(
+        self, moments: MomentAccumulator, sketch: Optional[KLLSketch] = None
+    ) -> StreamingStatsResponse:
+        """
+        由串流累加的動差計算基本統計量
+
+        Args:
+            moments: 單次走訪所有區塊後合併的動差累加器
+            sketch: 同一串流的分位數草圖，提供時回傳估計的中位數
+
+        Returns:
+            StreamingStatsResponse: 基本統計量結果 (串流模式不計算眾數)
+        """
+        if moments.n == 0:
+            raise ValueError("數值陣列不能為空")
+
+        variance = moments.variance(ddof=1)
+        return StreamingStatsResponse(
+            mean=moments.mean,
+            median=float(sketch.quantiles([0.5])[0]) if sketch is not None and sketch.n else None,
+            std=float(np.sqrt(variance)),
+            variance=variance,
+            min=moments.min,
+            max=moments.max,
+            range=moments.max - moments.min,
+            count=moments.n,
+            skewness=moments.skewness() if moments.m2 > 0 else None,
+            kurtosis=moments.kurtosis() if moments.m2 > 0 else None,
+        )
+
+    def distribution_stats_from_accumulator(self, moments: MomentAccumulator) -> DistributionStatsResponse:
+        """
+        由串流累加的動差計算分佈統計量
+
+        Shapiro-Wilk 檢定需要完整排序的資料，串流模式改用只依賴偏度與峰度的
+        D'Agostino-Pearson K² 檢定
+
+        Args:
+            moments: 單次走訪所有區塊後合併的動差累加器
+
+        Returns:
+            DistributionStatsResponse: 分佈統計量結果
+        """
+        if moments.n < 8:
+            raise ValueError("串流計算分佈統計量至少需要8個數值")
+        if moments.m2 == 0:
+            raise ValueError("數值全部相同，無法計算偏度與峰度")
+
+        _, p_value = moments.normality_test()
+        return DistributionStatsResponse(
+            skewness=moments.skewness(),
+            kurtosis=moments.kurtosis(),
+            is_normal=p_value > 0.05,
+            normality_p_value=p_value,
+            normality_test="dagostino_k2",
+        )
+
+    def percentiles_from_sketch(self, sketch: KLLSketch, percentiles: List[float]) -> PercentilesResponse:
+        """由串流累加的分位數草圖估計百分位數"""
+        if sketch.n == 0:
+            raise ValueError("數值陣列不能為空")
+
+        requested = [p for p in percentiles if 0 <= p <= 100]
+        results = sketch.percentiles(requested + [25, 50, 75])
+        return self._percentiles_response(requested, results, QUANTILE_SKETCH, sketch.rank_error)
@@ -1,12 +1,16 @@
 from typing import List, Dict, Any, Optional
 import numpy as np
-from scipy import stats
 from app.models.response_models import DistributionAnalysisResponse
+from app.services.result_cache import cached
+from app.services.lazy_imports import lazy_module
+
+stats = lazy_module("scipy.stats")
 
 
 class DistributionAnalysisService:
     """分布分析服務類別"""
 
+    @cached
     def normal_distribution_analysis(
         self,
         data: List[float],
@@ -15,7 +19,7 @@ class DistributionAnalysisService:
     ) -> DistributionAnalysisResponse:
         """常態分布分析"""
         try:
-            data_array = np.array(data)
+            data_array = np.asarray(data, dtype=float)
 
             # 基本統計量
             mean = float(np.mean(data_array))
@@ -82,12 +86,13 @@ class DistributionAnalysisService:
         except Exception as e:
             raise ValueError(f"常態分布分析錯誤: {str(e)}")
 
+    @cached
     def distribution_test(
         self, data: List[float], distribution: str = "normal", alpha: float = 0.05
     ) -> DistributionAnalysisResponse:
         """分布適合度檢定"""
         try:
-            data_array = np.array(data)
+            data_array = np.asarray(data, dtype=float)
             n = len(data_array)
 
             if distribution.lower() == "normal":
@@ -151,13 +156,14 @@ class DistributionAnalysisService:
         except Exception as e:
             raise ValueError(f"分布檢定錯誤: {str(e)}")
 
+    @cached
     def compare_distributions(
         self, data1: List[float], data2: List[float], test_type: str = "ks"
     ) -> Dict[str, Any]:
         """比較兩個分布"""
         try:
-            data1_array = np.array(data1)
-            data2_array = np.array(data2)
+            data1_array = np.asarray(data1, dtype=float)
+            data2_array = np.asarray(data2, dtype=float)
 
             if test_type.lower() == "ks":
                 # Kolmogorov-Smirnov 兩樣本檢定
@@ -0,0 +1,11 @@
+from typing import Iterable, Optional
+
+
+def wants_field(include: Optional[Iterable[str]], name: str) -> bool:
+    """
+    是否回傳指定的大型欄位
+
+    include 為 None 時回傳所有欄位 (與未支援欄位選擇前相同)，
+    否則只回傳列出的欄位；未要求的欄位由服務直接略過，不計算也不轉換。
+    """
+    return include is None or name in include
@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.services.lazy_imports import lazy_module
+
+fm = lazy_module("matplotlib.font_manager")
+
+# 依序嘗試的中文字體，從最常見的開始
+CHINESE_FONTS = [
+    'PingFang HK',           # macOS 繁體中文字體
+    'PingFang SC',           # macOS 簡體中文字體
+    'PingFang TC',           # macOS 繁體中文字體
+    'Hiragino Sans GB',      # macOS 簡體中文
+    'Hiragino Sans TC',      # macOS 繁體中文
+    'Hiragino Sans CNS',     # macOS 中文字體
+    'Hiragino Sans',         # macOS 通用
+    'Arial Unicode MS',      # macOS 通用字體
+    'Microsoft YaHei',       # Windows 雅黑
+    'SimHei',               # Windows 黑體
+    'WenQuanYi Micro Hei',  # Linux 文泉驛
+    'DejaVu Sans'           # 備用
+]
+
+# 找不到任何候選字體時使用的字體名稱
+FALLBACK_FONT = 'Arial Unicode MS'
+
+# 字體解析檔格式版本，格式改變時遞增讓舊檔失效
+_RESOLUTION_VERSION = 1
+
+
+def font_cache_path() -> str:
+    """
+    字體解析檔路徑
+
+    預設存放在 matplotlib 快取目錄 (與 fontlist 快取相同，可由 MPLCONFIGDIR 指定)，
+    也可用 SFDA_FONT_CACHE 指定。
+    """
+    path = os.environ.get("SFDA_FONT_CACHE")
+    if path:
+        return path
+    import matplotlib
+
+    return os.path.join(matplotlib.get_cachedir(), "sfda_font_resolution.json")
+
+
+def _weight(entry) -> int:
+    weight = entry.weight
+    if isinstance(weight, int):
+        return weight
+    return fm.weight_dict.get(weight, 400)
+
+
+def resolve_font() -> Dict[str, Any]:
+    """
+    掃描 matplotlib 的字體清單，選出第一個可用的候選中文字體
+
+    Returns:
+        字體解析結果：字體名稱、一般與粗體字型檔路徑 (找不到時為 None)
+    """
+    import matplotlib
+
+    entries: Dict[str, List[Any]] = {}
+    for entry in fm.fontManager.ttflist:
+        if entry.style == "normal":
+            entries.setdefault(entry.name, []).append(entry)
+
+    family = path = bold_path = None
+    for font in CHINESE_FONTS:
+        if font in entries:
+            family = font
+            # 一般字重取最接近 400 者，粗體取字重最高者
+            candidates = entries[font]
+            path = min(candidates, key=lambda entry: abs(_weight(entry) - 400)).fname
+            heaviest = max(candidates, key=_weight)
+            bold_path = heaviest.fname if _weight(heaviest) >= 600 else path
+            break
+
+    return {
+        "version": _RESOLUTION_VERSION,
+        "matplotlib": matplotlib.__version__,
+        "family": family,
+        "path": path,
+        "bold_path": bold_path,
+    }
+
+
+def _is_valid(resolution: Dict[str, Any]) -> bool:
+    import matplotlib
+
+    if resolution.get("version") != _RESOLUTION_VERSION or resolution.get("matplotlib") != matplotlib.__version__:
+        return False
+    paths = [resolution.get("path"), resolution.get("bold_path")]
+    return all(path is None or os.path.exists(path) for path in paths)
+
+
+def load_font_resolution(cache_path: Optional[str] = None, refresh: bool = False) -> Dict[str, Any]:
+    """
+    讀取字體解析檔，不存在或已失效 (matplotlib 版本改變、字型檔被移除) 時重新解析並寫回
+
+    Args:
+        cache_path: 解析檔路徑，預設為 font_cache_path()
+        refresh: 忽略現有的解析檔並重新解析
+
+    Returns:
+        字體解析結果
+    """
+    cache_path = cache_path or font_cache_path()
+    if not refresh:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                resolution = json.load(f)
+            if _is_valid(resolution):
+                return resolution
+        except (OSError, ValueError):
+            pass
+
+    resolution = resolve_font()
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(resolution, f, ensure_ascii=False)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # 快取目錄不可寫入時仍可使用本次解析結果
+        pass
+    return resolution
+
+
+class ChartFonts:
+    """
+    繪圖用字體
+
+    標題、軸標籤、刻度與資料標籤各自持有可重複使用的 FontProperties，
+    有字型檔路徑時直接指定檔案，繪圖時不必再依字體名稱搜尋。
+    """
+
+    def __init__(self, resolution: Dict[str, Any]):
+        self.family: str = resolution.get("family") or FALLBACK_FONT
+        self.path: Optional[str] = resolution.get("path")
+        self.bold_path: Optional[str] = resolution.get("bold_path") or self.path
+
+        self.title = self._properties(size=14, bold=True)
+        self.label = self._properties(size=12)
+        self.tick = self._properties()
+        self.text = self._properties(size=10)
+
+    def _properties(self, size: Optional[float] = None, bold: bool = False):
+        path = self.bold_path if bold else self.path
+        weight = "bold" if bold else "normal"
+        if path:
+            return fm.FontProperties(fname=path, size=size, weight=weight)
+        return fm.FontProperties(family=[self.family] + CHINESE_FONTS, size=size, weight=weight)
+
+
+_fonts_lock = threading.Lock()
+_chart_fonts: Optional[ChartFonts] = None
+
+
+def chart_fonts() -> ChartFonts:
+    """取得本行程共用的繪圖字體 (第一次呼叫時讀取字體解析檔)"""
+    global _chart_fonts
+    if _chart_fonts is None:
+        with _fonts_lock:
+            if _chart_fonts is None:
+                _chart_fonts = ChartFonts(load_font_resolution())
+    return _chart_fonts
+
+
+if __name__ == "__main__":
+    # 建置映像檔時執行：建立 matplotlib fontlist 快取並預先寫入字體解析檔
+    print(json.dumps(load_font_resolution(refresh=True), ensure_ascii=False, indent=2))
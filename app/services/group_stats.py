@@ -0,0 +1,190 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.lazy_imports import lazy_module
+
+stats = lazy_module("scipy.stats")
+
+
+def _label_name(label) -> str:
+    if isinstance(label, (float, np.floating)) and float(label).is_integer():
+        return str(int(label))
+    return str(label)
+
+
+def encode_groups(labels: Sequence) -> Tuple[List[str], np.ndarray]:
+    """
+    將分組標籤編碼為組別代碼
+
+    組別依標籤排序；標籤為 None 或 NaN 的觀測值代碼為 -1 (不納入任何組別)。
+    數值與字串陣列以 np.unique 一次編碼，只有混合型別的物件陣列需要逐一檢查缺失值。
+
+    Returns:
+        組別名稱與每個觀測值的組別代碼
+    """
+    labels = np.asarray(labels)
+    if labels.dtype.kind in "fiub":
+        labels = labels.astype(float)
+        missing = np.isnan(labels)
+    elif labels.dtype.kind == "U":
+        missing = np.zeros(labels.shape, dtype=bool)
+    else:
+        missing = np.fromiter(
+            (label is None or (isinstance(label, float) and np.isnan(label)) for label in labels),
+            dtype=bool, count=labels.size,
+        )
+    present = labels[~missing]
+    if present.dtype == object:
+        if any(isinstance(label, str) for label in present):
+            present = present.astype(str)
+        else:
+            present = present.astype(float)
+    unique_labels, present_codes = np.unique(present, return_inverse=True)
+    codes = np.full(labels.size, -1, dtype=np.intp)
+    codes[~missing] = present_codes
+    return [_label_name(label) for label in unique_labels], codes
+
+
+def long_format(values: Sequence[float], labels: Sequence) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    整理長格式數據 (數值陣列 + 分組標籤陣列)
+
+    標籤缺失或數值為 NaN 的觀測值不納入
+
+    Returns:
+        組別名稱、納入的數值與其組別代碼
+    """
+    values = np.asarray(values, dtype=float)
+    if len(labels) != values.size:
+        raise ValueError(f"分組標籤有 {len(labels)} 個，數值有 {values.size} 個")
+    names, codes = encode_groups(labels)
+    keep = (codes >= 0) & np.isfinite(values)
+    return names, values[keep], codes[keep]
+
+
+def split_groups(values: Sequence[float], labels: Sequence) -> Tuple[List[str], List[np.ndarray]]:
+    """將長格式數據依標籤切分為各組陣列 (組別依標籤排序，用於需要各組原始數據的計算)"""
+    names, values, codes = long_format(values, labels)
+    order = np.argsort(codes, kind="stable")
+    boundaries = np.cumsum(np.bincount(codes, minlength=len(names)))[:-1]
+    return names, np.split(values[order], boundaries)
+
+
+class GroupSummary:
+    """
+    各組的充分統計量
+
+    觀測數、平均數、離均差平方和，以及 (需要時) 合併樣本的平均等級與同值項。
+    各組統計量以組別代碼做 np.bincount 一次算出，不逐組建立 Python 列表；
+    ANOVA、Kruskal-Wallis 與事後比較只需要這些統計量。合併的觀測值與組別代碼
+    也一併保留，供置換檢定重新分組。
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        values: np.ndarray,
+        codes: np.ndarray,
+        n: np.ndarray,
+        mean: np.ndarray,
+        sum_squares: np.ndarray,
+        mean_rank: Optional[np.ndarray] = None,
+        tie_term: float = 0.0,
+    ):
+        self.names = names
+        self.values = values
+        self.codes = codes
+        self.n = n
+        self.mean = mean
+        self.sum_squares = sum_squares
+        self.mean_rank = mean_rank
+        self.tie_term = tie_term
+
+    @property
+    def k(self) -> int:
+        return len(self.n)
+
+    @property
+    def total(self) -> int:
+        return int(self.n.sum())
+
+    @property
+    def grand_mean(self) -> float:
+        return float(self.n @ self.mean / self.total)
+
+    @property
+    def variance(self) -> np.ndarray:
+        """各組的樣本變異數 (ddof=1)"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.sum_squares / (self.n - 1)
+
+    @classmethod
+    def from_codes(
+        cls,
+        values: np.ndarray,
+        codes: np.ndarray,
+        names: Sequence[str],
+        ranks: bool = False,
+    ) -> "GroupSummary":
+        """
+        由合併的觀測值與組別代碼計算
+
+        Args:
+            values: 所有觀測值
+            codes: 每個觀測值的組別代碼 (0 ~ k-1)
+            names: 組別名稱
+            ranks: 是否計算合併樣本的平均等級與同值項 (無母數方法使用)
+        """
+        values = np.asarray(values, dtype=float)
+        k = len(names)
+        n = np.bincount(codes, minlength=k)
+        if np.any(n == 0):
+            empty = ", ".join(name for name, size in zip(names, n) if size == 0)
+            raise ValueError(f"組別 {empty} 沒有觀測值")
+        mean = np.bincount(codes, weights=values, minlength=k) / n
+        # 第二次掃描計算離均差平方和，避免 Σx² - n·x̄² 的相消誤差
+        deviations = values - mean[codes]
+        sum_squares = np.bincount(codes, weights=deviations * deviations, minlength=k)
+
+        mean_rank = None
+        tie_term = 0.0
+        if ranks:
+            mean_rank = np.bincount(codes, weights=stats.rankdata(values), minlength=k) / n
+            _, counts = np.unique(values, return_counts=True)
+            tie_term = float(np.sum(counts.astype(float) ** 3 - counts))
+        return cls(list(names), values, codes, n, mean, sum_squares, mean_rank, tie_term)
+
+    def grouped_values(self) -> Tuple[np.ndarray, List[int]]:
+        """依組別排列的合併觀測值與各組大小 (置換檢定的輸入格式)"""
+        order = np.argsort(self.codes, kind="stable")
+        return self.values[order], self.n.tolist()
+
+    @classmethod
+    def from_groups(cls, groups: Sequence[Sequence[float]], ranks: bool = False) -> "GroupSummary":
+        """由各組數據計算，組別名稱為「組別 1」、「組別 2」…"""
+        sizes = [len(group) for group in groups]
+        values = np.concatenate([np.asarray(group, dtype=float) for group in groups])
+        codes = np.repeat(np.arange(len(groups)), sizes)
+        return cls.from_codes(values, codes, [f"組別 {i + 1}" for i in range(len(groups))], ranks)
+
+    @classmethod
+    def from_labels(cls, values: Sequence[float], labels: Sequence, ranks: bool = False) -> "GroupSummary":
+        """由長格式數據 (數值陣列 + 分組標籤陣列) 計算，組別依標籤排序"""
+        names, values, codes = long_format(values, labels)
+        return cls.from_codes(values, codes, names, ranks)
+
+    @classmethod
+    def from_input(
+        cls,
+        groups: Optional[Sequence[Sequence[float]]] = None,
+        values: Optional[Sequence[float]] = None,
+        labels: Optional[Sequence] = None,
+        ranks: bool = False,
+    ) -> "GroupSummary":
+        """由各組數據或長格式數據計算 (兩者擇一)"""
+        if groups is not None:
+            return cls.from_groups(groups, ranks)
+        if values is None or labels is None:
+            raise ValueError("必須提供 groups，或同時提供 values 與 labels")
+        return cls.from_labels(values, labels, ranks)
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Tuple
+
+
+# 圖片格式對應的媒體類型
+IMAGE_MEDIA_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+}
+
+
+def image_media_type(image_format: str) -> str:
+    """圖片格式的媒體類型，未知格式視為 application/octet-stream"""
+    return IMAGE_MEDIA_TYPES.get(image_format.lower(), "application/octet-stream")
+
+
+class ImageNotFoundError(KeyError):
+    """找不到圖片 (不存在、已過期或已被淘汰)"""
+
+
+class ImageStore:
+    """
+    短期圖片暫存區
+
+    圖表圖片以原始位元組保存，回應只帶圖片 id 與下載網址，
+    呼叫端再以 GET /api/v1/charts/images/{id} 取得圖片，不必經過 base64 與 JSON 跳脫。
+    超過保存時間即失效，超過總位元組上限時從最舊的圖片開始淘汰。
+    """
+
+    def __init__(self, ttl: float = 300.0, max_bytes: int = 256 << 20):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._images: "OrderedDict[str, Tuple[bytes, str, float]]" = OrderedDict()
+        self._total_bytes = 0
+        self._evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ImageStore":
+        """
+        從環境變數建立圖片暫存區
+
+        - SFDA_IMAGE_TTL: 圖片保存秒數
+        - SFDA_IMAGE_MAX_BYTES: 所有圖片的位元組上限
+        """
+        return cls(
+            ttl=float(os.environ.get("SFDA_IMAGE_TTL", 300)),
+            max_bytes=int(os.environ.get("SFDA_IMAGE_MAX_BYTES", 256 << 20)),
+        )
+
+    def _drop(self, image_id: str) -> None:
+        content, _, _ = self._images.pop(image_id)
+        self._total_bytes -= len(content)
+
+    def _expire(self, now: float) -> None:
+        # 依存入順序排列 (讀取不會改變到期時間)，只需檢查最舊的項目
+        while self._images:
+            image_id, (_, _, expires_at) = next(iter(self._images.items()))
+            if expires_at > now:
+                break
+            self._drop(image_id)
+
+    def put(self, content: bytes, media_type: str) -> str:
+        """
+        保存圖片
+
+        Args:
+            content: 編碼後的圖片位元組
+            media_type: 媒體類型
+
+        Returns:
+            圖片 id
+        """
+        if len(content) > self.max_bytes:
+            raise ValueError(f"圖片大小 ({len(content)} bytes) 超過上限 ({self.max_bytes} bytes)")
+        image_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            self._images[image_id] = (content, media_type, now + self.ttl)
+            self._total_bytes += len(content)
+            while self._total_bytes > self.max_bytes:
+                self._drop(next(iter(self._images)))
+                self._evictions += 1
+        return image_id
+
+    def get(self, image_id: str) -> Tuple[bytes, str]:
+        """取得圖片位元組與媒體類型"""
+        with self._lock:
+            self._expire(time.time())
+            entry = self._images.get(image_id)
+            if entry is None:
+                raise ImageNotFoundError(image_id)
+            return entry[0], entry[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire(time.time())
+            return {
+                "images": len(self._images),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "evictions": self._evictions,
+            }
+
+
+# 全域圖片暫存區
+image_store = ImageStore.from_env()
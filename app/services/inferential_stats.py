@@ -1,11 +1,22 @@
 from typing import List, Optional, Tuple
 import numpy as np
-from scipy import stats
-import pingouin as pg
 from app.models.response_models import (
     TTestResponse, ChiSquareResponse, ANOVAResponse,
-    MannWhitneyResponse, WilcoxonResponse, KruskalWallisResponse
+    MannWhitneyResponse, WilcoxonResponse, KruskalWallisResponse,
+    MassTestResponse, MultipleComparisonResponse
 )
+from app.services.result_cache import cached
+from app.services.lazy_imports import lazy_module
+from app.services import mass_testing, permutation, posthoc as posthoc_tests
+from app.services.group_stats import GroupSummary, encode_groups
+from app.services.permutation import METHOD_PARAMETRIC, METHOD_PERMUTATION
+
+stats = lazy_module("scipy.stats")
+
+
+def _check_method(method: str) -> None:
+    if method not in (METHOD_PARAMETRIC, METHOD_PERMUTATION):
+        raise ValueError(f"不支援的 p 值計算方法: {method}")
 
 
 class InferentialStatsService:
@@ -49,6 +60,7 @@ class InferentialStatsService:
         else:
             return "大"
 
+    @cached
     def ttest(
         self,
         sample1: List[float],
@@ -56,17 +68,27 @@ class InferentialStatsService:
         paired: bool = False,
         alpha: float = 0.05,
         alternative: str = "two-sided",
+        method: str = METHOD_PARAMETRIC,
+        n_resamples: int = 10000,
+        p_value_precision: Optional[float] = None,
+        random_seed: Optional[int] = None,
     ) -> TTestResponse:
-        """執行 t 檢定"""
+        """
+        執行 t 檢定
+
+        method 為 permutation 時以置換檢定計算 p 值 (app/services/permutation.py)：
+        單樣本與配對檢定翻轉差值的正負號，獨立樣本檢定重新分組，統計量與 scipy 相同
+        """
         try:
-            sample1_array = np.array(sample1)
+            _check_method(method)
+            sample1_array = np.asarray(sample1, dtype=float)
 
             if sample2 is None:
                 # 單樣本 t 檢定
                 statistic, p_value = stats.ttest_1samp(sample1_array, 0)
                 degrees_of_freedom = len(sample1) - 1
             else:
-                sample2_array = np.array(sample2)
+                sample2_array = np.asarray(sample2, dtype=float)
                 if paired:
                     # 配對樣本 t 檢定
                     statistic, p_value = stats.ttest_rel(sample1_array, sample2_array)
@@ -82,6 +104,26 @@ class InferentialStatsService:
             elif alternative == "greater":
                 p_value = p_value / 2 if statistic > 0 else 1 - p_value / 2
 
+            permutation_info = None
+            if method == METHOD_PERMUTATION:
+                options = dict(
+                    alternative=alternative, n_resamples=n_resamples, precision=p_value_precision, seed=random_seed
+                )
+                if sample2 is None:
+                    result = permutation.sign_flip_test(sample1_array, permutation.one_sample_t, **options)
+                elif paired:
+                    result = permutation.sign_flip_test(
+                        sample1_array - sample2_array, permutation.one_sample_t, **options
+                    )
+                else:
+                    # t 統計量不受平移影響，減去合併平均數以保留數值精度
+                    pooled = np.concatenate([sample1_array, sample2_array])
+                    result = permutation.two_sample_test(
+                        pooled - pooled.mean(), len(sample1_array), permutation.student_t, **options
+                    )
+                p_value = result.p_value
+                permutation_info = result.info()
+
             # 計算臨界值
             if alternative == "two-sided":
                 critical_value = stats.t.ppf(1 - alpha / 2, degrees_of_freedom)
@@ -131,11 +173,14 @@ class InferentialStatsService:
                 confidence_interval=confidence_interval,
                 effect_size=effect_size,
                 effect_size_interpretation=effect_size_interpretation,
+                method=method,
+                permutation=permutation_info,
             )
 
         except Exception as e:
             raise ValueError(f"t 檢定計算失敗: {str(e)}")
 
+    @cached
     def chi_square_test(
         self, observed: List[List[int]], expected: Optional[List[List[float]]] = None
     ) -> ChiSquareResponse:
@@ -188,39 +233,58 @@ class InferentialStatsService:
         except Exception as e:
             raise ValueError(f"卡方檢定計算失敗: {str(e)}")
 
-    def anova(self, groups: List[List[float]]) -> ANOVAResponse:
-        """執行單因子 ANOVA"""
+    @cached
+    def anova(
+        self,
+        groups: Optional[List[List[float]]] = None,
+        method: str = METHOD_PARAMETRIC,
+        n_resamples: int = 10000,
+        p_value_precision: Optional[float] = None,
+        random_seed: Optional[int] = None,
+        posthoc: Optional[str] = None,
+        values: Optional[List[float]] = None,
+        labels: Optional[List] = None,
+    ) -> ANOVAResponse:
+        """
+        執行單因子 ANOVA
+
+        輸入為各組數據 (groups) 或長格式數據 (values + labels)。各組的觀測數、平均數與
+        離均差平方和以 np.bincount 一次算出 (GroupSummary)，組別數多時也不逐組迴圈。
+        method 為 permutation 時以隨機重新分組的置換檢定計算 F 統計量的 p 值；
+        指定 posthoc (tukey 或 games_howell) 時由各組的充分統計量計算所有配對的事後比較
+        """
         try:
-            # 轉換為 numpy 陣列
-            group_arrays = [np.array(group) for group in groups]
-
-            # 執行 ANOVA
-            f_statistic, p_value = stats.f_oneway(*group_arrays)
+            _check_method(method)
+            summary = GroupSummary.from_input(groups, values, labels)
 
             # 計算自由度
-            k = len(groups)  # 組數
-            n = sum(len(group) for group in groups)  # 總樣本數
+            k = summary.k  # 組數
+            n = summary.total  # 總樣本數
+            if k < 2:
+                raise ValueError("至少需要 2 個組別")
             df_between = k - 1
             df_within = n - k
 
-            # 計算平方和
-            grand_mean = np.mean(np.concatenate(group_arrays))
-
-            # 組間平方和 (SSB)
-            ssb = sum(
-                len(group) * (np.mean(group) - grand_mean) ** 2
-                for group in group_arrays
-            )
-
-            # 組內平方和 (SSW)
-            ssw = sum(
-                np.sum((np.array(group) - np.mean(group)) ** 2)
-                for group in group_arrays
-            )
-
-            # 均方
-            msb = ssb / df_between
-            msw = ssw / df_within
+            # 組間平方和 (SSB) 與組內平方和 (SSW)
+            ssb = float(summary.n @ (summary.mean - summary.grand_mean) ** 2)
+            ssw = float(summary.sum_squares.sum())
+
+            # 均方與 F 統計量
+            with np.errstate(divide="ignore", invalid="ignore"):
+                msb = ssb / df_between
+                msw = np.float64(ssw) / df_within
+                f_statistic = msb / msw
+            p_value = stats.f.sf(f_statistic, df_between, df_within)
+
+            permutation_info = None
+            if method == METHOD_PERMUTATION:
+                pooled, sizes = summary.grouped_values()
+                result = permutation.k_sample_test(
+                    pooled, sizes, permutation.f_ratio,
+                    n_resamples=n_resamples, precision=p_value_precision, seed=random_seed,
+                )
+                p_value = result.p_value
+                permutation_info = result.info()
 
             # 判斷是否拒絕虛無假設（使用 α = 0.05）
             alpha = 0.05
@@ -231,6 +295,10 @@ class InferentialStatsService:
             eta_squared = ssb / total_ss if total_ss > 0 else 0
             effect_size_interpretation = self._interpret_eta_squared(eta_squared)
 
+            posthoc_result = None
+            if posthoc is not None:
+                posthoc_result = posthoc_tests.pairwise(posthoc, summary, alpha)
+
             return ANOVAResponse(
                 f_statistic=float(f_statistic),
                 p_value=float(p_value),
@@ -243,22 +311,36 @@ class InferentialStatsService:
                 reject_null=reject_null,
                 effect_size=float(eta_squared),
                 effect_size_interpretation=effect_size_interpretation,
+                method=method,
+                permutation=permutation_info,
+                posthoc=posthoc_result,
             )
 
         except Exception as e:
             raise ValueError(f"ANOVA 計算失敗: {str(e)}")
 
+    @cached
     def mann_whitney_test(
         self,
         sample1: List[float],
         sample2: List[float],
         alpha: float = 0.05,
         alternative: str = "two-sided",
+        method: str = METHOD_PARAMETRIC,
+        n_resamples: int = 10000,
+        p_value_precision: Optional[float] = None,
+        random_seed: Optional[int] = None,
     ) -> MannWhitneyResponse:
-        """執行 Mann-Whitney U 檢定"""
+        """
+        執行 Mann-Whitney U 檢定
+
+        method 為 permutation 時對合併樣本的等級重新分組，以 U 統計量的置換分佈計算 p 值
+        (有同值時仍為精確檢定)
+        """
         try:
-            sample1_array = np.array(sample1)
-            sample2_array = np.array(sample2)
+            _check_method(method)
+            sample1_array = np.asarray(sample1, dtype=float)
+            sample2_array = np.asarray(sample2, dtype=float)
 
             # 執行 Mann-Whitney U 檢定
             statistic, p_value = stats.mannwhitneyu(
@@ -285,6 +367,15 @@ class InferentialStatsService:
             rank_sum1 = np.sum(ranks[:len(sample1)])
             rank_sum2 = np.sum(ranks[len(sample1):])
 
+            permutation_info = None
+            if method == METHOD_PERMUTATION:
+                result = permutation.two_sample_test(
+                    ranks, n1, permutation.rank_sum_u, alternative=alternative, center=n1 * n2 / 2,
+                    n_resamples=n_resamples, precision=p_value_precision, seed=random_seed,
+                )
+                p_value = result.p_value
+                permutation_info = result.info()
+
             # 判斷是否拒絕虛無假設
             reject_null = p_value < alpha
 
@@ -316,11 +407,14 @@ class InferentialStatsService:
                 z_score=z_score,
                 rank_sum1=float(rank_sum1),
                 rank_sum2=float(rank_sum2),
+                method=method,
+                permutation=permutation_info,
             )
 
         except Exception as e:
             raise ValueError(f"Mann-Whitney U 檢定計算失敗: {str(e)}")
 
+    @cached
     def wilcoxon_test(
         self,
         sample1: List[float],
@@ -330,8 +424,8 @@ class InferentialStatsService:
     ) -> WilcoxonResponse:
         """執行 Wilcoxon 符號等級檢定"""
         try:
-            sample1_array = np.array(sample1)
-            sample2_array = np.array(sample2)
+            sample1_array = np.asarray(sample1, dtype=float)
+            sample2_array = np.asarray(sample2, dtype=float)
 
             # 檢查樣本大小是否相等
             if len(sample1) != len(sample2):
@@ -390,23 +484,42 @@ class InferentialStatsService:
         except Exception as e:
             raise ValueError(f"Wilcoxon 符號等級檢定計算失敗: {str(e)}")
 
+    @cached
     def kruskal_wallis_test(
-        self, groups: List[List[float]], alpha: float = 0.05
+        self,
+        groups: Optional[List[List[float]]] = None,
+        alpha: float = 0.05,
+        posthoc: Optional[str] = None,
+        posthoc_correction: str = mass_testing.CORRECTION_BONFERRONI,
+        values: Optional[List[float]] = None,
+        labels: Optional[List] = None,
     ) -> KruskalWallisResponse:
-        """執行 Kruskal-Wallis 檢定"""
-        try:
-            # 轉換為 numpy 陣列
-            group_arrays = [np.array(group) for group in groups]
+        """
+        執行 Kruskal-Wallis 檢定
 
-            # 執行 Kruskal-Wallis 檢定
-            statistic, p_value = stats.kruskal(*group_arrays)
+        輸入為各組數據 (groups) 或長格式數據 (values + labels)。合併樣本只排序一次，
+        各組的等級和以 np.bincount 算出，同值校正項由 np.unique 的計數求得。
+        指定 posthoc 為 dunn 時以合併樣本的平均等級計算所有配對的 Dunn 檢定
+        """
+        try:
+            summary = GroupSummary.from_input(groups, values, labels, ranks=True)
 
             # 計算自由度
-            k = len(groups)  # 組數
+            k = summary.k  # 組數
+            total_n = summary.total  # 總樣本數
+            if k < 2:
+                raise ValueError("至少需要 2 個組別")
             df = k - 1
 
+            # H 統計量 (含同值校正，與 scipy.stats.kruskal 相同)
+            tie_correction = 1.0 - summary.tie_term / (total_n ** 3 - total_n)
+            if tie_correction == 0:
+                raise ValueError("所有數值皆相同，無法計算 Kruskal-Wallis 檢定")
+            h = 12.0 / (total_n * (total_n + 1)) * float(summary.n @ summary.mean_rank ** 2) - 3.0 * (total_n + 1)
+            statistic = h / tie_correction
+            p_value = stats.chi2.sf(statistic, df)
+
             # 計算效果量 (eta squared)
-            total_n = sum(len(group) for group in groups)
             effect_size = (statistic - k + 1) / (total_n - k) if total_n > k else None
 
             # 判斷是否拒絕虛無假設
@@ -429,6 +542,10 @@ class InferentialStatsService:
                     effect_desc = "大"
                 interpretation += f"，效果量為 {effect_desc} (η² = {effect_size:.3f})"
 
+            posthoc_result = None
+            if posthoc is not None:
+                posthoc_result = posthoc_tests.pairwise(posthoc, summary, alpha, posthoc_correction)
+
             return KruskalWallisResponse(
                 statistic=float(statistic),
                 p_value=float(p_value),
@@ -439,7 +556,77 @@ class InferentialStatsService:
                 h_statistic=float(statistic),
                 degrees_of_freedom=df,
                 n_groups=k,
+                posthoc=posthoc_result,
             )
 
         except Exception as e:
             raise ValueError(f"Kruskal-Wallis 檢定計算失敗: {str(e)}")
+
+    @cached
+    def mass_test(
+        self,
+        data: List[List[float]],
+        labels: List,
+        features: Optional[List[str]] = None,
+        test: str = mass_testing.TEST_WELCH,
+        correction: str = mass_testing.CORRECTION_FDR_BH,
+        alpha: float = 0.05,
+        alternative: str = "two-sided",
+    ) -> MassTestResponse:
+        """
+        對每個特徵 (欄) 執行同一種組間檢定並做多重比較校正
+
+        所有欄位以向量化方式一次計算 (見 app/services/mass_testing.py)，
+        結果以 NumPy 陣列保存，由 FastJSONResponse 直接序列化。
+        """
+        matrix = np.asarray(data, dtype=float)
+        if matrix.ndim != 2:
+            raise ValueError("數據必須為二維矩陣 (觀測值 × 特徵)")
+        if len(labels) != matrix.shape[0]:
+            raise ValueError(f"分組標籤有 {len(labels)} 個，數據有 {matrix.shape[0]} 筆觀測值")
+        if features is not None and len(features) != matrix.shape[1]:
+            raise ValueError(f"特徵名稱有 {len(features)} 個，數據有 {matrix.shape[1]} 欄")
+
+        groups, codes = encode_groups(labels)
+        if test in mass_testing.TWO_GROUP_TESTS and len(groups) != 2:
+            raise ValueError(f"{test} 檢定需要恰好 2 個組別，實際為 {len(groups)} 個")
+        if len(groups) < 2:
+            raise ValueError("至少需要 2 個組別")
+
+        statistic, df, p_value = mass_testing.column_tests(matrix, codes, len(groups), test, alternative)
+        adjusted = mass_testing.adjust_p_values(p_value, correction)
+        reject = np.nan_to_num(adjusted, nan=1.0) < alpha
+        return MassTestResponse.model_construct(
+            test=test,
+            correction=correction,
+            alternative=alternative,
+            alpha=alpha,
+            groups=groups,
+            group_sizes=np.bincount(codes[codes >= 0], minlength=len(groups)).tolist(),
+            n_tests=int(np.count_nonzero(~np.isnan(p_value))),
+            n_significant=int(np.count_nonzero(reject)),
+            features=features,
+            statistic=statistic,
+            degrees_of_freedom=df,
+            p_value=p_value,
+            adjusted_p_value=adjusted,
+            reject_null=reject,
+        )
+
+    def multiple_comparison(
+        self, p_values: List[float], method: str = mass_testing.CORRECTION_HOLM, alpha: float = 0.05
+    ) -> MultipleComparisonResponse:
+        """多重比較校正 (Bonferroni、Holm、Benjamini-Hochberg)"""
+        p_array = np.asarray(p_values, dtype=float)
+        if np.any((p_array < 0) | (p_array > 1)):
+            raise ValueError("p 值必須介於 0 與 1 之間")
+        adjusted = mass_testing.adjust_p_values(p_array, method)
+        reject = np.nan_to_num(adjusted, nan=1.0) < alpha
+        return MultipleComparisonResponse.model_construct(
+            method=method,
+            alpha=alpha,
+            n_tests=int(np.count_nonzero(~np.isnan(p_array))),
+            n_significant=int(np.count_nonzero(reject)),
+            adjusted_p_value=adjusted,
+            reject_null=reject,
+        )
@@ -0,0 +1,229 @@
+import importlib
+import importlib.abc
+import os
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    記錄每個模組的匯入時間 (與 python -X importtime 相同的自身/累計時間)
+
+    只在 record_imports() 期間安裝於 sys.meta_path 最前面：找到模組後以計時載入器包裝，
+    累計時間包含其匯入的子模組，自身時間則扣除子模組的時間。
+    """
+
+    def __init__(self):
+        self.records: Dict[str, Dict[str, float]] = {}
+        self._local = threading.local()
+
+    def _stack(self) -> List[List[float]]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+        if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+        spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    def measure(self, fullname: str, func: Callable[[], Any]) -> Any:
+        stack = self._stack()
+        # frame: [子模組累計時間]
+        stack.append([0.0])
+        started = time.perf_counter()
+        try:
+            return func()
+        finally:
+            cumulative = time.perf_counter() - started
+            children = stack.pop()[0]
+            if stack:
+                stack[-1][0] += cumulative
+            self.records[fullname] = {"self_seconds": cumulative - children, "cumulative_seconds": cumulative}
+
+
+class _TimedLoader:
+    """包裝原本的載入器，只對 exec_module 計時，其餘屬性 (如資源讀取) 直接轉交"""
+
+    def __init__(self, loader, timer: _ImportTimer, fullname: str):
+        self._loader = loader
+        self._timer = timer
+        self._fullname = fullname
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        return self._timer.measure(self._fullname, lambda: self._loader.exec_module(module))
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class LazyModule(types.ModuleType):
+    """
+    延遲載入的模組
+
+    第一次存取屬性時才匯入實際模組並記錄耗時，之後的屬性存取直接轉交給實際模組。
+    before 可在匯入前執行設定 (例如先選定 matplotlib 後端)。
+    """
+
+    def __init__(self, name: str, before: Optional[Callable[[], None]] = None):
+        super().__init__(name)
+        object.__setattr__(self, "_lazy_before", before)
+        object.__setattr__(self, "_lazy_module", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+
+    def _load(self, trigger: str = "first_use") -> types.ModuleType:
+        module = object.__getattribute__(self, "_lazy_module")
+        if module is not None:
+            return module
+        with object.__getattribute__(self, "_lazy_lock"):
+            module = object.__getattribute__(self, "_lazy_module")
+            if module is None:
+                name = object.__getattribute__(self, "__name__")
+                before = object.__getattribute__(self, "_lazy_before")
+                started = time.perf_counter()
+                if before is not None:
+                    before()
+                module = importlib.import_module(name)
+                _lazy_loads[name] = {
+                    "seconds": time.perf_counter() - started,
+                    "trigger": trigger,
+                    "thread": threading.current_thread().name,
+                }
+                object.__setattr__(self, "_lazy_module", module)
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return object.__getattribute__(self, "_lazy_module") is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {object.__getattribute__(self, '__name__')!r} ({state})>"
+
+
+# 已登錄的延遲模組與暖機工作
+_lazy_registry: Dict[str, LazyModule] = {}
+_lazy_loads: Dict[str, Dict[str, Any]] = {}
+_warmup_tasks: Dict[str, Callable[[], Any]] = {}
+_warmup_state: Dict[str, Any] = {"started": False, "finished": False, "seconds": None, "errors": {}}
+_startup: Dict[str, Any] = {"seconds": None, "modules": {}}
+
+
+def lazy_module(name: str, before: Optional[Callable[[], None]] = None) -> LazyModule:
+    """
+    取得延遲載入的模組 (同名模組共用同一個代理物件)
+
+    用法與一般模組相同，例如 stats = lazy_module("scipy.stats") 後呼叫 stats.ttest_ind(...)
+    """
+    module = _lazy_registry.get(name)
+    if module is None:
+        module = _lazy_registry.setdefault(name, LazyModule(name, before))
+    return module
+
+
+def add_warmup_task(name: str, func: Callable[[], Any]) -> None:
+    """登錄暖機時要執行的初始化工作 (例如字體設定)"""
+    _warmup_tasks[name] = func
+
+
+def warm_up() -> None:
+    """
+    載入所有延遲模組並執行暖機工作
+
+    於服務啟動後在背景執行緒呼叫，讓第一個請求不必負擔匯入成本；
+    暖機前就收到的請求會在使用時自行載入，兩者以鎖避免重複匯入。
+    """
+    _warmup_state["started"] = True
+    started = time.perf_counter()
+    for name, module in list(_lazy_registry.items()):
+        try:
+            module._load(trigger="warmup")
+        except Exception as e:
+            _warmup_state["errors"][name] = str(e)
+    for name, func in list(_warmup_tasks.items()):
+        try:
+            task_started = time.perf_counter()
+            func()
+            _lazy_loads.setdefault(name, {
+                "seconds": time.perf_counter() - task_started,
+                "trigger": "warmup",
+                "thread": threading.current_thread().name,
+            })
+        except Exception as e:
+            _warmup_state["errors"][name] = str(e)
+    _warmup_state["seconds"] = time.perf_counter() - started
+    _warmup_state["finished"] = True
+
+
+def warmup_enabled() -> bool:
+    """是否於啟動後背景暖機 (可用 SFDA_LAZY_WARMUP=0 關閉)"""
+    return os.environ.get("SFDA_LAZY_WARMUP", "1") != "0"
+
+
+@contextmanager
+def record_imports() -> Iterator[None]:
+    """記錄區塊內的匯入時間，作為啟動匯入報告"""
+    timer = _ImportTimer()
+    sys.meta_path.insert(0, timer)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        sys.meta_path.remove(timer)
+        _startup["seconds"] = time.perf_counter() - started
+        _startup["modules"] = timer.records
+
+
+def import_report(limit: int = 30) -> Dict[str, Any]:
+    """
+    匯入成本報告
+
+    Returns:
+        啟動時匯入耗時最多的模組、各延遲模組的載入狀態與耗時、暖機狀態
+    """
+    modules = sorted(_startup["modules"].items(), key=lambda item: item[1]["cumulative_seconds"], reverse=True)
+    return {
+        "startup_seconds": _startup["seconds"],
+        "startup_modules": [
+            {
+                "module": name,
+                "self_seconds": round(record["self_seconds"], 6),
+                "cumulative_seconds": round(record["cumulative_seconds"], 6),
+            }
+            for name, record in modules[:limit]
+        ],
+        "lazy_modules": [
+            {"module": name, "loaded": module.loaded, **_lazy_loads.get(name, {})}
+            for name, module in sorted(_lazy_registry.items())
+        ],
+        "warmup_tasks": {name: _lazy_loads.get(name) for name in sorted(_warmup_tasks)},
+        "warmup": dict(_warmup_state),
+    }
@@ -0,0 +1,204 @@
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from app.services.lazy_imports import lazy_module
+
+stats = lazy_module("scipy.stats")
+
+# 每個欄位區塊的元素上限 (觀測值數 × 欄位數，約 32 MB 的 float64)
+_BLOCK_ELEMENTS = 4_000_000
+
+# 逐欄檢定的方法
+TEST_WELCH = "welch"  # Welch t 檢定 (不假設變異數相等)
+TEST_STUDENT = "student"  # Student t 檢定 (合併變異數)
+TEST_MANN_WHITNEY = "mann_whitney"  # Mann-Whitney U (常態近似，含同值與連續性校正)
+TEST_KRUSKAL = "kruskal"  # Kruskal-Wallis H (卡方近似，含同值校正)
+TWO_GROUP_TESTS = (TEST_WELCH, TEST_STUDENT, TEST_MANN_WHITNEY)
+
+# 多重比較校正方法
+CORRECTION_NONE = "none"
+CORRECTION_BONFERRONI = "bonferroni"
+CORRECTION_HOLM = "holm"
+CORRECTION_FDR_BH = "fdr_bh"  # Benjamini-Hochberg 偽發現率
+
+
+def _indicator(codes: np.ndarray, k: int) -> np.ndarray:
+    """觀測值 × 組別的 0/1 矩陣，各組的欄位和以一次矩陣乘法計算"""
+    indicator = np.zeros((codes.size, k))
+    valid = codes >= 0
+    indicator[np.flatnonzero(valid), codes[valid]] = 1.0
+    return indicator
+
+
+def _column_blocks(n: int, p: int) -> Iterator[slice]:
+    width = max(1, _BLOCK_ELEMENTS // max(n, 1))
+    for start in range(0, p, width):
+        yield slice(start, min(start + width, p))
+
+
+def _p_value(distribution, statistic: np.ndarray, alternative: str, *args) -> np.ndarray:
+    if alternative == "less":
+        return distribution.cdf(statistic, *args)
+    if alternative == "greater":
+        return distribution.sf(statistic, *args)
+    return np.minimum(2.0 * distribution.sf(np.abs(statistic), *args), 1.0)
+
+
+def _t_block(block: np.ndarray, valid: np.ndarray, indicator: np.ndarray, welch: bool, alternative: str):
+    counts = indicator.T @ valid
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = (indicator.T @ np.where(valid, block, 0.0)) / counts
+        # 第二次掃描計算離均差平方和，避免 Σx² - n·x̄² 的相消誤差
+        deviations = np.where(valid, block - indicator @ np.nan_to_num(means), 0.0)
+        sum_squares = indicator.T @ (deviations * deviations)
+        n1, n2 = counts
+        difference = means[0] - means[1]
+        if welch:
+            # 各組平均數的變異數 s²/n
+            mean_var1 = sum_squares[0] / (n1 - 1) / n1
+            mean_var2 = sum_squares[1] / (n2 - 1) / n2
+            standard_error2 = mean_var1 + mean_var2
+            df = standard_error2 ** 2 / (mean_var1 ** 2 / (n1 - 1) + mean_var2 ** 2 / (n2 - 1))
+        else:
+            df = n1 + n2 - 2
+            standard_error2 = (sum_squares[0] + sum_squares[1]) / df * (1.0 / n1 + 1.0 / n2)
+        statistic = difference / np.sqrt(standard_error2)
+    invalid = (n1 < 2) | (n2 < 2)
+    statistic[invalid] = np.nan
+    df = np.where(invalid, np.nan, df)
+    return statistic, df, _p_value(stats.t, statistic, alternative, df)
+
+
+def _ranks(block: np.ndarray, valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    各欄的平均等級 (無效觀測值為 0)、有效觀測值數與同值組的 Σ(t³ - t)
+
+    各欄排序後 (NaN 排在最後且彼此不相等)，依欄優先展開找出每段連續相等值，
+    同一段的觀測值取平均等級，同值項以 bincount 依欄加總，全程不逐欄迴圈
+    """
+    n, p = block.shape
+    masked = np.where(valid, block, np.nan)
+    order = np.argsort(masked, axis=0, kind="stable")
+    ordered = np.take_along_axis(masked, order, axis=0)
+    starts = np.ones((n, p), dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    flat_starts = starts.T.ravel()
+    run_starts = np.flatnonzero(flat_starts)
+    lengths = np.diff(np.append(run_starts, n * p)).astype(float)
+    ties = np.bincount(run_starts // n, weights=lengths ** 3 - lengths, minlength=p)
+
+    run = np.cumsum(flat_starts) - 1
+    average = (run_starts % n + (lengths + 1.0) / 2.0)[run].reshape(p, n).T
+    ranks = np.empty((n, p))
+    np.put_along_axis(ranks, order, average, axis=0)
+    ranks[~valid] = 0.0
+    return ranks, valid.sum(axis=0).astype(float), ties
+
+
+def _mann_whitney_block(block: np.ndarray, valid: np.ndarray, indicator: np.ndarray, alternative: str):
+    ranks, n, ties = _ranks(block, valid)
+    n1, n2 = indicator.T @ valid
+    u1 = indicator[:, 0] @ ranks - n1 * (n1 + 1) / 2.0
+    u2 = n1 * n2 - u1
+    mean = n1 * n2 / 2.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sd = np.sqrt(n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1))))
+        # 與 scipy.stats.mannwhitneyu(method="asymptotic") 相同的連續性校正
+        if alternative == "greater":
+            p_value = stats.norm.sf((u1 - mean - 0.5) / sd)
+        elif alternative == "less":
+            p_value = stats.norm.sf((u2 - mean - 0.5) / sd)
+        else:
+            p_value = np.minimum(2.0 * stats.norm.sf((np.maximum(u1, u2) - mean - 0.5) / sd), 1.0)
+    invalid = (n1 < 1) | (n2 < 1)
+    u1[invalid] = p_value[invalid] = np.nan
+    return u1, None, p_value
+
+
+def _kruskal_block(block: np.ndarray, valid: np.ndarray, indicator: np.ndarray):
+    ranks, n, ties = _ranks(block, valid)
+    counts = indicator.T @ valid
+    rank_sums = indicator.T @ ranks
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = np.where(counts > 0, rank_sums * rank_sums / counts, 0.0).sum(axis=0)
+        statistic = (12.0 / (n * (n + 1)) * between - 3.0 * (n + 1)) / (1.0 - ties / (n ** 3 - n))
+    df = (counts > 0).sum(axis=0) - 1.0
+    invalid = df < 1
+    statistic[invalid] = np.nan
+    df[invalid] = np.nan
+    return statistic, df, stats.chi2.sf(statistic, df)
+
+
+def column_tests(
+    data: np.ndarray, codes: np.ndarray, n_groups: int, test: str, alternative: str = "two-sided"
+) -> Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]:
+    """
+    對矩陣的每一欄執行同一種檢定
+
+    各組的計數、總和與等級和以「觀測值 × 組別」指示矩陣的矩陣乘法一次算出所有欄位，
+    欄位依區塊處理以限制暫存記憶體。NaN 視為缺失值，只排除該欄的該觀測值；
+    有效觀測值不足的欄位統計量與 p 值為 NaN。
+
+    Args:
+        data: 觀測值 × 欄位的數值矩陣
+        codes: 每個觀測值的組別代碼 (-1 為不納入)
+        n_groups: 組別數
+        test: 檢定方法 (welch, student, mann_whitney, kruskal)
+        alternative: 雙組檢定的對立假設，方向為第一組相對第二組
+
+    Returns:
+        各欄的統計量、自由度 (Mann-Whitney 為 None) 與 p 值
+    """
+    data = np.asarray(data, dtype=float)
+    indicator = _indicator(codes, n_groups)
+    in_group = (codes >= 0)[:, None]
+    parts = []
+    for columns in _column_blocks(*data.shape):
+        block = data[:, columns]
+        valid = np.isfinite(block) & in_group
+        if test == TEST_KRUSKAL:
+            parts.append(_kruskal_block(block, valid, indicator))
+        elif test == TEST_MANN_WHITNEY:
+            parts.append(_mann_whitney_block(block, valid, indicator, alternative))
+        else:
+            parts.append(_t_block(block, valid, indicator, test == TEST_WELCH, alternative))
+    statistic = np.concatenate([part[0] for part in parts])
+    df = None if test == TEST_MANN_WHITNEY else np.concatenate([part[1] for part in parts])
+    return statistic, df, np.concatenate([part[2] for part in parts])
+
+
+def adjust_p_values(p_values: np.ndarray, method: str) -> np.ndarray:
+    """
+    多重比較校正
+
+    NaN 的 p 值不計入檢定數，校正後仍為 NaN。
+
+    - bonferroni: p × m
+    - holm: 由小到大第 i 個乘上 (m - i + 1)，再取累積最大值 (逐步下降)
+    - fdr_bh: 由小到大第 i 個乘上 m / i，再由大到小取累積最小值 (逐步上升)
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    adjusted = np.full(p_values.shape, np.nan)
+    tested = ~np.isnan(p_values)
+    p = p_values[tested]
+    m = p.size
+    if method == CORRECTION_NONE or m == 0:
+        adjusted[tested] = p
+        return adjusted
+    if method == CORRECTION_BONFERRONI:
+        adjusted[tested] = np.minimum(p * m, 1.0)
+        return adjusted
+
+    order = np.argsort(p, kind="stable")
+    ranked = p[order]
+    if method == CORRECTION_HOLM:
+        steps = np.maximum.accumulate((m - np.arange(m)) * ranked)
+    elif method == CORRECTION_FDR_BH:
+        steps = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+    else:
+        raise ValueError(f"不支援的校正方法: {method}")
+    result = np.empty(m)
+    result[order] = np.minimum(steps, 1.0)
+    adjusted[tested] = result
+    return adjusted
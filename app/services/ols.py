@@ -0,0 +1,266 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.services.lazy_imports import lazy_module
+from app.services.streaming_stats import CovarianceAccumulator
+
+linalg = lazy_module("scipy.linalg")
+stats = lazy_module("scipy.stats")
+
+# 標準化後設計矩陣的條件數超過此值時提出警告 (約為 1/√ε，係數可能只剩約一半的有效位數)
+ILL_CONDITIONED = 1e8
+
+
+class OLSFit:
+    """
+    最小平方法的估計與推論結果
+
+    coefficients 與各項統計量依 terms 的順序排列，第一項為截距。
+    """
+
+    def __init__(
+        self,
+        terms: List[str],
+        coefficients: np.ndarray,
+        covariance: np.ndarray,
+        n: int,
+        rss: float,
+        tss: float,
+        confidence_level: float,
+        condition_number: float,
+        residuals: Optional[np.ndarray] = None,
+        fitted_values: Optional[np.ndarray] = None,
+    ):
+        self.terms = terms
+        self.coefficients = coefficients
+        self.n = n
+        self.rss = rss
+        self.tss = tss
+        self.confidence_level = confidence_level
+        self.condition_number = condition_number
+        self.residuals = residuals
+        self.fitted_values = fitted_values
+        self.df_model = len(terms) - 1
+        self.df_resid = n - len(terms)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sigma2 = rss / self.df_resid
+            self.standard_errors = np.sqrt(np.diag(covariance) * sigma2)
+            self.t_values = coefficients / self.standard_errors
+        self.residual_standard_error = float(np.sqrt(sigma2))
+        self.p_values = 2.0 * stats.t.sf(np.abs(self.t_values), self.df_resid)
+        margin = stats.t.ppf(0.5 + confidence_level / 2.0, self.df_resid) * self.standard_errors
+        self.confidence_intervals = np.column_stack([coefficients - margin, coefficients + margin])
+
+        if tss > 0:
+            self.r_squared = 1.0 - rss / tss
+        else:
+            # 依變數為常數時與 sklearn 的 r2_score 相同：完全配適為 1，否則為 0
+            self.r_squared = 1.0 if rss == 0 else 0.0
+        self.adjusted_r_squared = 1.0 - (1.0 - self.r_squared) * (n - 1) / self.df_resid
+        if rss > 0 and self.df_model > 0:
+            self.f_statistic = (tss - rss) * self.df_resid / (rss * self.df_model)
+            self.f_p_value = float(stats.f.sf(self.f_statistic, self.df_model, self.df_resid))
+        else:
+            self.f_statistic = float("inf")
+            self.f_p_value = 0.0
+
+    @property
+    def intercept(self) -> float:
+        return float(self.coefficients[0])
+
+    @property
+    def slopes(self) -> np.ndarray:
+        return self.coefficients[1:]
+
+    def durbin_watson(self) -> Optional[float]:
+        """殘差的 Durbin-Watson 統計量 (接近 2 表示無一階自我相關)"""
+        if self.residuals is None or self.rss <= 0:
+            return None
+        return float(np.sum(np.diff(self.residuals) ** 2) / self.rss)
+
+    def coefficient_table(self) -> List[dict]:
+        """每個係數的估計值、標準誤、t 值、p 值與信賴區間"""
+        return [
+            {
+                "term": term,
+                "estimate": float(self.coefficients[i]),
+                "standard_error": float(self.standard_errors[i]),
+                "t_value": float(self.t_values[i]),
+                "p_value": float(self.p_values[i]),
+                "confidence_interval": self.confidence_intervals[i].tolist(),
+            }
+            for i, term in enumerate(self.terms)
+        ]
+
+    def warnings(self) -> List[str]:
+        if self.condition_number > ILL_CONDITIONED:
+            return [
+                f"設計矩陣條件數 {self.condition_number:.3g} 過大 (自變數接近共線)，係數與標準誤的數值精度可能不足"
+            ]
+        return []
+
+
+def _terms(terms: Optional[Sequence[str]], p: int) -> List[str]:
+    return list(terms) if terms is not None else [f"x{i + 1}" for i in range(p)]
+
+
+def _with_intercept(unscaled: np.ndarray, feature_means: np.ndarray, n: int) -> np.ndarray:
+    """
+    加入截距的 (未乘 σ²) 共變異數矩陣
+
+    截距 b0 = ȳ - x̄ᵀβ，其共變異數由 β 的共變異數推得
+    """
+    p = unscaled.shape[0]
+    covariance = np.empty((p + 1, p + 1))
+    covariance[0, 0] = 1.0 / n + feature_means @ unscaled @ feature_means
+    covariance[0, 1:] = covariance[1:, 0] = -unscaled @ feature_means
+    covariance[1:, 1:] = unscaled
+    return covariance
+
+
+def fit_ols(
+    features: np.ndarray,
+    y: np.ndarray,
+    terms: Optional[Sequence[str]] = None,
+    confidence_level: float = 0.95,
+) -> OLSFit:
+    """
+    含截距的最小平方法，一次 QR 分解取得係數、共變異數與配適度
+
+    自變數與依變數先減去平均數 (截距由平均數求得)，自變數再除以各欄的範數，
+    使各欄尺度一致後以行樞軸 (column pivoting) 的 QR 分解求解：
+
+        Z P = Q R,  β = P R⁻¹ Qᵀ y,  Cov(β) = σ² P R⁻¹ R⁻ᵀ Pᵀ
+
+    不形成 XᵀX (其條件數為設計矩陣的平方)，多項式等尺度差異大的設計也能保有精度。
+    R 的對角元素小於容許誤差時視為完全共線並拋出錯誤，指出可由其他自變數線性表示的欄位。
+
+    Args:
+        features: 自變數矩陣 (觀測值 × 自變數)，不含截距欄
+        y: 依變數
+        terms: 各自變數的名稱，預設為 x1, x2, ...
+        confidence_level: 係數信賴區間的信心水準
+
+    Returns:
+        OLSFit
+    """
+    features = np.asarray(features, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if features.ndim == 1:
+        features = features.reshape(-1, 1)
+    n, p = features.shape
+    if y.shape != (n,):
+        raise ValueError(f"自變數有 {n} 筆觀測值，依變數有 {y.size} 筆")
+    if n < p + 2:
+        raise ValueError(f"觀測值數量 ({n}) 必須至少比參數數量 ({p + 1}) 多 1")
+    if not (np.isfinite(features).all() and np.isfinite(y).all()):
+        raise ValueError("數據包含 NaN 或無限大")
+    names = _terms(terms, p)
+
+    feature_means = features.mean(axis=0)
+    y_mean = y.mean()
+    centered = features - feature_means
+    y_centered = y - y_mean
+
+    scale = np.linalg.norm(centered, axis=0)
+    constant = np.flatnonzero(scale == 0)
+    if constant.size:
+        raise ValueError(f"自變數 {', '.join(names[i] for i in constant)} 為常數，與截距完全共線")
+    q, r, pivot = linalg.qr(centered / scale, mode="economic", pivoting=True)
+
+    diagonal = np.abs(np.diag(r))
+    tolerance = max(n, p) * np.finfo(float).eps * diagonal[0]
+    rank = int(np.sum(diagonal > tolerance))
+    if rank < p:
+        aliased = ", ".join(names[i] for i in pivot[rank:])
+        raise ValueError(f"自變數完全共線 (秩 {rank} < {p})，{aliased} 可由其他自變數線性表示")
+
+    qty = q.T @ y_centered
+    r_inverse = linalg.solve_triangular(r, np.eye(p))
+    slopes = np.empty(p)
+    slopes[pivot] = r_inverse @ qty
+    slopes /= scale
+    unscaled = np.empty((p, p))
+    unscaled[np.ix_(pivot, pivot)] = r_inverse @ r_inverse.T
+    unscaled /= np.outer(scale, scale)
+
+    residuals = y_centered - q @ qty
+    return OLSFit(
+        terms=["intercept"] + names,
+        coefficients=np.concatenate([[y_mean - feature_means @ slopes], slopes]),
+        covariance=_with_intercept(unscaled, feature_means, n),
+        n=n,
+        rss=float(residuals @ residuals),
+        tss=float(y_centered @ y_centered),
+        confidence_level=confidence_level,
+        condition_number=float(np.linalg.cond(r)),
+        residuals=residuals,
+        fitted_values=y - residuals,
+    )
+
+
+def fit_ols_from_moments(
+    moments: CovarianceAccumulator,
+    terms: Optional[Sequence[str]] = None,
+    confidence_level: float = 0.95,
+) -> OLSFit:
+    """
+    由充分統計量求解含截距的最小平方法
+
+    moments 為資料列 [x1, ..., xp, y] 的 CovarianceAccumulator (觀測數、平均數與離均差交叉乘積)，
+    可分區塊累加並跨 worker 合併，記憶體與資料列數無關 (p²)。以相關矩陣形式的
+    Sxx 做 Cholesky 分解求解：
+
+        β = Sxx⁻¹ Sxy,  RSS = Syy - Sxyᵀβ,  Cov(β) = σ² Sxx⁻¹
+
+    由於不保留個別資料列，不提供殘差與配適值 (也沒有 Durbin-Watson)；
+    XᵀX 的條件數為設計矩陣的平方，接近共線時精度較 fit_ols 的 QR 分解差，
+    回報的 condition_number 為換算回設計矩陣的條件數，與 fit_ols 相同。
+
+    Args:
+        moments: 資料列 [x1, ..., xp, y] 的累加器
+        terms: 各自變數的名稱，預設為 x1, x2, ...
+        confidence_level: 係數信賴區間的信心水準
+
+    Returns:
+        OLSFit
+    """
+    p = moments.n_vars - 1
+    n = moments.n
+    if p < 1:
+        raise ValueError("至少需要 1 個自變數")
+    if n < p + 2:
+        raise ValueError(f"觀測值數量 ({n}) 必須至少比參數數量 ({p + 1}) 多 1")
+    names = _terms(terms, p)
+    sxx = moments.comoment[:p, :p]
+    sxy = moments.comoment[:p, p]
+    syy = float(moments.comoment[p, p])
+
+    scale = np.sqrt(np.diag(sxx))
+    constant = np.flatnonzero(scale == 0)
+    if constant.size:
+        raise ValueError(f"自變數 {', '.join(names[i] for i in constant)} 為常數，與截距完全共線")
+    correlation = sxx / np.outer(scale, scale)
+    eigenvalues = np.linalg.eigvalsh(correlation)
+    # 相關矩陣的條件數為設計矩陣的平方，容許誤差也相應放寬
+    if eigenvalues[0] <= max(n, p) * np.finfo(float).eps * eigenvalues[-1]:
+        raise ValueError(f"自變數完全共線 (XᵀX 奇異，最小特徵值 {eigenvalues[0]:.3g})")
+    factor = linalg.cho_factor(correlation)
+    scaled_slopes = linalg.cho_solve(factor, sxy / scale)
+    slopes = scaled_slopes / scale
+    unscaled = linalg.cho_solve(factor, np.eye(p)) / np.outer(scale, scale)
+
+    feature_means = moments.mean[:p]
+    return OLSFit(
+        terms=["intercept"] + names,
+        coefficients=np.concatenate([[moments.mean[p] - feature_means @ slopes], slopes]),
+        covariance=_with_intercept(unscaled, feature_means, n),
+        n=n,
+        # 相減可能因捨入略小於 0
+        rss=max(syy - float(sxy @ slopes), 0.0),
+        tss=syy,
+        confidence_level=confidence_level,
+        condition_number=float(np.sqrt(eigenvalues[-1] / eigenvalues[0])),
+    )
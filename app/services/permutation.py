@@ -0,0 +1,271 @@
+import itertools
+import math
+from typing import Callable, Iterator, Optional, Sequence
+
+import numpy as np
+
+# 每批置換的元素上限 (置換數 × 觀測值數，約 32 MB 的 float64)
+_BATCH_ELEMENTS = 4_000_000
+# 每批置換數上限，也是提前停止的檢查間隔
+_BATCH_MAX_ROWS = 5000
+# 提前停止以 p 值的 99% 信賴區間半寬判斷
+_STOP_Z = 2.576
+
+# p 值的計算方法
+METHOD_PARAMETRIC = "parametric"  # 依 scipy 的理論分佈
+METHOD_PERMUTATION = "permutation"  # 置換檢定 (精確或 Monte Carlo)
+
+ALTERNATIVE_TWO_SIDED = "two-sided"
+ALTERNATIVE_LESS = "less"
+ALTERNATIVE_GREATER = "greater"
+
+
+class PermutationResult:
+    """置換檢定的 p 值與執行資訊"""
+
+    def __init__(self, p_value: float, n_resamples: int, exact: bool, early_stopped: bool):
+        self.p_value = p_value
+        self.n_resamples = n_resamples
+        self.exact = exact
+        self.early_stopped = early_stopped
+
+    @property
+    def standard_error(self) -> float:
+        """Monte Carlo p 值的標準誤 (精確檢定為 0)"""
+        if self.exact:
+            return 0.0
+        return math.sqrt(self.p_value * (1.0 - self.p_value) / self.n_resamples)
+
+    def info(self) -> dict:
+        return {
+            "n_resamples": self.n_resamples,
+            "exact": self.exact,
+            "early_stopped": self.early_stopped,
+            "standard_error": self.standard_error,
+        }
+
+
+# ---- 向量化統計量：輸入為 (置換數 × 觀測值) 矩陣，每列為一次置換，回傳每列的統計量 ----
+
+def student_t(samples: np.ndarray, n1: int) -> np.ndarray:
+    """前 n1 欄為第一組的合併變異數 (Student) 雙樣本 t 統計量"""
+    n = samples.shape[1]
+    n2 = n - n1
+    first, second = samples[:, :n1], samples[:, n1:]
+    mean1, mean2 = first.mean(axis=1), second.mean(axis=1)
+    # 各列先減去組平均再平方，避免 Σx² - (Σx)²/n 在數值偏移大時的相消誤差
+    deviations1 = first - mean1[:, None]
+    deviations2 = second - mean2[:, None]
+    ss_within = np.einsum("ij,ij->i", deviations1, deviations1) + np.einsum("ij,ij->i", deviations2, deviations2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pooled = ss_within / (n - 2)
+        return (mean1 - mean2) / np.sqrt(pooled * (1.0 / n1 + 1.0 / n2))
+
+
+def one_sample_t(samples: np.ndarray) -> np.ndarray:
+    """平均數為 0 的單樣本 t 統計量 (配對檢定時為差值)"""
+    n = samples.shape[1]
+    mean = samples.mean(axis=1)
+    deviations = samples - mean[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = np.einsum("ij,ij->i", deviations, deviations) / (n - 1)
+        return mean / np.sqrt(variance / n)
+
+
+def rank_sum_u(ranks: np.ndarray, n1: int) -> np.ndarray:
+    """前 n1 欄為第一組的 Mann-Whitney U (由第一組的等級和計算)"""
+    return ranks[:, :n1].sum(axis=1) - n1 * (n1 + 1) / 2.0
+
+
+def f_ratio(samples: np.ndarray, sizes: Sequence[int]) -> np.ndarray:
+    """依 sizes 連續分組的單因子 ANOVA F 統計量"""
+    sizes = np.asarray(sizes)
+    n, k = int(sizes.sum()), len(sizes)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    group_means = np.add.reduceat(samples, starts, axis=1) / sizes
+    grand_mean = samples.mean(axis=1)
+    # 組內平方和以離組平均的偏差計算，不以總平方和相減
+    deviations = samples - np.repeat(group_means, sizes, axis=1)
+    ss_within = np.einsum("ij,ij->i", deviations, deviations)
+    ss_between = ((group_means - grand_mean[:, None]) ** 2 * sizes).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (ss_between / (k - 1)) / (ss_within / (n - k))
+
+
+# ---- 置換產生器：每次產生一批 (置換數 × 觀測值) 的索引或符號矩陣 ----
+
+def _batch_rows(n: int) -> int:
+    return max(1, min(_BATCH_MAX_ROWS, _BATCH_ELEMENTS // max(n, 1)))
+
+
+def _shuffled_indices(rng: np.random.Generator, rows: int, n: int) -> np.ndarray:
+    indices = np.tile(np.arange(n), (rows, 1))
+    return rng.permuted(indices, axis=1, out=indices)
+
+
+def _combination_indices(n: int, n1: int, rows: int) -> Iterator[np.ndarray]:
+    """依序列舉所有 C(n, n1) 種分組，每列前 n1 個為第一組的索引，其餘為第二組"""
+    combinations = itertools.combinations(range(n), n1)
+    while True:
+        chunk = np.array(list(itertools.islice(combinations, rows)), dtype=np.intp).reshape(-1, n1)
+        if not len(chunk):
+            return
+        mask = np.zeros((len(chunk), n), dtype=bool)
+        mask[np.arange(len(chunk))[:, None], chunk] = True
+        rest = np.nonzero(~mask)[1].reshape(len(chunk), n - n1)
+        yield np.hstack([chunk, rest])
+
+
+def _all_signs(n: int, rows: int) -> Iterator[np.ndarray]:
+    """依序列舉所有 2ⁿ 種正負號組合"""
+    bits = np.arange(n)
+    for start in range(0, 1 << n, rows):
+        codes = np.arange(start, min(start + rows, 1 << n))
+        yield 1.0 - 2.0 * ((codes[:, None] >> bits) & 1)
+
+
+def _extreme(null: np.ndarray, observed: float, alternative: str, center: float) -> int:
+    """計算至少與觀察值一樣極端的置換數 (容許浮點捨入誤差)"""
+    tolerance = 1e-9 * max(1.0, abs(observed - center))
+    if alternative == ALTERNATIVE_GREATER:
+        hits = null >= observed - tolerance
+    elif alternative == ALTERNATIVE_LESS:
+        hits = null <= observed + tolerance
+    else:
+        hits = np.abs(null - center) >= abs(observed - center) - tolerance
+    return int(np.count_nonzero(hits))
+
+
+def _monte_carlo(
+    null_batch: Callable[[int], np.ndarray],
+    observed: float,
+    alternative: str,
+    center: float,
+    n_resamples: int,
+    rows: int,
+    precision: Optional[float],
+) -> PermutationResult:
+    """
+    隨機置換的 p 值 (Phipson & Smyth 校正，(b + 1) / (B + 1)，不會為 0)
+
+    指定 precision 時，每批結束後若 p 值 99% 信賴區間的半寬已小於 precision 即停止
+    """
+    count = done = 0
+    while done < n_resamples:
+        size = min(rows, n_resamples - done)
+        count += _extreme(null_batch(size), observed, alternative, center)
+        done += size
+        if precision is not None and done < n_resamples:
+            p = (count + 1) / (done + 1)
+            if _STOP_Z * math.sqrt(p * (1.0 - p) / done) < precision:
+                return PermutationResult(p, done, exact=False, early_stopped=True)
+    return PermutationResult((count + 1) / (done + 1), done, exact=False, early_stopped=False)
+
+
+def _exhaustive(
+    batches: Iterator[np.ndarray], null_from: Callable[[np.ndarray], np.ndarray],
+    observed: float, alternative: str, center: float,
+) -> PermutationResult:
+    """列舉所有置換的精確 p 值"""
+    count = total = 0
+    for batch in batches:
+        count += _extreme(null_from(batch), observed, alternative, center)
+        total += len(batch)
+    return PermutationResult(count / total, total, exact=True, early_stopped=False)
+
+
+def two_sample_test(
+    pooled: np.ndarray,
+    n1: int,
+    statistic: Callable[[np.ndarray, int], np.ndarray],
+    alternative: str = ALTERNATIVE_TWO_SIDED,
+    center: float = 0.0,
+    n_resamples: int = 10000,
+    precision: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> PermutationResult:
+    """
+    雙樣本置換檢定
+
+    pooled 的前 n1 個為第一組。每批以一個 (置換數 × n) 的索引矩陣重新分組，
+    statistic 對整批置換以單一向量運算計算。所有分組數 C(n, n1) 不超過
+    n_resamples 時改為列舉全部分組，回傳精確 p 值。
+
+    Args:
+        pooled: 合併的觀測值 (或等級)；統計量不受平移影響時 (例如 t) 宜先減去合併平均數
+        n1: 第一組的大小
+        statistic: 向量化統計量，statistic(矩陣, n1) 回傳每列的統計量
+        alternative: 對立假設 (two-sided 以與 center 的距離比較)
+        center: 虛無假設下統計量的中心
+        n_resamples: 隨機置換數
+        precision: p 值的目標精度，達到即提前停止
+        seed: 亂數種子
+    """
+    pooled = np.asarray(pooled, dtype=float)
+    n = pooled.size
+    observed = float(statistic(pooled[None, :], n1)[0])
+    rows = _batch_rows(n)
+    if math.comb(n, n1) <= n_resamples:
+        return _exhaustive(
+            _combination_indices(n, n1, rows),
+            lambda indices: statistic(pooled[indices], n1),
+            observed, alternative, center,
+        )
+    rng = np.random.default_rng(seed)
+    return _monte_carlo(
+        lambda size: statistic(pooled[_shuffled_indices(rng, size, n)], n1),
+        observed, alternative, center, n_resamples, rows, precision,
+    )
+
+
+def sign_flip_test(
+    differences: np.ndarray,
+    statistic: Callable[[np.ndarray], np.ndarray],
+    alternative: str = ALTERNATIVE_TWO_SIDED,
+    n_resamples: int = 10000,
+    precision: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> PermutationResult:
+    """
+    單樣本 (或配對差值) 的符號翻轉置換檢定，虛無假設為分佈對稱於 0
+
+    每批以 (置換數 × n) 的 ±1 矩陣乘上差值；2ⁿ 不超過 n_resamples 時列舉所有符號組合
+    """
+    differences = np.asarray(differences, dtype=float)
+    n = differences.size
+    observed = float(statistic(differences[None, :])[0])
+    rows = _batch_rows(n)
+    if n < 63 and (1 << n) <= n_resamples:
+        return _exhaustive(
+            _all_signs(n, rows), lambda signs: statistic(signs * differences), observed, alternative, 0.0
+        )
+    rng = np.random.default_rng(seed)
+    return _monte_carlo(
+        lambda size: statistic(np.where(rng.random((size, n)) < 0.5, -differences, differences)),
+        observed, alternative, 0.0, n_resamples, rows, precision,
+    )
+
+
+def k_sample_test(
+    pooled: np.ndarray,
+    sizes: Sequence[int],
+    statistic: Callable[[np.ndarray, Sequence[int]], np.ndarray],
+    n_resamples: int = 10000,
+    precision: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> PermutationResult:
+    """
+    多組置換檢定 (統計量越大越極端，例如 ANOVA 的 F)
+
+    pooled 依 sizes 連續分組，每批隨機重新分組後以 statistic(矩陣, sizes) 計算。
+    多組比較的統計量不受平移影響，先減去合併平均數以保留數值精度
+    """
+    pooled = np.asarray(pooled, dtype=float)
+    pooled = pooled - pooled.mean()
+    n = pooled.size
+    observed = float(statistic(pooled[None, :], sizes)[0])
+    rng = np.random.default_rng(seed)
+    return _monte_carlo(
+        lambda size: statistic(pooled[_shuffled_indices(rng, size, n)], sizes),
+        observed, ALTERNATIVE_GREATER, 0.0, n_resamples, _batch_rows(n), precision,
+    )
@@ -0,0 +1,256 @@
+import functools
+from typing import Iterator, Optional
+
+import numpy as np
+
+from app.services.group_stats import GroupSummary
+from app.services.lazy_imports import lazy_module
+from app.services.mass_testing import CORRECTION_BONFERRONI, adjust_p_values
+
+special = lazy_module("scipy.special")
+stats = lazy_module("scipy.stats")
+
+# 事後比較方法
+POSTHOC_TUKEY = "tukey"  # Tukey HSD (假設變異數相等)
+POSTHOC_GAMES_HOWELL = "games_howell"  # Games-Howell (不假設變異數相等)
+POSTHOC_DUNN = "dunn"  # Dunn 檢定 (Kruskal-Wallis 之後的等級比較)
+
+# 組別數上限 (配對數為 k(k-1)/2)
+MAX_GROUPS = 1000
+
+# 學生化全距分佈：以 W(w; k) = P(k 個標準常態的全距 ≤ w) 的表格內插，
+# 自由度為 ν 時再對 s = √(χ²_ν / ν) 積分：F(q; k, ν) = ∫ g_ν(s) W(q·s; k) ds
+_RANGE_STEP = 0.01
+_RANGE_MAX = 20.0  # k ≤ MAX_GROUPS 時全距超過此值的機率可忽略
+_RANGE_Z_NODES = 400
+_SCALE_NODES = 128
+# 自由度超過此值時視為無限大 (與 scipy 相同)
+_LARGE_DF = 100_000
+# 每批計算的配對數 (限制 配對數 × 積分節點 的暫存記憶體)
+_PAIR_BLOCK = 8192
+
+
+@functools.lru_cache(maxsize=32)
+def _range_table(k: int):
+    """W(w; k) 與其導數在 0 ~ _RANGE_MAX 等距格點上的值 (Gauss-Legendre 積分)"""
+    nodes, weights = np.polynomial.legendre.leggauss(_RANGE_Z_NODES)
+    z = 9.0 * nodes
+    z_weights = 9.0 * weights * np.exp(-0.5 * z * z) / np.sqrt(2.0 * np.pi)
+    w = np.arange(0.0, _RANGE_MAX + _RANGE_STEP, _RANGE_STEP)[:, None]
+    inner = np.clip(special.ndtr(z) - special.ndtr(z - w), 0.0, 1.0)
+    shifted_pdf = np.exp(-0.5 * (z - w) ** 2) / np.sqrt(2.0 * np.pi)
+    cdf = np.clip(k * (inner ** (k - 1)) @ z_weights, 0.0, 1.0)
+    derivative = k * (k - 1) * (shifted_pdf * inner ** (k - 2)) @ z_weights
+    return cdf, derivative
+
+
+def _range_cdf(w: np.ndarray, k: int) -> np.ndarray:
+    """W(w; k)，以三次 Hermite 內插表格值"""
+    cdf, derivative = _range_table(k)
+    x = np.minimum(w / _RANGE_STEP, len(cdf) - 1.000001)
+    i = np.floor(x).astype(np.intp)
+    t = x - i
+    t2, t3 = t * t, t * t * t
+    value = (
+        (2 * t3 - 3 * t2 + 1) * cdf[i]
+        + (t3 - 2 * t2 + t) * _RANGE_STEP * derivative[i]
+        + (3 * t2 - 2 * t3) * cdf[i + 1]
+        + (t3 - t2) * _RANGE_STEP * derivative[i + 1]
+    )
+    return np.where(w >= _RANGE_MAX, 1.0, value)
+
+
+def _blocks(size: int) -> Iterator[slice]:
+    for start in range(0, size, _PAIR_BLOCK):
+        yield slice(start, min(start + _PAIR_BLOCK, size))
+
+
+@functools.lru_cache(maxsize=1)
+def _scale_nodes():
+    return np.polynomial.legendre.leggauss(_SCALE_NODES)
+
+
+def _studentized_range(q: np.ndarray, k: int, df: np.ndarray, density: bool = False):
+    """學生化全距分佈的累積機率 (density 為 True 時一併回傳機率密度)"""
+    q, df = np.broadcast_arrays(np.asarray(q, dtype=float), np.asarray(df, dtype=float))
+    q, df = q.ravel(), df.ravel()
+    cdf = np.empty(q.size)
+    pdf = np.empty(q.size) if density else None
+    nodes, weights = _scale_nodes()
+    _, derivative = _range_table(k)
+    grid = np.arange(derivative.size) * _RANGE_STEP
+    for block in _blocks(q.size):
+        nu = df[block][:, None]
+        q_block = q[block][:, None]
+        # s 的分佈集中在眾數附近，積分區間取眾數 ± 14 個標準差；q·s 超過 _RANGE_MAX 時 W = 1，
+        # 該段以 χ² 的尾端機率直接計算，自由度小、q 大時轉折區間才有足夠的積分節點
+        mode = np.sqrt(np.maximum(nu - 1.0, 0.0) / nu)
+        spread = 14.0 / np.sqrt(2.0 * nu)
+        low = np.maximum(mode - spread, 0.0)
+        with np.errstate(divide="ignore"):
+            high = np.minimum(mode + spread, _RANGE_MAX / q_block)
+        high = np.maximum(high, low)
+        half = (high - low) / 2.0
+        s = low + half * (nodes + 1.0)
+        with np.errstate(divide="ignore"):
+            log_density = (
+                np.log(2.0) + nu / 2.0 * np.log(nu / 2.0) - special.gammaln(nu / 2.0)
+                + (nu - 1.0) * np.log(s) - nu / 2.0 * s * s
+            )
+        scale_weights = half * weights * np.exp(log_density)
+        tail = stats.chi2.sf(nu[:, 0] * high[:, 0] ** 2, nu[:, 0])
+        w = q_block * s
+        value = np.sum(scale_weights * _range_cdf(w, k), axis=1) + tail
+        large = df[block] > _LARGE_DF
+        cdf[block] = np.where(large, _range_cdf(q[block], k), value)
+        if density:
+            # dF/dq = ∫ g(s) s W'(q·s) ds，W' 以線性內插 (只用於求分位數的牛頓法)
+            slope = np.sum(scale_weights * s * np.interp(w, grid, derivative, right=0.0), axis=1)
+            pdf[block] = np.where(large, np.interp(q[block], grid, derivative, right=0.0), slope)
+    cdf = np.clip(cdf, 0.0, 1.0)
+    return (cdf, pdf) if density else cdf
+
+
+def studentized_range_cdf(q: np.ndarray, k: int, df: np.ndarray) -> np.ndarray:
+    """
+    學生化全距分佈的累積機率 (q、df 可為等長陣列，一次計算所有配對)
+
+    與 scipy.stats.studentized_range 相同的分佈，但 scipy 逐點做數值積分，
+    每點約需 10 毫秒；這裡各組別數 k 只建一次 W 的表格，配對間共用，誤差約 1e-10。
+    自由度超過 _LARGE_DF 時視為無限大 (s = 1)。
+    """
+    return _studentized_range(q, k, df)
+
+
+def studentized_range_ppf(probability: float, k: int, df: np.ndarray) -> np.ndarray:
+    """學生化全距分佈的分位數 (向量化的牛頓法，步長超出包夾區間時改用二分法)"""
+    df = np.atleast_1d(np.asarray(df, dtype=float))
+    low = np.zeros(df.shape)
+    high = np.full(df.shape, 8.0)
+    # 自由度很小時分位數可能很大，先擴大上界
+    for _ in range(30):
+        short = studentized_range_cdf(high, k, df) < probability
+        if not short.any():
+            break
+        high[short] *= 2.0
+    x = (low + high) / 2.0
+    for _ in range(100):
+        cdf, pdf = _studentized_range(x, k, df, density=True)
+        below = cdf < probability
+        low = np.where(below, x, low)
+        high = np.where(below, high, x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = x - (cdf - probability) / pdf
+        inside = (newton > low) & (newton < high)
+        updated = np.where(inside, newton, (low + high) / 2.0)
+        if np.all(np.abs(updated - x) <= 1e-12 * np.maximum(x, 1.0)):
+            return updated
+        x = updated
+    return x
+
+
+def _pairs(k: int):
+    if k > MAX_GROUPS:
+        raise ValueError(f"事後比較最多支援 {MAX_GROUPS} 個組別，實際為 {k} 個")
+    return np.triu_indices(k, 1)
+
+
+def _result(method, summary, first, second, difference, standard_error, statistic, p_value, alpha, **extra) -> dict:
+    return {
+        "method": method,
+        "alpha": alpha,
+        "groups": summary.names,
+        "group1": first.tolist(),
+        "group2": second.tolist(),
+        "difference": difference.tolist(),
+        "standard_error": standard_error.tolist(),
+        "statistic": statistic.tolist(),
+        "p_value": p_value.tolist(),
+        "reject_null": (p_value < alpha).tolist(),
+        **{name: value.tolist() if isinstance(value, np.ndarray) else value for name, value in extra.items()},
+    }
+
+
+def tukey_hsd(summary: GroupSummary, alpha: float = 0.05) -> dict:
+    """
+    Tukey HSD：所有配對共用 ANOVA 的組內均方
+
+        q = |x̄ᵢ - x̄ⱼ| / √(MSE / 2 · (1/nᵢ + 1/nⱼ)),  p = P(Q_{k, N-k} ≥ q)
+    """
+    first, second = _pairs(summary.k)
+    df = summary.total - summary.k
+    if df < 1:
+        raise ValueError("觀測值數量必須大於組別數")
+    mse = summary.sum_squares.sum() / df
+    n = summary.n.astype(float)
+    difference = summary.mean[first] - summary.mean[second]
+    standard_error = np.sqrt(mse / 2.0 * (1.0 / n[first] + 1.0 / n[second]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = np.abs(difference) / standard_error
+    p_value = 1.0 - studentized_range_cdf(statistic, summary.k, np.full(statistic.shape, df))
+    margin = studentized_range_ppf(1.0 - alpha, summary.k, df)[0] * standard_error
+    return _result(
+        POSTHOC_TUKEY, summary, first, second, difference, standard_error, statistic, p_value, alpha,
+        confidence_lower=difference - margin, confidence_upper=difference + margin,
+    )
+
+
+def games_howell(summary: GroupSummary, alpha: float = 0.05) -> dict:
+    """
+    Games-Howell：各配對以自己的變異數與 Welch 自由度比較學生化全距分佈
+
+        q = |x̄ᵢ - x̄ⱼ| / √((sᵢ²/nᵢ + sⱼ²/nⱼ) / 2)
+    """
+    first, second = _pairs(summary.k)
+    if np.any(summary.n < 2):
+        raise ValueError("Games-Howell 檢定每組至少需要 2 個觀測值")
+    n = summary.n.astype(float)
+    mean_variance = summary.variance / n
+    pair_variance = mean_variance[first] + mean_variance[second]
+    df = pair_variance ** 2 / (
+        mean_variance[first] ** 2 / (n[first] - 1) + mean_variance[second] ** 2 / (n[second] - 1)
+    )
+    difference = summary.mean[first] - summary.mean[second]
+    standard_error = np.sqrt(pair_variance / 2.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = np.abs(difference) / standard_error
+    p_value = 1.0 - studentized_range_cdf(statistic, summary.k, df)
+    margin = studentized_range_ppf(1.0 - alpha, summary.k, df) * standard_error
+    return _result(
+        POSTHOC_GAMES_HOWELL, summary, first, second, difference, standard_error, statistic, p_value, alpha,
+        degrees_of_freedom=df, confidence_lower=difference - margin, confidence_upper=difference + margin,
+    )
+
+
+def dunn(summary: GroupSummary, alpha: float = 0.05, correction: str = CORRECTION_BONFERRONI) -> dict:
+    """
+    Dunn 檢定：以合併樣本的平均等級差比較 (含同值校正)，再做多重比較校正
+
+        z = (R̄ᵢ - R̄ⱼ) / √((N(N+1)/12 - Σ(t³-t) / (12(N-1))) · (1/nᵢ + 1/nⱼ))
+    """
+    if summary.mean_rank is None:
+        raise ValueError("Dunn 檢定需要各組的平均等級")
+    first, second = _pairs(summary.k)
+    total = summary.total
+    n = summary.n.astype(float)
+    variance = total * (total + 1) / 12.0 - summary.tie_term / (12.0 * (total - 1))
+    difference = summary.mean_rank[first] - summary.mean_rank[second]
+    standard_error = np.sqrt(variance * (1.0 / n[first] + 1.0 / n[second]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = difference / standard_error
+    p_value = adjust_p_values(2.0 * stats.norm.sf(np.abs(statistic)), correction)
+    return _result(
+        POSTHOC_DUNN, summary, first, second, difference, standard_error, statistic, p_value, alpha,
+        correction=correction,
+    )
+
+
+def pairwise(method: str, summary: GroupSummary, alpha: float = 0.05, correction: Optional[str] = None) -> dict:
+    """依方法名稱執行事後比較"""
+    if method == POSTHOC_TUKEY:
+        return tukey_hsd(summary, alpha)
+    if method == POSTHOC_GAMES_HOWELL:
+        return games_howell(summary, alpha)
+    if method == POSTHOC_DUNN:
+        return dunn(summary, alpha, correction or CORRECTION_BONFERRONI)
+    raise ValueError(f"不支援的事後比較方法: {method}")
@@ -0,0 +1,154 @@
+import math
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+# 分位數計算方法
+QUANTILE_EXACT = "exact"
+QUANTILE_SKETCH = "sketch"
+
+DEFAULT_SKETCH_K = 200
+
+
+def exact_percentiles(values: np.ndarray, percentiles: Sequence[float]) -> np.ndarray:
+    """
+    精確百分位數
+
+    所有百分位數以單一 np.percentile 呼叫計算，NumPy 會對全部位置做一次 partition，
+    而不是每個百分位數各自部分排序整個陣列。
+    """
+    return np.percentile(np.asarray(values, dtype=float), np.asarray(percentiles, dtype=float))
+
+
+class KLLSketch:
+    """
+    KLL 分位數草圖 (Karnin, Lang, Liberty 2016)
+
+    以多層壓縮器保存資料的代表樣本，第 h 層的每個項目代表 2^h 個原始值；
+    某層超過容量時排序並隨機取奇數或偶數位置的項目升到上一層。
+    記憶體約為 O(k)，正規化等級誤差約為 1.7 / k，且草圖可任意合併，
+    適合串流資料與分區計算後合併。
+
+    一次加入極大量資料時，先以區塊隨機抽樣直接產生較高層的項目
+    (每 2^j 個值取一個，權重 2^j)，抽樣數量遠大於 k²，其誤差小於草圖本身的誤差，
+    因此億級資料也只需要走訪抽樣的位置。
+    """
+
+    def __init__(self, k: int = DEFAULT_SKETCH_K, seed: Optional[int] = 0):
+        if k < 8:
+            raise ValueError("草圖參數 k 至少為 8")
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def bulk_sample_size(self) -> int:
+        """大量資料直接抽樣時的最小樣本數"""
+        return max(1 << 15, 4 * self.k * self.k)
+
+    @property
+    def rank_error(self) -> float:
+        """估計的正規化等級誤差 (分位數位置的誤差比例)"""
+        return 1.7 / self.k
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _insert(self, level: int, values: np.ndarray) -> None:
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+        self.levels[level] = np.concatenate([self.levels[level], values])
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) <= self._capacity(level):
+                level += 1
+                continue
+            items = np.sort(self.levels[level])
+            # 奇數個項目時保留最後一個在原層
+            keep = items[len(items) - len(items) % 2:]
+            offset = int(self._rng.integers(2))
+            promoted = items[offset:len(items) - len(items) % 2:2]
+            self.levels[level] = keep
+            self._insert(level + 1, promoted)
+            # 層數增加後各層容量改變，從底層重新檢查
+            level = 0
+
+    def update(self, values) -> "KLLSketch":
+        """加入一批數值 (忽略缺值)"""
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return self
+        # 最小值會傳遞 NaN，只有在含缺值時才需要額外過濾
+        minimum = float(values.min())
+        if math.isnan(minimum):
+            values = values[~np.isnan(values)]
+            if values.size == 0:
+                return self
+            minimum = float(values.min())
+
+        self.n += values.size
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, float(values.max()))
+
+        level = 0
+        if values.size > 2 * self.bulk_sample_size:
+            level = int(math.log2(values.size / self.bulk_sample_size))
+            block = 1 << level
+            count = values.size // block
+            starts = np.arange(count) * block
+            sample = values[starts + self._rng.integers(0, block, size=count)]
+            remainder = values[count * block:]
+            self._insert(level, sample)
+            values = remainder
+        if values.size:
+            self._insert(0, values)
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """合併另一個草圖"""
+        if other.n == 0:
+            return self
+        for level, items in enumerate(other.levels):
+            if items.size:
+                self._insert(level, items)
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, probabilities: Sequence[float]) -> np.ndarray:
+        """
+        估計分位數
+
+        Args:
+            probabilities: 0 到 1 之間的機率
+
+        Returns:
+            各機率對應的估計值 (0 與 1 分別回傳最小值與最大值)
+        """
+        if self.n == 0:
+            raise ValueError("草圖中沒有資料")
+        probabilities = np.asarray(probabilities, dtype=float)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        targets = probabilities * cumulative[-1]
+        indices = np.clip(np.searchsorted(cumulative, targets, side="left"), 0, len(items) - 1)
+        result = items[indices]
+        result = np.where(probabilities <= 0, self.min, result)
+        return np.where(probabilities >= 1, self.max, result)
+
+    def percentiles(self, percentiles: Sequence[float]) -> np.ndarray:
+        """估計百分位數 (0 到 100)"""
+        return self.quantiles(np.asarray(percentiles, dtype=float) / 100.0)
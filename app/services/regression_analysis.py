@@ -1,161 +1,130 @@
-from typing import List
+from typing import List, Optional
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.metrics import r2_score
-from scipy import stats
-from app.models.response_models import RegressionResponse
+from app.models.response_models import CoefficientStatistics, RegressionResponse
+from app.services.field_selection import wants_field
+from app.services.ols import OLSFit, fit_ols, fit_ols_from_moments
+from app.services.result_cache import cached
+from app.services.streaming_stats import CovarianceAccumulator
+
+
+def _regression_response(
+    fit: OLSFit, include: Optional[List[str]], leading_coefficients: Optional[List[float]] = None
+) -> RegressionResponse:
+    """
+    由 OLS 結果建立回應
+
+    殘差與配適值保留為 NumPy 陣列 (model_construct 不逐元素驗證，由 FastJSONResponse 直接序列化；
+    欄位型別 FloatList 讓 model_dump 時轉為列表)
+    """
+    return RegressionResponse.model_construct(
+        coefficients=(leading_coefficients or []) + fit.slopes.tolist(),
+        intercept=fit.intercept,
+        r_squared=float(fit.r_squared),
+        adjusted_r_squared=float(fit.adjusted_r_squared),
+        f_statistic=float(fit.f_statistic),
+        p_value=fit.f_p_value,
+        residuals=fit.residuals if wants_field(include, "residuals") else None,
+        fitted_values=fit.fitted_values if wants_field(include, "fitted_values") else None,
+        coefficient_table=[CoefficientStatistics(**row) for row in fit.coefficient_table()],
+        confidence_level=fit.confidence_level,
+        degrees_of_freedom=fit.df_resid,
+        residual_standard_error=fit.residual_standard_error,
+        durbin_watson=fit.durbin_watson(),
+        condition_number=fit.condition_number,
+        warnings=fit.warnings(),
+    )
 
 
 class RegressionAnalysisService:
-    """迴歸分析服務類別"""
+    """
+    迴歸分析服務類別
+
+    三種迴歸都由 app/services/ols.py 的 QR 分解一次求得係數、標準誤、t/p 值、
+    信賴區間、配適度與殘差診斷，不需要 sklearn。
+    """
+
+    @cached
+    def linear_regression(
+        self,
+        x: List[float],
+        y: List[float],
+        include: Optional[List[str]] = None,
+        confidence_level: float = 0.95,
+    ) -> RegressionResponse:
+        """
+        執行簡單線性迴歸
 
-    def linear_regression(self, x: List[float], y: List[float]) -> RegressionResponse:
-        """執行簡單線性迴歸"""
+        include 列出要回傳的大型欄位 (residuals、fitted_values)，未指定時全部回傳
+        """
         try:
-            x_array = np.array(x).reshape(-1, 1)
-            y_array = np.array(y)
-
-            # 建立線性迴歸模型
-            model = LinearRegression()
-            model.fit(x_array, y_array)
-
-            # 預測值
-            y_pred = model.predict(x_array)
-
-            # 計算統計量
-            n = len(y)
-            coefficients = [float(model.coef_[0])]
-            intercept = float(model.intercept_)
-            r_squared = r2_score(y_array, y_pred)
-            adjusted_r_squared = 1 - (1 - r_squared) * (n - 1) / (n - 2)
-
-            # 計算 F 統計量
-            mse = np.mean((y_array - y_pred) ** 2)
-            if mse > 0:
-                f_statistic = r_squared * (n - 2) / ((1 - r_squared))
-                p_value = 1 - stats.f.cdf(f_statistic, 1, n - 2)
-            else:
-                f_statistic = float('inf')
-                p_value = 0.0
-
-            # 殘差
-            residuals = (y_array - y_pred).tolist()
-            fitted_values = y_pred.tolist()
-
-            return RegressionResponse(
-                coefficients=coefficients,
-                intercept=intercept,
-                r_squared=float(r_squared),
-                adjusted_r_squared=float(adjusted_r_squared),
-                f_statistic=float(f_statistic),
-                p_value=float(p_value),
-                residuals=residuals,
-                fitted_values=fitted_values,
-            )
+            x_array = np.asarray(x, dtype=float)
+            fit = fit_ols(x_array, y, terms=["x"], confidence_level=confidence_level)
+            return _regression_response(fit, include)
 
         except Exception as e:
             raise ValueError(f"線性迴歸計算失敗: {str(e)}")
 
+    @cached
     def multiple_regression(
-        self, x: List[List[float]], y: List[float]
+        self,
+        x: List[List[float]],
+        y: List[float],
+        include: Optional[List[str]] = None,
+        confidence_level: float = 0.95,
     ) -> RegressionResponse:
-        """執行多元線性迴歸"""
+        """
+        執行多元線性迴歸
+
+        include 列出要回傳的大型欄位 (residuals、fitted_values)，未指定時全部回傳
+        """
         try:
-            x_array = np.array(x)
-            y_array = np.array(y)
-
-            # 建立多元線性迴歸模型
-            model = LinearRegression()
-            model.fit(x_array, y_array)
-
-            # 預測值
-            y_pred = model.predict(x_array)
-
-            # 計算統計量
-            n, p = x_array.shape
-            coefficients = model.coef_.tolist()
-            intercept = float(model.intercept_)
-            r_squared = r2_score(y_array, y_pred)
-            adjusted_r_squared = 1 - (1 - r_squared) * (n - 1) / (n - p - 1)
-
-            # 計算 F 統計量
-            mse = np.mean((y_array - y_pred) ** 2)
-            if mse > 0:
-                f_statistic = r_squared * (n - p - 1) / ((1 - r_squared) * p)
-                p_value = 1 - stats.f.cdf(f_statistic, p, n - p - 1)
-            else:
-                f_statistic = float('inf')
-                p_value = 0.0
-
-            # 殘差
-            residuals = (y_array - y_pred).tolist()
-            fitted_values = y_pred.tolist()
-
-            return RegressionResponse(
-                coefficients=coefficients,
-                intercept=intercept,
-                r_squared=float(r_squared),
-                adjusted_r_squared=float(adjusted_r_squared),
-                f_statistic=float(f_statistic),
-                p_value=float(p_value),
-                residuals=residuals,
-                fitted_values=fitted_values,
-            )
+            x_array = np.asarray(x, dtype=float)
+            if x_array.ndim != 2:
+                raise ValueError("自變數必須為二維矩陣 (觀測值 × 自變數)")
+            fit = fit_ols(x_array, y, confidence_level=confidence_level)
+            return _regression_response(fit, include)
 
         except Exception as e:
             raise ValueError(f"多元迴歸計算失敗: {str(e)}")
 
+    @cached
     def polynomial_regression(
-        self, x: List[float], y: List[float], degree: int = 2
+        self,
+        x: List[float],
+        y: List[float],
+        degree: int = 2,
+        include: Optional[List[str]] = None,
+        confidence_level: float = 0.95,
     ) -> RegressionResponse:
-        """執行多項式迴歸"""
+        """
+        執行多項式迴歸
+
+        coefficients 第一個元素為常數項的位置 (固定為 0，常數項見 intercept)，
+        其後依序為 x, x², ... 的係數。
+
+        include 列出要回傳的大型欄位 (residuals、fitted_values)，未指定時全部回傳
+        """
         try:
-            x_array = np.array(x).reshape(-1, 1)
-            y_array = np.array(y)
-
-            # 建立多項式特徵
-            poly_features = PolynomialFeatures(degree=degree)
-            x_poly = poly_features.fit_transform(x_array)
-
-            # 建立線性迴歸模型（針對多項式特徵）
-            model = LinearRegression()
-            model.fit(x_poly, y_array)
-
-            # 預測值
-            y_pred = model.predict(x_poly)
-
-            # 計算統計量
-            n = len(y)
-            p = degree  # 多項式的項數
-            coefficients = model.coef_.tolist()
-            intercept = float(model.intercept_)
-            r_squared = r2_score(y_array, y_pred)
-            adjusted_r_squared = 1 - (1 - r_squared) * (n - 1) / (n - p - 1)
-
-            # 計算 F 統計量
-            mse = np.mean((y_array - y_pred) ** 2)
-            if mse > 0:
-                f_statistic = r_squared * (n - p - 1) / ((1 - r_squared) * p)
-                p_value = 1 - stats.f.cdf(f_statistic, p, n - p - 1)
-            else:
-                f_statistic = float('inf')
-                p_value = 0.0
-
-            # 殘差
-            residuals = (y_array - y_pred).tolist()
-            fitted_values = y_pred.tolist()
-
-            return RegressionResponse(
-                coefficients=coefficients,
-                intercept=intercept,
-                r_squared=float(r_squared),
-                adjusted_r_squared=float(adjusted_r_squared),
-                f_statistic=float(f_statistic),
-                p_value=float(p_value),
-                residuals=residuals,
-                fitted_values=fitted_values,
-            )
+            x_array = np.asarray(x, dtype=float)
+            features = x_array[:, None] ** np.arange(1, degree + 1)
+            terms = ["x"] + [f"x^{power}" for power in range(2, degree + 1)]
+            fit = fit_ols(features, y, terms=terms, confidence_level=confidence_level)
+            return _regression_response(fit, include, leading_coefficients=[0.0])
 
         except Exception as e:
             raise ValueError(f"多項式迴歸計算失敗: {str(e)}")
+
+    def session_regression(
+        self, moments: CovarianceAccumulator, terms: List[str], confidence_level: float = 0.95
+    ) -> RegressionResponse:
+        """
+        由增量迴歸工作階段累加的充分統計量求解多元線性迴歸
+
+        不保留個別資料列，因此回應不含殘差、配適值與 Durbin-Watson
+        """
+        try:
+            fit = fit_ols_from_moments(moments, terms=terms, confidence_level=confidence_level)
+            return _regression_response(fit, include=[])
+
+        except Exception as e:
+            raise ValueError(f"增量迴歸計算失敗: {str(e)}")
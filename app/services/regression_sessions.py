@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from app.models.response_models import RegressionSessionInfo, RegressionSessionState
+from app.services.streaming_stats import CovarianceAccumulator
+
+
+class RegressionSessionNotFoundError(KeyError):
+    """找不到指定的迴歸工作階段"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        super().__init__(session_id)
+
+    def __str__(self) -> str:
+        return f"找不到迴歸工作階段: {self.session_id}"
+
+
+def rows_moments(x: List[List[float]], y: List[float]) -> CovarianceAccumulator:
+    """一個資料列區塊 [x1, ..., xp, y] 的充分統計量 (模組層級函式，可交給行程池執行)"""
+    x_array = np.asarray(x, dtype=float)
+    y_array = np.asarray(y, dtype=float)
+    if x_array.ndim != 2:
+        raise ValueError("自變數必須為二維矩陣 (觀測值 × 自變數)")
+    if x_array.shape[0] != y_array.shape[0]:
+        raise ValueError(f"自變數有 {x_array.shape[0]} 筆觀測值，依變數有 {y_array.shape[0]} 筆")
+    rows = np.column_stack([x_array, y_array])
+    if not np.isfinite(rows).all():
+        raise ValueError("數據包含 NaN 或無限大")
+    return CovarianceAccumulator.from_rows(rows)
+
+
+class RegressionSession:
+    """
+    增量迴歸工作階段
+
+    只保存資料列 [x1, ..., xp, y] 的 CovarianceAccumulator (觀測數、平均數與離均差交叉乘積)，
+    記憶體與已加入的資料列數無關。
+    """
+
+    def __init__(self, session_id: str, terms: List[str]):
+        self.id = session_id
+        self.terms = terms
+        self.moments = CovarianceAccumulator(len(terms) + 1)
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.lock = threading.Lock()
+
+    @property
+    def n_features(self) -> int:
+        return len(self.terms)
+
+    def merge(self, moments: CovarianceAccumulator) -> None:
+        if moments.n_vars != self.moments.n_vars:
+            raise ValueError(f"工作階段有 {self.n_features} 個自變數，資料有 {moments.n_vars - 1} 個")
+        with self.lock:
+            self.moments.merge(moments)
+            self.updated_at = time.time()
+
+    def snapshot(self) -> CovarianceAccumulator:
+        """目前累加器的複本 (求解時不受同時加入的資料影響)"""
+        with self.lock:
+            return CovarianceAccumulator(self.moments.n_vars).merge(self.moments)
+
+    def info(self) -> RegressionSessionInfo:
+        return RegressionSessionInfo(
+            id=self.id,
+            terms=self.terms,
+            n_features=self.n_features,
+            n=self.moments.n,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+    def state(self) -> RegressionSessionState:
+        moments = self.snapshot()
+        return RegressionSessionState(
+            n_features=self.n_features,
+            n=moments.n,
+            mean=moments.mean.tolist(),
+            comoment=moments.comoment.tolist(),
+        )
+
+
+def moments_from_state(state: RegressionSessionState) -> CovarianceAccumulator:
+    """由匯出的充分統計量重建累加器 (用於合併其他 worker 的工作階段)"""
+    n_vars = state.n_features + 1
+    moments = CovarianceAccumulator(n_vars)
+    mean = np.asarray(state.mean, dtype=float)
+    comoment = np.asarray(state.comoment, dtype=float)
+    if mean.shape != (n_vars,) or comoment.shape != (n_vars, n_vars):
+        raise ValueError(f"充分統計量的維度與 {state.n_features} 個自變數不符")
+    if not (np.isfinite(mean).all() and np.isfinite(comoment).all()):
+        raise ValueError("充分統計量包含 NaN 或無限大")
+    if not np.allclose(comoment, comoment.T) or (np.diag(comoment) < 0).any():
+        raise ValueError("離均差交叉乘積矩陣必須對稱且對角線非負")
+    if state.n:
+        moments.n, moments.mean, moments.comoment = state.n, mean, comoment
+    return moments
+
+
+class RegressionSessionStore:
+    """
+    增量迴歸工作階段登錄表
+
+    依最近使用 (LRU) 順序淘汰，並淘汰閒置超過 ttl 秒的工作階段。
+    """
+
+    def __init__(self, max_sessions: int = 256, ttl: float = 3600.0):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, RegressionSession]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "RegressionSessionStore":
+        """
+        從環境變數建立工作階段登錄表
+
+        - SFDA_REGRESSION_SESSION_MAX_COUNT: 工作階段數量上限
+        - SFDA_REGRESSION_SESSION_TTL: 閒置多少秒後淘汰
+        """
+        return cls(
+            max_sessions=int(os.environ.get("SFDA_REGRESSION_SESSION_MAX_COUNT", 256)),
+            ttl=float(os.environ.get("SFDA_REGRESSION_SESSION_TTL", 3600)),
+        )
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl
+        for session_id in [key for key, session in self._sessions.items() if session.updated_at < cutoff]:
+            del self._sessions[session_id]
+
+    def create(self, n_features: int, terms: Optional[List[str]] = None) -> RegressionSession:
+        if terms is not None and len(terms) != n_features:
+            raise ValueError(f"terms 有 {len(terms)} 個名稱，自變數有 {n_features} 個")
+        session = RegressionSession(uuid.uuid4().hex, terms or [f"x{i + 1}" for i in range(n_features)])
+        with self._lock:
+            self._expire()
+            self._sessions[session.id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: str) -> RegressionSession:
+        """取得工作階段並標記為最近使用"""
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise RegressionSessionNotFoundError(session_id)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            if self._sessions.pop(session_id, None) is None:
+                raise RegressionSessionNotFoundError(session_id)
+
+
+# 全域迴歸工作階段登錄表
+regression_sessions = RegressionSessionStore.from_env()
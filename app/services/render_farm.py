@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+
+# 繪圖行程內的圖表服務，由 _init_worker 建立
+_worker_service = None
+
+
+def _init_worker() -> None:
+    """
+    繪圖行程初始化
+
+    載入 Agg 後端、解析中文字體並套用 seaborn 樣式，
+    再繪製一張小圖預熱字體快取，讓第一個請求不必負擔這些成本。
+    """
+    global _worker_service
+    from app.services.chart_service import ChartService
+
+    _worker_service = ChartService()
+    _worker_service.render_chart_bytes(
+        chart_type="bar",
+        data=[{"label": "預熱", "value": 1.0}],
+        title="預熱",
+        figsize=(2, 2),
+        dpi=50,
+    )
+
+
+def _render(spec: Dict[str, Any]) -> bytes:
+    """在繪圖行程中依圖表規格繪圖並回傳編碼後的圖片位元組"""
+    return _worker_service.render_chart_bytes(**spec)
+
+
+def _ping() -> int:
+    """預熱用的空任務"""
+    return os.getpid()
+
+
+class RenderFarm:
+    """
+    繪圖行程池
+
+    每個行程各自持有已初始化的 matplotlib/Agg 與中文字體設定，
+    接收精簡的圖表規格 (dict) 並回傳編碼後的圖片位元組，
+    讓多張圖表能在多核心上平行繪製而不會共用 matplotlib 的全域狀態。
+    """
+
+    def __init__(self, workers: int, timeout: float = 60.0):
+        self.workers = workers
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> "RenderFarm":
+        """
+        從環境變數建立繪圖行程池
+
+        - SFDA_RENDER_WORKERS: 繪圖行程數，設為 0 時於呼叫端行程內繪圖
+        - SFDA_RENDER_TIMEOUT: 單張圖表繪製逾時秒數
+        """
+        default_workers = min(4, os.cpu_count() or 1)
+        return cls(
+            workers=int(os.environ.get("SFDA_RENDER_WORKERS", default_workers)),
+            timeout=float(os.environ.get("SFDA_RENDER_TIMEOUT", 60)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _reset(self) -> None:
+        """繪圖行程異常終止後丟棄行程池，下次呼叫時重建"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def start(self) -> None:
+        """啟動並預熱所有繪圖行程"""
+        if not self.enabled:
+            return
+        executor = self._get_executor()
+        futures = [executor.submit(_ping) for _ in range(self.workers)]
+        for future in futures:
+            future.result(timeout=self.timeout)
+
+    def render(self, spec: Dict[str, Any]) -> bytes:
+        """
+        繪製圖表
+
+        Args:
+            spec: 圖表規格，欄位與 ChartService.render_chart_bytes 的參數相同
+
+        Returns:
+            編碼後的圖片位元組
+        """
+        try:
+            return self._get_executor().submit(_render, spec).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            self._reset()
+            raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        """關閉繪圖行程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# 全域繪圖行程池，所有 ChartService 共用
+render_farm = RenderFarm.from_env()
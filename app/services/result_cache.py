@@ -0,0 +1,362 @@
+import functools
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+
+# 快取未命中時的回傳值 (結果本身可能為 None)
+MISS = object()
+
+
+def _code_version() -> str:
+    """
+    程式碼版本：app 套件所有 .py 檔內容的雜湊，加上 SFDA_CACHE_SALT
+
+    加入快取鍵後，部署新版程式碼時磁碟層不會回傳舊程式碼算出的結果
+    """
+    hasher = hashlib.blake2b(digest_size=8)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                path = os.path.join(dirpath, filename)
+                hasher.update(os.path.relpath(path, root).encode())
+                with open(path, "rb") as f:
+                    hasher.update(f.read())
+    hasher.update(os.environ.get("SFDA_CACHE_SALT", "").encode())
+    return hasher.hexdigest()
+
+
+CODE_VERSION = _code_version()
+
+
+class UncacheableError(TypeError):
+    """參數無法產生快取鍵"""
+
+
+def _feed(hasher, value: Any) -> None:
+    """將參數以固定格式寫入雜湊，數值列表與 NumPy 陣列產生相同的鍵"""
+    if isinstance(value, np.ndarray) and value.dtype.kind in "fiu":
+        array = np.ascontiguousarray(value, dtype=np.float64)
+        hasher.update(b"a%d:%r" % (array.ndim, array.shape))
+        hasher.update(array.data)
+    elif isinstance(value, (list, tuple)):
+        array = None
+        if value and not isinstance(value[0], (str, bool, dict, BaseModel)):
+            try:
+                array = np.asarray(value)
+            except ValueError:
+                # 長度不一的巢狀列表 (如 groups)
+                array = None
+        if array is not None and array.dtype.kind in "fiu":
+            _feed(hasher, array)
+        else:
+            hasher.update(b"l%d[" % len(value))
+            for item in value:
+                _feed(hasher, item)
+            hasher.update(b"]")
+    elif isinstance(value, dict):
+        hasher.update(b"d%d{" % len(value))
+        for name in sorted(value, key=str):
+            _feed(hasher, str(name))
+            _feed(hasher, value[name])
+        hasher.update(b"}")
+    elif isinstance(value, BaseModel):
+        _feed(hasher, value.model_dump())
+    elif value is None or isinstance(value, (bool, int, float, str, np.generic)):
+        hasher.update(type(value).__name__.encode())
+        hasher.update(repr(value).encode())
+    else:
+        raise UncacheableError(f"無法為 {type(value).__name__} 產生快取鍵")
+
+
+def make_key(name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    """
+    產生快取鍵
+
+    以 BLAKE2b 雜湊程式碼版本、函式名稱、解碼後的數值陣列 (float64 位元組) 與其餘參數，
+    JSON 列表與二進位請求解碼的 NumPy 陣列會得到相同的鍵。
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(CODE_VERSION.encode())
+    hasher.update(name.encode())
+    _feed(hasher, list(args))
+    _feed(hasher, kwargs)
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    內容定址的計算結果快取
+
+    統計服務的結果只取決於輸入，因此以輸入內容的雜湊值作為鍵保存結果。
+    結果以 pickle 位元組保存，每次取出都是新的物件，呼叫端修改結果不會影響快取；
+    記憶體層依最近最少使用 (LRU) 順序淘汰並限制總位元組數，另可啟用磁碟層，
+    讓多個 worker 或重新啟動後仍能共用結果。
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 << 20,
+        ttl: float = 600.0,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 1 << 30,
+        enabled: bool = True,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._disk_writes = 0
+        self._by_name: Dict[str, Dict[str, int]] = {}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """
+        從環境變數建立快取
+
+        - SFDA_CACHE_ENABLED: 設為 0 時停用快取
+        - SFDA_CACHE_MAX_BYTES: 記憶體層位元組上限
+        - SFDA_CACHE_TTL: 結果保存秒數
+        - SFDA_CACHE_DIR: 磁碟層目錄，未設定時不使用磁碟層
+        - SFDA_CACHE_DISK_MAX_BYTES: 磁碟層位元組上限
+        - SFDA_CACHE_SALT: 加入快取鍵的字串 (程式碼以外的變更需要讓舊結果失效時使用)
+        """
+        return cls(
+            max_bytes=int(os.environ.get("SFDA_CACHE_MAX_BYTES", 256 << 20)),
+            ttl=float(os.environ.get("SFDA_CACHE_TTL", 600)),
+            disk_dir=os.environ.get("SFDA_CACHE_DIR") or None,
+            disk_max_bytes=int(os.environ.get("SFDA_CACHE_DISK_MAX_BYTES", 1 << 30)),
+            enabled=os.environ.get("SFDA_CACHE_ENABLED", "1") != "0",
+        )
+
+    def _count(self, name: str, field: str) -> None:
+        counts = self._by_name.setdefault(name, {"hits": 0, "misses": 0})
+        counts[field] += 1
+
+    def get(self, name: str, key: str) -> Any:
+        """取得快取結果，未命中時回傳 MISS"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    self._count(name, "hits")
+                    return pickle.loads(payload)
+                del self._entries[key]
+                self._bytes -= len(payload)
+
+        payload = self._read_disk(key, now)
+        with self._lock:
+            if payload is None:
+                self._misses += 1
+                self._count(name, "misses")
+                return MISS
+            self._disk_hits += 1
+            self._count(name, "hits")
+            self._store(key, payload, now)
+        return pickle.loads(payload)
+
+    def put(self, key: str, value: Any) -> None:
+        """保存結果"""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store(key, payload, time.time())
+        self._write_disk(key, payload)
+
+    def _store(self, key: str, payload: bytes, now: float) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous[1])
+        self._entries[key] = (now + self.ttl, payload)
+        self._bytes += len(payload)
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self._evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _read_disk(self, key: str, now: float) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl <= now:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, payload: bytes) -> None:
+        if not self.disk_dir or len(payload) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % 64 == 0
+        if prune:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """刪除過期檔案，並在超過上限時由最舊的檔案開始刪除"""
+        now = time.time()
+        files = []
+        total = 0
+        for entry in os.scandir(self.disk_dir):
+            if not entry.name.endswith(".pkl"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if stat.st_mtime + self.ttl <= now:
+                self._remove_file(entry.path)
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            self._remove_file(path)
+            total -= size
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def call(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        when: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """查詢快取，未命中時執行函式並保存結果 (when 回傳 False 時不保存)"""
+        key = self.key_for(name, args, kwargs)
+        if key is None:
+            return func(*args, **kwargs)
+        result = self.get(name, key)
+        if result is MISS:
+            result = func(*args, **kwargs)
+            if when is None or when(result):
+                self.put(key, result)
+        return result
+
+    def lookup(self, name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Optional[str], Any]:
+        """產生快取鍵並查詢結果，回傳 (鍵, 結果或 MISS)；無法快取時鍵為 None"""
+        key = self.key_for(name, args, kwargs)
+        if key is None:
+            return None, MISS
+        return key, self.get(name, key)
+
+    def key_for(self, name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[str]:
+        """產生快取鍵；快取停用或參數無法雜湊時回傳 None"""
+        if not self.enabled:
+            return None
+        try:
+            return make_key(name, args, kwargs)
+        except UncacheableError:
+            return None
+
+    def clear(self) -> None:
+        """清除記憶體層與磁碟層"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk_dir:
+            for entry in os.scandir(self.disk_dir):
+                if entry.name.endswith(".pkl"):
+                    self._remove_file(entry.path)
+
+    def stats(self) -> Dict[str, Any]:
+        """回傳命中率與使用量"""
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "disk_dir": self.disk_dir,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits + self._disk_hits) / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "by_function": {name: dict(counts) for name, counts in self._by_name.items()},
+            }
+
+
+# 全域結果快取
+result_cache = ResultCache.from_env()
+
+
+def _default_cacheable(result: Any) -> bool:
+    """回應模型中 success 為 False 的結果不保存"""
+    return getattr(result, "success", True) is not False
+
+
+def cached(func: Optional[Callable[..., Any]] = None, *, when: Callable[[Any], bool] = _default_cacheable):
+    """
+    服務方法的結果快取裝飾器
+
+    以方法的完整名稱加上參數內容作為快取鍵 (不含 self)，`when` 判斷結果是否值得保存。
+    透過 compute_pool 呼叫時會在派送前查詢快取，命中時不佔用執行器。
+    """
+    if func is None:
+        return functools.partial(cached, when=when)
+
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return result_cache.call(name, functools.partial(func, self), args, kwargs, when)
+
+    wrapper.__cache_name__ = name
+    wrapper.__cache_when__ = when
+    return wrapper
+
+
+def call_uncached(instance: Any, method_name: str, *args, **kwargs) -> Any:
+    """略過快取直接執行服務方法 (模組層級函式，可交給行程池執行)"""
+    method = getattr(type(instance), method_name)
+    return method.__wrapped__(instance, *args, **kwargs)
@@ -0,0 +1,337 @@
+import csv
+import io
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.lazy_imports import lazy_module
+from app.services.quantiles import DEFAULT_SKETCH_K, KLLSketch
+
+pd = lazy_module("pandas")
+stats = lazy_module("scipy.stats")
+
+
+# 串流格式
+STREAM_CSV = "csv"
+STREAM_FLOAT64 = "float64"
+
+# 交給計算執行器的區塊大小 (位元組)
+DEFAULT_BLOCK_BYTES = 4 << 20
+
+
+class CovarianceAccumulator:
+    """
+    可合併的平均數與交叉乘積累加器
+
+    只保存觀測數 n、平均數向量與離均差交叉乘積矩陣 (p × p)，記憶體與資料列數無關。
+    每個區塊先以矩陣乘法計算區塊內的統計量，再以 Chan 等人的成對合併公式併入：
+
+        δ = mean_b - mean_a
+        M = M_a + M_b + δ δᵀ · n_a n_b / n
+
+    相較於累加原始的 Σx 與 Σxxᵀ，此做法不會因大量資料相減而損失精度，
+    且區塊可在不同執行緒或行程中計算後再合併。
+    """
+
+    def __init__(self, n_vars: int):
+        self.n = 0
+        self.mean = np.zeros(n_vars)
+        self.comoment = np.zeros((n_vars, n_vars))
+
+    @property
+    def n_vars(self) -> int:
+        return self.mean.shape[0]
+
+    @classmethod
+    def from_rows(cls, rows: np.ndarray) -> "CovarianceAccumulator":
+        """由一個區塊 (列為觀測值、行為變數) 建立累加器"""
+        rows = np.asarray(rows, dtype=float)
+        accumulator = cls(rows.shape[1])
+        if rows.shape[0]:
+            accumulator.n = rows.shape[0]
+            accumulator.mean = rows.mean(axis=0)
+            centered = rows - accumulator.mean
+            accumulator.comoment = centered.T @ centered
+        return accumulator
+
+    def update(self, rows: np.ndarray) -> "CovarianceAccumulator":
+        """併入一個區塊"""
+        return self.merge(CovarianceAccumulator.from_rows(rows))
+
+    def merge(self, other: "CovarianceAccumulator") -> "CovarianceAccumulator":
+        """併入另一個累加器 (結果與依序處理所有資料相同)"""
+        if other.n_vars != self.n_vars:
+            raise ValueError(f"變數數量不一致: {self.n_vars} 與 {other.n_vars}")
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.comoment = other.n, other.mean.copy(), other.comoment.copy()
+            return self
+
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.n * other.n / n)
+        self.mean = self.mean + delta * (other.n / n)
+        self.n = n
+        return self
+
+    def covariance(self, ddof: int = 1) -> np.ndarray:
+        if self.n <= ddof:
+            raise ValueError("觀測值數量不足")
+        return self.comoment / (self.n - ddof)
+
+    def correlation(self) -> np.ndarray:
+        """Pearson 相關矩陣"""
+        if self.n < 2:
+            raise ValueError("至少需要 2 筆觀測值")
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = self.comoment / np.outer(scale, scale)
+        correlation = np.clip(correlation, -1.0, 1.0)
+        np.fill_diagonal(correlation, 1.0)
+        return correlation
+
+
+class MomentAccumulator:
+    """
+    可合併的單變數動差累加器
+
+    一次走訪即取得觀測數、平均數、二至四階中心動差總和 (M2, M3, M4) 與最小/最大值，
+    區塊間以 Pébay 的成對合併公式合併 (Welford 演算法的推廣)，記憶體固定。
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> "MomentAccumulator":
+        """由一個區塊建立累加器"""
+        values = np.asarray(values, dtype=float).ravel()
+        accumulator = cls()
+        if values.size:
+            accumulator.n = values.size
+            accumulator.mean = float(values.mean())
+            centered = values - accumulator.mean
+            squared = centered * centered
+            accumulator.m2 = float(squared.sum())
+            accumulator.m3 = float(np.dot(squared, centered))
+            accumulator.m4 = float(np.dot(squared, squared))
+            accumulator.min = float(values.min())
+            accumulator.max = float(values.max())
+        return accumulator
+
+    def update(self, values: np.ndarray) -> "MomentAccumulator":
+        """併入一個區塊"""
+        return self.merge(MomentAccumulator.from_values(values))
+
+    def merge(self, other: "MomentAccumulator") -> "MomentAccumulator":
+        """併入另一個累加器 (結果與依序處理所有資料相同)"""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        n_a, n_b = self.n, other.n
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term = delta * delta_n * n_a * n_b
+
+        m4 = (
+            self.m4 + other.m4
+            + term * delta_n2 * (n_a * n_a - n_a * n_b + n_b * n_b)
+            + 6.0 * delta_n2 * (n_a * n_a * other.m2 + n_b * n_b * self.m2)
+            + 4.0 * delta_n * (n_a * other.m3 - n_b * self.m3)
+        )
+        m3 = (
+            self.m3 + other.m3
+            + term * delta_n * (n_a - n_b)
+            + 3.0 * delta_n * (n_a * other.m2 - n_b * self.m2)
+        )
+        self.m2 = self.m2 + other.m2 + term
+        self.m3 = m3
+        self.m4 = m4
+        self.mean = self.mean + delta_n * n_b
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def variance(self, ddof: int = 1) -> float:
+        return self.m2 / (self.n - ddof) if self.n > ddof else 0.0
+
+    def skewness(self) -> float:
+        """偏度 (與 scipy.stats.skew 相同，未校正偏誤)"""
+        if self.m2 == 0:
+            return float("nan")
+        return float(np.sqrt(self.n) * self.m3 / self.m2 ** 1.5)
+
+    def kurtosis(self) -> float:
+        """超額峰度 (與 scipy.stats.kurtosis 相同，Fisher 定義、未校正偏誤)"""
+        if self.m2 == 0:
+            return float("nan")
+        return float(self.n * self.m4 / (self.m2 * self.m2) - 3.0)
+
+    def normality_test(self) -> Tuple[float, float]:
+        """
+        D'Agostino-Pearson K² 常態性檢定
+
+        只需要偏度、峰度與樣本數，因此可由串流動差計算 (與 scipy.stats.normaltest 相同)
+
+        Returns:
+            (K² 統計量, p 值)
+        """
+        n = float(self.n)
+        if n < 8:
+            raise ValueError("D'Agostino K² 檢定至少需要 8 個數值")
+
+        # 偏度檢定
+        y = self.skewness() * np.sqrt(((n + 1) * (n + 3)) / (6.0 * (n - 2)))
+        beta2 = (3.0 * (n * n + 27 * n - 70) * (n + 1) * (n + 3)) / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9))
+        w2 = -1 + np.sqrt(2 * (beta2 - 1))
+        delta = 1 / np.sqrt(0.5 * np.log(w2))
+        alpha = np.sqrt(2.0 / (w2 - 1))
+        y = 1.0 if y == 0 else y
+        z_skew = delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+
+        # 峰度檢定
+        b2 = self.kurtosis() + 3.0
+        expected = 3.0 * (n - 1) / (n + 1)
+        variance_b2 = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) * (n + 1.0) * (n + 3) * (n + 5))
+        x = (b2 - expected) / np.sqrt(variance_b2)
+        sqrt_beta1 = 6.0 * (n * n - 5 * n + 2) / ((n + 7) * (n + 9.0)) * np.sqrt(
+            (6.0 * (n + 3) * (n + 5)) / (n * (n - 2) * (n - 3))
+        )
+        a = 6.0 + 8.0 / sqrt_beta1 * (2.0 / sqrt_beta1 + np.sqrt(1 + 4.0 / (sqrt_beta1 ** 2)))
+        term1 = 1 - 2 / (9.0 * a)
+        denom = 1 + x * np.sqrt(2 / (a - 4.0))
+        term2 = np.sign(denom) * ((1 - 2.0 / a) / np.abs(denom)) ** (1 / 3.0) if denom != 0 else np.nan
+        z_kurt = (term1 - term2) / np.sqrt(2 / (9.0 * a))
+
+        k2 = float(z_skew ** 2 + z_kurt ** 2)
+        return k2, float(stats.chi2.sf(k2, 2))
+
+
+class ColumnSummary:
+    """
+    單一欄位的串流摘要：動差累加器加上分位數草圖
+
+    兩者都可合併，因此同一次走訪即可取得平均數、變異數、偏度、峰度與估計的中位數/百分位數。
+    """
+
+    def __init__(self, sketch_k: int = DEFAULT_SKETCH_K):
+        self.moments = MomentAccumulator()
+        self.sketch = KLLSketch(sketch_k)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, sketch_k: int = DEFAULT_SKETCH_K) -> "ColumnSummary":
+        summary = cls(sketch_k)
+        summary.moments = MomentAccumulator.from_values(values)
+        summary.sketch.update(values)
+        return summary
+
+    def merge(self, other: "ColumnSummary") -> "ColumnSummary":
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        return self
+
+
+class RowBlockReader:
+    """
+    將位元組串流切成只含完整資料列的區塊
+
+    - csv: 第一列為欄位名稱，區塊在換行處切開
+    - float64: little-endian float64 依列排列 (每列 n_cols 個值)，區塊依列長度對齊
+    """
+
+    def __init__(self, fmt: str, n_cols: Optional[int] = None, block_bytes: int = DEFAULT_BLOCK_BYTES):
+        if fmt not in (STREAM_CSV, STREAM_FLOAT64):
+            raise ValueError(f"不支援的串流格式: {fmt}")
+        if fmt == STREAM_FLOAT64 and not n_cols:
+            raise ValueError("float64 串流必須指定欄位數")
+        self.fmt = fmt
+        self.block_bytes = block_bytes
+        self.row_bytes = 8 * n_cols if n_cols else 0
+        self.header: Optional[List[str]] = None
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """加入資料，回傳已湊滿的完整區塊"""
+        self._buffer += data
+        if self.fmt == STREAM_CSV and self.header is None:
+            newline = self._buffer.find(b"\n")
+            if newline < 0:
+                return []
+            header = bytes(self._buffer[:newline]).decode("utf-8-sig").strip()
+            # 與資料區塊 (pd.read_csv) 相同的 CSV 引號規則，欄位名稱可含逗號
+            self.header = [name.strip() for name in next(csv.reader([header]), [])]
+            del self._buffer[:newline + 1]
+
+        if len(self._buffer) < self.block_bytes:
+            return []
+        if self.fmt == STREAM_CSV:
+            cut = self._buffer.rfind(b"\n") + 1
+        else:
+            cut = len(self._buffer) - len(self._buffer) % self.row_bytes
+        if cut <= 0:
+            return []
+        block = bytes(self._buffer[:cut])
+        del self._buffer[:cut]
+        return [block]
+
+    def finish(self) -> Optional[bytes]:
+        """串流結束時取得剩餘資料"""
+        if self.fmt == STREAM_CSV and self.header is None:
+            raise ValueError("CSV 串流缺少欄位名稱列")
+        if self.fmt == STREAM_FLOAT64 and len(self._buffer) % self.row_bytes:
+            raise ValueError("float64 串流長度不是完整資料列的整數倍")
+        block = bytes(self._buffer) if self._buffer.strip() else None
+        self._buffer = bytearray()
+        return block
+
+
+def parse_block(block: bytes, fmt: str, names: Sequence[str], usecols: Sequence[str]) -> np.ndarray:
+    """
+    解析區塊為 float64 矩陣 (列為觀測值)
+
+    兩種格式中，所選欄位含缺值 (NaN) 或無限大的資料列都會被略過 (成列刪除)。
+    """
+    if fmt == STREAM_FLOAT64:
+        rows = np.frombuffer(block, dtype="<f8").reshape(-1, len(names))
+        indices = [list(names).index(name) for name in usecols]
+        if len(indices) != len(names):
+            rows = rows[:, indices]
+    else:
+        frame = pd.read_csv(io.BytesIO(block), header=None, names=list(names), usecols=list(usecols))
+        rows = frame[list(usecols)].to_numpy(dtype=float)
+    finite = np.isfinite(rows).all(axis=1)
+    return rows if finite.all() else rows[finite]
+
+
+def covariance_from_block(
+    block: bytes, fmt: str, names: Sequence[str], usecols: Sequence[str]
+) -> CovarianceAccumulator:
+    """解析區塊並計算其交叉乘積統計量 (模組層級函式，可交給行程池執行)"""
+    return CovarianceAccumulator.from_rows(parse_block(block, fmt, names, usecols))
+
+
+def moments_from_block(
+    block: bytes, fmt: str, names: Sequence[str], usecols: Sequence[str]
+) -> MomentAccumulator:
+    """解析區塊並計算單一欄位的動差 (模組層級函式，可交給行程池執行)"""
+    return MomentAccumulator.from_values(parse_block(block, fmt, names, usecols)[:, 0])
+
+
+def summary_from_block(
+    block: bytes, fmt: str, names: Sequence[str], usecols: Sequence[str], sketch_k: int = DEFAULT_SKETCH_K
+) -> ColumnSummary:
+    """解析區塊並計算單一欄位的動差與分位數草圖 (模組層級函式，可交給行程池執行)"""
+    return ColumnSummary.from_values(parse_block(block, fmt, names, usecols)[:, 0], sketch_k)
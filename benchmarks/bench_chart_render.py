@@ -0,0 +1,153 @@
+"""
+圖表繪製效能測試
+
+比較各種繪製方式的單張圖表延遲 (中位數，毫秒)：
+
+- pyplot: 舊版做法，plt.subplots + plt.tight_layout + plt.savefig(bbox_inches='tight')
+- oo_tight: 物件導向 API (Figure + FigureCanvasAgg)，tight 版面
+- oo_fixed: 物件導向 API，固定版面只繪製一次
+- reuse: 依 (figsize, dpi) 重複使用 Figure，以 ax.clear() 清除後重繪 (tight 版面)
+
+執行方式:
+    python benchmarks/bench_chart_render.py --repeat 30
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.chart_service import (  # noqa: E402
+    LAYOUT_FIXED,
+    LAYOUT_TIGHT,
+    ChartService,
+    backend_agg,
+    configure_matplotlib,
+    mpl_figure,
+)
+
+FIGSIZE = (10, 6)
+DPI = 100
+
+
+def sample_charts():
+    """各圖表類型的測試資料 (與 API 產生的圖表資料格式相同)"""
+    rng = np.random.default_rng(0)
+    categories = [{"label": f"類別{i}", "value": float(v)} for i, v in enumerate(rng.uniform(10, 100, 12))]
+    values = rng.normal(50, 10, 1000)
+    counts, edges = np.histogram(values, bins=20)
+    x = rng.normal(0, 1, 500)
+    y = 2 * x + rng.normal(0, 1, 500)
+    boxes = []
+    for g in range(4):
+        group = rng.normal(50 + g * 5, 10, 200)
+        q1, median, q3 = np.percentile(group, [25, 50, 75])
+        boxes.append({
+            "group": f"組別{g + 1}", "median": median, "q1": q1, "q3": q3,
+            "lower_whisker": q1 - 1.5 * (q3 - q1), "upper_whisker": q3 + 1.5 * (q3 - q1), "outliers": [],
+        })
+    return {
+        "bar": (categories, {"x_axis_label": "類別", "y_axis_label": "數值"}),
+        "line": (categories, {"x_axis_label": "時間", "y_axis_label": "數值"}),
+        "pie": (categories[:6], None),
+        "histogram": (
+            [
+                {"bin_start": float(edges[i]), "bin_end": float(edges[i + 1]),
+                 "bin_center": float((edges[i] + edges[i + 1]) / 2), "count": int(c)}
+                for i, c in enumerate(counts)
+            ],
+            {"bins": 20, "mean": float(values.mean()), "std": float(values.std()), "x_axis_label": "數值", "y_axis_label": "頻率"},
+        ),
+        "boxplot": (boxes, {"y_axis_label": "數值"}),
+        "scatter": (
+            [{"x": float(a), "y": float(b)} for a, b in zip(x, y)],
+            {"x_axis_label": "X", "y_axis_label": "Y"},
+        ),
+    }
+
+
+def _draw(service, ax, chart_type, data, metadata):
+    if chart_type == "pie":
+        service._create_pie_chart_image(ax, data, "效能測試")
+    else:
+        getattr(service, {
+            "bar": "_create_bar_chart_image",
+            "line": "_create_line_chart_image",
+            "histogram": "_create_histogram_image",
+            "boxplot": "_create_boxplot_image",
+            "scatter": "_create_scatter_image",
+        }[chart_type])(ax, data, "效能測試", metadata)
+
+
+def render_pyplot(service, chart_type, data, metadata):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=FIGSIZE, dpi=DPI)
+    try:
+        _draw(service, ax, chart_type, data, metadata)
+        plt.tight_layout()
+        buffer = io.BytesIO()
+        plt.savefig(buffer, format="png", bbox_inches="tight", facecolor="white", edgecolor="none")
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+_reused = {}
+
+
+def render_reuse(service, chart_type, data, metadata):
+    key = (FIGSIZE, DPI)
+    if key not in _reused:
+        fig = mpl_figure.Figure(figsize=FIGSIZE, dpi=DPI)
+        backend_agg.FigureCanvasAgg(fig)
+        _reused[key] = (fig, fig.add_subplot())
+    fig, ax = _reused[key]
+    ax.clear()
+    _draw(service, ax, chart_type, data, metadata)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", facecolor="white", edgecolor="none")
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="圖表繪製效能測試")
+    parser.add_argument("--repeat", type=int, default=20, help="每種組合重複次數")
+    parser.add_argument("--types", default="bar,line,pie,histogram,boxplot,scatter", help="圖表類型 (逗號分隔)")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    service = ChartService()
+    configure_matplotlib()
+    charts = sample_charts()
+    methods = {
+        "pyplot": lambda t, d, m: render_pyplot(service, t, d, m),
+        "oo_tight": lambda t, d, m: service.render_chart_bytes(t, d, "效能測試", m, FIGSIZE, DPI, "png", LAYOUT_TIGHT),
+        "oo_fixed": lambda t, d, m: service.render_chart_bytes(t, d, "效能測試", m, FIGSIZE, DPI, "png", LAYOUT_FIXED),
+        "reuse": lambda t, d, m: render_reuse(service, t, d, m),
+    }
+
+    print(f"{'圖表':<10}" + "".join(f"{name:>12}" for name in methods))
+    for chart_type in args.types.split(","):
+        data, metadata = charts[chart_type]
+        row = []
+        for render in methods.values():
+            render(chart_type, data, metadata)  # 預熱
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                render(chart_type, data, metadata)
+                timings.append((time.perf_counter() - started) * 1000)
+            row.append(statistics.median(timings))
+        print(f"{chart_type:<10}" + "".join(f"{ms:>10.1f}ms" for ms in row))
+
+
+if __name__ == "__main__":
+    main()
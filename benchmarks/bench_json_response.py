@@ -0,0 +1,99 @@
+"""
+JSON 回應序列化效能測試
+
+比較大型數值結果從服務結果到 HTTP 回應本體的耗時 (中位數，毫秒)：
+
+- response_model: 舊版做法，.tolist() 後建立 Pydantic 模型，端點回傳模型，
+  FastAPI 依 response_model 驗證、序列化後以標準函式庫 json 輸出
+- fast_json: 結果以 model_construct 保留 NumPy 陣列，端點直接回傳 FastJSONResponse (orjson)
+
+測試資料為 100 萬筆殘差的簡單線性迴歸與 300 × 300 的相關矩陣。
+
+執行方式:
+    python benchmarks/bench_json_response.py --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.api.fast_json import FastJSONResponse, orjson  # noqa: E402
+from app.models.response_models import CorrelationMatrixResponse, RegressionResponse  # noqa: E402
+
+
+def sample_results(n: int, p: int):
+    """迴歸與相關矩陣的計算結果 (只測量回應的建立與序列化，不含計算本身)"""
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=n)
+    y = 2 * x + rng.normal(size=n)
+    slope, intercept = np.polyfit(x, y, 1)
+    fitted = slope * x + intercept
+    regression = {
+        "coefficients": [float(slope)],
+        "intercept": float(intercept),
+        "r_squared": 0.8,
+        "adjusted_r_squared": 0.8,
+        "f_statistic": 1234.5,
+        "p_value": 0.0,
+        "residuals": y - fitted,
+        "fitted_values": fitted,
+    }
+    correlation = np.corrcoef(rng.normal(size=(p, 200)))
+    matrix = {
+        "correlation_matrix": correlation,
+        "p_values_matrix": np.abs(correlation),
+        "columns": [f"v{i}" for i in range(p)],
+        "method": "pearson",
+    }
+    return {
+        "regression": (RegressionResponse, regression),
+        "correlation_matrix": (CorrelationMatrixResponse, matrix),
+    }
+
+
+def via_response_model(model, fields) -> bytes:
+    content = model(**{name: value.tolist() if isinstance(value, np.ndarray) else value for name, value in fields.items()})
+    field = create_response_field(name="response", type_=model)
+    serialized = asyncio.run(serialize_response(field=field, response_content=content))
+    return JSONResponse(serialized).body
+
+
+def via_fast_json(model, fields) -> bytes:
+    return FastJSONResponse(model.model_construct(**fields)).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 回應序列化效能測試")
+    parser.add_argument("--repeat", type=int, default=5, help="每種組合重複次數")
+    parser.add_argument("--n", type=int, default=1_000_000, help="迴歸的資料筆數")
+    parser.add_argument("--p", type=int, default=300, help="相關矩陣的變數數")
+    args = parser.parse_args()
+
+    methods = {"response_model": via_response_model, "fast_json": via_fast_json}
+    print(f"orjson: {'已安裝' if orjson is not None else '未安裝 (使用標準函式庫)'}")
+    print(f"{'結果':<20}" + "".join(f"{name:>16}" for name in methods) + f"{'大小':>12}")
+    for name, (model, fields) in sample_results(args.n, args.p).items():
+        row = []
+        for serialize in methods.values():
+            body = serialize(model, fields)  # 預熱
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                serialize(model, fields)
+                timings.append((time.perf_counter() - started) * 1000)
+            row.append(statistics.median(timings))
+        print(f"{name:<20}" + "".join(f"{ms:>14.1f}ms" for ms in row) + f"{len(body) / 1e6:>10.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
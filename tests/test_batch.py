@@ -0,0 +1,74 @@
+from fastapi.testclient import TestClient
+from scipy import stats
+
+from app.main import app
+
+client = TestClient(app)
+
+CONTROL = [72.0, 75.5, 68.2, 80.1, 77.3, 70.8, 74.4, 69.9]
+TREATMENT = [78.4, 82.1, 79.5, 85.0, 81.2, 77.7, 83.6, 80.9]
+PLACEBO = [70.1, 73.3, 69.5, 71.8, 74.0, 68.7]
+
+
+def test_batch_runs_jobs_over_shared_arrays():
+    """測試批次工作引用共用陣列，結果依工作順序回傳"""
+    response = client.post(
+        "/api/v1/batch",
+        json={
+            "arrays": {"control": CONTROL, "treatment": TREATMENT, "placebo": PLACEBO},
+            "jobs": [
+                {"id": "t", "type": "ttest", "params": {"sample1": "control", "sample2": "treatment"}},
+                {"id": "a", "type": "inferential.anova", "params": {"groups": ["control", "treatment", "placebo"]}},
+                {"id": "r", "type": "correlation.pearson", "params": {"x": "control", "y": "treatment"}},
+                {"id": "h", "type": "histogram", "params": {"values": "treatment", "bins": 5}},
+            ],
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["succeeded"] == 4 and body["failed"] == 0
+    assert [result["id"] for result in body["results"]] == ["t", "a", "r", "h"]
+
+    t_result, anova_result, pearson_result, histogram_result = body["results"]
+    assert abs(t_result["result"]["p_value"] - stats.ttest_ind(CONTROL, TREATMENT).pvalue) < 1e-10
+    assert abs(anova_result["result"]["f_statistic"] - stats.f_oneway(CONTROL, TREATMENT, PLACEBO).statistic) < 1e-10
+    assert abs(pearson_result["result"]["correlation_coefficient"] - stats.pearsonr(CONTROL, TREATMENT)[0]) < 1e-10
+    assert histogram_result["result"]["success"] is True
+
+
+def test_batch_job_errors_are_isolated():
+    """測試單一工作失敗不影響其他工作"""
+    response = client.post(
+        "/api/v1/batch",
+        json={
+            "arrays": {"control": CONTROL},
+            "jobs": [
+                {"type": "basic", "params": {"values": "control"}},
+                {"type": "ttest", "params": {"sample1": "missing"}},
+                {"type": "ttest", "params": {"sample1": [1.0]}},
+                {"type": "no_such_job", "params": {}},
+            ],
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["succeeded"] == 1 and body["failed"] == 3
+    assert [result["status_code"] for result in body["results"]] == [200, 400, 422, 400]
+    assert "missing" in body["results"][1]["error"]
+
+
+def test_shared_arrays_are_validated_like_inline_arrays():
+    """測試共用陣列與內嵌陣列套用相同的欄位驗證 (長度不足時皆為 422)"""
+    response = client.post(
+        "/api/v1/batch",
+        json={
+            "arrays": {"a": [1.0]},
+            "jobs": [
+                {"id": "shared", "type": "ttest", "params": {"sample1": "a"}},
+                {"id": "inline", "type": "ttest", "params": {"sample1": [1.0]}},
+            ],
+        },
+    )
+    shared, inline = response.json()["results"]
+    assert not shared["success"] and shared["status_code"] == 422
+    assert shared["error"][0]["type"] == inline["error"][0]["type"] == "too_short"
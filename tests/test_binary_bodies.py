@@ -0,0 +1,100 @@
+import numpy as np
+import pyarrow as pa
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.array_codec import decode_raw_float64, encode_raw_float64
+
+client = TestClient(app)
+
+RAW = {"content-type": "application/octet-stream"}
+ARROW = {"content-type": "application/vnd.apache.arrow.stream"}
+
+
+def _arrow_stream(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_raw_float64_roundtrip_is_zero_copy():
+    """測試原始 float64 格式解碼不複製資料"""
+    body = encode_raw_float64(np.arange(4.0), np.ones((2, 3)))
+    vector, matrix = decode_raw_float64(body)
+    assert vector.tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert matrix.shape == (2, 3)
+    assert not vector.flags.owndata
+
+
+def test_basic_stats_raw_body():
+    """測試以原始 float64 內容計算基本統計量"""
+    body = encode_raw_float64(np.arange(1.0, 11.0))
+    response = client.post("/api/v1/descriptive/basic", content=body, headers=RAW)
+    assert response.status_code == 200
+    assert response.json()["mean"] == 5.5
+
+
+def test_ttest_raw_body_with_names_and_query_params():
+    """測試以標頭指定欄位名稱並以查詢參數傳入純量參數"""
+    body = encode_raw_float64([5.1, 4.9, 5.6, 5.8, 6.0], [4.1, 4.3, 4.0, 4.6])
+    headers = dict(RAW, **{"x-array-names": "sample1,sample2"})
+    response = client.post(
+        "/api/v1/inferential/ttest?alpha=0.01&alternative=greater", content=body, headers=headers
+    )
+    assert response.status_code == 200
+    expected = client.post(
+        "/api/v1/inferential/ttest",
+        json={"sample1": [5.1, 4.9, 5.6, 5.8, 6.0], "sample2": [4.1, 4.3, 4.0, 4.6],
+              "alpha": 0.01, "alternative": "greater"},
+    ).json()
+    assert response.json() == expected
+
+
+def test_anova_raw_body_groups():
+    """測試多組資料依序傳入 groups 欄位"""
+    body = encode_raw_float64([1, 2, 3], [4, 5, 6, 7], [7, 8, 9])
+    response = client.post("/api/v1/inferential/anova", content=body, headers=RAW)
+    assert response.status_code == 200
+    assert response.json()["degrees_of_freedom_between"] == 2
+
+
+def test_multiple_regression_arrow_stream():
+    """測試以 Arrow 串流傳入矩陣與向量"""
+    x = [[1.0, 2.0], [2.0, 1.0], [3.0, 5.0], [4.0, 3.0], [5.0, 6.0]]
+    y = [1.0, 2.0, 3.0, 4.0, 6.0]
+    table = pa.table({
+        "x": pa.array(x, type=pa.list_(pa.float64(), 2)),
+        "y": pa.array(y, type=pa.float64()),
+    })
+    response = client.post("/api/v1/regression/multiple", content=_arrow_stream(table), headers=ARROW)
+    assert response.status_code == 200
+    expected = client.post("/api/v1/regression/multiple", json={"x": x, "y": y}).json()
+    assert np.allclose(response.json()["coefficients"], expected["coefficients"])
+
+
+def test_invalid_raw_body():
+    """測試格式錯誤的二進位內容回傳 400"""
+    response = client.post("/api/v1/descriptive/basic", content=b"\x01\x02", headers=RAW)
+    assert response.status_code == 400
+
+
+def test_raw_body_validates_like_json():
+    """測試二進位請求與 JSON 相同地檢查欄位長度與非有限值 (回傳 422)"""
+    too_short = client.post("/api/v1/inferential/ttest", content=encode_raw_float64([1.0]), headers=RAW)
+    assert too_short.status_code == 422
+    assert too_short.json()["detail"][0]["type"] == "too_short"
+    assert client.post("/api/v1/inferential/ttest", json={"sample1": [1.0]}).status_code == 422
+
+    with_nan = client.post("/api/v1/descriptive/basic", content=encode_raw_float64([1.0, np.nan, 3.0]), headers=RAW)
+    assert with_nan.status_code == 422
+    normal = client.post("/api/v1/distribution/normal", content=encode_raw_float64([1.0, 2.0, 3.0]), headers=RAW)
+    assert normal.status_code == 422
+
+
+def test_raw_header_with_overflowing_shape_is_rejected():
+    """測試標頭維度乘積超過 int64 時回傳 400，而不是溢位成很小的元素數"""
+    header = np.array([2, 1 << 32, 1 << 32], dtype="<u8").tobytes()
+    body = header + np.zeros(4).tobytes()
+    response = client.post("/api/v1/descriptive/basic", content=body, headers=RAW)
+    assert response.status_code == 400
@@ -0,0 +1,65 @@
+import numpy as np
+from fastapi.testclient import TestClient
+from scipy import stats
+
+from app.main import app
+from app.services import bootstrap
+
+client = TestClient(app)
+
+rng = np.random.default_rng(0)
+GROUP_A = rng.normal(0.0, 1.0, 40).tolist()
+GROUP_B = rng.normal(0.6, 1.2, 35).tolist()
+
+
+def test_bca_interval_matches_scipy():
+    """測試 BCa 區間與 scipy.stats.bootstrap 一致 (差異在 Monte Carlo 誤差內)"""
+    result = bootstrap.bootstrap_ci(
+        bootstrap.COHENS_D, [GROUP_A, GROUP_B], n_resamples=20000, method=bootstrap.CI_BCA, seed=1
+    )
+
+    def cohens_d(x, y, axis):
+        pooled = ((len(x) - 1) * np.var(x, ddof=1, axis=axis) + (len(y) - 1) * np.var(y, ddof=1, axis=axis))
+        return (np.mean(x, axis=axis) - np.mean(y, axis=axis)) / np.sqrt(pooled / (len(x) + len(y) - 2))
+
+    expected = stats.bootstrap(
+        (GROUP_A, GROUP_B), cohens_d, vectorized=True, n_resamples=20000, method="BCa", random_state=2
+    )
+    assert np.isclose(result["estimate"], cohens_d(np.array(GROUP_A), np.array(GROUP_B), 0))
+    assert np.allclose(
+        result["confidence_interval"],
+        [expected.confidence_interval.low, expected.confidence_interval.high],
+        atol=0.03,
+    )
+
+
+def test_effect_size_ci_on_endpoints_is_reproducible():
+    """測試檢定端點的 effect_size_ci：固定種子可重現，拆段平行計算的重抽次數正確"""
+    body = {
+        "sample1": GROUP_A, "sample2": GROUP_B, "effect_size_ci": "percentile",
+        "bootstrap_resamples": 120000, "random_seed": 5,
+    }
+    first = client.post("/api/v1/inferential/ttest", json=body).json()["effect_size_ci"]
+    second = client.post("/api/v1/inferential/ttest", json=body).json()["effect_size_ci"]
+    assert first == second and first["n_resamples"] == 120000
+    low, high = first["confidence_interval"]
+    assert low < first["estimate"] < high
+
+    table = {"observed": [[20, 15, 5], [10, 25, 12]], "effect_size_ci": "bca", "random_seed": 5}
+    chi_square = client.post("/api/v1/inferential/chisquare", json=table).json()
+    assert chi_square["effect_size_ci"]["effect_size"] == bootstrap.CRAMERS_V
+    assert np.isclose(chi_square["effect_size_ci"]["estimate"], chi_square["effect_size"])
+
+    plain = client.post("/api/v1/inferential/kruskal_wallis", json={"groups": [GROUP_A, GROUP_B, GROUP_A[:10]]})
+    assert plain.json()["effect_size_ci"] is None
+
+
+def test_large_offset_keeps_effect_sizes_finite():
+    """測試數值有大偏移 (約 1e8) 時效果量與其區間不受相消誤差影響"""
+    offset = 1e8
+    shifted = [[x + offset for x in GROUP_A], [x + offset for x in GROUP_B]]
+    for name in (bootstrap.COHENS_D, bootstrap.ETA_SQUARED):
+        result = bootstrap.bootstrap_ci(name, shifted, n_resamples=2000, method=bootstrap.CI_BCA, seed=1)
+        plain = bootstrap.bootstrap_ci(name, [GROUP_A, GROUP_B], n_resamples=2000, method=bootstrap.CI_BCA, seed=1)
+        assert np.isclose(result["estimate"], plain["estimate"], rtol=1e-6)
+        assert np.allclose(result["confidence_interval"], plain["confidence_interval"], rtol=1e-4)
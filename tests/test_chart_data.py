@@ -0,0 +1,59 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+VALUES = [2.1, 2.4, 2.2, 2.8, 3.0, 2.6, 2.5, 9.5, 2.7, -4.0, 2.3, 2.9]
+
+
+def _columns(records):
+    return {key: [record[key] for record in records] for key in records[0]}
+
+
+def test_columnar_data_matches_records():
+    """測試 columns 格式與 records 格式內容相同"""
+    requests = [
+        ("/api/v1/charts/histogram", {"values": VALUES, "bins": 5}),
+        ("/api/v1/charts/boxplot", {"groups": [VALUES, VALUES[:6]], "group_labels": ["A", "B"]}),
+        ("/api/v1/charts/scatter", {"x": VALUES, "y": VALUES[::-1]}),
+        ("/api/v1/charts/line", {"data": [{"label": f"t{i}", "value": v} for i, v in enumerate(VALUES)]}),
+    ]
+    for path, body in requests:
+        records = client.post(path, json=body).json()
+        columns = client.post(path, json={**body, "data_format": "columns"}).json()
+        assert records["data_format"] == "records" and columns["data_format"] == "columns"
+        assert columns["data"] == _columns(records["data"]), path
+
+
+def test_histogram_and_boxplot_values():
+    """測試直方圖區間與盒鬚圖異常值"""
+    histogram = client.post("/api/v1/charts/histogram", json={"values": VALUES, "bins": 5}).json()["data"]
+    counts, edges = np.histogram(VALUES, bins=5)
+    assert [item["count"] for item in histogram] == counts.tolist()
+    assert [item["bin_start"] for item in histogram] == edges[:-1].tolist()
+    assert histogram[0]["frequency"] == counts[0] / len(VALUES)
+
+    boxplot = client.post("/api/v1/charts/boxplot", json={"groups": [VALUES]}).json()["data"][0]
+    assert boxplot["outliers"] == [9.5, -4.0]
+    assert boxplot["lower_whisker"] > -4.0 and boxplot["upper_whisker"] < 9.5
+
+
+def test_include_omits_heavy_fields():
+    """測試 include 省略迴歸殘差、配適值與圖表數據"""
+    x = np.arange(20, dtype=float)
+    body = {"x": x.tolist(), "y": (2 * x + 1).tolist()}
+    full = client.post("/api/v1/regression/linear", json=body).json()
+    slim = client.post("/api/v1/regression/linear", json={**body, "include": []}).json()
+    assert slim["residuals"] is None and slim["fitted_values"] is None
+    assert slim["coefficients"] == full["coefficients"] and slim["r_squared"] == full["r_squared"]
+    partial = client.post("/api/v1/regression/linear", json={**body, "include": ["fitted_values"]}).json()
+    assert partial["residuals"] is None and partial["fitted_values"] == full["fitted_values"]
+
+    scatter = client.post("/api/v1/charts/scatter", json={"x": VALUES, "y": VALUES[::-1], "include": [], "show_regression_line": True}).json()
+    assert scatter["data"] == [] and "correlation" in scatter["metadata"]
+    image = client.post("/api/v1/charts/histogram", json={
+        "values": VALUES, "include": [], "generate_image": True, "image_delivery": "url"
+    }).json()
+    assert image["data"] == [] and image["has_image"]
@@ -0,0 +1,57 @@
+import asyncio
+import math
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.compute_pool import ComputePool, ComputeQueueFullError
+
+client = TestClient(app)
+
+
+def test_thread_lane_runs_off_event_loop():
+    """測試執行緒通道不在事件迴圈執行緒上計算"""
+    pool = ComputePool(thread_workers=2)
+
+    async def main():
+        return threading.get_ident(), await pool.run("any.endpoint", threading.get_ident)
+
+    loop_thread, worker_thread = asyncio.run(main())
+    pool.shutdown()
+    assert loop_thread != worker_thread
+
+
+def test_process_lane():
+    """測試行程池通道"""
+    pool = ComputePool(process_workers=1, policy={"heavy": "process"})
+    result = asyncio.run(pool.run("heavy", math.sqrt, 16.0))
+    pool.shutdown()
+    assert result == 4.0
+    assert pool.stats()["completed"]["process"] == 1
+
+
+def test_queue_full():
+    """測試佇列深度上限"""
+    pool = ComputePool(thread_workers=1, endpoint_limits={"slow": 1})
+    gate = threading.Event()
+
+    async def main():
+        first = asyncio.ensure_future(pool.run("slow", gate.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ComputeQueueFullError):
+            await pool.run("slow", gate.wait)
+        gate.set()
+        await first
+
+    asyncio.run(main())
+    pool.shutdown()
+    assert pool.stats()["rejected"]["thread"] == 1
+
+
+def test_router_dispatch_through_pool():
+    """測試路由經由計算執行器回傳結果"""
+    response = client.post("/api/v1/descriptive/basic", json={"values": [1, 2, 3, 4]})
+    assert response.status_code == 200
+    assert response.json()["mean"] == 2.5
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from scipy import stats
+
+from app.main import app
+from app.services.correlation_engine import kendall_matrix
+
+client = TestClient(app)
+
+REFERENCE = {"pearson": stats.pearsonr, "spearman": stats.spearmanr, "kendall": stats.kendalltau}
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman", "kendall"])
+def test_matrix_matches_pairwise_scipy(method):
+    """測試向量化相關矩陣與逐對 SciPy 計算結果一致"""
+    rng = np.random.default_rng(7)
+    data = np.round(rng.normal(size=(4, 40)), 1)  # 變數 × 觀測值，含同值
+    response = client.post(
+        "/api/v1/correlation/matrix",
+        json={"data": data.tolist(), "columns": ["a", "b", "c", "d"], "method": method},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["method"] == method
+    for i in range(4):
+        assert result["correlation_matrix"][i][i] == 1.0
+        for j in range(i + 1, 4):
+            r, p = REFERENCE[method](data[i], data[j])
+            assert np.isclose(result["correlation_matrix"][i][j], r)
+            assert np.isclose(result["correlation_matrix"][j][i], r)
+            assert np.isclose(result["p_values_matrix"][i][j], p)
+
+
+def test_kendall_exact_p_values_without_ties():
+    """測試無同值的小樣本使用與 SciPy 相同的精確 p 值"""
+    data = np.random.default_rng(3).normal(size=(12, 3))
+    tau, p_values = kendall_matrix(data)
+    expected = stats.kendalltau(data[:, 0], data[:, 2])
+    assert np.isclose(tau[0, 2], expected.statistic)
+    assert np.isclose(p_values[0, 2], expected.pvalue)
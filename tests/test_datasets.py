@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.dataset_store import DatasetStore
+
+client = TestClient(app)
+
+CSV_PATH = "test_data/teaching_method_comparison.csv"
+
+
+def _upload(path: str = CSV_PATH) -> dict:
+    with open(path, "rb") as f:
+        response = client.post("/api/v1/datasets", files={"file": ("teaching.csv", f, "text/csv")})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_upload_and_reference_column():
+    """測試上傳資料集後以欄位引用計算基本統計量"""
+    info = _upload()
+    frame = pd.read_csv(CSV_PATH)
+    assert info["n_rows"] == len(frame)
+    assert {"name": "exam_score", "dtype": "float64", "numeric": True} in info["columns"]
+
+    response = client.post(
+        "/api/v1/descriptive/basic", json={"values": {"dataset": info["id"], "column": "exam_score"}}
+    )
+    assert response.status_code == 200
+    assert np.isclose(response.json()["mean"], frame["exam_score"].mean())
+
+
+def test_grouped_reference_matches_inline_groups():
+    """測試以分組欄位引用執行 ANOVA 與直接傳入陣列結果相同"""
+    info = _upload()
+    frame = pd.read_csv(CSV_PATH)
+    groups = [group["exam_score"].tolist() for _, group in frame.groupby("teaching_method")]
+
+    response = client.post(
+        "/api/v1/inferential/anova",
+        json={"groups": {"dataset": info["id"], "column": "exam_score", "group_by": "teaching_method"}},
+    )
+    assert response.status_code == 200
+    expected = client.post("/api/v1/inferential/anova", json={"groups": groups}).json()
+    assert np.isclose(response.json()["f_statistic"], expected["f_statistic"])
+
+
+def test_unknown_dataset_and_column():
+    """測試引用不存在的資料集或欄位時回傳驗證錯誤"""
+    response = client.post("/api/v1/descriptive/basic", json={"values": {"dataset": "missing", "column": "x"}})
+    assert response.status_code == 422
+    assert client.get("/api/v1/datasets/missing").status_code == 404
+
+    info = _upload()
+    response = client.post(
+        "/api/v1/descriptive/basic", json={"values": {"dataset": info["id"], "column": "teaching_method"}}
+    )
+    assert response.status_code == 422
+    assert client.delete(f"/api/v1/datasets/{info['id']}").status_code == 200
+
+
+def test_store_evicts_least_recently_used():
+    """測試超過數量上限時淘汰最久未使用的資料集"""
+    store = DatasetStore(max_datasets=2)
+    content = b"a,b\n1,2\n3,4\n"
+    first = store.ingest(content, "csv").id
+    second = store.ingest(content, "csv").id
+    store.get(first)
+    store.ingest(content, "csv")
+    assert [info.id for info in store.list()][0] == first
+    assert second not in [info.id for info in store.list()]
+    assert store.evictions == 1
+
+
+def test_missing_cells_and_read_only_columns():
+    """測試含缺失值的欄位：一維引用回傳 422，分組引用排除缺失值；取得的欄位為唯讀"""
+    store = DatasetStore()
+    info = store.ingest(b"score,group\n1.0,a\n,a\n3.0,b\n4.0,b\n5.0,a\n", "csv")
+    assert not store.column(info.id, "score").flags.writeable
+    groups = store.grouped(info.id, "score", "group")
+    assert [group.tolist() for group in groups] == [[1.0, 5.0], [3.0, 4.0]]
+
+    content = "score,group\n1.0,a\n,a\n3.0,b\n4.0,b\n5.0,a\n6.0,b\n".encode()
+    uploaded = client.post("/api/v1/datasets", files={"file": ("missing.csv", content, "text/csv")}).json()
+    response = client.post(
+        "/api/v1/descriptive/basic", json={"values": {"dataset": uploaded["id"], "column": "score"}}
+    )
+    assert response.status_code == 422
+    assert "score" in response.text
+    response = client.post(
+        "/api/v1/inferential/anova",
+        json={"groups": {"dataset": uploaded["id"], "column": "score", "group_by": "group"}},
+    )
+    assert response.status_code == 200
@@ -0,0 +1,93 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.decimation import density_grid, lttb_indices, minmax_indices
+
+client = TestClient(app)
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def test_decimation_keeps_endpoints_and_extremes():
+    """測試 LTTB 與最小-最大包絡線保留首尾點，包絡線保留所有尖峰"""
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=10_000)
+    y[1234], y[8765] = 50.0, -50.0
+    x = np.arange(len(y), dtype=float)
+
+    lttb = lttb_indices(x, y, 500)
+    assert len(lttb) == 500
+    assert lttb[0] == 0 and lttb[-1] == len(y) - 1
+    assert np.all(np.diff(lttb) > 0)
+    assert {1234, 8765} <= set(lttb.tolist())
+
+    envelope = minmax_indices(y, 500)
+    assert len(envelope) <= 500
+    assert envelope[0] == 0 and envelope[-1] == len(y) - 1
+    assert np.all(np.diff(envelope) > 0)
+    assert y[envelope].max() == y.max() and y[envelope].min() == y.min()
+
+
+def test_density_grid_counts_every_point():
+    """測試密度分箱的點數總和等於原始點數"""
+    rng = np.random.default_rng(1)
+    x, y = rng.normal(size=(2, 20_000))
+    x_centers, y_centers, counts = density_grid(x, y, 400)
+    assert len(counts) <= 400
+    assert counts.sum() == 20_000
+    assert np.all(counts > 0)
+    assert x.min() <= x_centers.min() and x_centers.max() <= x.max()
+
+
+def test_scatter_endpoint_decimates_large_inputs():
+    """測試散點圖超過門檻時回傳密度分箱結果，統計量仍以完整數據計算"""
+    rng = np.random.default_rng(2)
+    x = rng.normal(size=3000)
+    y = 2 * x + rng.normal(size=3000)
+    response = client.post("/api/v1/charts/scatter", json={
+        "x": x.tolist(),
+        "y": y.tolist(),
+        "show_regression_line": True,
+        "max_points": 100,
+        "generate_image": True,
+        "image_delivery": "binary",
+        "figsize": [4, 3],
+        "dpi": 50,
+    })
+    assert response.status_code == 200
+    assert response.content.startswith(PNG_MAGIC)
+
+    result = client.post("/api/v1/charts/scatter", json={
+        "x": x.tolist(), "y": y.tolist(), "show_regression_line": True, "max_points": 100,
+    }).json()
+    assert result["success"] is True
+    assert len(result["data"]) <= 100
+    assert sum(point["count"] for point in result["data"]) == 3000
+    decimation = result["metadata"]["decimation"]
+    assert decimation["method"] == "density"
+    assert decimation["original_points"] == 3000
+    assert decimation["returned_points"] == len(result["data"])
+    assert result["metadata"]["data_points_count"] == 3000
+    assert abs(result["metadata"]["correlation"] - np.corrcoef(x, y)[0, 1]) < 1e-10
+
+
+def test_line_endpoint_decimation_modes():
+    """測試折線圖的 LTTB、包絡線與關閉降採樣"""
+    values = np.sin(np.linspace(0, 20, 2000)).tolist()
+    data = [{"label": f"t{i}", "value": value} for i, value in enumerate(values)]
+
+    result = client.post("/api/v1/charts/line", json={"data": data, "max_points": 200}).json()
+    assert result["metadata"]["decimation"]["method"] == "lttb"
+    assert len(result["data"]) == 200
+    assert result["data"][0] == {"label": "t0", "value": values[0], "index": 0}
+    assert result["metadata"]["max_value"] == max(values)
+
+    result = client.post("/api/v1/charts/line", json={"data": data, "max_points": 200, "decimation": "minmax"}).json()
+    assert result["metadata"]["decimation"]["method"] == "minmax"
+    assert len(result["data"]) <= 200
+    assert max(point["value"] for point in result["data"]) == max(values)
+
+    result = client.post("/api/v1/charts/line", json={"data": data, "max_points": 200, "decimation": "none"}).json()
+    assert len(result["data"]) == 2000
+    assert "decimation" not in result["metadata"]
@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api import fast_json
+from app.api.fast_json import FastJSONResponse
+from app.main import app
+from app.models.response_models import RegressionResponse
+
+client = TestClient(app)
+
+
+def _regression_result():
+    return RegressionResponse.model_construct(
+        coefficients=[2.0],
+        intercept=0.5,
+        r_squared=1.0,
+        adjusted_r_squared=1.0,
+        f_statistic=float("inf"),
+        p_value=0.0,
+        residuals=np.array([0.1, -0.2, np.nan]),
+        fitted_values=np.arange(3, dtype=float),
+    )
+
+
+def test_fast_json_serializes_numpy_fields(monkeypatch):
+    """測試 NumPy 陣列欄位直接序列化，NaN 與無限大輸出為 null，無 orjson 時結果相同"""
+    body = json.loads(FastJSONResponse(_regression_result()).body)
+    assert body["residuals"] == [0.1, -0.2, None]
+    assert body["fitted_values"] == [0.0, 1.0, 2.0]
+    assert body["f_statistic"] is None
+
+    monkeypatch.setattr(fast_json, "orjson", None)
+    assert json.loads(FastJSONResponse(_regression_result()).body) == body
+
+
+def test_regression_endpoint_returns_numpy_residuals():
+    """測試迴歸端點略過 response_model 後的回應內容"""
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=200)
+    y = 3 * x + 1 + rng.normal(size=200)
+    response = client.post("/api/v1/regression/linear", json={"x": x.tolist(), "y": y.tolist()})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    result = response.json()
+    slope, intercept = np.polyfit(x, y, 1)
+    assert np.isclose(result["coefficients"][0], slope)
+    assert np.allclose(result["fitted_values"], slope * x + intercept)
+    assert np.allclose(result["residuals"], y - (slope * x + intercept))
+
+    batch = client.post("/api/v1/batch", json={
+        "arrays": {"x": x.tolist(), "y": y.tolist()},
+        "jobs": [{"type": "regression.linear", "params": {"x": "x", "y": "y"}}],
+    }).json()
+    assert batch["results"][0]["result"]["residuals"] == result["residuals"]
+
+    schema = client.get("/openapi.json").json()
+    assert "RegressionResponse" in str(schema["paths"]["/api/v1/regression/linear"]["post"]["responses"]["200"])
@@ -0,0 +1,32 @@
+import json
+
+from app.services import font_cache
+
+
+def test_font_resolution_is_persisted(tmp_path, monkeypatch):
+    """測試字體解析結果寫入解析檔，之後直接讀取而不重新掃描字體"""
+    cache_path = str(tmp_path / "fonts.json")
+    resolution = font_cache.load_font_resolution(cache_path)
+    assert resolution["family"] in font_cache.CHINESE_FONTS or resolution["family"] is None
+    with open(cache_path, encoding="utf-8") as f:
+        assert json.load(f) == resolution
+
+    def fail():
+        raise AssertionError("不應重新掃描字體")
+
+    monkeypatch.setattr(font_cache, "resolve_font", fail)
+    assert font_cache.load_font_resolution(cache_path) == resolution
+
+
+def test_stale_font_resolution_is_refreshed(tmp_path):
+    """測試 matplotlib 版本不同或字型檔不存在時重新解析"""
+    cache_path = tmp_path / "fonts.json"
+    stale = dict(font_cache.resolve_font(), path="/nonexistent/font.ttf")
+    cache_path.write_text(json.dumps(stale), encoding="utf-8")
+
+    resolution = font_cache.load_font_resolution(str(cache_path))
+    assert resolution["path"] != "/nonexistent/font.ttf"
+
+    fonts = font_cache.ChartFonts(resolution)
+    assert fonts.title.get_weight() == "bold"
+    assert fonts.label.get_size() == 12
@@ -0,0 +1,37 @@
+import json
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+HEAVY_MODULES = ["scipy", "pandas", "sklearn", "matplotlib", "seaborn", "pingouin"]
+
+
+def test_app_import_does_not_load_heavy_modules():
+    """測試匯入應用程式時不會載入重量級套件"""
+    code = (
+        "import json, sys; import app.main; "
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert json.loads(output.strip().splitlines()[-1]) == []
+
+
+def test_import_report():
+    """測試匯入成本報告列出啟動模組與延遲載入的套件"""
+    client.post("/api/v1/descriptive/distribution", json={"values": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]})
+
+    response = client.get("/api/v1/system/imports", params={"limit": 5})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["startup_seconds"] > 0
+    assert 0 < len(report["startup_modules"]) <= 5
+
+    lazy_modules = {item["module"]: item for item in report["lazy_modules"]}
+    assert {"scipy.stats", "pandas", "matplotlib.figure", "seaborn"} <= set(lazy_modules)
+    assert lazy_modules["scipy.stats"]["loaded"] is True
+    assert lazy_modules["scipy.stats"]["seconds"] >= 0
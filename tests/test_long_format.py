@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from scipy import stats
+
+from app.main import app
+
+client = TestClient(app)
+
+CSV_PATH = "test_data/teaching_method_comparison.csv"
+
+
+def test_long_format_matches_groups():
+    """測試長格式數據 (數值 + 分組標籤) 與各組數據的 ANOVA、Kruskal-Wallis 結果相同"""
+    rng = np.random.default_rng(5)
+    labels = rng.choice(["b", "a", "c"], 60).tolist()
+    values = rng.normal(size=60).round(1)
+    groups = [values[np.array(labels) == name].tolist() for name in "abc"]
+    long_body = {"values": values.tolist(), "labels": labels}
+
+    for endpoint, test in [("anova", stats.f_oneway), ("kruskal_wallis", stats.kruskal)]:
+        long_result = client.post(f"/api/v1/inferential/{endpoint}", json=long_body).json()
+        group_result = client.post(f"/api/v1/inferential/{endpoint}", json={"groups": groups}).json()
+        assert np.isclose(long_result["p_value"], group_result["p_value"])
+        assert np.isclose(long_result["p_value"], test(*groups).pvalue)
+
+    tukey = client.post("/api/v1/inferential/anova", json={**long_body, "posthoc": "tukey"}).json()["posthoc"]
+    assert tukey["groups"] == ["a", "b", "c"]
+
+    response = client.post("/api/v1/inferential/anova", json={"values": [1.0, 2.0], "labels": ["a"]})
+    assert response.status_code == 422
+
+
+def test_long_format_dataset_reference_and_many_groups():
+    """測試以資料集欄位引用長格式數據，以及上萬組的 ANOVA"""
+    with open(CSV_PATH, "rb") as f:
+        info = client.post("/api/v1/datasets", files={"file": ("teaching.csv", f, "text/csv")}).json()
+    frame = pd.read_csv(CSV_PATH)
+    groups = [group["exam_score"].tolist() for _, group in frame.groupby("teaching_method")]
+    response = client.post(
+        "/api/v1/inferential/anova",
+        json={
+            "values": {"dataset": info["id"], "column": "exam_score"},
+            "labels": {"dataset": info["id"], "column": "teaching_method"},
+        },
+    )
+    assert response.status_code == 200
+    assert np.isclose(response.json()["f_statistic"], stats.f_oneway(*groups).statistic)
+
+    rng = np.random.default_rng(6)
+    labels = np.repeat(np.arange(10000), 3)
+    values = rng.normal(size=labels.size) + (labels % 2)
+    result = client.post(
+        "/api/v1/inferential/anova", json={"values": values.tolist(), "labels": labels.tolist()}
+    ).json()
+    assert result["degrees_of_freedom_between"] == 9999
+    assert result["p_value"] < 1e-6
@@ -0,0 +1,53 @@
+import numpy as np
+from fastapi.testclient import TestClient
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+
+from app.main import app
+
+client = TestClient(app)
+
+rng = np.random.default_rng(3)
+# 40 個樣本 × 300 個特徵，前 30 個特徵在兩組間有差異，數值取到小數一位以產生同值
+DATA = np.round(rng.normal(size=(40, 300)), 1)
+DATA[:20, :30] += 1.2
+LABELS = ["case"] * 20 + ["control"] * 20
+
+
+def test_mass_test_matches_per_column_scipy():
+    """測試逐欄 Welch t 與 Mann-Whitney U 與 scipy 逐欄計算一致，並以 BH 校正"""
+    body = {"data": DATA.tolist(), "labels": LABELS}
+    welch = client.post("/api/v1/inferential/mass_test", json=body).json()
+    expected = stats.ttest_ind(DATA[:20], DATA[20:], axis=0, equal_var=False)
+    assert welch["groups"] == ["case", "control"] and welch["n_tests"] == 300
+    assert np.allclose(welch["statistic"], expected.statistic)
+    assert np.allclose(welch["p_value"], expected.pvalue)
+    reject, adjusted, _, _ = multipletests(expected.pvalue, alpha=0.05, method="fdr_bh")
+    assert np.allclose(welch["adjusted_p_value"], adjusted)
+    assert welch["reject_null"] == reject.tolist()
+
+    mann_whitney = client.post("/api/v1/inferential/mass_test", json={**body, "test": "mann_whitney"}).json()
+    for column in (0, 1, 150):
+        result = stats.mannwhitneyu(DATA[:20, column], DATA[20:, column], method="asymptotic")
+        assert np.isclose(mann_whitney["statistic"][column], result.statistic)
+        assert np.isclose(mann_whitney["p_value"][column], result.pvalue)
+
+
+def test_kruskal_mass_test_and_multiple_comparison():
+    """測試三組的逐欄 Kruskal-Wallis 與多重比較校正端點"""
+    labels = [1, 2, 3, 4] * 10
+    result = client.post("/api/v1/inferential/mass_test", json={
+        "data": DATA[:, :5].tolist(), "labels": [label % 3 for label in labels], "test": "kruskal",
+        "correction": "holm", "features": ["a", "b", "c", "d", "e"],
+    }).json()
+    groups = [DATA[np.array(labels) % 3 == g, 2] for g in range(3)]
+    assert result["groups"] == ["0", "1", "2"] and result["features"][2] == "c"
+    assert np.isclose(result["statistic"][2], stats.kruskal(*groups).statistic)
+
+    two_group_only = client.post("/api/v1/inferential/mass_test", json={"data": DATA[:, :5].tolist(), "labels": labels})
+    assert two_group_only.status_code == 400
+
+    p_values = [0.001, 0.02, 0.03, 0.04, 0.5]
+    holm = client.post("/api/v1/inferential/multiple_comparison", json={"p_values": p_values}).json()
+    assert np.allclose(holm["adjusted_p_value"], multipletests(p_values, method="holm")[1])
+    assert holm["n_significant"] == 1
@@ -0,0 +1,67 @@
+import numpy as np
+from fastapi.testclient import TestClient
+from scipy import stats
+
+from app.main import app
+
+client = TestClient(app)
+
+# 小樣本的治療組與對照組 (收縮壓下降量)
+TREATMENT = [12.0, 15.5, 9.0, 18.0, 14.0, 11.5, 16.0]
+CONTROL = [8.0, 6.5, 10.0, 7.0, 9.5, 5.0]
+
+
+def test_exact_permutation_p_values():
+    """測試所有置換數不多時回傳精確 p 值 (與 scipy 的精確檢定一致)"""
+    body = {"sample1": TREATMENT, "sample2": CONTROL, "method": "permutation", "alternative": "greater"}
+    result = client.post("/api/v1/inferential/ttest", json=body).json()
+    expected = stats.permutation_test(
+        (TREATMENT, CONTROL), lambda x, y, axis: stats.ttest_ind(x, y, axis=axis).statistic,
+        vectorized=True, n_resamples=np.inf, alternative="greater",
+    )
+    assert result["method"] == "permutation" and result["permutation"]["exact"]
+    assert result["permutation"]["n_resamples"] == 1716
+    assert np.isclose(result["p_value"], expected.pvalue)
+
+    mann_whitney = client.post("/api/v1/inferential/mann_whitney", json={**body, "alternative": "two-sided"}).json()
+    assert np.isclose(mann_whitney["p_value"], stats.mannwhitneyu(TREATMENT, CONTROL, method="exact").pvalue)
+
+    paired = client.post("/api/v1/inferential/ttest", json={
+        "sample1": TREATMENT[:6], "sample2": CONTROL, "paired": True, "method": "permutation"
+    }).json()
+    assert paired["permutation"]["n_resamples"] == 64
+
+
+def test_monte_carlo_anova_is_reproducible_and_stops_early():
+    """測試 Monte Carlo 置換 ANOVA：固定種子可重現，達到精度時提前停止"""
+    rng = np.random.default_rng(0)
+    groups = [rng.normal(mean, 1.0, 20).tolist() for mean in (0.0, 0.2, 0.9)]
+    body = {"groups": groups, "method": "permutation", "n_resamples": 20000, "random_seed": 7}
+    first = client.post("/api/v1/inferential/anova", json=body).json()
+    second = client.post("/api/v1/inferential/anova", json={**body, "p_value_precision": 0.01}).json()
+    assert not first["permutation"]["exact"] and first["permutation"]["n_resamples"] == 20000
+    assert abs(first["p_value"] - stats.f_oneway(*groups).pvalue) < 0.01
+    assert second["permutation"]["early_stopped"] and second["permutation"]["n_resamples"] < 20000
+    assert first["f_statistic"] == second["f_statistic"]
+
+
+def test_large_offset_does_not_lose_precision():
+    """測試數值有大偏移 (約 1e8) 時置換 p 值與未偏移的數據相同"""
+    offset = 1e8
+    body = {"method": "permutation", "random_seed": 3}
+    shifted = client.post("/api/v1/inferential/ttest", json={
+        **body, "sample1": [x + offset for x in TREATMENT], "sample2": [x + offset for x in CONTROL],
+    }).json()
+    plain = client.post("/api/v1/inferential/ttest", json={**body, "sample1": TREATMENT, "sample2": CONTROL}).json()
+    assert np.isclose(shifted["p_value"], plain["p_value"])
+
+    rng = np.random.default_rng(1)
+    groups = [rng.normal(mean, 1.0, 10) for mean in (0.0, 0.5, 1.0)]
+    anova = [
+        client.post("/api/v1/inferential/anova", json={
+            **body, "groups": [(group + shift).tolist() for group in groups], "n_resamples": 5000,
+        }).json()
+        for shift in (0.0, offset)
+    ]
+    assert np.isclose(anova[0]["p_value"], anova[1]["p_value"], atol=2e-3)
+    assert abs(anova[1]["p_value"] - stats.f_oneway(*groups).pvalue) < 0.03
@@ -0,0 +1,47 @@
+import numpy as np
+from fastapi.testclient import TestClient
+from scipy import stats
+
+from app.main import app
+
+client = TestClient(app)
+
+rng = np.random.default_rng(2)
+# 四組變異數不相等的數據
+GROUPS = [rng.normal(mean, sd, n).round(2) for mean, sd, n in [(0, 1, 12), (0.5, 2, 9), (1.5, 1, 15), (0.2, 0.5, 7)]]
+
+
+def test_tukey_and_games_howell_match_scipy():
+    """測試 Tukey HSD 與 scipy.stats.tukey_hsd 一致，Games-Howell 與逐對的學生化全距分佈一致"""
+    body = {"groups": [group.tolist() for group in GROUPS]}
+    tukey = client.post("/api/v1/inferential/anova", json={**body, "posthoc": "tukey"}).json()["posthoc"]
+    expected = stats.tukey_hsd(*GROUPS)
+    first, second = np.array(tukey["group1"]), np.array(tukey["group2"])
+    assert len(first) == 6 and tukey["groups"][0] == "組別 1"
+    assert np.allclose(tukey["p_value"], expected.pvalue[first, second], atol=1e-8)
+    assert np.allclose(tukey["confidence_lower"], expected.confidence_interval().low[first, second])
+
+    games_howell = client.post("/api/v1/inferential/anova", json={**body, "posthoc": "games_howell"}).json()["posthoc"]
+    x, y = GROUPS[1], GROUPS[3]
+    pair = list(zip(games_howell["group1"], games_howell["group2"])).index((1, 3))
+    mean_var = x.var(ddof=1) / len(x), y.var(ddof=1) / len(y)
+    df = sum(mean_var) ** 2 / (mean_var[0] ** 2 / (len(x) - 1) + mean_var[1] ** 2 / (len(y) - 1))
+    q = abs(x.mean() - y.mean()) / np.sqrt(sum(mean_var) / 2)
+    assert np.isclose(games_howell["degrees_of_freedom"][pair], df)
+    assert np.isclose(games_howell["p_value"][pair], stats.studentized_range.sf(q, 4, df), atol=1e-8)
+
+
+def test_dunn_after_kruskal_wallis():
+    """測試 Dunn 檢定的 z 值與 Bonferroni 校正"""
+    body = {"groups": [group.tolist() for group in GROUPS], "posthoc": "dunn"}
+    dunn = client.post("/api/v1/inferential/kruskal_wallis", json=body).json()["posthoc"]
+    pooled = np.concatenate(GROUPS)
+    ranks = stats.rankdata(pooled)
+    sizes = np.array([len(group) for group in GROUPS])
+    mean_ranks = [chunk.mean() for chunk in np.split(ranks, np.cumsum(sizes)[:-1])]
+    _, ties = np.unique(pooled, return_counts=True)
+    n = len(pooled)
+    variance = n * (n + 1) / 12 - np.sum(ties ** 3 - ties) / (12 * (n - 1))
+    z = (mean_ranks[0] - mean_ranks[2]) / np.sqrt(variance * (1 / sizes[0] + 1 / sizes[2]))
+    assert dunn["correction"] == "bonferroni" and np.isclose(dunn["statistic"][1], z)
+    assert np.isclose(dunn["p_value"][1], min(1.0, 6 * 2 * stats.norm.sf(abs(z))))
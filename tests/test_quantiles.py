@@ -0,0 +1,52 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.quantiles import KLLSketch
+
+client = TestClient(app)
+
+
+def _rank_errors(sorted_values, estimates, percentiles):
+    ranks = np.searchsorted(sorted_values, estimates) / len(sorted_values)
+    return np.abs(ranks - np.asarray(percentiles) / 100.0)
+
+
+def test_sketch_bulk_and_merged_error_bounds():
+    """測試大量資料與分區合併的草圖誤差在估計範圍內"""
+    values = np.random.default_rng(8).lognormal(size=2_000_000)
+    sorted_values = np.sort(values)
+    percentiles = [1, 10, 50, 90, 99]
+
+    bulk = KLLSketch(k=200).update(values)
+    assert bulk.n == len(values)
+    assert np.all(_rank_errors(sorted_values, bulk.percentiles(percentiles), percentiles) < 2 * bulk.rank_error)
+
+    merged = KLLSketch(k=200)
+    for chunk in np.array_split(values, 20):
+        merged.merge(KLLSketch(k=200).update(chunk))
+    assert merged.n == len(values)
+    assert merged.percentiles([0, 100]).tolist() == [values.min(), values.max()]
+    assert np.all(_rank_errors(sorted_values, merged.percentiles(percentiles), percentiles) < 2 * merged.rank_error)
+
+
+def test_percentiles_sketch_method_and_stream():
+    """測試百分位數端點的草圖模式與串流端點"""
+    values = np.random.default_rng(9).normal(100, 15, size=20000)
+    response = client.post(
+        "/api/v1/descriptive/percentiles",
+        json={"values": values.tolist(), "percentiles": [10, 90], "method": "sketch"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["method"] == "sketch"
+    assert set(result["percentiles"]) == {"P10", "P90"}
+    assert abs(result["quartiles"]["Q2"] - np.median(values)) < 1.0
+
+    response = client.post(
+        "/api/v1/descriptive/percentiles/stream?percentiles=10&percentiles=90",
+        content=values.astype("<f8").tobytes(),
+        headers={"content-type": "application/octet-stream"},
+    )
+    assert response.status_code == 200
+    assert abs(response.json()["percentiles"]["P90"] - np.percentile(values, 90)) < 1.0
@@ -0,0 +1,115 @@
+import json
+import subprocess
+import sys
+import warnings
+
+import numpy as np
+import statsmodels.api as sm
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.regression_analysis import RegressionAnalysisService
+
+client = TestClient(app)
+
+
+def test_multiple_regression_inference_matches_statsmodels():
+    """測試係數、標準誤、p 值、信賴區間與配適度與 statsmodels 一致"""
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(200, 3))
+    y = x @ [1.0, 0.0, -2.0] + 3.0 + rng.normal(size=200)
+    result = client.post("/api/v1/regression/multiple", json={
+        "x": x.tolist(), "y": y.tolist(), "confidence_level": 0.9
+    }).json()
+    expected = sm.OLS(y, sm.add_constant(x)).fit()
+
+    table = result["coefficient_table"]
+    assert [row["term"] for row in table] == ["intercept", "x1", "x2", "x3"]
+    assert np.allclose([result["intercept"]] + result["coefficients"], expected.params)
+    assert np.allclose([row["standard_error"] for row in table], expected.bse)
+    assert np.allclose([row["t_value"] for row in table], expected.tvalues)
+    assert np.allclose([row["p_value"] for row in table], expected.pvalues)
+    assert np.allclose([row["confidence_interval"] for row in table], expected.conf_int(alpha=0.1))
+    assert np.isclose(result["r_squared"], expected.rsquared)
+    assert np.isclose(result["adjusted_r_squared"], expected.rsquared_adj)
+    assert np.isclose(result["f_statistic"], expected.fvalue)
+    assert result["degrees_of_freedom"] == 196
+    assert np.isclose(result["residual_standard_error"], np.sqrt(expected.scale))
+    assert np.isclose(result["durbin_watson"], sm.stats.durbin_watson(expected.resid))
+
+
+def test_polynomial_shape_and_collinear_design():
+    """測試多項式係數格式，以及完全共線時回傳明確的錯誤"""
+    x = np.linspace(-2, 2, 30)
+    y = 1.0 + 2.0 * x - 0.5 * x ** 2
+    result = client.post("/api/v1/regression/polynomial", json={"x": x.tolist(), "y": y.tolist(), "degree": 2}).json()
+    assert np.allclose(result["coefficients"], [0.0, 2.0, -0.5])
+    assert np.isclose(result["intercept"], 1.0)
+    assert [row["term"] for row in result["coefficient_table"]] == ["intercept", "x", "x^2"]
+
+    collinear = np.column_stack([x, 2 * x + 1]).tolist()
+    response = client.post("/api/v1/regression/multiple", json={"x": collinear, "y": y.tolist()})
+    assert response.status_code == 400
+    assert "共線" in response.json()["detail"]
+
+
+def test_regression_does_not_import_sklearn():
+    """測試迴歸分析不再載入 sklearn"""
+    code = (
+        "import sys; from app.services.regression_analysis import RegressionAnalysisService; "
+        "RegressionAnalysisService().linear_regression([1.0, 2.0, 3.0], [1.0, 2.5, 2.9]); "
+        "print('sklearn' in sys.modules)"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1] == "False"
+
+
+def test_incremental_session_matches_multiple_regression():
+    """測試分批加入並跨工作階段合併的結果與一次送出所有資料列相同"""
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=(600, 2))
+    y = x @ [0.5, -1.5] + 2.0 + rng.normal(size=600)
+    expected = client.post("/api/v1/regression/multiple", json={"x": x.tolist(), "y": y.tolist()}).json()
+
+    first = client.post("/api/v1/regression/sessions", json={"n_features": 2}).json()["id"]
+    second = client.post("/api/v1/regression/sessions", json={"n_features": 2}).json()["id"]
+    for i, (rows, values) in enumerate(zip(np.array_split(x, 6), np.array_split(y, 6))):
+        session_id = first if i % 2 else second
+        info = client.post(f"/api/v1/regression/sessions/{session_id}/rows", json={
+            "x": rows.tolist(), "y": values.tolist()
+        }).json()
+    assert info["n"] == 300
+    state = client.get(f"/api/v1/regression/sessions/{second}/state").json()
+    assert client.post(f"/api/v1/regression/sessions/{first}/merge", json=state).json()["n"] == 600
+    negative = client.post(f"/api/v1/regression/sessions/{first}/merge", json={**state, "n": -1})
+    assert negative.status_code == 422
+    skewed = [row[:] for row in state["comoment"]]
+    skewed[0][1] += 1.0
+    asymmetric = client.post(f"/api/v1/regression/sessions/{first}/merge", json={**state, "comoment": skewed})
+    assert asymmetric.status_code == 400
+
+    result = client.post(f"/api/v1/regression/sessions/{first}/solve", json={}).json()
+    assert np.allclose(result["coefficients"], expected["coefficients"])
+    assert np.isclose(result["intercept"], expected["intercept"])
+    assert np.isclose(result["r_squared"], expected["r_squared"])
+    assert np.allclose(
+        [row["standard_error"] for row in result["coefficient_table"]],
+        [row["standard_error"] for row in expected["coefficient_table"]],
+    )
+    assert result["residuals"] is None and result["durbin_watson"] is None
+
+    bad = client.post(f"/api/v1/regression/sessions/{first}/rows", json={"x": [[1.0, 2.0, 3.0]], "y": [1.0]})
+    assert bad.status_code == 400
+    assert client.delete(f"/api/v1/regression/sessions/{first}").status_code == 200
+    assert client.post(f"/api/v1/regression/sessions/{first}/solve", json={}).status_code == 404
+
+
+def test_service_response_serializes_itself():
+    """測試服務回傳的模型 (含 NumPy 陣列欄位) 可自行序列化，係數表為模型物件"""
+    result = RegressionAnalysisService().linear_regression([1.0, 2.0, 3.0, 4.0, 5.0], [2.0, 4.1, 5.9, 8.2, 9.9])
+    assert np.isclose(result.coefficient_table[1].estimate, result.coefficients[0])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        dumped = result.model_dump()
+    assert dumped["residuals"] == json.loads(result.model_dump_json())["residuals"]
+    assert len(dumped["fitted_values"]) == 5
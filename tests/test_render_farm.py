@@ -0,0 +1,96 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.render_farm import RenderFarm
+
+client = TestClient(app)
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def test_render_farm_returns_png_bytes():
+    """測試繪圖行程池回傳編碼後的圖片"""
+    farm = RenderFarm(workers=1)
+    try:
+        farm.start()
+        image = farm.render({
+            "chart_type": "bar",
+            "data": [{"label": "甲", "value": 3.0}, {"label": "乙", "value": 5.0}],
+            "title": "測試",
+            "metadata": {"x_axis_label": "類別", "y_axis_label": "數值"},
+            "figsize": (4, 3),
+            "dpi": 50,
+            "image_format": "png",
+        })
+    finally:
+        farm.shutdown()
+    assert image.startswith(PNG_MAGIC)
+
+
+def test_histogram_endpoint_generates_image():
+    """測試直方圖端點經由繪圖行程池產生圖片"""
+    data = {
+        "values": [1, 2, 2, 3, 3, 3, 4, 4, 5, 6],
+        "generate_image": True,
+        "figsize": [4, 3],
+        "dpi": 50,
+    }
+    response = client.post("/api/v1/charts/histogram", json=data)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["has_image"] is True
+    assert result["image_base64"]
+
+
+def test_fixed_layout_renders_exact_size():
+    """測試固定版面只繪製一次，圖片大小為 figsize × dpi"""
+    import struct
+
+    from app.services.chart_service import LAYOUT_FIXED, ChartService
+
+    image = ChartService().render_chart_bytes(
+        chart_type="line",
+        data=[{"label": "一月", "value": 3.0}, {"label": "二月", "value": 5.0}],
+        title="測試",
+        metadata={"x_axis_label": "月份", "y_axis_label": "數值"},
+        figsize=(4, 3),
+        dpi=50,
+        layout=LAYOUT_FIXED,
+    )
+    assert image.startswith(PNG_MAGIC)
+    # PNG IHDR 區塊的寬與高
+    assert struct.unpack(">II", image[16:24]) == (200, 150)
+
+
+def test_histogram_image_delivery_modes():
+    """測試直方圖以圖片本身、multipart/mixed 與暫存網址回傳圖片"""
+    data = {
+        "values": [1, 2, 2, 3, 3, 3, 4, 4, 5, 6],
+        "generate_image": True,
+        "figsize": [4, 3],
+        "dpi": 50,
+    }
+    response = client.post("/api/v1/charts/histogram", json={**data, "image_delivery": "binary"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    image = response.content
+    assert image.startswith(PNG_MAGIC)
+
+    response = client.post("/api/v1/charts/histogram", json={**data, "image_delivery": "multipart"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("multipart/mixed; boundary=")
+    boundary = response.headers["content-type"].split("boundary=")[1].encode()
+    parts = response.content.split(b"--" + boundary)
+    assert b'"chart_type":"histogram"' in parts[1]
+    assert parts[2].split(b"\r\n\r\n", 1)[1].rstrip(b"\r\n") == image
+
+    response = client.post("/api/v1/charts/histogram", json={**data, "image_delivery": "url"})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["has_image"] is True and result["image_base64"] is None
+    fetched = client.get(result["image_url"])
+    assert fetched.status_code == 200
+    assert fetched.headers["content-type"] == "image/png"
+    assert fetched.content == image
+
+    assert client.get("/api/v1/charts/images/missing").status_code == 404
@@ -0,0 +1,50 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.array_codec import encode_raw_float64
+from app.services.result_cache import MISS, ResultCache, make_key
+
+client = TestClient(app)
+
+
+def test_key_is_content_addressed():
+    """測試 JSON 列表與 NumPy 陣列產生相同的鍵，參數不同時鍵不同"""
+    values = [1.0, 2.5, 3.0]
+    assert make_key("f", (values,), {"alpha": 0.05}) == make_key("f", (np.array(values),), {"alpha": 0.05})
+    assert make_key("f", (values,), {"alpha": 0.05}) != make_key("f", (values,), {"alpha": 0.01})
+    assert make_key("f", ([[1.0], [2.0, 3.0]],), {}) != make_key("f", ([[1.0, 2.0], [3.0]],), {})
+
+
+def test_lru_eviction_ttl_and_disk_tier(tmp_path):
+    """測試記憶體上限淘汰、TTL 過期與磁碟層回填"""
+    cache = ResultCache(max_bytes=200, ttl=60, disk_dir=str(tmp_path))
+    cache.put("a", b"x" * 120)
+    cache.put("b", b"y" * 120)
+    assert cache.stats()["evictions"] == 1
+    # 記憶體層已淘汰，仍可由磁碟層取得
+    assert cache.get("f", "a") == b"x" * 120
+    assert cache.stats()["disk_hits"] == 1
+
+    expired = ResultCache(ttl=0)
+    expired.put("c", 1)
+    assert expired.get("f", "c") is MISS
+
+
+def test_repeated_request_hits_cache():
+    """測試重複請求 (JSON 與二進位) 由快取回應"""
+    client.delete("/api/v1/system/cache")
+    name = "DescriptiveStatsService.calculate_distribution_stats"
+    before = client.get("/api/v1/system/cache").json()["by_function"].get(name, {"hits": 0, "misses": 0})
+    values = [3.1, 4.1, 5.9, 2.6, 5.3, 5.8]
+    first = client.post("/api/v1/descriptive/distribution", json={"values": values}).json()
+    second = client.post(
+        "/api/v1/descriptive/distribution",
+        content=encode_raw_float64(values),
+        headers={"content-type": "application/octet-stream"},
+    ).json()
+    assert first == second
+
+    after = client.get("/api/v1/system/cache").json()["by_function"][name]
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
@@ -0,0 +1,66 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.streaming_stats import CovarianceAccumulator, RowBlockReader
+
+client = TestClient(app)
+
+
+def test_accumulator_merge_matches_full_data():
+    """測試分區塊合併的相關矩陣與一次計算相同 (含大偏移量)"""
+    rng = np.random.default_rng(11)
+    data = rng.normal(size=(5000, 4)) + 1e6
+    accumulator = CovarianceAccumulator(4)
+    for chunk in np.array_split(data, 7):
+        accumulator.merge(CovarianceAccumulator.from_rows(chunk))
+    assert accumulator.n == 5000
+    assert np.allclose(accumulator.correlation(), np.corrcoef(data, rowvar=False))
+
+
+def test_row_block_reader_splits_on_row_boundaries():
+    """測試區塊只在完整資料列處切開"""
+    reader = RowBlockReader("csv", block_bytes=8)
+    blocks = reader.feed(b"a,b\n1,2\n3,") + reader.feed(b"4\n5,6\n")
+    tail = reader.finish()
+    assert reader.header == ["a", "b"]
+    assert b"".join(blocks + [tail or b""]) == b"1,2\n3,4\n5,6\n"
+    assert all(block.endswith(b"\n") for block in blocks)
+
+    quoted = RowBlockReader("csv")
+    quoted.feed(b'"x,1",b\n1,2\n')
+    assert quoted.header == ["x,1", "b"]
+
+
+def test_stream_endpoint_csv_and_float64():
+    """測試 CSV 與 float64 串流端點結果與一般相關矩陣端點一致"""
+    rng = np.random.default_rng(5)
+    data = rng.normal(size=(300, 3))
+    data[:, 1] += data[:, 0]
+    expected = client.post(
+        "/api/v1/correlation/matrix", json={"data": data.T.tolist(), "columns": ["x", "y", "z"]}
+    ).json()
+
+    csv_body = "x,y,z\n" + "\n".join(",".join(repr(v) for v in row) for row in data) + "\n"
+    response = client.post(
+        "/api/v1/correlation/matrix/stream", content=csv_body, headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 200
+    assert response.json()["n_observations"] == 300
+    assert np.allclose(response.json()["correlation_matrix"], expected["correlation_matrix"])
+    assert np.allclose(response.json()["p_values_matrix"], expected["p_values_matrix"])
+
+    response = client.post(
+        "/api/v1/correlation/matrix/stream?columns=x,y,z",
+        content=data.astype("<f8").tobytes(),
+        headers={"content-type": "application/octet-stream"},
+    )
+    assert response.status_code == 200
+    assert np.allclose(response.json()["correlation_matrix"], expected["correlation_matrix"])
+
+    response = client.post(
+        "/api/v1/correlation/matrix/stream?columns=x,y",
+        files={"file": ("data.csv", csv_body.encode(), "text/csv")},
+    )
+    assert response.status_code == 200
+    assert response.json()["columns"] == ["x", "y"]
@@ -0,0 +1,62 @@
+import numpy as np
+from fastapi.testclient import TestClient
+from scipy import stats
+
+from app.main import app
+from app.services.streaming_stats import MomentAccumulator
+
+client = TestClient(app)
+
+
+def test_moment_merge_matches_scipy():
+    """測試分區塊合併的動差與 SciPy 一次計算相同"""
+    values = np.random.default_rng(2).gamma(2.0, size=20001) + 1e4
+    moments = MomentAccumulator()
+    for chunk in np.array_split(values, 9):
+        moments.merge(MomentAccumulator.from_values(chunk))
+    assert np.isclose(moments.variance(), np.var(values, ddof=1))
+    assert np.isclose(moments.skewness(), stats.skew(values))
+    assert np.isclose(moments.kurtosis(), stats.kurtosis(values))
+    assert np.allclose(moments.normality_test(), stats.normaltest(values))
+
+
+def test_basic_and_distribution_stream_endpoints():
+    """測試串流端點與一般端點結果一致"""
+    values = np.random.default_rng(4).normal(50, 10, size=500)
+    body = values.astype("<f8").tobytes()
+    headers = {"content-type": "application/octet-stream"}
+
+    expected = client.post("/api/v1/descriptive/basic", json={"values": values.tolist()}).json()
+    result = client.post("/api/v1/descriptive/basic/stream", content=body, headers=headers).json()
+    for key in ("mean", "std", "variance", "min", "max", "range", "count"):
+        assert np.isclose(result[key], expected[key])
+
+    csv_body = "id,score\n" + "\n".join(f"{i},{v!r}" for i, v in enumerate(values)) + "\n"
+    response = client.post(
+        "/api/v1/descriptive/distribution/stream?column=score",
+        content=csv_body,
+        headers={"content-type": "text/csv"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["normality_test"] == "dagostino_k2"
+    assert np.isclose(result["normality_p_value"], stats.normaltest(values).pvalue)
+    assert np.isclose(result["skewness"], stats.skew(values))
+
+
+def test_float64_stream_drops_missing_rows_like_csv():
+    """測試 float64 串流與 CSV 相同地略過含 NaN 的資料列"""
+    values = [1.0, 2.0, np.nan, 4.0, 5.0]
+    raw = client.post(
+        "/api/v1/descriptive/basic/stream",
+        content=np.array(values, dtype="<f8").tobytes(),
+        headers={"content-type": "application/octet-stream"},
+    ).json()
+    csv = client.post(
+        "/api/v1/descriptive/basic/stream?column=v",
+        content="v\n1\n2\nnan\n4\n5\n",
+        headers={"content-type": "text/csv"},
+    ).json()
+    assert raw["count"] == csv["count"] == 4
+    assert raw["mean"] == csv["mean"] == 3.0
+    assert raw["median"] == csv["median"]